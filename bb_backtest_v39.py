@@ -0,0 +1,668 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ═══════════════════════════════════════════════════════════════════════
+# BB Backtest v39 — 이벤트 기반 과거 데이터 재생기 (실제 매수/매도 엔진 구동)
+# ═══════════════════════════════════════════════════════════════════════
+"""
+저장된 캔들 이력을 시뮬레이션 시계로 재생하며 v39 엔진을 그대로 구동.
+
+[해결 문제]
+DAE_TIERS / RATCHET_STOP_TIERS 같은 규칙 변경을 검증하려면 실거래로 돌려보는 수밖에 없었음.
+엔진은 get_candles_*, get_current_price, datetime.now(), time.time()을 직접 호출 →
+30일치를 확인하려면 30일이 걸림.
+
+[설계]
+  1. 엔진 무수정
+     - EMATrendBuyEngine.check_buy_signal / TrendSellEngine.check_sell_signal /
+       MarketWideScreener.run_full_screening / EMA4HTracker를 그대로 사용
+     - 엔진 생성 시 ReplayMarketProvider(시뮬레이션 시계 + 재생 캔들/시세/계정) 주입
+       → 봇 모듈 전역은 건드리지 않음 (실거래 엔진과 같은 프로세스에서도 실행 가능)
+
+  2. 데이터
+     - 5분봉이 기준 타임라인 (필수), 15분/1H/4H는 원본이 있으면 사용, 없으면 5분봉 재집계
+     - 진행 중인 상위 봉은 같은 슬롯의 5분봉 누적(open/high/low/close/volume) → 실시간과 같은 모양
+     - 입력: crypto_data_downloader_v3 CSV 폴더 또는 로컬 캔들 DB(upbit_candle_store)
+     - 프레임은 스텝×티커×시간봉당 1회 생성
+     - 지표는 봇의 IncrementalIndicatorState로 확정봉을 한 번씩만 반영, 프레임 창 값은 window()
+       (같은 프레임의 add_indicators 결과와 동일 — 실시간 add_indicators_incremental과 같은 값)
+       → 프레임마다 지표 컬럼을 DataFrame 생성자 한 번으로 구성 (컬럼별 삽입 비용 제거)
+
+  3. 시뮬레이션
+     - 5분봉 마감 직전(봉 시작 + 299초)마다 1스텝: 4H EMA 동기화 → 정시 스크리닝 →
+       보유 코인 매도 평가 → 후보 코인 매수 평가
+     - 체결: 평가 가격 ± 슬리피지, 양방향 수수료 (시장가 즉시 체결 가정)
+     - 매수 금액/보유 한도/재진입 쿨다운은 execute_buy 규칙과 동일
+     - 미반영: 틱 단위 트리거(5분 종가 해상도), 일일 거래 한도/연속 손실/시장 상태 게이트
+
+  4. 출력
+     - 체결 목록 (sell_category, 사유, 세션/단계 포함), 자산 곡선, 수익률/MDD/승률,
+       포지션당 기대값(분할 매도 합산), 매도 사유별 집계
+
+[사용 예시]
+
+    data = load_csv_dir("./market_data", ["KRW-ETH", "KRW-XRP", "KRW-BTC"])
+    result = Backtester(data, initial_cash=1_000_000).run()
+    print(result.summary())
+    result.trades_df().to_csv("bt_trades.csv")
+
+    # CLI
+    python bb_backtest_v39.py --csv-dir ./market_data --start 2026-01-01 --end 2026-02-01
+    python bb_backtest_v39.py --store --tickers KRW-ETH,KRW-XRP,KRW-BTC --days 30
+"""
+
+import argparse
+import glob
+import os
+import re
+import sys
+import time as _real_time
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import bb_bounce_hunter_v39 as bot
+from upbit_market_provider import MarketDataProvider
+
+
+# ============================================================================
+# SECTION 1: 기본 설정
+# ============================================================================
+
+BASE_TF = "5m"
+TF_SECONDS = {"5m": 300, "15m": 900, "1h": 3600, "4h": 14400}
+TF_INTERVAL_CODES = {"5m": "minute5", "15m": "minute15", "1h": "minute60", "4h": "minute240"}
+KST_OFFSET_SEC = 9 * 3600
+
+# 스텝당 생성하는 프레임 길이 (엔진 요청 count의 최대값 이상)
+FRAME_ROWS = {"5m": 60, "15m": 60, "1h": 60, "4h": bot.EMA_4H_HISTORY_COUNT + 1}
+
+DEFAULT_INITIAL_CASH = 1_000_000
+DEFAULT_FEE_RATE = 0.0005        # 업비트 KRW 마켓 수수료 0.05%
+DEFAULT_SLIPPAGE_BPS = 5.0       # 시장가 체결 슬리피지 (bp)
+EMA_MIN_4H_BARS = 60             # EMA4HTracker.init_from_df 최소 봉 수
+DAY_BARS_5M = 288                # 24h 거래대금 롤링 창 (5분봉 개수)
+
+VOL_RATIO_WINDOW = 10            # _finish_candles_1h 거래량 비율 창
+MIN_FRAME_ROWS = 20              # add_indicators 최소 행 수 (미만이면 None — 실시간과 동일)
+INDICATOR_HISTORY = 1000         # 시간봉별 지표 상태 보관 봉 수 (프레임 창이 더 길면 add_indicators)
+
+
+# ============================================================================
+# SECTION 2: 시간 유틸 (인덱스는 KST naive, 시계는 UTC epoch)
+# ============================================================================
+
+def _kst_index_to_epoch(index: pd.DatetimeIndex) -> np.ndarray:
+    """KST naive 인덱스 → UTC epoch 초 배열"""
+    return index.values.astype("datetime64[s]").astype(np.int64) - KST_OFFSET_SEC
+
+
+def _epoch_to_kst_index(epochs: np.ndarray) -> pd.DatetimeIndex:
+    return pd.DatetimeIndex((np.asarray(epochs, dtype=np.int64) + KST_OFFSET_SEC).astype("datetime64[s]"))
+
+
+def _epoch_to_kst(ts: float) -> datetime:
+    return datetime(1970, 1, 1) + timedelta(seconds=ts + KST_OFFSET_SEC)
+
+
+def _slot_start(epochs: np.ndarray, tf: str) -> np.ndarray:
+    """UTC 기준 정렬된 봉 시작 epoch (업비트 캔들 경계와 동일)"""
+    sec = TF_SECONDS[tf]
+    return (epochs // sec) * sec
+
+
+# ============================================================================
+# SECTION 3: 데이터 적재
+# ============================================================================
+
+_CSV_NAME = re.compile(r"^([A-Z0-9]+)_(minute\d+|day|week|month)_")
+
+
+def _normalize_ohlcv(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    if df is None or df.empty:
+        return None
+    df = df.copy()
+    df.index = pd.DatetimeIndex(pd.to_datetime(df.index)).tz_localize(None)
+    df = df[~df.index.duplicated(keep="last")].sort_index()
+    if "value" not in df.columns:
+        df["value"] = df["close"] * df["volume"]
+    df = df[["open", "high", "low", "close", "volume", "value"]].astype(float)
+    return df[df["close"] > 0]
+
+
+def load_csv_dir(path: str, tickers: Optional[List[str]] = None) -> Dict[str, Dict[str, pd.DataFrame]]:
+    """다운로더 CSV 폴더 → {ticker: {tf: DataFrame}} (같은 코인/시간봉은 가장 최근 파일)"""
+    codes = {v: k for k, v in TF_INTERVAL_CODES.items()}
+    latest: Dict[tuple, str] = {}
+    for fp in sorted(glob.glob(os.path.join(path, "*.csv"))):
+        m = _CSV_NAME.match(os.path.basename(fp))
+        if not m or m.group(2) not in codes:
+            continue
+        ticker = f"KRW-{m.group(1)}"
+        if tickers and ticker not in tickers:
+            continue
+        latest[(ticker, codes[m.group(2)])] = fp      # 파일명 끝 타임스탬프 순 정렬 → 마지막이 최신
+    data: Dict[str, Dict[str, pd.DataFrame]] = {}
+    for (ticker, tf), fp in latest.items():
+        df = _normalize_ohlcv(pd.read_csv(fp, index_col=0, encoding="utf-8-sig"))
+        if df is not None:
+            data.setdefault(ticker, {})[tf] = df
+    return data
+
+
+def load_from_store(tickers: List[str], start: Optional[datetime] = None,
+                    end: Optional[datetime] = None) -> Dict[str, Dict[str, pd.DataFrame]]:
+    """로컬 캔들 DB → {ticker: {tf: DataFrame}} (네트워크 조회 없음)"""
+    store = bot.get_candle_store()
+    data: Dict[str, Dict[str, pd.DataFrame]] = {}
+    for ticker in tickers:
+        for tf, code in TF_INTERVAL_CODES.items():
+            df = _normalize_ohlcv(store.read(ticker, code))
+            if df is None:
+                continue
+            if end is not None:
+                df = df[df.index < end]
+            if start is not None and tf == BASE_TF:
+                df = df[df.index >= start]
+            data.setdefault(ticker, {})[tf] = df
+    return data
+
+
+# ============================================================================
+# SECTION 4: 티커별 재생 데이터 (사전 계산 배열)
+# ============================================================================
+
+class _TickerSeries:
+    """5분봉 기준 배열 + 상위 시간봉 확정봉 + 진행 봉 누적값"""
+
+    def __init__(self, ticker: str, frames: Dict[str, pd.DataFrame]):
+        self.ticker = ticker
+        m5 = frames[BASE_TF]
+        self.t5 = _kst_index_to_epoch(m5.index)
+        self.o5, self.h5, self.l5, self.c5, self.v5, self.val5 = (
+            m5[c].to_numpy(dtype=float) for c in ("open", "high", "low", "close", "volume", "value"))
+
+        # 24h 거래대금/거래량 (롤링), 전일 종가 (UTC 0시 = KST 9시 기준 — 업비트 등락률 기준)
+        self.roll_val = m5["value"].rolling(DAY_BARS_5M, min_periods=1).sum().to_numpy()
+        self.roll_vol = m5["volume"].rolling(DAY_BARS_5M, min_periods=1).sum().to_numpy()
+        day = self.t5 // 86400
+        last_close = pd.Series(self.c5).groupby(day).transform("last").to_numpy()
+        day_change = np.flatnonzero(np.diff(day)) + 1
+        ref = np.full(len(self.t5), np.nan)
+        for i, start in enumerate(day_change):
+            stop = day_change[i + 1] if i + 1 < len(day_change) else len(day)
+            ref[start:stop] = last_close[start - 1]
+        self.prev_day_close = ref
+
+        self._ind: Dict[str, "bot.IncrementalIndicatorState"] = {}
+        self.closed: Dict[str, tuple] = {}
+        self.forming: Dict[str, tuple] = {}
+        for tf in ("15m", "1h", "4h"):
+            slot = _slot_start(self.t5, tf)
+            g = pd.DataFrame({"slot": slot, "o": self.o5, "h": self.h5, "l": self.l5,
+                              "v": self.v5, "val": self.val5}).groupby("slot")
+            self.forming[tf] = (slot, g["o"].transform("first").to_numpy(),
+                                g["h"].cummax().to_numpy(), g["l"].cummin().to_numpy(),
+                                self.c5, g["v"].cumsum().to_numpy(), g["val"].cumsum().to_numpy())
+            native = frames.get(tf)
+            if native is None:
+                native = m5.groupby(_epoch_to_kst_index(slot)).agg(
+                    {"open": "first", "high": "max", "low": "min", "close": "last",
+                     "volume": "sum", "value": "sum"})
+            ts = _slot_start(_kst_index_to_epoch(native.index), tf)
+            self.closed[tf] = (ts, *(native[c].to_numpy(dtype=float)
+                                     for c in ("open", "high", "low", "close", "volume", "value")))
+
+    def pos_at(self, bar_start: int) -> int:
+        """bar_start 시점까지의 마지막 5분봉 위치 (상장 전이면 -1)"""
+        return int(np.searchsorted(self.t5, bar_start, side="right")) - 1
+
+    def first_ready_ts(self) -> int:
+        """4H 확정봉이 EMA 초기화에 충분해지는 첫 5분봉 시각"""
+        ts4 = self.closed["4h"][0]
+        if len(ts4) < EMA_MIN_4H_BARS + 1:
+            return int(self.t5[-1]) + 1
+        return max(int(ts4[EMA_MIN_4H_BARS]), int(self.t5[0]))
+
+    def _indicator_state(self, tf: str, closes: np.ndarray, k: int):
+        """확정봉 k개까지 지표 상태 전진 (재생은 단조 증가 → 봉당 push 1회)"""
+        state = self._ind.get(tf)
+        if state is None:
+            state = self._ind[tf] = bot.IncrementalIndicatorState(history=INDICATOR_HISTORY)
+        for i in range(state.count, k):
+            state.push(closes[i])
+        return state
+
+    def frame(self, tf: str, pos: int, rows: int) -> Optional[pd.DataFrame]:
+        """pos(5분봉) 시점의 tf 프레임 — 확정봉 rows-1개 + 진행 봉 1개 (지표 포함)"""
+        if pos < 0:
+            return None
+        if tf == BASE_TF:
+            k = pos
+            closed = (self.t5, self.o5, self.h5, self.l5, self.c5, self.v5, self.val5)
+            cur = tuple(arr[pos] for arr in closed)
+        else:
+            closed = self.closed[tf]
+            k = int(np.searchsorted(closed[0], self.forming[tf][0][pos], side="left"))
+            cur = tuple(arr[pos] for arr in self.forming[tf])
+        lo = max(0, k - rows + 1)
+        if k + 1 - lo < MIN_FRAME_ROWS:
+            return None
+        ts, o, h, l, c, v, val = (np.append(arr[lo:k], x) for arr, x in zip(closed, cur))
+
+        cols = {"open": o, "high": h, "low": l, "close": c, "volume": v, "value": val}
+        ind = self._indicator_state(tf, closed[4], k).window(lo, cur[4])
+        if ind is None:
+            ind = bot.add_indicators(pd.DataFrame(cols))
+        for col in bot._INDICATOR_COLUMNS:
+            cols[col] = np.asarray(ind[col], dtype=float)
+        cols["is_bull"] = c >= o
+        cols["srsi_direction"] = np.where(cols["srsi_k"] > cols["srsi_d"], "↗",
+                                          np.where(cols["srsi_k"] < cols["srsi_d"], "↘", "→"))
+        if tf == "1h":
+            # _finish_candles_1h: volume / rolling(10).mean() (창 부족 구간은 자기 자신 → 1.0)
+            csum = np.cumsum(np.insert(v, 0, 0.0))
+            w = VOL_RATIO_WINDOW
+            mean = v.copy()
+            if len(v) >= w:
+                mean[w - 1:] = (csum[w:] - csum[:-w]) / w
+            cols["vol_ratio"] = v / mean
+        return pd.DataFrame(cols, index=_epoch_to_kst_index(ts))
+
+    def ticker_row(self, pos: int) -> dict:
+        """/v1/ticker 응답 형식 (스크리너 스냅샷 입력)"""
+        close = self.c5[pos]
+        ref = self.prev_day_close[pos]
+        change = close / ref - 1 if ref == ref and ref > 0 else 0.0
+        return {"market": self.ticker, "trade_price": close, "signed_change_rate": change,
+                "acc_trade_price_24h": self.roll_val[pos], "acc_trade_volume_24h": self.roll_vol[pos]}
+
+
+# ============================================================================
+# SECTION 4-B: 재생 공급자 (엔진 주입용 MarketDataProvider 구현)
+# ============================================================================
+
+class ReplayMarketProvider(MarketDataProvider):
+    """
+    저장 캔들 재생 공급자.
+    advance(bar_start)로 5분봉 단위 전진 — 시계는 봉 마감 직전(봉 시작 + 299초),
+    프레임은 스텝×티커×시간봉당 1회 생성.
+    """
+
+    def __init__(self, series: Dict[str, _TickerSeries]):
+        self.series = series
+        self.ts = 0.0
+        self.account: Dict[str, tuple] = {}     # currency → (보유 수량, 평균 매수가) — Backtester 갱신
+        self._pos: Dict[str, int] = {}
+        self._step = -1
+        self._frames: Dict[tuple, tuple] = {}
+
+    def advance(self, bar_start: int):
+        self._step += 1
+        self.ts = float(bar_start + TF_SECONDS[BASE_TF] - 1)
+        for tk, s in self.series.items():
+            self._pos[tk] = s.pos_at(bar_start)
+
+    def listed(self) -> List[str]:
+        """현재 시점에 데이터가 있는 티커"""
+        return [tk for tk, p in self._pos.items() if p >= 0]
+
+    def time(self) -> float:
+        return self.ts
+
+    def now(self) -> datetime:
+        return _epoch_to_kst(self.ts)
+
+    def candles(self, ticker: str, tf: str, count: int) -> Optional[pd.DataFrame]:
+        s = self.series.get(ticker)
+        pos = self._pos.get(ticker, -1)
+        if s is None or pos < 0 or tf not in FRAME_ROWS:
+            return None
+        key = (ticker, tf)
+        cached = self._frames.get(key)
+        if cached is None or cached[0] != self._step:
+            df = s.frame(tf, pos, max(FRAME_ROWS[tf], count))
+            self._frames[key] = cached = (self._step, df)
+        df = cached[1]
+        return None if df is None else df.iloc[-count:]
+
+    def price(self, ticker: str) -> Optional[float]:
+        s = self.series.get(ticker)
+        pos = self._pos.get(ticker, -1)
+        return float(s.c5[pos]) if s is not None and pos >= 0 else None
+
+    def balances(self) -> Optional[List[dict]]:
+        return [{"currency": cur, "balance": str(qty), "locked": "0",
+                 "avg_buy_price": str(avg), "unit_currency": "KRW"}
+                for cur, (qty, avg) in self.account.items()]
+
+    def markets(self) -> List[str]:
+        return list(self.series)
+
+    def tickers(self, markets: List[str]) -> List[dict]:
+        return [self.series[m].ticker_row(self._pos[m]) for m in markets
+                if m in self.series and self._pos.get(m, -1) >= 0]
+
+
+# ============================================================================
+# SECTION 5: 결과
+# ============================================================================
+
+class BacktestResult:
+    def __init__(self, trades: List[dict], equity: pd.Series, initial_cash: float,
+                 open_positions: Dict[str, dict], elapsed_sec: float, steps: int,
+                 ema_sync: Optional[Dict[str, int]] = None):
+        self.trades = trades
+        self.equity = equity
+        self.initial_cash = initial_cash
+        self.open_positions = open_positions
+        self.elapsed_sec = elapsed_sec
+        self.steps = steps
+        self.ema_sync = dict(ema_sync or {})     # EMA4H sync_from_df 결과별 횟수 (stream/init/current/fail)
+
+    def trades_df(self) -> pd.DataFrame:
+        return pd.DataFrame(self.trades)
+
+    def _round_trips(self) -> List[tuple]:
+        """청산 완료 포지션별 (손익 KRW, 손익 % — 매수 금액 대비, 분할 매도 합산)"""
+        cost = {(t["ticker"], t["ts"]): t["amount_krw"] for t in self.trades if t["side"] == "buy"}
+        pnl: Dict[tuple, float] = {}
+        trips = []
+        for t in self.trades:
+            if t["side"] != "sell":
+                continue
+            key = (t["ticker"], t["buy_ts"])
+            pnl[key] = pnl.get(key, 0.0) + t["pnl_krw"]
+            if t["ratio"] >= 1.0 and cost.get(key):
+                trips.append((pnl[key], pnl.pop(key) / cost[key] * 100))
+        return trips
+
+    def metrics(self) -> dict:
+        sells = [t for t in self.trades if t["side"] == "sell"]
+        closed = [t for t in sells if t["ratio"] >= 1.0]
+        trips = self._round_trips()
+        final = float(self.equity.iloc[-1]) if len(self.equity) else self.initial_cash
+        peak = self.equity.cummax() if len(self.equity) else self.equity
+        dd = ((peak - self.equity) / peak * 100) if len(self.equity) else peak
+        wins = sum(1 for t in closed if t["profit_pct"] > 0)
+        return {
+            "final_equity": final,
+            "return_pct": (final / self.initial_cash - 1) * 100,
+            "max_drawdown_pct": float(dd.max()) if len(dd) else 0.0,
+            "buys": sum(1 for t in self.trades if t["side"] == "buy"),
+            "sells": len(sells),
+            "closed_trades": len(closed),
+            "win_rate": wins / len(closed) * 100 if closed else 0.0,
+            "avg_profit_pct": float(np.mean([t["profit_pct"] for t in closed])) if closed else 0.0,
+            "expectancy_pct": float(np.mean([p for _, p in trips])) if trips else 0.0,
+            "expectancy_krw": float(np.mean([k for k, _ in trips])) if trips else 0.0,
+            "pnl_krw": sum(t["pnl_krw"] for t in sells),
+            "steps": self.steps,
+            "elapsed_sec": self.elapsed_sec,
+        }
+
+    def by_category(self) -> pd.DataFrame:
+        df = self.trades_df()
+        if df.empty or "sell_category" not in df:
+            return pd.DataFrame()
+        sells = df[df["side"] == "sell"]
+        return sells.groupby("sell_category").agg(
+            trades=("profit_pct", "size"),
+            win_rate=("profit_pct", lambda s: (s > 0).mean() * 100),
+            avg_pct=("profit_pct", "mean"),
+            pnl_krw=("pnl_krw", "sum"),
+        ).sort_values("pnl_krw", ascending=False)
+
+    def summary(self) -> str:
+        m = self.metrics()
+        lines = [
+            f"기간: {self.equity.index[0]} ~ {self.equity.index[-1]}" if len(self.equity) else "기간: -",
+            f"스텝: {m['steps']:,} (소요 {m['elapsed_sec']:.1f}초)",
+            f"최종 자산: {m['final_equity']:,.0f}원 ({m['return_pct']:+.2f}%) | MDD {m['max_drawdown_pct']:.2f}%",
+            f"매수 {m['buys']}회 | 매도 {m['sells']}회 (전량 {m['closed_trades']}회) | "
+            f"승률 {m['win_rate']:.1f}% | 평균 {m['avg_profit_pct']:+.2f}% | 손익 {m['pnl_krw']:+,.0f}원",
+            f"기대값: 포지션당 {m['expectancy_pct']:+.2f}% ({m['expectancy_krw']:+,.0f}원, 분할 매도 합산)",
+        ]
+        cat = self.by_category()
+        if not cat.empty:
+            lines.append("매도 사유별:")
+            for name, row in cat.iterrows():
+                lines.append(f"  {name:<14s} {int(row['trades']):>4d}건 승률 {row['win_rate']:5.1f}% "
+                             f"평균 {row['avg_pct']:+.2f}% 손익 {row['pnl_krw']:+,.0f}원")
+        if self.ema_sync:
+            lines.append("EMA4H 동기화: " + " | ".join(f"{k} {v}" for k, v in sorted(self.ema_sync.items())))
+        if self.open_positions:
+            lines.append(f"미청산: {', '.join(self.open_positions)}")
+        return "\n".join(lines)
+
+
+# ============================================================================
+# SECTION 6: 백테스터
+# ============================================================================
+
+class Backtester:
+    """
+    과거 데이터 재생기.
+
+    [Thread Safety]
+    엔진/공급자는 실행마다 새로 생성 (봇 모듈 전역 교체 없음).
+    단, quiet=True의 stdout 전환과 전략 상수(DAE_TIERS 등)는 프로세스 전역.
+    """
+
+    def __init__(self, data: Dict[str, Dict[str, pd.DataFrame]],
+                 initial_cash: float = DEFAULT_INITIAL_CASH,
+                 fee_rate: float = DEFAULT_FEE_RATE,
+                 slippage_bps: float = DEFAULT_SLIPPAGE_BPS,
+                 start: Optional[datetime] = None, end: Optional[datetime] = None,
+                 quiet: bool = True, series: Optional[Dict[str, _TickerSeries]] = None):
+        # series: 이전 실행의 재생 데이터 재사용 (파라미터 스윕 — 지표 상태는 데이터에만 의존)
+        if series is None:
+            series = {tk: _TickerSeries(tk, fr) for tk, fr in data.items()
+                      if fr.get(BASE_TF) is not None and len(fr[BASE_TF]) > 0}
+        self.series = series
+        if not self.series:
+            raise ValueError("5분봉 데이터가 있는 티커가 없습니다")
+        self.initial_cash = initial_cash
+        self.fee_rate = fee_rate
+        self.slippage = slippage_bps / 10000
+        self.quiet = quiet
+
+        all_t5 = np.unique(np.concatenate([s.t5 for s in self.series.values()]))
+        first = min(s.first_ready_ts() for s in self.series.values())
+        lo = first if start is None else max(first, int(_kst_index_to_epoch(pd.DatetimeIndex([start]))[0]))
+        hi = None if end is None else int(_kst_index_to_epoch(pd.DatetimeIndex([end]))[0])
+        mask = all_t5 >= lo
+        if hi is not None:
+            mask &= all_t5 < hi
+        self.timeline = all_t5[mask]
+
+    # ─────────────────────────────────────────────
+    # 재생
+    # ─────────────────────────────────────────────
+
+    def run(self) -> BacktestResult:
+        t0 = _real_time.perf_counter()
+        sink = open(os.devnull, "w") if self.quiet else sys.stdout
+        try:
+            with redirect_stdout(sink):
+                trades, equity, open_pos, ema_sync = self._run()
+        finally:
+            if sink is not sys.stdout:
+                sink.close()
+        return BacktestResult(trades, equity, self.initial_cash, open_pos,
+                              _real_time.perf_counter() - t0, len(self.timeline), ema_sync)
+
+    def _fill(self, price: float, side: str) -> float:
+        return price * (1 + self.slippage) if side == "buy" else price * (1 - self.slippage)
+
+    @staticmethod
+    def _sync_account(provider: ReplayMarketProvider, cash: float, positions: Dict[str, dict]):
+        provider.account = {"KRW": (cash, 0.0)}
+        for tk, p in positions.items():
+            provider.account[tk.split("-", 1)[1]] = (p["qty"], p["buy_price"])
+
+    def _run(self):
+        provider = ReplayMarketProvider(self.series)
+        ema_tracker = bot.EMA4HTracker(provider=provider)
+        screener = bot.MarketWideScreener(ema_tracker, snapshot=bot.MarketSnapshot(), provider=provider)
+        buy_engine = bot.EMATrendBuyEngine(ema_tracker, provider=provider)
+        sell_engine = bot.TrendSellEngine(ema_tracker, provider=provider)
+
+        cash = self.initial_cash
+        positions: Dict[str, dict] = {}
+        last_sells: Dict[str, tuple] = {}        # ticker → (매도 시각, sell_category) — 재진입 쿨다운
+        trades: List[dict] = []
+        eq_ts, eq_val = [], []
+        last_4h_slot = last_screen_slot = None
+        ema_sync: Dict[str, int] = {}
+        screen_sec = bot.SCREENING_INTERVAL_MIN * 60
+        self._sync_account(provider, cash, positions)
+
+        for bar_start in self.timeline:
+            provider.advance(bar_start)
+            now_ts = provider.time()
+            live = provider.listed()
+
+            # ── 4H EMA: 새 4H 슬롯이면 확정봉 동기화, 매 스텝 현재가 갱신 ──
+            slot_4h = int(bar_start // TF_SECONDS["4h"])
+            if slot_4h != last_4h_slot:
+                last_4h_slot = slot_4h
+                for tk in live:
+                    res = ema_tracker.sync_from_df(tk, provider.candles(tk, "4h", bot.EMA_4H_HISTORY_COUNT))
+                    ema_sync[res] = ema_sync.get(res, 0) + 1
+            for tk in live:
+                ema_tracker.update_current_price(tk, provider.price(tk))
+
+            # ── 정시 스크리닝 → 매수 후보 ──
+            slot_screen = int(bar_start // screen_sec)
+            if slot_screen != last_screen_slot:
+                last_screen_slot = slot_screen
+                screener.update_exclude_coins(set(positions))
+                buy_engine.register_candidates(screener.run_full_screening())
+
+            # ── 매도 평가 ──
+            for tk in list(positions):
+                price = provider.price(tk)
+                if price is None:
+                    continue
+                sig = sell_engine.check_sell_signal(tk, price)
+                if not sig.get("signal"):
+                    continue
+                pos = positions[tk]
+                ratio = float(sig.get("sell_ratio", 1.0) or 1.0)
+                is_partial = ratio < 1.0 and sig.get("sell_category") == "PARTIAL_TAKE"
+                qty = pos["qty"] * (ratio if is_partial else 1.0)
+                fill = self._fill(price, "sell")
+                proceeds = qty * fill * (1 - self.fee_rate)
+                cost = pos["cost"] * (qty / pos["qty"])
+                cash += proceeds
+                trades.append({
+                    "side": "sell", "ts": _epoch_to_kst(now_ts), "ticker": tk,
+                    "buy_ts": _epoch_to_kst(pos["buy_ts"]), "buy_price": pos["buy_price"],
+                    "price": fill, "ratio": ratio if is_partial else 1.0,
+                    "profit_pct": (fill - pos["buy_price"]) / pos["buy_price"] * 100,
+                    "pnl_krw": proceeds - cost,
+                    "sell_category": sig.get("sell_category", "NONE"),
+                    "reason": sig.get("reason", ""), "session": sig.get("session"),
+                    "phase": sig.get("phase"), "hold_hours": (now_ts - pos["buy_ts"]) / 3600,
+                })
+                if is_partial:
+                    pos["qty"] -= qty
+                    pos["cost"] -= cost
+                    sell_engine.mark_partial_done(tk, sig.get("partial_tier"))
+                else:
+                    del positions[tk]
+                    sell_engine.remove(tk)
+                    last_sells[tk] = (now_ts, sig.get("sell_category", "PROFIT_TAKE"))
+                self._sync_account(provider, cash, positions)
+
+            # ── 매수 평가 (execute_buy 규칙: 보유 한도 / 쿨다운 / 최소 금액 / 분할 비율) ──
+            if len(positions) < bot.MAX_HOLDINGS and cash >= bot.MIN_BUY_AMOUNT_KRW:
+                for tk in buy_engine.get_watch_list():
+                    if tk in positions or provider.price(tk) is None:
+                        continue
+                    sig = buy_engine.check_buy_signal(tk)
+                    if not sig.get("signal"):
+                        continue
+                    sold = last_sells.get(tk)
+                    if sold and now_ts - sold[0] < bot.get_cooldown_for_category(sold[1]) * 60:
+                        continue
+                    if sig["entry_price"] < bot.MIN_BUY_PRICE:
+                        continue
+                    ratio = bot.FIRST_BUY_RATIO if not positions else 1.0
+                    amount = cash * ratio * bot.BUY_FEE_BUFFER
+                    if amount < bot.MIN_BUY_AMOUNT_KRW:
+                        continue
+                    fill = self._fill(provider.price(tk), "buy")
+                    cash -= amount * (1 + self.fee_rate)
+                    positions[tk] = {"qty": amount / fill, "cost": amount * (1 + self.fee_rate),
+                                     "buy_price": fill, "buy_ts": now_ts}
+                    sell_engine.register(tk, fill, now_ts, buy_bb_width=sig.get("bb_width_pct"))
+                    buy_engine.record_buy(tk)
+                    self._sync_account(provider, cash, positions)
+                    trades.append({"side": "buy", "ts": _epoch_to_kst(now_ts), "ticker": tk,
+                                   "price": fill, "amount_krw": amount, "reason": sig.get("reason", "")})
+                    if len(positions) >= bot.MAX_HOLDINGS:
+                        break
+
+            eq_ts.append(bar_start)
+            eq_val.append(cash + sum(p["qty"] * (provider.price(tk) or p["buy_price"])
+                                     for tk, p in positions.items()))
+
+        equity = pd.Series(eq_val, index=_epoch_to_kst_index(np.array(eq_ts, dtype=np.int64)),
+                           dtype=float, name="equity")
+        open_pos = {tk: {"qty": p["qty"], "buy_price": p["buy_price"],
+                         "buy_ts": _epoch_to_kst(p["buy_ts"])} for tk, p in positions.items()}
+        return trades, equity, open_pos, ema_sync
+
+
+# ============================================================================
+# SECTION 7: CLI
+# ============================================================================
+
+def _parse_date(s: Optional[str]) -> Optional[datetime]:
+    return datetime.strptime(s, "%Y-%m-%d") if s else None
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="v39 매수/매도 엔진 과거 데이터 백테스트")
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--csv-dir", help="crypto_data_downloader_v3 CSV 폴더")
+    src.add_argument("--store", action="store_true", help="로컬 캔들 DB 사용")
+    ap.add_argument("--tickers", help="쉼표 구분 (예: KRW-ETH,KRW-BTC)")
+    ap.add_argument("--start", help="KST YYYY-MM-DD")
+    ap.add_argument("--end", help="KST YYYY-MM-DD (미포함)")
+    ap.add_argument("--days", type=int, help="--store: 종료일(기본 현재) 이전 N일 재생")
+    ap.add_argument("--cash", type=float, default=DEFAULT_INITIAL_CASH)
+    ap.add_argument("--fee", type=float, default=DEFAULT_FEE_RATE)
+    ap.add_argument("--slippage-bps", type=float, default=DEFAULT_SLIPPAGE_BPS)
+    ap.add_argument("--out", help="체결 목록 CSV 저장 경로")
+    ap.add_argument("--verbose", action="store_true", help="엔진 로그 출력")
+    args = ap.parse_args(argv)
+
+    tickers = [t.strip() for t in args.tickers.split(",")] if args.tickers else None
+    start, end = _parse_date(args.start), _parse_date(args.end)
+    if args.days and start is None:
+        start = (end or datetime.now()) - timedelta(days=args.days)
+
+    if args.csv_dir:
+        data = load_csv_dir(args.csv_dir, tickers)
+    else:
+        if not tickers:
+            ap.error("--store는 --tickers 필요")
+        data = load_from_store(tickers, end=end)
+    print(f"{bot.Colors.CYAN}[백테스트] {len(data)}개 티커 적재{bot.Colors.ENDC}")
+
+    result = Backtester(data, initial_cash=args.cash, fee_rate=args.fee,
+                        slippage_bps=args.slippage_bps, start=start, end=end,
+                        quiet=not args.verbose).run()
+    print(result.summary())
+    if args.out:
+        result.trades_df().to_csv(args.out, encoding="utf-8-sig", index=False)
+        print(f"{bot.Colors.GREEN}[백테스트] 체결 목록 저장: {args.out}{bot.Colors.ENDC}")
+
+
+if __name__ == "__main__":
+    main()
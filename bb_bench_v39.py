@@ -0,0 +1,586 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ═══════════════════════════════════════════════════════════════════════
+# BB Bench v39 — 매매 핫패스 벤치마크 (기록 픽스처 + I/O 차단 + 기준선 회귀 판정)
+# ═══════════════════════════════════════════════════════════════════════
+"""
+지표 계산 / WS 5분봉 / 매수·매도 판정 / 스크리너 점수 / 예측기 피처 생성의
+호출당 지연 분포와 메모리 할당을 오프라인 픽스처로 측정.
+
+[해결 문제]
+add_indicators, get_ws_candles_5m, TrendSellEngine.check_sell_signal,
+EMATrendBuyEngine.check_buy_signal, MarketWideScreener._score_candidates,
+price_predictor_v5_1.build_features가 얼마나 걸리는지, 봉 수/티커 수에 따라
+어떻게 늘어나는지 측정한 적이 없음 → v40에서 느려져도 알 방법이 없음.
+
+[설계]
+  1. 픽스처 (디렉터리 1개)
+     - candles/{ticker}_{tf}.csv : 5m/15m/1h/4h OHLCV (KST 인덱스)
+     - ws_ticks.jsonl            : WS trade 메시지 원문 (1줄 1메시지)
+     - ticker_snapshot.json      : /v1/ticker 응답 (KRW 전체)
+     - record 명령: 실거래 API에서 1회 기록 / synth 명령: 고정 시드 합성 (네트워크 없음)
+
+  2. I/O 차단
+     - 엔진은 InMemoryMarketProvider 주입 (REST/WS 호출 없음, 시계 고정)
+     - WS 5분봉은 픽스처 5분봉으로 링버퍼를 시드하고 틱 캡처를 재생
+
+  3. 측정
+     - 워밍업 후 호출마다 perf_counter_ns → p50/p90/p99/max (µs)
+     - 별도 패스에서 tracemalloc → 호출당 최대 할당(peak KB) 중앙값
+     - 판정 경로(매수/매도 사유 앞부분) 함께 기록 → 같은 깊이의 경로를 비교하는지 확인
+
+  4. 기준선 / 회귀
+     - --save-baseline: 결과를 JSON으로 저장 (메타: 봇 모듈, Python/NumPy/pandas 버전)
+     - --baseline: p50 또는 peak KB가 허용 비율(기본 25%)과 최소 차이를 넘게 늘면 REGRESSION,
+       하나라도 있으면 종료 코드 1
+     - --bot-module로 다른 버전(bb_bounce_hunter_v40 …)을 같은 픽스처로 측정
+
+[사용 예시]
+
+    python bb_bench_v39.py synth --fixtures ./bench_fixtures
+    python bb_bench_v39.py record --fixtures ./bench_fixtures --tickers KRW-BTC,KRW-ETH,KRW-XRP
+    python bb_bench_v39.py run --fixtures ./bench_fixtures --save-baseline bench_baseline_v39.json
+    python bb_bench_v39.py run --fixtures ./bench_fixtures --bot-module bb_bounce_hunter_v40 \\
+        --baseline bench_baseline_v39.json
+"""
+
+import argparse
+import gc
+import glob
+import importlib
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from upbit_market_provider import InMemoryMarketProvider, kst_to_epoch
+
+
+# ============================================================================
+# SECTION 1: 기본 설정
+# ============================================================================
+
+DEFAULT_FIXTURE_DIR = "./bench_fixtures"
+DEFAULT_BOT_MODULE = "bb_bounce_hunter_v39"
+DEFAULT_TICKERS = ["KRW-BTC", "KRW-ETH", "KRW-XRP"]
+
+TIMEFRAMES = ("5m", "15m", "1h", "4h")
+TF_SECONDS = {"5m": 300, "15m": 900, "1h": 3600, "4h": 14400}
+TF_INTERVAL_CODES = {"5m": "minute5", "15m": "minute15", "1h": "minute60", "4h": "minute240"}
+FIXTURE_BARS = {"5m": 1000, "15m": 600, "1h": 400, "4h": 300}
+
+BAR_COUNTS = (60, 200, 1000)             # 지표/피처: 봉 수 스케일링
+TICKER_COUNTS = (1, 10, 50)              # 매수/매도 판정: 티커 수 스케일링
+SCREEN_COUNTS = (50, 200, 1000)          # 스크리너 점수: 후보 수 스케일링
+
+DEFAULT_ITERS = 200
+DEFAULT_WARMUP = 20
+DEFAULT_ALLOC_ITERS = 20
+REGRESSION_TOLERANCE = 0.25              # 기준선 대비 허용 증가율
+REGRESSION_MIN_US = 20.0                 # p50 증가가 이보다 작으면 잡음으로 간주
+REGRESSION_MIN_KB = 16.0                 # peak 할당 증가가 이보다 작으면 잡음으로 간주
+
+SYNTH_END_KST = datetime(2026, 3, 2, 14, 55)     # 합성 픽스처 마지막 5분봉 (매수 게이트 ALLOW 시간대)
+SYNTH_SEED = 39
+
+
+# ============================================================================
+# SECTION 2: 측정
+# ============================================================================
+
+def measure(fn: Callable[[], object], iters: int = DEFAULT_ITERS, warmup: int = DEFAULT_WARMUP,
+            alloc_iters: int = DEFAULT_ALLOC_ITERS) -> dict:
+    """호출당 지연 분포(µs) + 최대 할당(KB)"""
+    for _ in range(warmup):
+        fn()
+    gc.collect()
+    samples = np.empty(iters)
+    for i in range(iters):
+        t0 = time.perf_counter_ns()
+        fn()
+        samples[i] = time.perf_counter_ns() - t0
+    samples /= 1000.0
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(alloc_iters):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            fn()
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "n": iters,
+        "p50_us": float(np.percentile(samples, 50)),
+        "p90_us": float(np.percentile(samples, 90)),
+        "p99_us": float(np.percentile(samples, 99)),
+        "max_us": float(samples.max()),
+        "mean_us": float(samples.mean()),
+        "peak_kb": float(np.median(peaks)) / 1024 if peaks else 0.0,
+    }
+
+
+class _Cycle:
+    """인자 목록을 순환하며 fn 호출 (호출 결과의 판정 경로 집계)"""
+
+    def __init__(self, fn, args: list, path_fn=None):
+        self.fn = fn
+        self.args = args
+        self.path_fn = path_fn
+        self.i = 0
+        self.paths = Counter()
+
+    def __call__(self):
+        args = self.args[self.i % len(self.args)]
+        self.i += 1
+        out = self.fn(*args)
+        if self.path_fn is not None:
+            self.paths[self.path_fn(out)] += 1
+        return out
+
+    def top_path(self) -> str:
+        return self.paths.most_common(1)[0][0] if self.paths else ""
+
+
+# ============================================================================
+# SECTION 3: 픽스처 (기록 / 합성 / 적재)
+# ============================================================================
+
+def _write_fixtures(path: str, frames: Dict[str, Dict[str, pd.DataFrame]],
+                    ticks: List[dict], snapshot: List[dict], source: str):
+    os.makedirs(os.path.join(path, "candles"), exist_ok=True)
+    for ticker, by_tf in frames.items():
+        for tf, df in by_tf.items():
+            df.to_csv(os.path.join(path, "candles", f"{ticker}_{tf}.csv"), index_label="datetime")
+    with open(os.path.join(path, "ws_ticks.jsonl"), "w", encoding="utf-8") as f:
+        for t in ticks:
+            f.write(json.dumps(t, ensure_ascii=False) + "\n")
+    with open(os.path.join(path, "ticker_snapshot.json"), "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, ensure_ascii=False)
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"source": source, "created": datetime.now().isoformat(timespec="seconds"),
+                   "tickers": list(frames)}, f, ensure_ascii=False)
+
+
+def synth_fixtures(path: str, tickers: Optional[List[str]] = None, seed: int = SYNTH_SEED,
+                   markets: int = 250) -> str:
+    """고정 시드 합성 픽스처 (완만한 상승 추세 + 잡음 — 엔진이 깊은 판정 경로까지 진행)"""
+    tickers = tickers or DEFAULT_TICKERS
+    rng = np.random.default_rng(seed)
+    frames: Dict[str, Dict[str, pd.DataFrame]] = {}
+    for k, ticker in enumerate(tickers):
+        by_tf = {}
+        for tf in TIMEFRAMES:
+            n = FIXTURE_BARS[tf]
+            step = TF_SECONDS[tf]
+            end = SYNTH_END_KST - timedelta(seconds=(SYNTH_END_KST.minute * 60) % step)
+            idx = pd.date_range(end=end, periods=n, freq=f"{step}s")
+            scale = np.sqrt(step / 300)
+            ret = rng.normal(0.0004 * scale, 0.004 * scale, n) + 0.003 * scale * np.sin(np.arange(n) / 9)
+            close = 1000.0 * (k + 1) * np.exp(np.cumsum(ret))
+            op = np.r_[close[0], close[:-1]]
+            hi = np.maximum(op, close) * (1 + np.abs(rng.normal(0, 0.002, n)))
+            lo = np.minimum(op, close) * (1 - np.abs(rng.normal(0, 0.002, n)))
+            vol = rng.uniform(500, 1500, n) * scale
+            by_tf[tf] = pd.DataFrame({"open": op, "high": hi, "low": lo, "close": close,
+                                      "volume": vol, "value": vol * close}, index=idx)
+        frames[ticker] = by_tf
+
+    slot_start = kst_to_epoch(SYNTH_END_KST)
+    ticks = []
+    for i in range(2000):
+        ticker = tickers[i % len(tickers)]
+        last = float(frames[ticker]["5m"]["close"].iat[-1])
+        ticks.append({"type": "trade", "code": ticker,
+                      "trade_price": round(last * (1 + rng.normal(0, 0.001)), 4),
+                      "trade_volume": float(rng.uniform(0.01, 5)),
+                      "trade_timestamp": int((slot_start + i * 0.1) * 1000),
+                      "sequential_id": i + 1, "ask_bid": "BID" if i % 2 else "ASK"})
+
+    snapshot = []
+    for i in range(markets):
+        snapshot.append({"market": tickers[i] if i < len(tickers) else f"KRW-S{i:04d}",
+                         "trade_price": float(rng.uniform(10, 100000)),
+                         "signed_change_rate": float(rng.normal(0, 0.04)),
+                         "acc_trade_price_24h": float(rng.lognormal(23, 1.5)),
+                         "acc_trade_volume_24h": float(rng.lognormal(14, 2))})
+    _write_fixtures(path, frames, ticks, snapshot, "synthetic")
+    return path
+
+
+def record_fixtures(path: str, tickers: Optional[List[str]] = None, tick_seconds: float = 30,
+                    bot_module: str = DEFAULT_BOT_MODULE) -> str:
+    """실거래 API에서 픽스처 1회 기록 (캔들 REST + /v1/ticker 전체 + WS trade 캡처)"""
+    import websocket
+    bot = importlib.import_module(bot_module)
+    tickers = tickers or DEFAULT_TICKERS
+    frames = {}
+    for ticker in tickers:
+        frames[ticker] = {}
+        for tf in TIMEFRAMES:
+            df = bot.market_client.fetch_candles(ticker, TF_INTERVAL_CODES[tf], FIXTURE_BARS[tf])
+            if df is not None:
+                frames[ticker][tf] = df
+    provider = bot.LiveMarketProvider()
+    snapshot = provider.tickers(provider.markets())
+
+    ticks = []
+    ws = websocket.create_connection(bot.UPBIT_WS_URL, timeout=5)
+    try:
+        ws.send(json.dumps([{"ticket": f"bench-{uuid.uuid4()}"},
+                            {"type": "trade", "codes": tickers, "isOnlyRealtime": True}]))
+        deadline = time.time() + tick_seconds
+        while time.time() < deadline:
+            try:
+                msg = json.loads(ws.recv())
+            except websocket.WebSocketTimeoutException:
+                continue
+            if msg.get("type") == "trade":
+                ticks.append(msg)
+    finally:
+        ws.close()
+    _write_fixtures(path, frames, ticks, snapshot, "recorded")
+    print(f"[벤치] 기록 완료: 캔들 {sum(len(v) for v in frames.values())}개 프레임, "
+          f"틱 {len(ticks)}개, 시세 {len(snapshot)}개 → {path}")
+    return path
+
+
+class Fixtures:
+    def __init__(self, path: str):
+        self.path = path
+        self.frames: Dict[str, Dict[str, pd.DataFrame]] = {}
+        for fp in sorted(glob.glob(os.path.join(path, "candles", "*.csv"))):
+            ticker, tf = os.path.basename(fp)[:-4].rsplit("_", 1)
+            df = pd.read_csv(fp, index_col=0)
+            df.index = pd.DatetimeIndex(pd.to_datetime(df.index))
+            self.frames.setdefault(ticker, {})[tf] = df.astype(float)
+        with open(os.path.join(path, "ws_ticks.jsonl"), encoding="utf-8") as f:
+            self.ticks = [json.loads(line) for line in f if line.strip()]
+        with open(os.path.join(path, "ticker_snapshot.json"), encoding="utf-8") as f:
+            self.snapshot = json.load(f)
+        meta_fp = os.path.join(path, "meta.json")
+        self.meta = json.load(open(meta_fp, encoding="utf-8")) if os.path.exists(meta_fp) else {}
+        if not self.frames:
+            raise FileNotFoundError(f"픽스처 캔들 없음: {path} (synth 또는 record 먼저 실행)")
+
+    @property
+    def tickers(self) -> List[str]:
+        return [t for t, by_tf in self.frames.items() if all(tf in by_tf for tf in TIMEFRAMES)]
+
+    def end_ts(self) -> float:
+        """픽스처 공통 마지막 5분봉 마감 직전 (epoch)"""
+        last = min(self.frames[t]["5m"].index[-1] for t in self.tickers)
+        return kst_to_epoch(last.to_pydatetime()) + TF_SECONDS["5m"] - 1
+
+
+# ============================================================================
+# SECTION 4: 벤치마크
+# ============================================================================
+
+class BenchContext:
+    """봇 모듈 + 픽스처 → 지표 포함 프레임/공급자 준비 (벤치마크 간 공유)"""
+
+    def __init__(self, bot, fx: Fixtures):
+        self.bot = bot
+        self.fx = fx
+        self._ind: Dict[tuple, pd.DataFrame] = {}
+
+    def indicator_frame(self, ticker: str, tf: str) -> Optional[pd.DataFrame]:
+        key = (ticker, tf)
+        if key not in self._ind:
+            df = self.bot.add_indicators(self.fx.frames[ticker][tf].copy())
+            if df is not None and tf == "1h":
+                df["vol_ratio"] = df["volume"] / df["volume"].rolling(window=10).mean().fillna(df["volume"])
+            self._ind[key] = df
+        return self._ind[key]
+
+    def provider(self, n_tickers: int):
+        """fixture 티커를 n개로 복제한 메모리 공급자 → (provider, 티커 목록)"""
+        provider = InMemoryMarketProvider(ts=self.fx.end_ts())
+        base = self.fx.tickers
+        names = []
+        for i in range(n_tickers):
+            src = base[i % len(base)]
+            name = src if i < len(base) else f"{src}{i:03d}"
+            for tf in TIMEFRAMES:
+                provider.set_candles(name, tf, self.indicator_frame(src, tf))
+            names.append(name)
+        if "KRW-BTC" in self.fx.frames and "KRW-BTC" not in names:
+            for tf in TIMEFRAMES:
+                provider.set_candles("KRW-BTC", tf, self.indicator_frame("KRW-BTC", tf))
+        return provider, names
+
+
+def _reason_head(sig) -> str:
+    reason = (sig or {}).get("reason", "")
+    return reason.split("(")[0].split(" ")[0][:24]
+
+
+def bench_add_indicators(ctx: BenchContext) -> Dict[str, Callable]:
+    df5 = ctx.fx.frames[ctx.fx.tickers[0]]["5m"]
+    out = {}
+    for n in BAR_COUNTS:
+        src = df5.iloc[-n:][["open", "high", "low", "close", "volume"]]
+        out[f"add_indicators[bars={n}]"] = (lambda s=src: ctx.bot.add_indicators(s.copy()), None)
+    return out
+
+
+def bench_ws_candles(ctx: BenchContext) -> Dict[str, Callable]:
+    bot = ctx.bot
+    ticker = ctx.fx.tickers[0]
+    df = ctx.fx.frames[ticker]["5m"].iloc[-bot.WS_CANDLE_HISTORY_SIZE:]
+    ts_arr = np.array([kst_to_epoch(t.to_pydatetime()) for t in df.index], dtype=float)
+    ohlcv = df[["open", "high", "low", "close", "volume"]].to_numpy(dtype=float)
+    buf = bot.CandleRingBuffer()
+    for i in range(len(df) - 1):
+        buf.append_closed(*ohlcv[i], ts_arr[i])
+    slot = int(ts_arr[-1])
+    buf.start_current(*ohlcv[-1], ts_arr[-1], slot)
+    with bot.ws_candles_5m_lock:
+        bot.ws_candles_5m[ticker] = buf
+
+    # 틱 캡처를 진행 중 봉 슬롯 안으로 재배치해 순환 재생 (가격/수량은 원본)
+    ticks = [(float(t["trade_price"]), float(t.get("trade_volume", 0.0)))
+             for t in ctx.fx.ticks if t.get("code") == ticker] or [(float(ohlcv[-1][3]), 0.0)]
+    state = {"i": 0}
+
+    def tick_then_read():
+        price, vol = ticks[state["i"] % len(ticks)]
+        state["i"] += 1
+        bot._update_ws_candle(ticker, price, vol, slot + state["i"] % 299)
+        return bot.get_ws_candles_5m(ticker)
+
+    return {
+        f"get_ws_candles_5m[tick,bars={buf.size}]": (tick_then_read, None),
+        f"get_ws_candles_5m[cached,bars={buf.size}]": (lambda: bot.get_ws_candles_5m(ticker), None),
+    }
+
+
+def bench_check_sell(ctx: BenchContext) -> Dict[str, Callable]:
+    bot = ctx.bot
+    out = {}
+    for n in TICKER_COUNTS:
+        provider, names = ctx.provider(n)
+        engine = bot.TrendSellEngine(bot.EMA4HTracker(provider=provider), provider=provider)
+        args = []
+        for name in names:
+            price = provider.price(name)
+            engine.register(name, price / 1.03, buy_time=provider.time() - 8 * 3600)
+            args.append((name, price))
+        out[f"check_sell_signal[tickers={n}]"] = _Cycle(engine.check_sell_signal, args, _reason_head)
+    return out
+
+
+def bench_check_buy(ctx: BenchContext) -> Dict[str, Callable]:
+    bot = ctx.bot
+    out = {}
+    for n in TICKER_COUNTS:
+        provider, names = ctx.provider(n)
+        tracker = bot.EMA4HTracker(provider=provider)
+        for name in names:
+            tracker.init_from_df(name, provider.candles(name, "4h", bot.EMA_4H_HISTORY_COUNT))
+        engine = bot.EMATrendBuyEngine(tracker, provider=provider)
+        engine.register_candidates([
+            bot.CoinCandidate(ticker=name, price=provider.price(name), change_rate=0.0,
+                              trade_volume_24h=0.0, trade_value_24h=0.0, ema_qualified=True)
+            for name in names])
+        out[f"check_buy_signal[tickers={n}]"] = _Cycle(engine.check_buy_signal,
+                                                       [(name,) for name in names], _reason_head)
+    return out
+
+
+def bench_score_candidates(ctx: BenchContext) -> Dict[str, Callable]:
+    bot = ctx.bot
+    base = [r for r in ctx.fx.snapshot if str(r.get("market", "")).startswith("KRW-")]
+    out = {}
+    for n in SCREEN_COUNTS:
+        rows = [{**base[i % len(base)], "market": f"KRW-B{i:04d}"} for i in range(n)]
+        snapshot = bot.MarketSnapshot()
+        snapshot.update_from_rest(rows)
+        _, cols = snapshot.view()
+        screener = bot.MarketWideScreener(bot.EMA4HTracker(), snapshot=snapshot,
+                                          provider=InMemoryMarketProvider())
+        idx = np.arange(n)
+        out[f"_score_candidates[tickers={n}]"] = (lambda s=screener, c=cols, i=idx: s._score_candidates(c, i), None)
+    return out
+
+
+def bench_build_features(ctx: BenchContext) -> Dict[str, Callable]:
+    try:
+        with redirect_stdout(open(os.devnull, "w")):
+            predictor = importlib.import_module("price_predictor_v5_1")
+    except (ImportError, SystemExit):
+        return {}          # lightgbm 미설치 등 → 건너뜀 (보고서에 SKIP 표시)
+    df15 = ctx.fx.frames[ctx.fx.tickers[0]]["15m"]
+    return {f"build_features[bars={n}]": (lambda s=df15.iloc[-n:]: predictor.build_features(s.copy()), None)
+            for n in BAR_COUNTS if n <= len(df15)}
+
+
+BENCHMARKS = {
+    "add_indicators": bench_add_indicators,
+    "ws_candles": bench_ws_candles,
+    "check_sell": bench_check_sell,
+    "check_buy": bench_check_buy,
+    "score_candidates": bench_score_candidates,
+    "build_features": bench_build_features,
+}
+
+
+def run_benchmarks(fixture_dir: str = DEFAULT_FIXTURE_DIR, bot_module: str = DEFAULT_BOT_MODULE,
+                   only: Optional[List[str]] = None, iters: int = DEFAULT_ITERS,
+                   warmup: int = DEFAULT_WARMUP, alloc_iters: int = DEFAULT_ALLOC_ITERS) -> dict:
+    """벤치마크 실행 → {"meta": {...}, "results": {이름: 통계}, "skipped": [그룹]}"""
+    bot = importlib.import_module(bot_module)
+    ctx = BenchContext(bot, Fixtures(fixture_dir))
+    results, skipped = {}, []
+    with redirect_stdout(open(os.devnull, "w")):
+        for group, factory in BENCHMARKS.items():
+            if only and group not in only:
+                continue
+            try:
+                cases = factory(ctx)
+            except AttributeError as e:
+                skipped.append(f"{group} ({e})")      # 다른 버전 모듈에 대상 함수 없음
+                continue
+            if not cases:
+                skipped.append(group)
+                continue
+            for name, case in cases.items():
+                fn = case[0] if isinstance(case, tuple) else case
+                stats = measure(fn, iters, warmup, alloc_iters)
+                if isinstance(fn, _Cycle):
+                    stats["path"] = fn.top_path()
+                results[name] = stats
+    return {
+        "meta": {"bot_module": bot_module, "fixtures": os.path.abspath(fixture_dir),
+                 "fixture_source": ctx.fx.meta.get("source", "?"),
+                 "python": platform.python_version(), "numpy": np.__version__,
+                 "pandas": pd.__version__, "machine": platform.machine(),
+                 "created": datetime.now().isoformat(timespec="seconds"), "iters": iters},
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+# ============================================================================
+# SECTION 5: 기준선 비교
+# ============================================================================
+
+def compare(report: dict, baseline: dict, tolerance: float = REGRESSION_TOLERANCE) -> Dict[str, dict]:
+    """이름별 {p50_ratio, peak_ratio, status: OK | REGRESSION | IMPROVED | NEW}"""
+    base = baseline.get("results", {})
+    out = {}
+    for name, cur in report["results"].items():
+        ref = base.get(name)
+        if ref is None:
+            out[name] = {"status": "NEW"}
+            continue
+        p50_ratio = cur["p50_us"] / ref["p50_us"] if ref["p50_us"] > 0 else 1.0
+        peak_ratio = cur["peak_kb"] / ref["peak_kb"] if ref["peak_kb"] > 0 else 1.0
+        slower = (p50_ratio > 1 + tolerance and cur["p50_us"] - ref["p50_us"] > REGRESSION_MIN_US)
+        heavier = (peak_ratio > 1 + tolerance and cur["peak_kb"] - ref["peak_kb"] > REGRESSION_MIN_KB)
+        if slower or heavier:
+            status = "REGRESSION"
+        elif p50_ratio < 1 - tolerance:
+            status = "IMPROVED"
+        else:
+            status = "OK"
+        out[name] = {"p50_ratio": p50_ratio, "peak_ratio": peak_ratio, "status": status,
+                     "path_changed": ref.get("path") != cur.get("path")}
+    return out
+
+
+def format_report(report: dict, diff: Optional[Dict[str, dict]] = None) -> str:
+    from bb_bounce_hunter_v39 import Colors
+    meta = report["meta"]
+    lines = [f"[벤치] {meta['bot_module']} | 픽스처 {meta['fixture_source']} | "
+             f"Python {meta['python']} NumPy {meta['numpy']} pandas {meta['pandas']}",
+             f"{'이름':<40s} {'p50':>9s} {'p90':>9s} {'p99':>9s} {'max':>9s} {'peakKB':>8s}  비교/경로"]
+    for name, s in report["results"].items():
+        tail = s.get("path", "")
+        color = ""
+        if diff and name in diff:
+            d = diff[name]
+            if d["status"] == "NEW":
+                tail = f"NEW {tail}"
+            else:
+                tail = f"{d['status']} x{d['p50_ratio']:.2f} mem x{d['peak_ratio']:.2f} {tail}"
+                if d.get("path_changed"):
+                    tail += " (경로 변경)"
+                color = {"REGRESSION": Colors.RED, "IMPROVED": Colors.GREEN}.get(d["status"], "")
+        lines.append(f"{color}{name:<40s} {s['p50_us']:>9.1f} {s['p90_us']:>9.1f} {s['p99_us']:>9.1f} "
+                     f"{s['max_us']:>9.1f} {s['peak_kb']:>8.1f}  {tail}{Colors.ENDC if color else ''}")
+    for g in report.get("skipped", []):
+        lines.append(f"{Colors.YELLOW}SKIP {g}{Colors.ENDC}")
+    return "\n".join(lines)
+
+
+# ============================================================================
+# SECTION 6: CLI
+# ============================================================================
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="v39 매매 핫패스 벤치마크")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p_syn = sub.add_parser("synth", help="고정 시드 합성 픽스처 생성")
+    p_rec = sub.add_parser("record", help="실거래 API에서 픽스처 기록")
+    p_run = sub.add_parser("run", help="벤치마크 실행")
+    for p in (p_syn, p_rec, p_run):
+        p.add_argument("--fixtures", default=DEFAULT_FIXTURE_DIR)
+    for p in (p_syn, p_rec):
+        p.add_argument("--tickers", help="쉼표 구분 (기본 KRW-BTC,KRW-ETH,KRW-XRP)")
+    p_rec.add_argument("--tick-seconds", type=float, default=30, help="WS 체결 캡처 시간 (초)")
+    p_run.add_argument("--bot-module", default=DEFAULT_BOT_MODULE)
+    p_run.add_argument("--only", help=f"쉼표 구분 그룹 ({','.join(BENCHMARKS)})")
+    p_run.add_argument("--iters", type=int, default=DEFAULT_ITERS)
+    p_run.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    p_run.add_argument("--alloc-iters", type=int, default=DEFAULT_ALLOC_ITERS)
+    p_run.add_argument("--baseline", help="비교할 기준선 JSON")
+    p_run.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    p_run.add_argument("--save-baseline", help="결과를 기준선 JSON으로 저장")
+    args = ap.parse_args(argv)
+
+    if args.cmd in ("synth", "record"):
+        tickers = [t.strip() for t in args.tickers.split(",")] if args.tickers else None
+        if args.cmd == "synth":
+            synth_fixtures(args.fixtures, tickers)
+            print(f"[벤치] 합성 픽스처 생성: {args.fixtures}")
+        else:
+            record_fixtures(args.fixtures, tickers, args.tick_seconds)
+        return 0
+
+    only = [g.strip() for g in args.only.split(",")] if args.only else None
+    report = run_benchmarks(args.fixtures, args.bot_module, only,
+                            args.iters, args.warmup, args.alloc_iters)
+    diff = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            diff = compare(report, json.load(f), args.tolerance)
+    print(format_report(report, diff))
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+        print(f"[벤치] 기준선 저장: {args.save_baseline}")
+    regressions = [n for n, d in (diff or {}).items() if d["status"] == "REGRESSION"]
+    if regressions:
+        print(f"[벤치] 회귀 {len(regressions)}건: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
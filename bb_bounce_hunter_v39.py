@@ -76,12 +76,22 @@ from datetime import datetime, timedelta
 import time
 import requests
 import numpy as np
-from collections import deque
+from collections import deque, OrderedDict
 import traceback
 import threading
 from threading import Lock, Event
 from dataclasses import dataclass, field
 from typing import Dict, List, Set, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from upbit_market_client import CANDLE_MAX_PER_CALL, get_market_client, candles_to_df
+from upbit_rate_limiter import PRIORITY_BULK, PRIORITY_NORMAL
+from upbit_candle_store import get_candle_store
+from upbit_trade_ledger import ROLLING_WINDOW, get_trade_ledger
+from upbit_account_stream import AccountStateCache, OrderFillTracker, PrivateStreamClient
+from upbit_market_provider import (KST_OFFSET_SEC, MarketDataProvider, epoch_to_kst,
+                                    kst_index_to_epoch, kst_to_epoch)
+from upbit_metrics import get_metrics_registry
 
 # ★ v36: price_predictor 임포트 완전 제거 (사용자 핵심 지시 #5)
 # v35의 'from price_predictor_v5_1 import get_prediction' 라인 삭제됨
@@ -132,6 +142,14 @@ MAX_DAILY_TRADES = 999
 BUY_THREAD_INTERVAL = 30            # 매수 스레드 주기 (초)
 SELL_THREAD_INTERVAL = 30           # 매도 스레드 주기 (초)
 MONITOR_THREAD_INTERVAL = 600       # 모니터 주기 (10분)
+
+# ── 우선순위 작업 스케줄러 ──
+SCHED_WORKERS = 4                   # 워커 스레드 수
+SCHED_MAX_BACKGROUND_RUNNING = 2    # 스크리닝+리포트 동시 실행 상한 (나머지는 매매 전용)
+SCHED_SELL_RESERVED_WORKERS = 1     # 매도 전용 워커 수 (매수 일괄 평가가 워커를 모두 점유해도 매도 즉시 실행)
+SCHED_QUEUE_LIMITS = {"sell": 64, "buy": 64, "screen": 2, "report": 64}
+SCHED_DEADLINE_SEC = {"sell": 20, "buy": 45, "screen": 1800, "report": 600}
+SCHED_LATENCY_SAMPLES = 200
 BUY_SLEEP_WHEN_FULL = 60            # 보유 만석 시 대기 (초)
 
 # ── BB/RSI 지표 (v35 동일) ──
@@ -146,6 +164,16 @@ STOCH_D_PERIOD = 3
 WS_CANDLE_HISTORY_SIZE = 40
 WS_CANDLE_MIN_FOR_INDICATOR = 22
 
+# ── 체결(trade) 스트림 캔들 집계 ──
+# "trade": 체결 스트림 → 1분봉(기준 시계열) → 5m/15m/60m/240m 증분 롤업
+# "ticker": v35 방식 (ticker 피드 + acc_trade_volume 근사)
+WS_CANDLE_SOURCE = "trade"
+TRADE_CANDLE_TIMEFRAMES = {"1m": 60, "5m": 300, "15m": 900, "1h": 3600, "4h": 14400}
+TRADE_CANDLE_CAPACITY = {"1m": 120, "5m": WS_CANDLE_HISTORY_SIZE, "15m": 100, "1h": 100,
+                         "4h": 100}
+TRADE_CANDLE_BASE_TF = "1m"
+TRADE_SEQ_DEDUP_SIZE = 5000          # sequential_id 중복 제거 윈도우 (티커별)
+
 
 # ═══════════════════════════════════════════════════════════════════════
 # ★ v36 핵심: 마켓 와이드 스크리너 파라미터 (사용자 핵심 지시 #7,8)
@@ -172,7 +200,11 @@ SCREENING_WEIGHTS = {
 }
 
 # 스크리닝 주기
-SCREENING_INTERVAL_MIN = 60       # 매시 정각 (1H봉 동기화)
+SCREENING_INTERVAL_MIN = 60       # 매시 정각 (1H봉 동기화), 스냅샷이 WS로 상시 갱신되므로 1분까지 가능
+
+# 시세 스냅샷 (Tier1 입력)
+SCREENING_WS_SNAPSHOT = True          # KRW 전 마켓 ticker WS 구독 → 스냅샷 상시 갱신
+SCREENING_SNAPSHOT_MAX_AGE_SEC = 120  # 이보다 오래된 행만 REST로 보충
 
 
 # ═══════════════════════════════════════════════════════════════════════
@@ -184,6 +216,9 @@ EMA_4H_SHORT = 10
 EMA_4H_MID = 20
 EMA_4H_LONG = 50
 EMA_4H_HISTORY_COUNT = 100    # 4H 캔들 100개 = 약 16일
+EMA_4H_FINALIZE_DELAY_SEC = 5 # 4H봉 마감 후 이만큼 기다렸다가 확정봉 반영 (REST 반영 지연 흡수)
+EMA_4H_STORE_CAPACITY = 300   # 티커당 보관 확정봉 수 (링 배열)
+EMA_4H_STORE_INITIAL_ROWS = 256  # 초기 티커 행 수 (KRW 마켓 전체, 초과 시 2배 확장)
 
 # 매수 자격: 최근 N봉 중 종가<EMA20 봉 1개 이상 (눌림 발생)
 EMA_PULLBACK_LOOKBACK = 5
@@ -422,6 +457,12 @@ COOLDOWN_BB_DAE_T2     = 60
 # ──────────────────────────────────────────────────────────────────────
 INTRADAY_STOP_LOSS_PCT = -3.0
 INTRADAY_STOP_GRACE_SEC = 1800
+ABSOLUTE_STOP_LOSS_PCT = -5.0       # 절대 손절 (v38 값, 모든 PHASE)
+
+# RSI 과매수 반전 (v38 값, 시간대 정책으로 override)
+RSI_OVERBOUGHT_EXIT = 75.0
+RSI_OVERBOUGHT_COOL = 65.0
+RSI_EXIT_MIN_PROFIT = 2.0
 ACCEL_STOP_5M_BEAR_COUNT = 3
 ACCEL_STOP_RSI_THRESHOLD = 25.0
 ACCEL_STOP_DROP_PCT = 0.8
@@ -432,6 +473,61 @@ ACCEL_STOP_DROP_PCT = 0.8
 EMA_TREND_BREAK_BARS = 2
 DEADCROSS_MIN_HOLD_HOURS = 24
 
+# ──────────────────────────────────────────────────────────────────────
+# [SECTION 2-P] 틱 기반 매도 트리거 (WS 틱 → 임계 돌파 시에만 전체 평가)
+# ──────────────────────────────────────────────────────────────────────
+SELL_EVENT_DRIVEN = True
+SELL_SWEEP_INTERVAL_WS = 120        # WS 정상 시 전체 보유 코인 안전 점검 주기 (초)
+SELL_TRIGGER_MIN_INTERVAL_SEC = 1.0 # 같은 코인 트리거 재발화 최소 간격
+DAE_ZONE_RECHECK_DD_PCT = 0.3       # DAE zone 안에서 zone 고점 대비 이만큼 밀리면 재평가
+
+# ──────────────────────────────────────────────────────────────────────
+# [SECTION 2-Q] REST 캔들 캐시 ((티커, 봉) 단위 최장 시계열 보관 + 동시 조회 병합)
+# ──────────────────────────────────────────────────────────────────────
+CANDLE_CACHE_MIN_FETCH = 60         # 최소 조회 길이 (count=3/5/10/19 요청을 한 번의 조회로 흡수)
+CANDLE_CACHE_MAX_ENTRIES = 800      # 초과 시 가장 오래 안 쓴 항목부터 제거 (LRU)
+CANDLE_CACHE_MAX_AGE_SEC = 3600     # 마지막 조회 후 이 시간이 지난 항목 제거
+CANDLE_CACHE_WAIT_SEC = 15          # 진행 중인 동일 조회 대기 한도
+CANDLE_UPBIT_INTERVALS = {"5m": "minute5", "15m": "minute15", "1h": "minute60", "4h": "minute240"}
+CANDLE_LIVE_REFRESH_SEC = {"5m": 15, "15m": 60, "1h": 120, "4h": 300}  # 진행 중 봉 count=1 재조회 주기
+CANDLE_TAIL_MAX_BARS = 20           # 봉 마감 후 경과 봉 수가 이 이하면 꼬리만 조회 후 병합
+CANDLE_WS_PATCH = True              # 재조회 사이에는 WS 최신가로 진행 중 봉 패치
+CANDLE_STORE_ENABLED = True         # get_ohlcv를 로컬 캔들 DB(upbit_candle_store) 경유 (새 봉만 REST 조회)
+
+# ──────────────────────────────────────────────────────────────────────
+# [SECTION 2-R] 웜 스타트 (WS 우선 기동 + 병렬 REST 초기화 + 지표 스냅샷 복원)
+# ──────────────────────────────────────────────────────────────────────
+WARM_START_WORKERS = 8              # 시작 시 REST 초기화 동시 작업 수 (요청 수는 공용 토큰 버킷이 제한)
+WARM_SNAPSHOT_PATH = os.getenv("BOT_WARM_SNAPSHOT", "./market_data/ema4h_snapshot.npz")
+EMA_SNAPSHOT_TS_FORMAT = "utc_epoch_v2"   # 봉 시각 저장 형식 (다르면 스냅샷 무시)
+
+# ──────────────────────────────────────────────────────────────────────
+# [SECTION 2-S] 포지션 저널 (held_coins + 매도엔진 상태 WAL / 체크포인트)
+# ──────────────────────────────────────────────────────────────────────
+POSITION_JOURNAL_ENABLED = True
+POSITION_JOURNAL_PATH = os.getenv("BOT_POSITION_JOURNAL", "./market_data/positions.journal")
+POSITION_JOURNAL_COMPACT_RECORDS = 500   # 저널 레코드가 이만큼 쌓이면 스냅샷으로 압축
+POSITION_JOURNAL_AVG_MATCH_PCT = 1.0     # 저널 매수가와 거래소 평단 차이가 이 이내면 저널 상태 복원
+
+# ──────────────────────────────────────────────────────────────────────
+# [SECTION 2-T] 거래 원장 (SQLite, 매도 사유/세션/단계별 증분 집계)
+# ──────────────────────────────────────────────────────────────────────
+TRADE_LEDGER_ENABLED = True
+
+# ──────────────────────────────────────────────────────────────────────
+# [SECTION 2-U] 계정 상태 캐시 (비공개 WS myAsset/myOrder, REST는 느린 대조만)
+# ──────────────────────────────────────────────────────────────────────
+ACCOUNT_STREAM_ENABLED = True
+ACCOUNT_REST_RECONCILE_SEC = 300    # WS 정상이어도 이 주기로 /v1/accounts 재조회 (끊김 시 즉시)
+ORDER_FILL_WS_TIMEOUT_SEC = 5       # myOrder 최종 상태 대기 한도 (초과/미연결 시 REST 폴링)
+ORDER_SENT_MAX_AGE_SEC = 600        # 체결 대기 없이 남은 주문 전송 기록 정리 기준
+
+# ──────────────────────────────────────────────────────────────────────
+# [SECTION 2-V] 런타임 메트릭 (Prometheus text format, 로컬 HTTP)
+# ──────────────────────────────────────────────────────────────────────
+METRICS_HTTP_PORT = int(os.getenv("BOT_METRICS_PORT", "9108"))   # 0 = HTTP 노출 끔 (기록은 계속)
+METRICS_HTTP_HOST = os.getenv("BOT_METRICS_HOST", "127.0.0.1")
+
 # ★ v39 변경 요약:
 #   [v38 → v39 추가]
 #   + DAE_ENABLED, DAE_TIERS (5단계 거리별 가속 매도 매트릭스)
@@ -459,7 +555,6 @@ stop_event = Event()
 held_coins_lock = Lock()
 trade_lock = Lock()
 statistics_lock = Lock()
-cache_lock = Lock()
 
 # 글로벌 상태
 upbit = None
@@ -467,8 +562,6 @@ held_coins = {}
 recent_sells = {}        # 재진입 쿨다운용
 daily_trade_count = 0
 last_reset_date = datetime.now().date()
-data_cache = {}
-cache_timestamps = {}
 
 # ★ v36 핵심 인스턴스 (main()에서 생성)
 ema_tracker = None       # EMA4HTracker
@@ -482,10 +575,12 @@ total_trades = 0
 winning_trades = 0
 losing_trades = 0
 total_profit = 0.0
-trade_history = deque(maxlen=100)
 consecutive_losses = 0
 last_loss_time = None
 
+# 웜 스타트 계측 (기동 → 첫 매도 점검 완료까지)
+warm_start_stats = {'boot_ts': None, 'first_sell_check_sec': None}
+
 # 일일 통계
 daily_buy_count = 0
 daily_sell_count = 0
@@ -540,6 +635,52 @@ _STARTUP_BANNER = f"""
 
 UPBIT_API_BASE = "https://api.upbit.com"
 
+# 공용 REST 클라이언트 (keep-alive 커넥션 풀 + 그룹별 토큰 버킷, 주문/계정 요청 우선)
+market_client = get_market_client()
+
+# 로컬 캔들 DB (예측기/다운로더와 공유, 재시작 시 마지막 저장 봉 이후만 조회)
+# main()에서 생성 — import만 하는 도구(백테스트/스윕/벤치)는 DB 파일을 만들지 않음
+candle_store = None
+
+# 거래 원장 (재시작 후에도 누적 통계/재진입 쿨다운 유지, main()에서 생성)
+trade_ledger = None
+
+# 계정 잔고 캐시 (비공개 WS로 갱신 — 무효일 때만 REST 조회)
+account_cache = AccountStateCache(ACCOUNT_REST_RECONCILE_SEC) if ACCOUNT_STREAM_ENABLED else None
+private_stream = None  # PrivateStreamClient (main()에서 기동)
+
+# 주문 체결 추적 (myOrder 스트림 → 주문 UUID별 Future)
+order_tracker = OrderFillTracker() if ACCOUNT_STREAM_ENABLED else None
+
+# 런타임 메트릭 (REST 요청 수/응답 시간·토큰 대기는 upbit_market_client/upbit_rate_limiter가 기록)
+metrics = get_metrics_registry()
+_M_OHLCV_SEC = metrics.histogram("bot_get_ohlcv_seconds", "get_ohlcv 소요 시간 (캔들 DB 경유 포함)",
+                                 ("interval",))
+_M_OHLCV_CALLS = metrics.counter("bot_get_ohlcv_calls_total", "get_ohlcv 호출 수 (result=ok|empty|error)",
+                                 ("interval", "result"))
+_M_CANDLE_CACHE = metrics.counter("bot_candle_cache_requests_total",
+                                  "캔들 캐시 조회 (result=hit|live|tail|full|coalesced)", ("tf", "result"))
+_M_PRICE_LOOKUPS = metrics.counter("bot_price_lookups_total", "현재가 조회 출처 (source=ws|rest)",
+                                   ("source",))
+_M_WS_MESSAGES = metrics.counter("bot_ws_messages_total", "공개 WS 수신 메시지 수", ("type",))
+_M_WS_HANDLE_SEC = metrics.histogram("bot_ws_message_seconds", "공개 WS 메시지 처리 시간", ("type",))
+_M_CHECK_SELL_SEC = metrics.histogram("bot_check_sell_seconds", "TrendSellEngine.check_sell_signal 소요 시간")
+_M_CHECK_BUY_SEC = metrics.histogram("bot_check_buy_seconds", "EMATrendBuyEngine.check_buy_signal 소요 시간")
+_M_ORDER_POST_SEC = metrics.histogram("bot_order_post_seconds", "주문 전송 응답 시간", ("side",))
+_M_ORDER_ROUNDTRIP_SEC = metrics.histogram("bot_order_roundtrip_seconds",
+                                           "주문 전송 → 체결 확정 (source=ws|rest|none)", ("side", "source"))
+_M_WS_PRICE_AGE = metrics.gauge("bot_ws_price_age_seconds", "보유 코인 WS 최신가 경과 시간", ("ticker",))
+_M_WS_PRICE_MAX_AGE = metrics.gauge("bot_ws_price_cache_max_age_seconds", "WS 시세 캐시 중 가장 오래된 항목 경과 시간")
+_M_WS_PRICE_ENTRIES = metrics.gauge("bot_ws_price_cache_entries", "WS 시세 캐시 항목 수")
+_M_WS_LAST_MSG_AGE = metrics.gauge("bot_ws_last_message_age_seconds", "마지막 공개 WS 메시지 경과 시간")
+_M_WS_CONNECTED = metrics.gauge("bot_ws_connected", "공개 WS 연결 상태 (1=연결)")
+_M_CANDLE_CACHE_ENTRIES = metrics.gauge("bot_candle_cache_entries", "캔들 캐시 항목 수")
+_M_HELD = metrics.gauge("bot_held_positions", "보유 코인 수")
+_M_WS_TRADE = (_M_WS_MESSAGES.labels("trade"), _M_WS_HANDLE_SEC.labels("trade"))
+_M_WS_TICKER = (_M_WS_MESSAGES.labels("ticker"), _M_WS_HANDLE_SEC.labels("ticker"))
+_M_PRICE_WS = _M_PRICE_LOOKUPS.labels("ws")
+_M_PRICE_REST = _M_PRICE_LOOKUPS.labels("rest")
+
 
 class UpbitAPI:
     """Upbit 공식 REST API 클라이언트 (JWT 인증)"""
@@ -547,6 +688,8 @@ class UpbitAPI:
     def __init__(self, access_key, secret_key):
         self.access_key = access_key
         self.secret_key = secret_key
+        self._order_sent = {}   # 주문 UUID → (side, 전송 시각) — 체결 왕복 시간 측정용
+        self._order_sent_lock = threading.Lock()
 
     def _make_jwt_token(self, query_params=None):
         payload = {
@@ -569,16 +712,27 @@ class UpbitAPI:
         return {'Authorization': f'Bearer {token}', 'Content-Type': 'application/json'}
 
     def get_balances(self):
+        """/v1/accounts (계정 캐시 유효하면 메모리 사본, 아니면 REST 조회 후 캐시 재시드)"""
+        if account_cache is None:
+            return self._get_balances_rest()
+        cached = account_cache.balances()
+        if cached is not None:
+            return cached
+        version = account_cache.version()
+        balances = self._get_balances_rest()
+        seeded = account_cache.seed_from_rest(balances, since_version=version)
+        return seeded if seeded is not None else balances
+
+    def _get_balances_rest(self):
         for attempt in range(1, 4):
             try:
-                headers = self._auth_headers()
-                resp = requests.get(f"{UPBIT_API_BASE}/v1/accounts", headers=headers, timeout=10)
+                # 429는 market_client가 제한기 백오프 + 새 JWT로 재시도 (여기서 추가 대기 없음)
+                resp = market_client.get("/v1/accounts", headers=self._auth_headers)
                 if resp.status_code == 200:
                     return resp.json()
                 if resp.status_code == 401:
                     return None
                 if resp.status_code == 429:
-                    time.sleep(5 * attempt)
                     continue
                 time.sleep(2 * attempt)
             except requests.exceptions.ConnectionError:
@@ -591,6 +745,10 @@ class UpbitAPI:
         try:
             if '-' in str(currency):
                 currency = currency.split('-')[1]
+            if account_cache is not None:
+                cached = account_cache.balance(currency)
+                if cached is not None:
+                    return cached
             balances = self.get_balances()
             if not balances:
                 return 0.0
@@ -607,9 +765,7 @@ class UpbitAPI:
                 'market': ticker, 'side': 'bid',
                 'price': str(round(price, 0)), 'ord_type': 'price',
             }
-            headers = self._auth_headers(params)
-            resp = requests.post(f"{UPBIT_API_BASE}/v1/orders", json=params, headers=headers, timeout=10)
-            return resp.json()
+            return self._post_order(params)
         except Exception:
             return None
 
@@ -619,17 +775,33 @@ class UpbitAPI:
                 'market': ticker, 'side': 'ask',
                 'volume': str(volume), 'ord_type': 'market',
             }
-            headers = self._auth_headers(params)
-            resp = requests.post(f"{UPBIT_API_BASE}/v1/orders", json=params, headers=headers, timeout=10)
-            return resp.json()
+            return self._post_order(params)
         except Exception:
             return None
 
+    def _post_order(self, params):
+        """주문 전송 + 체결 추적 등록 (전송 시각 기준 체결 지연 측정)"""
+        sent_ts = time.time()
+        resp = market_client.post("/v1/orders", json=params,
+                                  headers=lambda: self._auth_headers(params))
+        _M_ORDER_POST_SEC.labels(params['side']).observe(time.time() - sent_ts)
+        result = resp.json()
+        if isinstance(result, dict) and result.get('uuid'):
+            with self._order_sent_lock:
+                # wait_order_filled를 거치지 않은 주문은 여기서 나이순 정리 (누적 방지)
+                cutoff = sent_ts - ORDER_SENT_MAX_AGE_SEC
+                for old in [u for u, (_, ts) in self._order_sent.items() if ts < cutoff]:
+                    del self._order_sent[old]
+                self._order_sent[result['uuid']] = (params['side'], sent_ts)
+            if order_tracker is not None:
+                order_tracker.track(result['uuid'], sent_ts=sent_ts)
+        return result
+
     def get_order(self, uuid_str):
         try:
             params = {'uuid': uuid_str}
-            headers = self._auth_headers(params)
-            resp = requests.get(f"{UPBIT_API_BASE}/v1/order", params=params, headers=headers, timeout=10)
+            resp = market_client.get("/v1/order", params=params,
+                                     headers=lambda: self._auth_headers(params))
             if resp.status_code == 200:
                 return resp.json()
             return None
@@ -637,14 +809,31 @@ class UpbitAPI:
             return None
 
     def wait_order_filled(self, uuid_str, timeout_sec=5):
+        """체결 결과 (myOrder 스트림 우선, 미연결/타임아웃이면 남은 시간만 REST 폴링)"""
+        deadline = time.time() + timeout_sec
+        with self._order_sent_lock:
+            side, sent_ts = self._order_sent.pop(uuid_str, ("unknown", time.time()))
+        if order_tracker is not None:
+            fill = order_tracker.wait(order_tracker.track(uuid_str),
+                                      min(timeout_sec, ORDER_FILL_WS_TIMEOUT_SEC))
+            if fill is not None:
+                _M_ORDER_ROUNDTRIP_SEC.labels(side, "ws").observe(time.time() - sent_ts)
+                return fill
+            order_tracker.forget(uuid_str)
+        fill = self._wait_order_filled_rest(uuid_str, max(deadline - time.time(), 0.0))
+        _M_ORDER_ROUNDTRIP_SEC.labels(side, "rest" if fill is not None else "none"
+                                      ).observe(time.time() - sent_ts)
+        return fill
+
+    def _wait_order_filled_rest(self, uuid_str, timeout_sec=5):
+        """REST 폴링 (timeout_sec 경과 후 마지막 1회 조회 — 0이면 1회만)"""
         try:
-            elapsed = 0
+            deadline = time.time() + timeout_sec
             interval = 0.5
-            while elapsed < timeout_sec:
+            while time.time() < deadline:
                 order = self.get_order(uuid_str)
                 if order is None:
-                    time.sleep(interval)
-                    elapsed += interval
+                    time.sleep(min(interval, max(deadline - time.time(), 0.0)))
                     continue
                 state = order.get('state', '')
                 if state in ('done', 'cancel'):
@@ -666,8 +855,7 @@ class UpbitAPI:
                         'avg_price': avg_price, 'paid_fee': total_fee,
                         'executed_volume': total_volume, 'state': state,
                     }
-                time.sleep(interval)
-                elapsed += interval
+                time.sleep(min(interval, max(deadline - time.time(), 0.0)))
             order = self.get_order(uuid_str)
             if order:
                 exec_vol = float(order.get('executed_volume', 0))
@@ -704,33 +892,125 @@ _ws_app = None
 _ws_app_lock = threading.Lock()
 
 WS_CACHE_STALE_SEC = 30.0
+WS_HANDOVER_TIMEOUT_SEC = 10.0   # 핫 재구독: 새 소켓이 이 시간 안에 데이터를 못 받으면 포기
 CACHE_TTL_DAILY = 300
 
-_api_last_call_time = 0.0
-_api_call_lock = threading.Lock()
-
-# 5분봉 실시간 빌더
+# 5분봉 실시간 빌더 (티커별 CandleRingBuffer)
 ws_candles_5m = {}
 ws_candles_5m_lock = threading.Lock()
 _ws_candle_initialized = {}
 
 
-def _rate_limit_wait(min_interval=0.12):
-    global _api_last_call_time
-    with _api_call_lock:
-        now = time.time()
-        elapsed = now - _api_last_call_time
-        if elapsed < min_interval:
-            time.sleep(min_interval - elapsed)
-        _api_last_call_time = time.time()
-
-
 def _get_5m_slot(ts=None):
     if ts is None:
         ts = time.time()
     return int(ts) // 300 * 300
 
 
+class CandleRingBuffer:
+    """5분봉 컬럼형 링버퍼 (open/high/low/close/volume/ts, 사전 할당 NumPy).
+
+    - 확정봉 capacity개 + 진행 중인 봉 1개를 보관 (내부 슬롯 capacity+1)
+    - 각 값은 pos, pos+M 두 곳에 기록 → 최근 N봉이 항상 연속 구간 → 복사 없는 뷰
+    - WS 스레드는 제자리 갱신만 수행, DataFrame은 읽을 때 지연 생성 후 캐시
+    """
+
+    FIELDS = ('open', 'high', 'low', 'close', 'volume', 'ts')
+    _O, _H, _L, _C, _V, _T = range(6)
+
+    def __init__(self, capacity=WS_CANDLE_HISTORY_SIZE, bar_sec=300):
+        self.capacity = capacity
+        self.bar_sec = bar_sec
+        self.synced = False          # REST 시드 이후 WS 끊김 없이 이어졌는지
+        self._m = capacity + 1
+        self._data = np.zeros((len(self.FIELDS), 2 * self._m), dtype=float)
+        self.closed_count = 0        # 누적 확정봉 수 (= 진행 봉의 seq)
+        self.has_current = False
+        self.current_slot = None
+        self.version = 0             # 봉 확정마다 증가
+        self.tick_seq = 0            # 틱마다 증가
+        self._df_cache = {}
+
+    @property
+    def size(self):
+        return min(self.closed_count, self.capacity)
+
+    @property
+    def indicators_ready(self):
+        return self.size >= WS_CANDLE_MIN_FOR_INDICATOR
+
+    def _write(self, seq, field_idx, value):
+        pos = seq % self._m
+        self._data[field_idx, pos] = value
+        self._data[field_idx, pos + self._m] = value
+
+    def _write_bar(self, seq, o, h, l, c, v, ts):
+        pos = seq % self._m
+        col = (o, h, l, c, v, ts)
+        self._data[:, pos] = col
+        self._data[:, pos + self._m] = col
+
+    def append_closed(self, o, h, l, c, v, ts):
+        """확정봉 추가 (REST 초기화용)"""
+        self._write_bar(self.closed_count, o, h, l, c, v, ts)
+        self.closed_count += 1
+        self.version += 1
+
+    def start_current(self, o, h, l, c, v, ts, slot):
+        self._write_bar(self.closed_count, o, h, l, c, v, ts)
+        self.has_current = True
+        self.current_slot = slot
+        self.tick_seq += 1
+
+    def slot_of(self, ts):
+        return int(ts) // self.bar_sec * self.bar_sec
+
+    def bar_at(self, seq):
+        """seq번째 봉 (o, h, l, c, v, ts)"""
+        return tuple(self._data[:, seq % self._m])
+
+    def set_current(self, o, h, l, c, v, ts, slot):
+        """현재 봉 통째로 교체 (롤업용) — 슬롯이 바뀌면 이전 봉 확정"""
+        if self.has_current and slot < self.current_slot:
+            return
+        if self.has_current and slot != self.current_slot:
+            self._write(self.closed_count, self._T, self.current_slot)
+            self.closed_count += 1
+            self.version += 1
+        self.start_current(o, h, l, c, v, ts, slot)
+
+    def update_tick(self, price, volume_delta, ts, slot):
+        """틱 반영 — 같은 슬롯이면 제자리 갱신, 슬롯이 바뀌면 현재 봉 확정 후 새 봉 시작"""
+        if self.has_current and slot < self.current_slot:
+            return  # 이미 확정된 봉에 늦게 도착한 체결 — 무시
+        if self.has_current and slot == self.current_slot:
+            seq = self.closed_count
+            pos = seq % self._m
+            d = self._data
+            if price > d[self._H, pos]:
+                self._write(seq, self._H, price)
+            if price < d[self._L, pos]:
+                self._write(seq, self._L, price)
+            self._write(seq, self._C, price)
+            self._write(seq, self._V, d[self._V, pos] + volume_delta)
+            self._write(seq, self._T, ts)
+            self.tick_seq += 1
+            return
+        if self.has_current:
+            # 확정봉의 ts는 슬롯 시작 시각
+            self._write(self.closed_count, self._T, self.current_slot)
+            self.closed_count += 1
+            self.version += 1
+        self.start_current(price, price, price, price, volume_delta, ts, slot)
+
+    def views(self, include_current=True):
+        """최근 봉들의 (6, n) 뷰 — 복사 없음 (다음 봉 확정 전까지만 유효)"""
+        n = self.size
+        start = (self.closed_count - n) % self._m
+        length = n + (1 if include_current and self.has_current else 0)
+        return self._data[:, start:start + length]
+
+
 def _init_ws_candle_from_rest(ticker):
     """봇 시작 시 REST로 5분봉 히스토리 로드 → WS 빌더 초기화"""
     try:
@@ -738,24 +1018,30 @@ def _init_ws_candle_from_rest(ticker):
         if df is None or len(df) < WS_CANDLE_MIN_FOR_INDICATOR:
             return False
 
-        history = deque(maxlen=WS_CANDLE_HISTORY_SIZE)
-        for idx in range(len(df)):
-            row = df.iloc[idx]
-            history.append({
-                'open': float(row['open']),
-                'high': float(row['high']),
-                'low': float(row['low']),
-                'close': float(row['close']),
-                'volume': float(row['volume']),
-                'timestamp': row.name.timestamp() if hasattr(row.name, 'timestamp') else time.time(),
-            })
+        ts_arr = kst_index_to_epoch(df.index)      # REST 인덱스는 KST naive
+        ohlcv = df[['open', 'high', 'low', 'close', 'volume']].to_numpy(dtype=float)
+        buf = CandleRingBuffer()
+        n = len(df)
+        # 마지막 REST 봉이 진행 중인 슬롯이면 현재 봉으로 이어 받음
+        last_slot = _get_5m_slot(ts_arr[-1])
+        last_is_current = last_slot == _get_5m_slot()
+        closed_n = n - 1 if last_is_current else n
+        for i in range(closed_n):
+            buf.append_closed(*ohlcv[i], ts_arr[i])
+        if last_is_current:
+            buf.start_current(*ohlcv[-1], ts_arr[-1], last_slot)
 
+        with ws_status_lock:
+            buf.synced = ws_status['connected']
         with ws_candles_5m_lock:
-            ws_candles_5m[ticker] = {
-                'current': None,
-                'history': history,
-                'indicators_ready': len(history) >= WS_CANDLE_MIN_FOR_INDICATOR,
-            }
+            ws_candles_5m[ticker] = buf
+            if WS_CANDLE_SOURCE == "trade":
+                agg = trade_aggregators.get(ticker)
+                if agg is None:
+                    trade_aggregators[ticker] = TradeCandleAggregator(ticker, buf)
+                else:
+                    agg.buffers["5m"] = buf
+                    agg.seed_partial("5m", buf)
         _ws_candle_initialized[ticker] = True
         return True
     except Exception:
@@ -763,103 +1049,292 @@ def _init_ws_candle_from_rest(ticker):
 
 
 def _update_ws_candle(ticker, price, volume_delta=0.0, ts=None):
-    """WebSocket 틱 → 5분봉 실시간 갱신"""
+    """WebSocket 틱 → 5분봉 실시간 갱신 (링버퍼 제자리 갱신)"""
     try:
         if ts is None:
             ts = time.time()
         current_slot = _get_5m_slot(ts)
 
         with ws_candles_5m_lock:
-            if ticker not in ws_candles_5m:
+            buf = ws_candles_5m.get(ticker)
+            if buf is None:
                 return
+            buf.update_tick(price, volume_delta, ts, current_slot)
+    except Exception:
+        pass
 
-            candle_data = ws_candles_5m[ticker]
-            current = candle_data['current']
 
-            if current is None:
-                candle_data['current'] = {
-                    'open': price, 'high': price, 'low': price, 'close': price,
-                    'volume': volume_delta, 'slot': current_slot, 'timestamp': ts,
-                }
-                return
+def get_ws_candle_arrays(ticker, include_current=True):
+    """WS 빌더 5분봉 컬럼 뷰 dict (복사 없음, 다음 봉 확정 전까지 유효)"""
+    with ws_candles_5m_lock:
+        buf = ws_candles_5m.get(ticker)
+        if buf is None or not buf.indicators_ready:
+            return None
+        block = buf.views(include_current)
+        return {name: block[i] for i, name in enumerate(CandleRingBuffer.FIELDS)}
 
-            if current['slot'] == current_slot:
-                current['high'] = max(current['high'], price)
-                current['low'] = min(current['low'], price)
-                current['close'] = price
-                current['volume'] += volume_delta
-                current['timestamp'] = ts
-            else:
-                completed_candle = {
-                    'open': current['open'],
-                    'high': current['high'],
-                    'low': current['low'],
-                    'close': current['close'],
-                    'volume': current['volume'],
-                    'timestamp': current['slot'],
-                }
-                candle_data['history'].append(completed_candle)
-                candle_data['indicators_ready'] = (
-                    len(candle_data['history']) >= WS_CANDLE_MIN_FOR_INDICATOR
-                )
-                candle_data['current'] = {
-                    'open': price, 'high': price, 'low': price, 'close': price,
-                    'volume': volume_delta, 'slot': current_slot, 'timestamp': ts,
-                }
-    except Exception:
-        pass
+
+def _ring_buffer_block(buf, include_current, min_bars):
+    """(ws_candles_5m_lock 보유 상태에서 호출) → (cache_key, 캐시된 df, 복사한 블록)"""
+    if buf.size < min_bars:
+        return None, None, None
+    cache_key = (buf.version, buf.tick_seq if include_current else None)
+    cached = buf._df_cache.get(include_current)
+    if cached is not None and cached[0] == cache_key:
+        return cache_key, cached[1], None
+    return cache_key, None, buf.views(include_current).copy()
+
+
+def _block_to_df(buf, ticker, indicator_tf, include_current, cache_key, block, min_bars):
+    if block.shape[1] < min_bars:
+        return None
+
+    ts_arr = block[CandleRingBuffer._T]
+    # REST 캔들과 같은 KST naive 인덱스 (호스트 시간대 무관)
+    index = pd.to_datetime(ts_arr + KST_OFFSET_SEC, unit='s').rename('datetime')
+    df = pd.DataFrame({
+        'open': block[CandleRingBuffer._O], 'high': block[CandleRingBuffer._H],
+        'low': block[CandleRingBuffer._L], 'close': block[CandleRingBuffer._C],
+        'volume': block[CandleRingBuffer._V],
+    }, index=index)
+    if not df.index.is_monotonic_increasing or df.index.has_duplicates:
+        df = df.sort_index()
+        df = df[~df.index.duplicated(keep='last')]
+
+    if len(df) < 20:
+        return None
+
+    df = add_indicators_incremental(df, ticker, indicator_tf)
+    if df is not None:
+        with ws_candles_5m_lock:
+            buf._df_cache[include_current] = (cache_key, df)
+    return df
+
+
+def _ring_buffer_to_df(buf, ticker, indicator_tf, include_current=True,
+                       min_bars=WS_CANDLE_MIN_FOR_INDICATOR):
+    """링버퍼 → 지표 포함 DataFrame (버퍼 단위 캐시)
+
+    확정봉만: 다음 봉 확정까지 캐시 / 현재 봉 포함: 새 틱이 올 때까지 캐시
+    """
+    with ws_candles_5m_lock:
+        cache_key, cached, block = _ring_buffer_block(buf, include_current, min_bars)
+    if cached is not None:
+        return cached
+    if block is None:
+        return None
+    return _block_to_df(buf, ticker, indicator_tf, include_current, cache_key, block, min_bars)
 
 
 def get_ws_candles_5m(ticker, include_current=True):
-    """WS 빌더에서 5분봉 DataFrame 반환"""
+    """WS 빌더에서 5분봉 DataFrame 반환 (호출자 소유 사본 — 수정해도 버퍼 캐시에 영향 없음)"""
     try:
         with ws_candles_5m_lock:
-            if ticker not in ws_candles_5m:
-                return None
-            cd = ws_candles_5m[ticker]
-            if not cd['indicators_ready']:
-                return None
-            candles = list(cd['history'])
-            if include_current and cd['current'] is not None:
-                candles.append({
-                    'open': cd['current']['open'],
-                    'high': cd['current']['high'],
-                    'low': cd['current']['low'],
-                    'close': cd['current']['close'],
-                    'volume': cd['current']['volume'],
-                    'timestamp': cd['current']['timestamp'],
-                })
-
-        if len(candles) < WS_CANDLE_MIN_FOR_INDICATOR:
+            buf = ws_candles_5m.get(ticker)
+        if buf is None:
             return None
+        df = _ring_buffer_to_df(buf, ticker, "ws5m", include_current)
+        return df.copy() if df is not None else None
+    except Exception:
+        return None
+
 
-        rows = []
-        for c in candles:
-            ts_val = c['timestamp']
-            if isinstance(ts_val, (int, float)):
-                dt = datetime.fromtimestamp(ts_val)
+# ───────────────────────────────────────────────────────────────────────
+# 체결(trade) 스트림 → 1m/5m/15m/60m 동시 집계
+# ───────────────────────────────────────────────────────────────────────
+
+trade_aggregators = {}      # ticker → TradeCandleAggregator (ws_candles_5m_lock 보호)
+
+
+class TradeCandleAggregator:
+    """단일 티커 체결 스트림 집계기.
+
+    - sequential_id로 중복 체결 제거 (재연결 스냅샷/중복 수신 대비)
+    - trade_timestamp(거래소 ms) 기준으로 1분봉(기준 시계열)만 직접 갱신
+    - 상위 봉(5m/15m/60m/240m) = 슬롯 내 확정 1분봉 누적(partial) ⊕ 진행 중 1분봉
+      → 모든 시간봉이 같은 시점의 같은 체결 집합에서 파생 (스냅샷 불일치 없음)
+    - 5m 버퍼는 ws_candles_5m와 같은 객체를 공유
+    """
+
+    def __init__(self, ticker, buf_5m=None):
+        self.ticker = ticker
+        self.buffers = {}
+        for tf, bar_sec in TRADE_CANDLE_TIMEFRAMES.items():
+            if tf == "5m" and buf_5m is not None:
+                self.buffers[tf] = buf_5m
             else:
-                dt = ts_val
-            rows.append({
-                'datetime': dt,
-                'open': c['open'], 'high': c['high'],
-                'low': c['low'], 'close': c['close'],
-                'volume': c['volume'],
-            })
+                self.buffers[tf] = CandleRingBuffer(TRADE_CANDLE_CAPACITY[tf], bar_sec)
+        self.base = self.buffers[TRADE_CANDLE_BASE_TF]
+        self._partial = {}           # tf → [slot, o, h, l, c, v] (슬롯 내 확정 1분봉 누적)
+        self._seen_ids = set()
+        self._seen_order = deque()
+        self.trade_count = 0
+        self.duplicate_count = 0
+        self.last_trade_ts = 0.0
+
+    def on_trade(self, price, volume, ts, seq_id=None):
+        """체결 1건 반영 (ws_candles_5m_lock 보유 상태에서 호출) → 반영 여부"""
+        if seq_id is not None:
+            if seq_id in self._seen_ids:
+                self.duplicate_count += 1
+                return False
+            self._seen_ids.add(seq_id)
+            self._seen_order.append(seq_id)
+            if len(self._seen_order) > TRADE_SEQ_DEDUP_SIZE:
+                self._seen_ids.discard(self._seen_order.popleft())
+
+        base = self.base
+        slot = base.slot_of(ts)
+        if base.has_current and slot < base.current_slot:
+            return False  # 이미 확정된 1분봉에 늦게 도착한 체결
+        prev_closed = base.closed_count
+        base.update_tick(price, volume, ts, slot)
+        if base.closed_count != prev_closed:
+            self._fold_closed_minute(base.bar_at(prev_closed))
+        self._roll_up(ts)
+        self.trade_count += 1
+        self.last_trade_ts = ts
+        return True
 
-        df = pd.DataFrame(rows)
-        df['datetime'] = pd.to_datetime(df['datetime'])
-        df = df.set_index('datetime').sort_index(ascending=True)
-        df = df[~df.index.duplicated(keep='last')]
+    def _fold_closed_minute(self, bar):
+        """확정된 1분봉 → 각 상위 봉의 partial에 누적"""
+        o, h, l, c, v, minute_ts = bar
+        for tf, buf in self.buffers.items():
+            if buf is self.base:
+                continue
+            hslot = buf.slot_of(minute_ts)
+            part = self._partial.get(tf)
+            if part is None or part[0] != hslot:
+                self._partial[tf] = [hslot, o, h, l, c, v]
+            else:
+                part[2] = max(part[2], h)
+                part[3] = min(part[3], l)
+                part[4] = c
+                part[5] += v
+
+    def _roll_up(self, ts):
+        """진행 중 1분봉 + partial → 상위 봉 현재 봉 (시간봉당 O(1))"""
+        o, h, l, c, v, _ = self.base.bar_at(self.base.closed_count)
+        minute_slot = self.base.current_slot
+        for tf, buf in self.buffers.items():
+            if buf is self.base:
+                continue
+            hslot = buf.slot_of(minute_slot)
+            part = self._partial.get(tf)
+            if part is not None and part[0] == hslot:
+                buf.set_current(part[1], max(part[2], h), min(part[3], l), c,
+                                part[5] + v, ts, hslot)
+            else:
+                buf.set_current(o, h, l, c, v, ts, hslot)
+
+    def seed_partial(self, timeframe, buf):
+        """REST 시드 직후 — REST 현재 봉에서 진행 중 1분봉 몫을 뺀 값을 partial로"""
+        if not buf.has_current:
+            self._partial.pop(timeframe, None)
+            return
+        o, h, l, c, v, _ = buf.bar_at(buf.closed_count)
+        base = self.base
+        if base.has_current and buf.slot_of(base.current_slot) == buf.current_slot:
+            v = max(0.0, v - base.bar_at(base.closed_count)[4])
+        self._partial[timeframe] = [buf.current_slot, o, h, l, c, v]
+
+
+def _on_trade_message(code, data):
+    """WS trade 메시지 → 집계기 반영"""
+    price = float(data.get('trade_price', 0) or 0)
+    volume = float(data.get('trade_volume', 0) or 0)
+    trade_ts_ms = data.get('trade_timestamp') or data.get('timestamp')
+    if price <= 0 or not trade_ts_ms:
+        return
+    ts = float(trade_ts_ms) / 1000.0
+    with ws_candles_5m_lock:
+        agg = trade_aggregators.get(code)
+        if agg is None:
+            return
+        agg.on_trade(price, volume, ts, data.get('sequential_id'))
 
-        if len(df) < 20:
-            return None
 
-        df = add_indicators(df)
-        return df
+def _mark_trade_buffers_unsynced():
+    """WS 끊김 → 체결 집계 봉은 구멍이 생길 수 있으므로 REST 재시드 전까지 미사용"""
+    with ws_candles_5m_lock:
+        for agg in trade_aggregators.values():
+            for buf in agg.buffers.values():
+                buf.synced = False
 
+
+def seed_trade_candles(ticker, timeframe, df):
+    """REST로 받은 봉(df)으로 체결 집계 버퍼 재시드 (WS 연결 중일 때만 synced)"""
+    if WS_CANDLE_SOURCE != "trade" or df is None or len(df) == 0:
+        return False
+    bar_sec = TRADE_CANDLE_TIMEFRAMES.get(timeframe)
+    if bar_sec is None:
+        return False
+    try:
+        with ws_status_lock:
+            connected = ws_status['connected']
+        if not connected:
+            return False
+        ts_arr = kst_index_to_epoch(df.index)      # REST 인덱스는 KST naive
+        ohlcv = df[['open', 'high', 'low', 'close', 'volume']].to_numpy(dtype=float)
+        buf = CandleRingBuffer(TRADE_CANDLE_CAPACITY[timeframe], bar_sec)
+        last_slot = buf.slot_of(ts_arr[-1])
+        last_is_current = last_slot == buf.slot_of(time.time())
+        closed_n = len(df) - 1 if last_is_current else len(df)
+        for i in range(max(0, closed_n - buf.capacity), closed_n):
+            buf.append_closed(*ohlcv[i], ts_arr[i])
+        if last_is_current:
+            buf.start_current(*ohlcv[-1], ts_arr[-1], last_slot)
+        buf.synced = True
+        with ws_candles_5m_lock:
+            agg = trade_aggregators.get(ticker)
+            if agg is None:
+                return False
+            if timeframe == TRADE_CANDLE_BASE_TF:
+                return False  # 기준 1분봉은 체결로만 갱신
+            agg.buffers[timeframe] = buf
+            agg.seed_partial(timeframe, buf)
+            if timeframe == "5m":
+                ws_candles_5m[ticker] = buf
+        return True
     except Exception:
-        return None
+        return False
+
+
+def get_trade_candle_frames(ticker, tf_counts):
+    """여러 시간봉을 한 번의 락 구간에서 스냅샷 → {tf: DataFrame 마지막 count개}
+
+    모든 블록을 같은 시점에 복사하므로 15m/1h 프레임이 서로 다른 순간의 값을 섞지 않음.
+    준비 안 된 시간봉은 결과에서 빠짐. 반환 프레임은 캐시와 분리된 사본.
+    """
+    frames = {}
+    if WS_CANDLE_SOURCE != "trade":
+        return frames
+    try:
+        snaps = []
+        with ws_candles_5m_lock:
+            agg = trade_aggregators.get(ticker)
+            if agg is None:
+                return frames
+            for tf, count in tf_counts.items():
+                buf = agg.buffers.get(tf)
+                if buf is None or not buf.synced or buf.size + 1 < min(count, buf.capacity):
+                    continue
+                cache_key, cached, block = _ring_buffer_block(buf, True, 20)
+                snaps.append((tf, count, buf, cache_key, cached, block))
+        for tf, count, buf, cache_key, cached, block in snaps:
+            df = cached
+            if df is None and block is not None:
+                df = _block_to_df(buf, ticker, f"trade{tf}", True, cache_key, block, 20)
+            if df is not None:
+                frames[tf] = df.iloc[-count:].copy()
+    except Exception:
+        pass
+    return frames
+
+
+def get_trade_candles(ticker, timeframe, count):
+    """체결 집계 봉 → 지표 포함 DataFrame 마지막 count개 (준비 안 됐으면 None)"""
+    return get_trade_candle_frames(ticker, {timeframe: count}).get(timeframe)
 
 
 def _get_ws_subscribe_tickers():
@@ -881,19 +1356,28 @@ def _get_ws_subscribe_tickers():
 
 
 def _build_subscribe_message(tickers):
-    return json.dumps([
-        {"ticket": str(uuid.uuid4())},
-        {"type": "ticker", "codes": tickers, "isOnlyRealtime": False}
-    ])
+    # ticker는 KRW 전 마켓(스크리너 스냅샷), trade는 보유/후보 코인만
+    ticker_codes = sorted(set(tickers) | set(market_snapshot.markets())) \
+        if SCREENING_WS_SNAPSHOT else list(tickers)
+    msg = [{"ticket": str(uuid.uuid4())}]
+    if ticker_codes:
+        msg.append({"type": "ticker", "codes": ticker_codes, "isOnlyRealtime": False})
+    if WS_CANDLE_SOURCE == "trade" and tickers:
+        msg.append({"type": "trade", "codes": tickers, "isOnlyRealtime": True})
+    return json.dumps(msg)
 
 
 def _ws_on_open(ws):
+    if ws_subscription_manager.is_standby(ws):
+        # 핫 재구독용 두 번째 소켓 — 상태는 첫 데이터 수신 후 교체 시점에 반영
+        ws.send(_build_subscribe_message(ws_subscription_manager.standby_tickers(ws)))
+        return
     tickers = _get_ws_subscribe_tickers()
     if not tickers:
-        # v36: 스크리닝 전이면 빈 구독 (스크리닝 후 재연결로 적용됨)
+        # v36: 스크리닝 전이면 빈 구독 (스크리닝 후 핫 재구독으로 적용됨)
         tickers = []
-    msg = _build_subscribe_message(tickers) if tickers else json.dumps([{"ticket": str(uuid.uuid4())}])
-    ws.send(msg)
+    ws.send(_build_subscribe_message(tickers))
+    ws_subscription_manager.mark_subscribed(tickers)
     with ws_status_lock:
         ws_status['connected'] = True
         ws_status['subscribed_tickers'] = tickers
@@ -901,7 +1385,13 @@ def _ws_on_open(ws):
 
 
 def _ws_on_message(ws, message):
+    t0 = time.perf_counter()
+    m_count = m_sec = None
     try:
+        if ws is not _ws_app:
+            # 교체 대기 중인 새 소켓의 첫 데이터 → 교체 (교체 전후 메시지는 양쪽 모두 반영,
+            # 체결은 sequential_id 중복 제거, 시세는 최신값 덮어쓰기라 중복 무해)
+            ws_subscription_manager.on_standby_message(ws)
         data = json.loads(message)
         code = data.get('code', '')
         price = data.get('trade_price', 0)
@@ -912,8 +1402,21 @@ def _ws_on_message(ws, message):
             with ws_status_lock:
                 ws_status['last_received'] = ts
 
-            vol_delta = float(data.get('acc_trade_volume', 0)) * 0.001
-            _update_ws_candle(code, price, vol_delta, ts)
+            if data.get('type') == 'trade':
+                m_count, m_sec = _M_WS_TRADE
+                _on_trade_message(code, data)
+            else:
+                m_count, m_sec = _M_WS_TICKER
+                market_snapshot.on_ws_ticker(code, data)
+            if data.get('type') != 'trade' and WS_CANDLE_SOURCE != "trade":
+                vol_delta = float(data.get('acc_trade_volume', 0)) * 0.001
+                _update_ws_candle(code, price, vol_delta, ts)
+
+            # 보유 코인 가격 트리거 (O(1)) → 돌파 시에만 매도 평가 작업 등록
+            if SELL_EVENT_DRIVEN and sell_engine is not None:
+                fired = sell_engine.on_price_tick(code, float(price))
+                if fired:
+                    _dispatch_sell_trigger(code, fired, float(price))
 
             # ★ v36: EMA 트래커 현재가 갱신
             if ema_tracker is not None:
@@ -921,6 +1424,9 @@ def _ws_on_message(ws, message):
 
     except Exception:
         pass
+    if m_count is not None:
+        m_count.inc()
+        m_sec.observe(time.perf_counter() - t0)
 
 
 def _ws_on_error(ws, error):
@@ -929,8 +1435,11 @@ def _ws_on_error(ws, error):
 
 
 def _ws_on_close(ws, close_status_code, close_msg):
+    if ws_subscription_manager.on_close(ws):
+        return  # 교체로 은퇴한 소켓 / 포기한 대기 소켓 — 연결 상태 유지
     with ws_status_lock:
         ws_status['connected'] = False
+    _mark_trade_buffers_unsynced()
 
 
 def _ws_on_ping(ws, message):
@@ -946,6 +1455,13 @@ def _create_ws_app():
     )
 
 
+def _run_ws_app(app):
+    app.run_forever(
+        ping_interval=30, ping_timeout=10,
+        skip_utf8_validation=True,
+    )
+
+
 def websocket_thread_worker():
     global _ws_app
     print(f"{Colors.BLUE}[Thread 4] WebSocket 빌더 스레드 시작{Colors.ENDC}")
@@ -954,10 +1470,15 @@ def websocket_thread_worker():
             app = _create_ws_app()
             with _ws_app_lock:
                 _ws_app = app
-            app.run_forever(
-                ping_interval=30, ping_timeout=10,
-                skip_utf8_validation=True,
-            )
+            _run_ws_app(app)
+            # 핫 재구독으로 교체된 경우 새 소켓이 끊길 때까지 대기 (재연결 카운트/백오프 없음)
+            while True:
+                with _ws_app_lock:
+                    current = _ws_app
+                if current is app or stop_event.is_set():
+                    break
+                app = current
+                ws_subscription_manager.join(app)
         except Exception as e:
             if DEBUG_MODE:
                 print(f"{Colors.RED}[WS] run_forever 예외: {e}{Colors.ENDC}")
@@ -972,7 +1493,7 @@ def websocket_thread_worker():
 
 
 def reconnect_websocket():
-    """★ v36 신규: 스크리닝 후 WS 재구독 트리거"""
+    """★ v36 신규: WS 강제 재연결 (구독 변경은 ws_subscription_manager.update 사용)"""
     global _ws_app
     try:
         with _ws_app_lock:
@@ -982,6 +1503,156 @@ def reconnect_websocket():
         pass
 
 
+class WSSubscriptionManager:
+    """
+    WS 핫 재구독 — 연결을 끊지 않고 구독 코인 집합 교체.
+
+    [해결 문제]
+    v39는 스크리닝마다 reconnect_websocket()으로 소켓을 닫음 →
+    틱 유실 + 체결 집계 봉 unsynced + reconnect_count 증가 + 5+2·rc초 대기.
+
+    [설계]
+    - _get_ws_subscribe_tickers() 결과와 현재 구독을 비교, 같으면 아무것도 안 함
+    - 다르면 새 구독으로 두 번째 소켓을 열고 기존 소켓은 계속 수신
+    - 새 소켓이 첫 데이터를 받으면 _ws_app 교체 후 기존 소켓 종료 (끊김 처리 없음)
+    - WS_HANDOVER_TIMEOUT_SEC 안에 데이터가 없으면 새 소켓 포기 (기존 소켓 유지)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribed: Optional[Tuple[str, ...]] = None
+        self._standby = {}      # app → {"tickers", "thread", "started"}
+        self._retired = set()   # 교체/포기로 닫는 중인 소켓
+        self._threads = {}      # 승격된 대기 소켓 app → 실행 스레드
+        self.handovers = 0
+        self.unchanged = 0
+        self.failed = 0
+
+    def _desired(self) -> Tuple[str, ...]:
+        tickers = set(_get_ws_subscribe_tickers())
+        if SCREENING_WS_SNAPSHOT:
+            # ticker 구독 대상(전 마켓)이 늘어난 경우도 변경으로 간주
+            tickers |= {f"ticker:{m}" for m in market_snapshot.markets()}
+        return tuple(sorted(tickers))
+
+    def mark_subscribed(self, tickers: List[str]):
+        """일반 (재)연결 on_open에서 적용한 구독 기록"""
+        with self._lock:
+            self._subscribed = None if not tickers else self._desired()
+
+    def is_standby(self, ws) -> bool:
+        with self._lock:
+            return ws in self._standby
+
+    def standby_tickers(self, ws) -> List[str]:
+        with self._lock:
+            return list(self._standby[ws]["tickers"])
+
+    def update(self) -> str:
+        """구독 변경 적용 → 'unchanged' | 'started' | 'pending' | 'offline'"""
+        with ws_status_lock:
+            connected = ws_status['connected']
+        if not connected:
+            return "offline"  # 다음 재연결 on_open이 최신 구독 적용
+        desired = self._desired()
+        with self._lock:
+            if desired == self._subscribed:
+                self.unchanged += 1
+                return "unchanged"
+            for app, info in self._standby.items():
+                if info["desired"] == desired:
+                    return "pending"
+            stale = list(self._standby)
+        for app in stale:
+            self._abandon(app)
+        tickers = _get_ws_subscribe_tickers()
+        app = _create_ws_app()
+        thread = threading.Thread(target=_run_ws_app, args=(app,), name="WS-standby", daemon=True)
+        with self._lock:
+            self._standby[app] = {"tickers": tickers, "desired": desired,
+                                  "thread": thread, "started": time.time()}
+        thread.start()
+        timer = threading.Timer(WS_HANDOVER_TIMEOUT_SEC, self._check_timeout, args=(app,))
+        timer.daemon = True
+        timer.start()
+        print(f"{Colors.CYAN}[WS] 핫 재구독 시작 ({len(tickers)}개) — 새 소켓 수신 대기{Colors.ENDC}")
+        return "started"
+
+    def on_standby_message(self, ws):
+        """대기 소켓 첫 데이터 → _ws_app 교체 + 기존 소켓 은퇴"""
+        global _ws_app
+        with self._lock:
+            info = self._standby.pop(ws, None)
+            if info is None:
+                return
+            self._threads[ws] = info["thread"]
+            self._subscribed = info["desired"]
+            self.handovers += 1
+        with _ws_app_lock:
+            old = _ws_app
+            _ws_app = ws
+        with ws_status_lock:
+            ws_status['subscribed_tickers'] = info["tickers"]
+            ws_status['last_received'] = time.time()
+        if old is not None and old is not ws:
+            with self._lock:
+                self._retired.add(old)
+            try:
+                old.close()
+            except Exception:
+                pass
+        print(f"{Colors.GREEN}[WS] 핫 재구독 교체 완료 ({len(info['tickers'])}개 구독, "
+              f"{(time.time() - info['started']) * 1000:.0f}ms){Colors.ENDC}")
+
+    def _check_timeout(self, app):
+        with self._lock:
+            pending = app in self._standby
+        if pending:
+            self._abandon(app)
+            print(f"{Colors.YELLOW}[WS] 핫 재구독 실패 (무응답) — 기존 소켓 유지{Colors.ENDC}")
+
+    def _abandon(self, app):
+        with self._lock:
+            if self._standby.pop(app, None) is None:
+                return
+            self._retired.add(app)
+            self.failed += 1
+        try:
+            app.close()
+        except Exception:
+            pass
+
+    def on_close(self, ws) -> bool:
+        """닫힌 소켓이 은퇴/대기 소켓이면 True (연결 끊김으로 처리하지 않음)"""
+        with self._lock:
+            if ws in self._retired:
+                self._retired.discard(ws)
+                return True
+            if ws in self._standby:
+                self._standby.pop(ws, None)
+                self.failed += 1
+                return True
+            return False
+
+    def join(self, app):
+        """승격된 소켓의 실행 스레드 종료까지 대기 (websocket_thread_worker 전용)"""
+        with self._lock:
+            thread = self._threads.get(app)
+        if thread is not None:
+            thread.join()
+            with self._lock:
+                self._threads.pop(app, None)
+
+    def close_all(self):
+        with self._lock:
+            apps = list(self._standby)
+        for app in apps:
+            self._abandon(app)
+
+
+ws_subscription_manager = WSSubscriptionManager()
+
+
 def get_ws_status_summary():
     with ws_status_lock:
         return {
@@ -989,6 +1660,7 @@ def get_ws_status_summary():
             'reconnect_count': ws_status['reconnect_count'],
             'subscribed': len(ws_status['subscribed_tickers']),
             'error_count': ws_status['error_count'],
+            'handovers': ws_subscription_manager.handovers,
         }
 
 
@@ -1003,7 +1675,9 @@ def get_current_price(ticker):
                 entry = ws_price_cache[ticker]
                 age = time.time() - entry['ts']
                 if age < WS_CACHE_STALE_SEC:
+                    _M_PRICE_WS.inc()
                     return entry['price']
+        _M_PRICE_REST.inc()
         return _get_price_rest_single(ticker)
     except Exception:
         return None
@@ -1011,11 +1685,7 @@ def get_current_price(ticker):
 
 def _get_price_rest_single(ticker):
     try:
-        _rate_limit_wait()
-        resp = requests.get(
-            f"{UPBIT_API_BASE}/v1/ticker",
-            params={'markets': ticker}, timeout=5
-        )
+        resp = market_client.get("/v1/ticker", params={'markets': ticker}, timeout=5)
         if resp.status_code == 200:
             data = resp.json()
             if data and len(data) > 0:
@@ -1025,150 +1695,322 @@ def _get_price_rest_single(ticker):
         return None
 
 
+def get_current_prices(tickers):
+    """여러 티커 현재가 → {ticker: price} (WS 캐시 우선, 나머지는 /v1/ticker 일괄 1회)"""
+    prices, missing = {}, []
+    now = time.time()
+    with ws_price_lock:
+        for tk in dict.fromkeys(tickers):
+            entry = ws_price_cache.get(tk)
+            if entry and now - entry['ts'] < WS_CACHE_STALE_SEC:
+                prices[tk] = entry['price']
+            else:
+                missing.append(tk)
+    for i in range(0, len(missing), 100):
+        try:
+            resp = market_client.get("/v1/ticker", params={'markets': ",".join(missing[i:i + 100])},
+                                     timeout=5)
+            if resp.status_code == 200:
+                for t in resp.json():
+                    prices[t.get('market')] = t.get('trade_price')
+            else:
+                # 상장 폐지 마켓이 섞이면 일괄 조회가 404 → 개별 조회
+                for tk in missing[i:i + 100]:
+                    prices[tk] = _get_price_rest_single(tk)
+        except Exception:
+            pass
+    return prices
+
+
 # ═══════════════════════════════════════════════════════════════════════
 # SECTION 8: OHLCV 데이터 수집 (v35 + 1H/4H 추가)
 # ═══════════════════════════════════════════════════════════════════════
 
-def get_ohlcv(ticker, interval="minute15", count=200, to=None):
-    """★ v36 변경: minute60 (1H), minute240 (4H) 인터벌 추가"""
+_candle_gap_fills = set()          # 공백 채우기 제출된 (ticker, interval)
+_candle_gap_fills_lock = threading.Lock()
+
+
+def _fill_candle_gap(ticker, interval):
     try:
-        _rate_limit_wait()
-        interval_map = {
-            'minute1':   '/v1/candles/minutes/1',
-            'minute5':   '/v1/candles/minutes/5',
-            'minute15':  '/v1/candles/minutes/15',
-            'minute60':  '/v1/candles/minutes/60',    # ★ v36 신규: 1H
-            'minute240': '/v1/candles/minutes/240',   # ★ v36 신규: 4H
-            'day':       '/v1/candles/days',
-        }
-        path = interval_map.get(interval, '/v1/candles/minutes/15')
-        max_per_call = 200
-        all_candles = []
-        remaining = count
-        current_to = to
-
-        while remaining > 0:
-            batch_count = min(remaining, max_per_call)
-            params = {'market': ticker, 'count': batch_count}
-            if current_to:
-                params['to'] = current_to
-            resp = requests.get(f"{UPBIT_API_BASE}{path}", params=params, timeout=10)
-            if resp.status_code != 200:
-                break
-            candles = resp.json()
-            if not candles:
-                break
-            all_candles.extend(candles)
-            remaining -= len(candles)
-            if len(candles) < batch_count:
-                break
-            last_dt = candles[-1].get('candle_date_time_utc', '')
-            if last_dt:
-                current_to = last_dt
-            else:
-                break
-            time.sleep(0.15)
+        candle_store.fill_gap(ticker, interval, priority=PRIORITY_BULK)
+    finally:
+        with _candle_gap_fills_lock:
+            _candle_gap_fills.discard((ticker, interval))
 
-        if not all_candles:
-            return None
 
-        rows = [{
-            'datetime': c.get('candle_date_time_kst', ''),
-            'open': c.get('opening_price', 0.0),
-            'high': c.get('high_price', 0.0),
-            'low': c.get('low_price', 0.0),
-            'close': c.get('trade_price', 0.0),
-            'volume': c.get('candle_acc_trade_volume', 0.0),
-            'value': c.get('candle_acc_trade_price', 0.0),
-        } for c in all_candles]
-
-        df = pd.DataFrame(rows)
-        df['datetime'] = pd.to_datetime(df['datetime'])
-        df = df.set_index('datetime').sort_index(ascending=True)
-        df = df[~df.index.duplicated(keep='last')]
-        if len(df) > count:
-            df = df.iloc[-count:]
-        return df
+def _schedule_candle_gap_fill(ticker, interval):
+    """재등장 티커의 저장소 공백 → 백그라운드 작업 1건 (중복 제출 없음, 큐 가득이면 다음 조회 때 재시도)"""
+    key = (ticker, interval)
+    with _candle_gap_fills_lock:
+        if key in _candle_gap_fills:
+            return
+        _candle_gap_fills.add(key)
+    if work_scheduler.submit(PRIO_REPORT, _fill_candle_gap, ticker, interval,
+                             name="candle_gap_fill") is None:
+        with _candle_gap_fills_lock:
+            _candle_gap_fills.discard(key)
 
+
+def get_ohlcv(ticker, interval="minute15", count=200, to=None):
+    """★ v36 변경: minute60 (1H), minute240 (4H) 인터벌 추가 — 공용 클라이언트 경유"""
+    t0 = time.perf_counter()
+    try:
+        if candle_store is not None:
+            # 매매 경로 조회 — 저장소 기본(PRIORITY_BULK) 대신 직접 조회와 같은 우선순위,
+            # 오래 비운 티커도 최신 1페이지만 (사이 공백은 백그라운드 BULK 작업이 채움)
+            df = candle_store.get_candles(ticker, interval, count, to, priority=PRIORITY_NORMAL,
+                                          max_sync_bars=max(count, CANDLE_MAX_PER_CALL))
+            if to is None and candle_store.gap_head(ticker, interval) is not None:
+                _schedule_candle_gap_fill(ticker, interval)
+        else:
+            df = candles_to_df(market_client.fetch_candles_raw(ticker, interval, count, to), count)
+        _M_OHLCV_CALLS.labels(interval, "ok" if df is not None else "empty").inc()
+        return df
     except Exception as e:
+        _M_OHLCV_CALLS.labels(interval, "error").inc()
         if DEBUG_MODE:
             print(f"{Colors.RED}[API] get_ohlcv({ticker},{interval},{count}) 예외: {e}{Colors.ENDC}")
         return None
+    finally:
+        _M_OHLCV_SEC.labels(interval).observe(time.perf_counter() - t0)
 
 
 # ═══════════════════════════════════════════════════════════════════════
-# SECTION 9: 스마트 캐시 시스템 (v35 동일 + 1H/4H 추가)
+# SECTION 9: 스마트 캐시 시스템 ((티커, 봉) 단위 시계열 캐시 + 동시 조회 병합)
 # ═══════════════════════════════════════════════════════════════════════
 
-def get_cached_data(cache_key, ttl):
-    try:
-        with cache_lock:
-            if cache_key in data_cache and cache_key in cache_timestamps:
-                age = (datetime.now() - cache_timestamps[cache_key]).total_seconds()
-                if age < ttl:
-                    return data_cache[cache_key]
-        return None
-    except Exception:
+@dataclass
+class CandleCacheEntry:
+    raw: pd.DataFrame           # REST OHLCV (지표 없음, 병합/패치 기준)
+    df: pd.DataFrame            # 지표 계산 완료 프레임
+    count: int                  # 보관 길이 (신규 상장 코인은 len(raw) < count 가능)
+    slot: int                   # 마지막 REST 반영 시점의 진행 중 봉 슬롯 (epoch // 봉 길이)
+    fetched_at: float           # 마지막 REST 반영 시각
+    patched_price: Optional[float] = None
+
+
+class _CandleFetch:
+    """진행 중인 REST 조회 1건 (같은 키의 후속 요청은 이 결과를 기다림)"""
+
+    def __init__(self, count):
+        self.count = count
+        self.df = None
+        self.done = Event()
+
+
+def _candle_slot(ts_sec, tf):
+    return int(ts_sec // TRADE_CANDLE_TIMEFRAMES[tf])
+
+
+def _ws_live_price(ticker):
+    """WS 최신가 (WS_CACHE_STALE_SEC 이내만, REST 폴백 없음)"""
+    with ws_price_lock:
+        entry = ws_price_cache.get(ticker)
+    if entry is None or time.time() - entry['ts'] >= WS_CACHE_STALE_SEC:
         return None
+    return entry['price']
 
 
-def set_cached_data(cache_key, data):
-    try:
-        with cache_lock:
-            data_cache[cache_key] = data
-            cache_timestamps[cache_key] = datetime.now()
-    except Exception:
-        pass
+class CandleSeriesCache:
+    """
+    (티커, 봉) 단위 read-through 캔들 캐시 — 봉 경계 기반 무효화.
+
+    [해결 문제]
+    v39의 get_cached_data는 f"{ticker}_15m_{count}" 키를 사용 →
+    check_sell_signal 한 번에 count=3/5/ATR_PERIOD+5가 각각 REST 조회,
+    항목은 만료되어도 삭제되지 않아 티커 수 × count 종류만큼 계속 증가.
+    또한 1H 300초 / 4H 900초 고정 TTL → 4H봉 마감 직후 최대 15분간 지난 봉으로 판정,
+    봉 중간에는 불필요한 전체 재조회.
+
+    [설계]
+    - 키 (ticker, tf)마다 지금까지 조회한 가장 긴 시계열 1개만 보관,
+      보관 길이 이하 요청은 df.iloc[-count:] 슬라이스로 응답
+    - 봉 마감(KST 봉 스케줄 = epoch 정렬 슬롯) 시점에 즉시 무효화 →
+      경과 봉 수 + 1개만 REST 조회 후 병합 (CANDLE_TAIL_MAX_BARS 초과 시 전체 재조회)
+    - 같은 봉 안에서는 CANDLE_LIVE_REFRESH_SEC마다 count=1 조회로 진행 중 봉만 갱신
+    - 그 사이에는 WS 최신가로 진행 중 봉의 high/low/close 패치
+    - 캐시 미스가 동시에 여러 스레드에서 발생하면 조회 1건만 실행, 나머지는 결과 대기
+    - 항목 수 상한(LRU) + 마지막 REST 반영 후 최대 보관 시간으로 제거
+    """
 
+    def __init__(self, max_entries=CANDLE_CACHE_MAX_ENTRIES,
+                 max_age_sec=CANDLE_CACHE_MAX_AGE_SEC):
+        self.max_entries = max_entries
+        self.max_age_sec = max_age_sec
+        self._entries: "OrderedDict[Tuple[str, str], CandleCacheEntry]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], _CandleFetch] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.tail_fetches = 0
+        self.ws_patches = 0
+        self.coalesced = 0
+        self.evictions = 0
 
-def get_smart_cache_ttl_15m():
-    """15분봉 경계 인식 스마트 TTL"""
-    now = datetime.now()
-    minutes_in_period = now.minute % 15
-    seconds_in_period = minutes_in_period * 60 + now.second
-    if seconds_in_period < 30:
-        return 10
-    elif seconds_in_period > 840:
-        return 10
-    else:
-        return 120
+    @staticmethod
+    def _slice(df, count):
+        if df is None or len(df) <= count:
+            return df
+        return df.iloc[-count:]
+
+    def _plan(self, entry, tf, count, now):
+        """캐시 항목 → ('hit' | 'live' | 'tail' | 'full', 조회할 봉 수)"""
+        if entry is None or entry.count < count:
+            return "full", max(count, CANDLE_CACHE_MIN_FETCH, entry.count if entry else 0)
+        elapsed = _candle_slot(now, tf) - entry.slot
+        if elapsed <= 0:
+            if now - entry.fetched_at < CANDLE_LIVE_REFRESH_SEC[tf]:
+                return "hit", 0
+            return "live", 1
+        if elapsed <= CANDLE_TAIL_MAX_BARS:
+            return "tail", elapsed + 1
+        return "full", entry.count
+
+    def is_fresh(self, ticker, tf, count):
+        """조회 없이 응답 가능한지 (마감 이후 갱신 + 보관 길이 ≥ count)"""
+        with self._lock:
+            return self._plan(self._entries.get((ticker, tf)), tf, count, time.time())[0] == "hit"
+
+    def put(self, ticker, tf, raw, df, count):
+        """REST 조회 결과 저장 (count = 보관 길이)"""
+        if raw is None or df is None:
+            return
+        key = (ticker, tf)
+        now = time.time()
+        with self._lock:
+            self._entries[key] = CandleCacheEntry(raw, df, count, _candle_slot(now, tf), now)
+            self._entries.move_to_end(key)
+            self._evict(now)
+
+    def _evict(self, now):
+        expired = [k for k, e in self._entries.items() if now - e.fetched_at >= self.max_age_sec]
+        for k in expired:
+            del self._entries[k]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        self.evictions += len(expired)
+
+    def get_or_fetch(self, ticker, tf, count, finish_fn, seed=True):
+        """
+        캐시 조회 → 필요 시 REST 조회/병합 1회 실행 후 저장.
+        finish_fn(ticker, raw)는 지표까지 계산된 DataFrame 또는 None 반환.
+        seed=True면 REST 결과로 체결 집계 버퍼도 재시드.
+        """
+        key = (ticker, tf)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            action, n = self._plan(entry, tf, count, now)
+            if action == "hit":
+                self.hits += 1
+                self._entries.move_to_end(key)
+            else:
+                keep = n if action == "full" else entry.count
+                pending = self._inflight.get(key)
+                if pending is not None and pending.count >= count:
+                    self.coalesced += 1
+                    mine = None
+                    action = "coalesced"
+                else:
+                    if action == "full":
+                        self.misses += 1
+                    else:
+                        self.tail_fetches += 1
+                    mine = _CandleFetch(keep)
+                    if pending is None:
+                        self._inflight[key] = mine
+        _M_CANDLE_CACHE.labels(tf, action).inc()
+
+        if action == "hit":
+            return self._slice(self._patch_live(key, entry, tf, finish_fn), count)
+
+        if mine is None:
+            if not pending.done.wait(CANDLE_CACHE_WAIT_SEC):
+                return None
+            return self._slice(pending.df, count)
+
+        try:
+            interval = CANDLE_UPBIT_INTERVALS[tf]
+            if action == "full":
+                raw = get_ohlcv(ticker, interval=interval, count=n)
+            else:
+                tail = get_ohlcv(ticker, interval=interval, count=n)
+                raw = None
+                if tail is not None:
+                    raw = pd.concat([entry.raw, tail[entry.raw.columns]])
+                    raw = raw[~raw.index.duplicated(keep='last')].sort_index().iloc[-mine.count:]
+            if raw is not None and len(raw) >= 20:
+                if seed:
+                    seed_trade_candles(ticker, tf, raw)
+                mine.df = finish_fn(ticker, raw.copy())
+                self.put(ticker, tf, raw, mine.df, mine.count)
+            return self._slice(mine.df, count)
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is mine:
+                    del self._inflight[key]
+            mine.done.set()
+
+    def _patch_live(self, key, entry, tf, finish_fn):
+        """WS 최신가로 진행 중 봉 high/low/close 패치 (가격 변화 없으면 기존 프레임)"""
+        if not CANDLE_WS_PATCH:
+            return entry.df
+        price = _ws_live_price(key[0])
+        if price is None or price == entry.patched_price:
+            return entry.df
+        raw = entry.raw
+        if _candle_slot(kst_to_epoch(raw.index[-1]), tf) != entry.slot:
+            return entry.df  # 진행 중 봉이 아직 REST에 없음 (봉 시작 후 체결 없음)
+        raw = raw.copy()
+        i = len(raw) - 1
+        raw.iat[i, raw.columns.get_loc('close')] = price
+        raw.iat[i, raw.columns.get_loc('high')] = max(raw['high'].iat[i], price)
+        raw.iat[i, raw.columns.get_loc('low')] = min(raw['low'].iat[i], price)
+        df = finish_fn(key[0], raw.copy())
+        if df is None:
+            return entry.df
+        with self._lock:
+            if self._entries.get(key) is entry:
+                entry.raw, entry.df, entry.patched_price = raw, df, price
+                self.ws_patches += 1
+        return df
+
+    def get_stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                    "tail_fetches": self.tail_fetches, "ws_patches": self.ws_patches,
+                    "coalesced": self.coalesced, "evictions": self.evictions}
+
+
+candle_cache = CandleSeriesCache()
 
 
 def get_candles_15m(ticker, count=50):
     try:
-        cache_key = f"{ticker}_15m_{count}"
-        smart_ttl = get_smart_cache_ttl_15m()
-        cached = get_cached_data(cache_key, smart_ttl)
-        if cached is not None:
-            return cached
-        df = get_ohlcv(ticker, interval="minute15", count=count)
-        if df is not None and len(df) >= 20:
-            df = add_indicators(df)
-            if df is not None:
-                set_cached_data(cache_key, df)
-                return df
-        return None
+        df_mem = get_trade_candles(ticker, "15m", count)
+        if df_mem is not None:
+            return df_mem
+        return candle_cache.get_or_fetch(ticker, "15m", count, _finish_candles_15m)
     except Exception:
         return None
 
 
+def _finish_candles_15m(ticker, df):
+    return add_indicators_incremental(df, ticker, "15m")
+
+
 def get_candles_5m_rest(ticker, count=40):
     try:
-        cache_key = f"{ticker}_5m_{count}"
-        cached = get_cached_data(cache_key, 15)
-        if cached is not None:
-            return cached
-        df = get_ohlcv(ticker, interval="minute5", count=count)
-        if df is not None and len(df) >= 20:
-            df = add_indicators(df)
-            if df is not None:
-                set_cached_data(cache_key, df)
-                return df
-        return None
+        return candle_cache.get_or_fetch(ticker, "5m", count, _finish_candles_5m, seed=False)
     except Exception:
         return None
 
 
+def _finish_candles_5m(ticker, df):
+    return add_indicators_incremental(df, ticker, "5m")
+
+
 def get_candles_5m(ticker, count=40):
     """5분봉 통합 — WS 빌더 우선, REST 폴백"""
     df = get_ws_candles_5m(ticker, include_current=True)
@@ -1180,43 +2022,130 @@ def get_candles_5m(ticker, count=40):
 def get_candles_1h(ticker, count=50):
     """★ v36 신규: 1시간봉 조회 (매수 타이밍 판정용)"""
     try:
-        cache_key = f"{ticker}_1h_{count}"
-        # 1H봉은 5분 캐시 (현재 봉 갱신 빈도)
-        cached = get_cached_data(cache_key, 300)
-        if cached is not None:
-            return cached
-        df = get_ohlcv(ticker, interval="minute60", count=count)
-        if df is not None and len(df) >= 20:
-            df = add_indicators(df)
-            if df is not None:
-                # 1H봉용 거래량 비율 추가
-                df['vol_ratio'] = df['volume'] / df['volume'].rolling(window=10).mean().fillna(df['volume'])
-                set_cached_data(cache_key, df)
-                return df
-        return None
+        df_mem = get_trade_candles(ticker, "1h", max(count, 20))
+        if df_mem is not None:
+            df_mem = df_mem.copy()
+            df_mem['vol_ratio'] = df_mem['volume'] / df_mem['volume'].rolling(window=10).mean().fillna(df_mem['volume'])
+            return df_mem.iloc[-count:]
+        return candle_cache.get_or_fetch(ticker, "1h", count, _finish_candles_1h)
     except Exception:
         return None
 
 
+def _finish_candles_1h(ticker, df):
+    df = add_indicators_incremental(df, ticker, "1h")
+    if df is not None:
+        # 1H봉용 거래량 비율 추가
+        df['vol_ratio'] = df['volume'] / df['volume'].rolling(window=10).mean().fillna(df['volume'])
+    return df
+
+
 def get_candles_4h(ticker, count=100):
     """★ v36 신규: 4시간봉 조회 (EMA 추세 판정용)"""
     try:
-        cache_key = f"{ticker}_4h_{count}"
-        # 4H봉은 15분 캐시 (현재 봉 갱신 빈도)
-        cached = get_cached_data(cache_key, 900)
-        if cached is not None:
-            return cached
-        df = get_ohlcv(ticker, interval="minute240", count=count)
-        if df is not None and len(df) >= 20:
-            df = add_indicators(df)
-            if df is not None:
-                set_cached_data(cache_key, df)
-                return df
-        return None
+        df_mem = get_trade_candles(ticker, "4h", count)
+        if df_mem is not None:
+            return df_mem
+        return candle_cache.get_or_fetch(ticker, "4h", count, _finish_candles_4h)
     except Exception:
         return None
 
 
+def _finish_candles_4h(ticker, df):
+    return add_indicators_incremental(df, ticker, "4h")
+
+
+def prefetch_candles_4h(tickers, count=100):
+    """4시간봉 일괄 선조회 — 메모리/캐시에 없는 티커만 동시 REST 조회 후 캐시 적재"""
+    missing = [tk for tk in dict.fromkeys(tickers)
+               if get_trade_candles(tk, "4h", count) is None
+               and not candle_cache.is_fresh(tk, "4h", count)]
+    if not missing:
+        return 0
+    loaded = 0
+    for tk, raw in market_client.fetch_candles_many(missing, "minute240", count).items():
+        try:
+            if raw is None or len(raw) < 20:
+                continue
+            seed_trade_candles(tk, "4h", raw)
+            df = _finish_candles_4h(tk, raw.copy())
+            if df is not None:
+                candle_cache.put(tk, "4h", raw, df, count)
+                loaded += 1
+        except Exception:
+            pass
+    return loaded
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# SECTION 9-B: 시계/시세 공급자 (엔진 주입용 — 실거래 구현)
+# ═══════════════════════════════════════════════════════════════════════
+
+class LiveMarketProvider(MarketDataProvider):
+    """
+    실거래 공급자: 벽시계 + WS/캐시/REST 조회 함수 위임.
+    스크리너/EMA 트래커/매수·매도 엔진의 기본 공급자 (재생/메모리 구현은 upbit_market_provider 참조).
+    """
+
+    def time(self) -> float:
+        return time.time()
+
+    def now(self) -> datetime:
+        return epoch_to_kst(time.time())
+
+    def candles(self, ticker, tf, count):
+        fetch = _LIVE_CANDLE_FETCHERS.get(tf)
+        return fetch(ticker, count=count) if fetch is not None else None
+
+    def candle_frames(self, ticker, tf_counts):
+        """1분봉 롤업에서 같은 시점 스냅샷, 미준비 시간봉만 캐시/REST"""
+        frames = dict(get_trade_candle_frames(ticker, tf_counts))
+        for tf, n in tf_counts.items():
+            if frames.get(tf) is None:
+                frames[tf] = self.candles(ticker, tf, n)
+        return frames
+
+    def price(self, ticker):
+        return get_current_price(ticker)
+
+    def balances(self):
+        return upbit.get_balances() if upbit is not None else None
+
+    def markets(self):
+        """업비트 KRW 마켓 목록 (실패 시 예외)"""
+        resp = market_client.get("/v1/market/all", params={"isDetails": "false"},
+                                 priority=PRIORITY_BULK)
+        resp.raise_for_status()
+        return [m["market"] for m in resp.json() if m["market"].startswith("KRW-")]
+
+    def tickers(self, markets):
+        """Ticker API 일괄 조회 (최대 100개씩)"""
+        results = []
+        BATCH_SIZE = 100
+        for i in range(0, len(markets), BATCH_SIZE):
+            batch = markets[i:i + BATCH_SIZE]
+            try:
+                resp = market_client.get("/v1/ticker", params={"markets": ",".join(batch)},
+                                         priority=PRIORITY_BULK)
+                resp.raise_for_status()
+                results.extend(resp.json())
+            except Exception as e:
+                if DEBUG_MODE:
+                    print(f"{Colors.YELLOW}[스크리너] Ticker 조회 실패 (배치 {i}): {e}{Colors.ENDC}")
+        return results
+
+    def prefetch(self, tickers, tf, count):
+        return prefetch_candles_4h(tickers, count=count) if tf == "4h" else 0
+
+
+_LIVE_CANDLE_FETCHERS = {
+    "5m": get_candles_5m, "15m": get_candles_15m,
+    "1h": get_candles_1h, "4h": get_candles_4h,
+}
+
+live_provider = LiveMarketProvider()
+
+
 # ═══════════════════════════════════════════════════════════════════════
 # SECTION 10: 기술 지표 계산 (v35 동일 — EMA5/10 제거)
 # ═══════════════════════════════════════════════════════════════════════
@@ -1272,6 +2201,349 @@ def add_indicators(df):
         return None
 
 
+# ═══════════════════════════════════════════════════════════════════════
+# SECTION 10-B: 증분 지표 엔진 (티커×타임프레임별 O(1) 갱신)
+# ═══════════════════════════════════════════════════════════════════════
+# add_indicators()는 호출마다 전체 프레임의 rolling/ewm을 재계산한다.
+# 아래 상태 객체는 확정봉 1개당 O(1)로 BB와 RSI 누적합을 갱신하고,
+# 진행 중인 마지막 봉은 상태 변경 없이 창 계산에만 더한다.
+#
+# 결과는 같은 프레임에 add_indicators(df)를 돌린 값과 같다 (창 패리티).
+# RSI(ewm adjust=True)와 이를 입력으로 쓰는 StochRSI/K/D는 프레임 첫 행부터 계산되므로
+# 같은 봉이라도 프레임 시작점에 따라 값이 다르다 → 상태에는 창과 무관한 누적합만 두고
+# 창마다 복원한다 (BB는 창 앞쪽 period-1행만 NaN/50/0 규칙 적용).
+
+INDICATOR_STATE_HISTORY = 300       # 상태별 보관하는 확정봉 수 (더 긴 프레임은 재시드 시 늘림)
+INDICATOR_PARITY_TOL = 1e-6         # 패리티 검증 허용 오차
+INDICATOR_FLAT_RSI_RANGE = 1e-9     # StochRSI 창의 RSI 범위가 이 이하면 0으로 봄 (반올림 잡음)
+
+_INDICATOR_COLUMNS = ('bb_mid', 'bb_std', 'BB_UPPER', 'BB_LOWER',
+                      'bb_position', 'bb_width', 'rsi', 'srsi_k', 'srsi_d')
+
+
+class IncrementalIndicatorState:
+    """단일 티커×타임프레임의 BB/RSI 증분 상태 + 창 단위 지표 계산.
+
+    - BB: 앵커 기준 이동 합/제곱합 (period봉마다 앵커 재설정으로 오차 누적 차단)
+    - RSI: 상승/하락폭의 감쇠 누적합 S(t) = a·S(t-1) + x(t), a = 1 - 1/period.
+      ewm(adjust=True)의 창 가중 평균 비율 = (S(t) - a^(t-s)·S(s)) 비율 → 창마다 행당 O(1)
+      (창 첫 봉의 diff는 NaN → 0으로 관측되므로 s 자신의 상승/하락폭은 빠짐)
+    - StochRSI/K/D: 창 RSI에서 고정 길이 슬라이딩 윈도우 (NumPy)
+    - 확정봉 기록은 CandleRingBuffer처럼 pos, pos+capacity 두 곳에 써서 최근 구간이 항상 연속
+    """
+
+    _MID, _STD, _UP, _LO, _POS, _WID, _SG, _SL, _CG, _CL = range(10)
+    _NCOL = 10
+
+    def __init__(self, bb_period=BB_PERIOD, bb_std_dev=BB_STD_DEV,
+                 rsi_period=RSI_PERIOD, stoch_period=STOCH_RSI_PERIOD,
+                 k_period=STOCH_K_PERIOD, d_period=STOCH_D_PERIOD,
+                 history=INDICATOR_STATE_HISTORY):
+        self.bb_period = bb_period
+        self.bb_std_dev = bb_std_dev
+        self.rsi_period = rsi_period
+        self.stoch_period = stoch_period
+        self.k_period = k_period
+        self.d_period = d_period
+        self.capacity = history
+        self.lock = threading.Lock()
+
+        # BB 윈도우 + 앵커 기준 이동 합
+        self._bb_win = deque(maxlen=bb_period)
+        self._anchor = 0.0
+        self._s1 = 0.0
+        self._s2 = 0.0
+        self._since_anchor = 0
+
+        # RSI 감쇠 누적합 / 상승·하락 봉 수 (마지막 확정봉 기준)
+        self._decay = 1.0 - 1.0 / rsi_period
+        self._prev_close = None
+        self._sums = (0.0, 0.0, 0.0, 0.0)
+
+        self.count = 0
+        self.last_ts = None
+        self.last_close = None
+
+        # 확정봉 기록 (컬럼 × 2·capacity) + 봉 시각 → 순번
+        self._hist = np.full((self._NCOL, 2 * history), np.nan)
+        self._hist_ts = deque(maxlen=history)
+        self._hist_seq = {}
+
+    # ── 내부: close 1개 반영 결과 계산 (상태 변경 없음) ──
+    def _step(self, close):
+        close = float(close)
+        n_bb = len(self._bb_win)
+        full = n_bb == self.bb_period
+
+        # BB
+        anchor = self._anchor if n_bb > 0 else close
+        s1 = self._s1 + (close - anchor)
+        s2 = self._s2 + (close - anchor) ** 2
+        if full:
+            old = self._bb_win[0] - anchor
+            s1 -= old
+            s2 -= old * old
+        n_win = n_bb if full else n_bb + 1
+        if n_win >= self.bb_period:
+            mean_dev = s1 / n_win
+            var = (s2 - s1 * mean_dev) / (n_win - 1)
+            bb_std = float(np.sqrt(var)) if var > 0 else 0.0
+            bb_mid = anchor + mean_dev
+            upper = bb_mid + bb_std * self.bb_std_dev
+            lower = bb_mid - bb_std * self.bb_std_dev
+            bb_range = upper - lower
+            if bb_range != 0:
+                bb_position = min(100.0, max(0.0, (close - lower) / bb_range * 100))
+            else:
+                bb_position = 50.0
+            bb_width = (bb_range / lower * 100) if lower != 0 else 0.0
+        else:
+            bb_mid = bb_std = upper = lower = np.nan
+            bb_position = 50.0
+            bb_width = 0.0
+
+        # RSI 누적합 (첫 봉의 diff는 NaN → gain/loss 0으로 관측됨 — calculate_rsi와 동일)
+        gain = loss = 0.0
+        if self._prev_close is not None:
+            delta = close - self._prev_close
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+        s_gain, s_loss, n_gain, n_loss = self._sums
+        sums = (self._decay * s_gain + gain, self._decay * s_loss + loss,
+                n_gain + (gain > 0), n_loss + (loss > 0))
+
+        row = (bb_mid, bb_std, upper, lower, bb_position, bb_width) + sums
+        return row, (anchor, s1, s2, sums)
+
+    def push(self, close, ts=None):
+        """확정봉 1개 반영 (O(1))"""
+        row, (anchor, s1, s2, sums) = self._step(close)
+        close = float(close)
+
+        self._bb_win.append(close)
+        self._anchor, self._s1, self._s2 = anchor, s1, s2
+        self._since_anchor += 1
+        if self._since_anchor >= self.bb_period:
+            # 앵커 재설정: 윈도우 첫 값 기준으로 합 재계산 (period봉당 1회, 상각 O(1))
+            self._anchor = self._bb_win[0]
+            devs = [v - self._anchor for v in self._bb_win]
+            self._s1 = sum(devs)
+            self._s2 = sum(v * v for v in devs)
+            self._since_anchor = 0
+        self._prev_close = close
+        self._sums = sums
+
+        pos = self.count % self.capacity
+        self._hist[:, pos] = row
+        self._hist[:, pos + self.capacity] = row
+        self.count += 1
+        self.last_ts = ts
+        self.last_close = close
+        if len(self._hist_ts) == self._hist_ts.maxlen:
+            self._hist_seq.pop(self._hist_ts[0], None)
+        self._hist_ts.append(ts)
+        if ts is not None:
+            self._hist_seq[ts] = self.count - 1
+
+    def seq_of(self, ts):
+        """봉 시각 → 확정봉 순번 (보관 구간 밖이면 None)"""
+        return self._hist_seq.get(ts)
+
+    def window(self, start_seq, preview_close):
+        """start_seq ~ 마지막 확정봉 + 진행 중 봉(preview_close) 창의 지표 컬럼 dict
+
+        같은 창(확정봉 + 마지막 행)에 add_indicators()를 돌린 결과와 같은 값.
+        start_seq가 보관 구간 밖이면 None.
+        """
+        m = self.count - start_seq
+        if m < 0 or m > self.capacity:
+            return None
+        start = start_seq % self.capacity
+        block = np.empty((self._NCOL, m + 1))
+        block[:, :m] = self._hist[:, start:start + m]
+        block[:, m] = self._step(preview_close)[0]
+        return self._window_columns(block)
+
+    def _window_columns(self, block):
+        n = block.shape[1]
+        cols = {
+            'bb_mid': block[self._MID].copy(), 'bb_std': block[self._STD].copy(),
+            'BB_UPPER': block[self._UP].copy(), 'BB_LOWER': block[self._LO].copy(),
+            'bb_position': block[self._POS].copy(), 'bb_width': block[self._WID].copy(),
+        }
+        # 창 앞쪽 period-1행: rolling 미충족 (calculate_bollinger_bands의 NaN/fillna 규칙)
+        head = min(n, self.bb_period - 1)
+        for col in ('bb_mid', 'bb_std', 'BB_UPPER', 'BB_LOWER'):
+            cols[col][:head] = np.nan
+        cols['bb_position'][:head] = 50.0
+        cols['bb_width'][:head] = 0.0
+
+        # RSI: 창 안 가중합 비율 (상승/하락 봉이 하나도 없으면 정확히 0)
+        decay = self._decay ** np.arange(n)
+        s_gain = block[self._SG] - decay * block[self._SG, 0]
+        s_loss = block[self._SL] - decay * block[self._SL, 0]
+        s_gain[block[self._CG] == block[self._CG, 0]] = 0.0
+        has_loss = block[self._CL] > block[self._CL, 0]
+        rsi = np.full(n, np.nan)
+        rsi[has_loss] = 100 - 100 / (1 + s_gain[has_loss] / s_loss[has_loss])
+        rsi[:self.rsi_period - 1] = np.nan
+        cols['rsi'] = rsi
+
+        # StochRSI → K → D (rolling min/max/mean, NaN은 50 — calculate_stochastic_rsi)
+        # 가격이 멈춰 RSI가 일정한 구간은 범위가 반올림 잡음(1e-14)뿐 → 정확한 계산대로 범위 0 = 50
+        stoch = np.full(n, np.nan)
+        p = self.stoch_period
+        if n >= p:
+            win = np.lib.stride_tricks.sliding_window_view(rsi, p)
+            rsi_min, rsi_max = win.min(axis=1), win.max(axis=1)
+            rsi_range = rsi_max - rsi_min
+            with np.errstate(invalid='ignore', divide='ignore'):
+                stoch[p - 1:] = np.where(rsi_range > INDICATOR_FLAT_RSI_RANGE,
+                                         (rsi[p - 1:] - rsi_min) / rsi_range * 100, np.nan)
+        stoch[np.isnan(stoch)] = 50.0
+        cols['srsi_k'] = k = self._rolling_mean(stoch, self.k_period)
+        cols['srsi_d'] = self._rolling_mean(k, self.d_period)
+        return cols
+
+    @staticmethod
+    def _rolling_mean(x, w):
+        """rolling(w).mean().fillna(50) — 입력에 NaN 없음"""
+        out = np.full(len(x), 50.0)
+        if len(x) >= w:
+            out[w - 1:] = np.lib.stride_tricks.sliding_window_view(x, w).mean(axis=1)
+        return out
+
+
+indicator_states = {}
+indicator_states_lock = threading.Lock()
+
+
+def get_indicator_state(ticker, timeframe):
+    """(ticker, timeframe) 증분 지표 상태 조회 (없으면 None)"""
+    with indicator_states_lock:
+        return indicator_states.get((ticker, timeframe))
+
+
+def _seed_indicator_state(index, closes):
+    """새 상태 생성 후 확정봉(마지막 행 제외) 전체 반영"""
+    state = IncrementalIndicatorState(history=max(INDICATOR_STATE_HISTORY, len(closes)))
+    for ts, c in zip(index[:-1], closes[:-1]):
+        state.push(c, ts)
+    return state
+
+
+def _apply_indicator_columns(df, cols):
+    """창 지표 컬럼 → add_indicators와 같은 컬럼 구성의 DataFrame
+    (컬럼을 하나씩 끼워 넣으면 pandas 삽입 비용이 계산보다 커서 한 번에 생성)"""
+    data = {col: df[col].to_numpy() for col in df.columns}
+    for col in _INDICATOR_COLUMNS:
+        data[col] = cols[col]
+    k, d = cols['srsi_k'], cols['srsi_d']
+    data['is_bull'] = data['close'] >= data['open']
+    data['srsi_direction'] = np.where(k > d, '↗', np.where(k < d, '↘', '→'))
+    return pd.DataFrame(data, index=df.index)
+
+
+def _incremental_frame(df, state):
+    """df(마지막 행 = 진행 중 봉) + 기존 상태 → (지표 df, 사용한 상태)
+
+    상태와 프레임이 어긋나면(갭/확정봉 종가 불일치/보관 구간 밖) 프레임 기준으로 새 상태를 만든다.
+    """
+    index = df.index
+    closes = df['close'].to_numpy(dtype=float)
+    n = len(df)
+    if state is not None and state.last_ts is not None:
+        with state.lock:
+            pos = index.searchsorted(state.last_ts)
+            aligned = (pos < n - 1 and index[pos] == state.last_ts
+                       and abs(closes[pos] - state.last_close) <= 1e-9 * max(1.0, abs(state.last_close)))
+            if aligned:
+                for i in range(pos + 1, n - 1):
+                    state.push(closes[i], index[i])
+                start_seq = state.seq_of(index[0])
+                if start_seq is not None:
+                    cols = state.window(start_seq, closes[-1])
+                    if cols is not None:
+                        return _apply_indicator_columns(df, cols), state
+    state = _seed_indicator_state(index, closes)
+    return _apply_indicator_columns(df, state.window(0, closes[-1])), state
+
+
+def add_indicators_incremental(df, ticker, timeframe):
+    """add_indicators()의 증분 버전 (결과 동일).
+
+    마지막 행은 진행 중인 봉, 나머지 행은 확정봉으로 상태에 반영.
+    확정봉이 이미 반영돼 있으면 새 봉만 push하고 창 컬럼은 NumPy로 한 번에 계산.
+    """
+    try:
+        if df is None or len(df) < 20:
+            return None
+        key = (ticker, timeframe)
+        with indicator_states_lock:
+            state = indicator_states.get(key)
+        if state is not None and state.last_ts is not None and state.last_ts >= df.index[-1]:
+            # 캐시된 과거 프레임 — 상태를 건드리지 않고 전체 계산
+            return add_indicators(df)
+        out, used = _incremental_frame(df, state)
+        if used is not state:
+            with indicator_states_lock:
+                indicator_states[key] = used
+        return out
+    except Exception:
+        return add_indicators(df)
+
+
+def check_incremental_parity(df, window=None, tol=INDICATOR_PARITY_TOL):
+    """증분 엔진 ↔ add_indicators 패리티 검증.
+
+    window=None이면 df 전체를 한 프레임으로, 아니면 window행 프레임을 1봉씩 밀면서
+    (같은 상태를 이어 쓰는 실시간 경로 그대로) 모든 행을 add_indicators 결과와 비교.
+
+    가격이 멈춘 구간은 비교에서 뺀다 — 정확한 값이 0인 곳에서 pandas rolling 분산은 ~1e-7,
+    일정한 RSI의 rolling 범위는 ~1e-14 잡음을 내고 StochRSI가 그 잡음을 0~100으로 확대한다.
+    (종가 20봉이 모두 같은 행의 bb_std/bb_width/bb_position,
+     RSI 14봉 범위 ≤ INDICATOR_FLAT_RSI_RANGE인 행과 그 뒤 K/D 창)
+
+    Returns:
+        (ok: bool, max_diff: dict{컬럼: 최대 상대오차})
+    """
+    base = df[['open', 'high', 'low', 'close', 'volume']]
+    size = len(base) if window is None else window
+    max_diff = {col: 0.0 for col in _INDICATOR_COLUMNS}
+    state = None
+    for end in range(size, len(base) + 1):
+        frame = base.iloc[end - size:end]
+        ref = add_indicators(frame.copy())
+        if ref is None:
+            return False, {}
+        got, state = _incremental_frame(frame.copy(), state)
+        skip = _parity_noise_rows(ref)
+        for col in _INDICATOR_COLUMNS:
+            g = got[col].to_numpy(dtype=float)
+            e = ref[col].to_numpy(dtype=float)
+            if (np.isnan(g) != np.isnan(e)).any():
+                max_diff[col] = float('inf')
+                continue
+            mask = ~np.isnan(e) & ~skip.get(col, False)
+            if mask.any():
+                err = np.abs(g[mask] - e[mask]) / np.maximum(1.0, np.abs(e[mask]))
+                max_diff[col] = max(max_diff[col], float(err.max()))
+    ok = all(v <= tol for v in max_diff.values())
+    return ok, max_diff
+
+
+def _parity_noise_rows(ref):
+    """add_indicators 결과 중 반올림 잡음만 남는 행 → {컬럼: bool 배열}"""
+    flat_bb = (ref['close'].rolling(BB_PERIOD).max() == ref['close'].rolling(BB_PERIOD).min()).to_numpy()
+    rsi = ref['rsi']
+    flat_rsi = (rsi.rolling(STOCH_RSI_PERIOD).max() - rsi.rolling(STOCH_RSI_PERIOD).min()
+                <= INDICATOR_FLAT_RSI_RANGE).astype(float)
+    k_rows = flat_rsi.rolling(STOCH_K_PERIOD, min_periods=1).max().to_numpy() > 0
+    d_rows = flat_rsi.rolling(STOCH_K_PERIOD + STOCH_D_PERIOD - 1, min_periods=1).max().to_numpy() > 0
+    return {'bb_std': flat_bb, 'bb_width': flat_bb, 'bb_position': flat_bb,
+            'srsi_k': k_rows, 'srsi_d': d_rows}
+
+
 # ═══════════════════════════════════════════════════════════════════════
 # ★ [v37 NEW] 매도 보조 함수 그룹 — 시간대/단계/ATR/천장/BTC위기/2-Bar
 # ═══════════════════════════════════════════════════════════════════════
@@ -1382,7 +2654,7 @@ def _calc_dynamic_trail_pct(atr_pct, session_policy, phase):
     return max(ATR_TRAIL_MIN_PCT, min(ATR_TRAIL_MAX_PCT, base))
 
 
-def _check_short_term_top_signal(ticker, profit_pct):
+def _check_short_term_top_signal(ticker, profit_pct, provider=None):
     """단기 천장 식별: BB + RSI + StochRSI + 윗꼬리 다중 합의
 
     Returns:
@@ -1390,12 +2662,13 @@ def _check_short_term_top_signal(ticker, profit_pct):
     """
     if profit_pct < TOP_SIGNAL_MIN_PROFIT:
         return False, 0, []
+    provider = provider or live_provider
 
     agree = 0
     tags = []
 
     # 1H봉 점검 (BB Position, RSI, 윗꼬리)
-    df_1h = get_candles_1h(ticker, count=5)
+    df_1h = provider.candles(ticker, "1h", 5)
     if df_1h is not None and len(df_1h) >= 2:
         c = df_1h.iloc[-1]
         bb_pos = c.get("bb_position", 50.0)
@@ -1427,7 +2700,7 @@ def _check_short_term_top_signal(ticker, profit_pct):
             pass
 
     # 15분 StochRSI %K 데드크로스 (90+ 영역에서)
-    df_15m = get_candles_15m(ticker, count=5)
+    df_15m = provider.candles(ticker, "15m", 5)
     if df_15m is not None and len(df_15m) >= 2:
         try:
             # v36의 add_indicators는 srsi_k/srsi_d 컬럼 사용
@@ -1446,15 +2719,16 @@ def _check_short_term_top_signal(ticker, profit_pct):
     return is_top, agree, tags
 
 
-def _check_btc_system_risk():
+def _check_btc_system_risk(provider=None):
     """BTC 1H -3%+ 또는 5분봉 N연속 -1%+ 하락 시 시스템 위기 감지
 
     Returns:
         (is_crash, reason)
     """
+    provider = provider or live_provider
     try:
         # 1H봉 점검
-        df_btc_1h = get_candles_1h("KRW-BTC", count=2)
+        df_btc_1h = provider.candles("KRW-BTC", "1h", 2)
         if df_btc_1h is not None and len(df_btc_1h) >= 1:
             c = df_btc_1h.iloc[-1]
             o = float(c["open"])
@@ -1465,9 +2739,9 @@ def _check_btc_system_risk():
                     return True, f"BTC1H급락({change:+.2f}%)"
 
         # 5분봉 N연속 -1%+ 점검
-        df_btc_5m = get_candles_5m(
-            "KRW-BTC",
-            count=BTC_CRASH_5M_CONSECUTIVE + 1,
+        df_btc_5m = provider.candles(
+            "KRW-BTC", "5m",
+            BTC_CRASH_5M_CONSECUTIVE + 1,
         )
         if df_btc_5m is not None and len(df_btc_5m) >= BTC_CRASH_5M_CONSECUTIVE:
             consecutive = 0
@@ -1505,27 +2779,50 @@ def _check_two_bar_stoploss(df_5m, buy_price, threshold_pct=TWO_BAR_CONFIRM_LOSS
         return False
 
 
+# ★ v39 변경: BB_DAE_T2~T6 추가 (BB 상단 위 거리별 차등 쿨다운)
+COOLDOWN_BY_CATEGORY = {
+    "PARTIAL_TAKE":   COOLDOWN_PARTIAL_TAKE,
+    "PROFIT_TAKE":    COOLDOWN_PROFIT_TAKE,
+    "TOP_SIGNAL":     COOLDOWN_TOP_SIGNAL,
+    "RSI_REVERT":     COOLDOWN_RSI_REVERT,
+    "RALLY_GUARD":    COOLDOWN_RALLY_GUARD,
+    "RATCHET_STOP":   COOLDOWN_RATCHET_STOP,
+    "SPIKE_RECOVERY": COOLDOWN_SPIKE_RECOVERY,
+    "TRAILING":       COOLDOWN_TRAILING,
+    "STOPLOSS":       COOLDOWN_STOPLOSS,
+    "TREND_END":      COOLDOWN_TREND_END,
+    "BTC_CRASH":      COOLDOWN_BTC_CRASH,
+    # ★ v39 NEW: BB 상단 위 거리별 가속 매도 카테고리
+    "BB_DAE_T2":      COOLDOWN_BB_DAE_T2,    # 0.3%+ 위, 1.5% drawdown
+    "BB_DAE_T3":      COOLDOWN_BB_DAE_T3,    # 0.7%+ 위, 1.0% drawdown
+    "BB_DAE_T4":      COOLDOWN_BB_DAE_T4,    # 1.5%+ 위, 0.6% drawdown
+    "BB_DAE_T5":      COOLDOWN_BB_DAE_T5,    # 2.5%+ 위, 0.3% drawdown
+    "BB_DAE_T6":      COOLDOWN_BB_DAE_T6,    # 4.0%+ 위, 즉시 매도
+}
+COOLDOWN_DEFAULT_MIN = 60
+
+
 def get_cooldown_for_category(sell_category):
-    """★ v39 변경: BB_DAE_T2~T6 추가 (BB 상단 위 거리별 차등 쿨다운)"""
-    return {
-        "PARTIAL_TAKE":   COOLDOWN_PARTIAL_TAKE,
-        "PROFIT_TAKE":    COOLDOWN_PROFIT_TAKE,
-        "TOP_SIGNAL":     COOLDOWN_TOP_SIGNAL,
-        "RSI_REVERT":     COOLDOWN_RSI_REVERT,
-        "RALLY_GUARD":    COOLDOWN_RALLY_GUARD,
-        "RATCHET_STOP":   COOLDOWN_RATCHET_STOP,
-        "SPIKE_RECOVERY": COOLDOWN_SPIKE_RECOVERY,
-        "TRAILING":       COOLDOWN_TRAILING,
-        "STOPLOSS":       COOLDOWN_STOPLOSS,
-        "TREND_END":      COOLDOWN_TREND_END,
-        "BTC_CRASH":      COOLDOWN_BTC_CRASH,
-        # ★ v39 NEW: BB 상단 위 거리별 가속 매도 카테고리
-        "BB_DAE_T2":      COOLDOWN_BB_DAE_T2,    # 0.3%+ 위, 1.5% drawdown
-        "BB_DAE_T3":      COOLDOWN_BB_DAE_T3,    # 0.7%+ 위, 1.0% drawdown
-        "BB_DAE_T4":      COOLDOWN_BB_DAE_T4,    # 1.5%+ 위, 0.6% drawdown
-        "BB_DAE_T5":      COOLDOWN_BB_DAE_T5,    # 2.5%+ 위, 0.3% drawdown
-        "BB_DAE_T6":      COOLDOWN_BB_DAE_T6,    # 4.0%+ 위, 즉시 매도
-    }.get(sell_category, 60)
+    """매도 사유 → 재진입 쿨다운(분), 모듈 상수 조회 O(1)"""
+    return COOLDOWN_BY_CATEGORY.get(sell_category, COOLDOWN_DEFAULT_MIN)
+
+
+def restore_recent_sells_from_ledger():
+    """재시작 시 원장의 최근 전량 매도로 recent_sells 재구성 (쿨다운 유지) → 복원 건수"""
+    if trade_ledger is None:
+        return 0
+    horizon_min = max(list(COOLDOWN_BY_CATEGORY.values()) + [COOLDOWN_DEFAULT_MIN])
+    restored = 0
+    for tk, rec in trade_ledger.recent_sells(time.time() - horizon_min * 60).items():
+        if tk in recent_sells:
+            continue
+        recent_sells[tk] = {
+            'time': datetime.fromtimestamp(rec['ts']),
+            'reason': rec['reason'],
+            'category': rec['category'] or 'PROFIT_TAKE',
+        }
+        restored += 1
+    return restored
 
 
 # ═══════════════════════════════════════════════════════════════════════
@@ -2011,8 +3308,7 @@ def calculate_coin_status_for_report(ticker):
         d_change = 0.0
 
         try:
-            url = f"https://api.upbit.com/v1/ticker?markets={ticker}"
-            resp = requests.get(url, timeout=3)
+            resp = market_client.get("/v1/ticker", params={'markets': ticker}, timeout=3)
             if resp.status_code == 200:
                 item = resp.json()[0]
                 d_change = item.get('signed_change_rate', 0) * 100
@@ -2186,6 +3482,112 @@ class CoinCandidate:
     ema_status: dict = field(default_factory=dict)
 
 
+# ───────────────────────────────────────────────────────────────────────
+# ★ MarketSnapshot — KRW 전 마켓 컬럼형 시세 스냅샷 (스크리너 입력)
+# ───────────────────────────────────────────────────────────────────────
+
+class MarketSnapshot:
+    """
+    KRW 마켓 전체 시세를 컬럼별 NumPy 배열로 보관.
+
+    - 컬럼: price / change_pct(signed_change_rate × 100) / trade_value_24h /
+      trade_volume_24h / updated_ts
+    - WS ticker 메시지마다 해당 행만 O(1) 갱신, 오래된 행만 REST(/v1/ticker)로 보충
+    - 스크리너는 view()로 배열 복사본을 받아 필터/점수/상위 N을 벡터 연산으로 처리
+    """
+
+    FIELDS = ('price', 'change_pct', 'trade_value_24h', 'trade_volume_24h', 'updated_ts')
+    _P, _CHG, _VAL, _VOL, _TS = range(5)
+
+    def __init__(self, initial_rows: int = 256):
+        self._index: Dict[str, int] = {}
+        self._tickers: List[str] = []
+        self._data = np.full((len(self.FIELDS), initial_rows), np.nan)
+        self._lock = threading.Lock()
+        self.ws_updates = 0
+        self.rest_updates = 0
+
+    def _row_for(self, ticker: str) -> int:
+        """티커 행 번호 (없으면 할당, 모자라면 2배 확장) — 락 보유 상태에서 호출"""
+        row = self._index.get(ticker)
+        if row is not None:
+            return row
+        row = len(self._tickers)
+        if row >= self._data.shape[1]:
+            self._data = np.concatenate(
+                [self._data, np.full((len(self.FIELDS), self._data.shape[1]), np.nan)], axis=1)
+        self._index[ticker] = row
+        self._tickers.append(ticker)
+        return row
+
+    def set_markets(self, markets: List[str]):
+        with self._lock:
+            for m in markets:
+                self._row_for(m)
+
+    def markets(self) -> List[str]:
+        with self._lock:
+            return list(self._tickers)
+
+    def _write(self, row: int, data: dict, ts: float) -> bool:
+        try:
+            price = float(data.get('trade_price', 0))
+            change = float(data.get('signed_change_rate', 0)) * 100
+            value = float(data.get('acc_trade_price_24h', 0))
+            volume = float(data.get('acc_trade_volume_24h', 0))
+        except (TypeError, ValueError):
+            return False
+        self._data[:, row] = (price, change, value, volume, ts)
+        return True
+
+    def on_ws_ticker(self, code: str, data: dict):
+        """WS ticker 메시지 → 행 갱신 (set_markets/REST로 등록된 마켓만)"""
+        with self._lock:
+            row = self._index.get(code)
+            if row is not None and self._write(row, data, time.time()):
+                self.ws_updates += 1
+
+    def update_from_rest(self, rows: List[dict], now: Optional[float] = None) -> int:
+        """/v1/ticker 응답 리스트 → 행 갱신, 갱신 행 수 반환 (now: 갱신 시각, 기본 벽시계)"""
+        now = time.time() if now is None else now
+        n = 0
+        with self._lock:
+            for t in rows:
+                code = t.get('market', '')
+                if code.startswith("KRW-") and self._write(self._row_for(code), t, now):
+                    n += 1
+            self.rest_updates += n
+        return n
+
+    def stale_markets(self, max_age_sec: float, markets: Optional[List[str]] = None,
+                      now: Optional[float] = None) -> List[str]:
+        """updated_ts가 max_age_sec보다 오래됐거나 값이 없는 마켓"""
+        now = time.time() if now is None else now
+        with self._lock:
+            names = self._tickers if markets is None else markets
+            rows = [self._index.get(m) for m in names]
+            ts = np.array([self._data[self._TS, r] if r is not None else np.nan for r in rows])
+        stale = ~(now - ts < max_age_sec)
+        return [m for m, s in zip(names, stale) if s]
+
+    def view(self, markets: Optional[List[str]] = None,
+             now: Optional[float] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """(티커 배열, {컬럼: 배열}) 복사본 + 파생 컬럼 age_sec — markets 지정 시 그 순서로"""
+        with self._lock:
+            if markets is None:
+                names = list(self._tickers)
+                block = self._data[:, :len(names)].copy()
+            else:
+                names = [m for m in markets if m in self._index]
+                block = self._data[:, [self._index[m] for m in names]]
+        cols = {f: block[i] for i, f in enumerate(self.FIELDS)}
+        cols['age_sec'] = (time.time() if now is None else now) - cols['updated_ts']
+        return np.array(names, dtype=object), cols
+
+
+market_snapshot = MarketSnapshot()
+
+
 # ───────────────────────────────────────────────────────────────────────
 # ★ MarketWideScreener — 마켓 와이드 스크리너 (사용자 핵심 지시 #7,8)
 # ───────────────────────────────────────────────────────────────────────
@@ -2195,15 +3597,22 @@ class MarketWideScreener:
     업비트 KRW 마켓 200+ 코인 매시 정각 스크리닝.
     
     [동작]
-      Tier 1 (5초): GET /v1/ticker 일괄 → 거래대금/등락률 필터 → 200→30개
-      Tier 2 (60초): 30개 코인 4H EMA 자격 평가 → 5~8개 최종 후보
+      Tier 1: MarketSnapshot(WS 상시 갱신, 오래된 행만 REST 보충) 배열 필터 → 200→30개
+      Tier 2: 4H EMA 자격 일괄 판정 (최신 상태가 아닌 코인만 4H봉 동시 조회) → 점수 → 5~8개
     
     [성능]
-      매시 정각 1회 약 60초 소요 → 1H봉 갱신과 동기화
+      필터/점수/상위 N 모두 벡터 연산, CoinCandidate는 최종 후보만 생성
+      → SCREENING_INTERVAL_MIN 주기 (1분까지 가능)
+
+    [공급자]
+      마켓 목록/시세/4H봉/시각은 provider 경유 (생략 시 실거래 공급자)
     """
 
-    def __init__(self, ema_tracker_ref):
+    def __init__(self, ema_tracker_ref, snapshot: Optional[MarketSnapshot] = None,
+                 provider: Optional[MarketDataProvider] = None):
         self.ema_tracker = ema_tracker_ref
+        self.snapshot = snapshot or market_snapshot
+        self.provider = provider or live_provider
         self.exclude_coins: Set[str] = set()
         self._all_markets: List[str] = []
         self._markets_loaded_at: float = 0
@@ -2213,15 +3622,11 @@ class MarketWideScreener:
 
     def _load_all_krw_markets(self, force: bool = False) -> List[str]:
         """업비트 KRW 마켓 목록 로드 (1일 1회 캐시)"""
-        if not force and self._all_markets and (time.time() - self._markets_loaded_at < 86400):
+        if not force and self._all_markets and (self.provider.time() - self._markets_loaded_at < 86400):
             return self._all_markets
         try:
-            resp = requests.get(f"{UPBIT_API_BASE}/v1/market/all",
-                                params={"isDetails": "false"}, timeout=10)
-            resp.raise_for_status()
-            markets = resp.json()
-            self._all_markets = [m["market"] for m in markets if m["market"].startswith("KRW-")]
-            self._markets_loaded_at = time.time()
+            self._all_markets = self.provider.markets()
+            self._markets_loaded_at = self.provider.time()
             print(f"{Colors.CYAN}[스크리너] KRW 마켓 로드: {len(self._all_markets)}개{Colors.ENDC}")
             return self._all_markets
         except Exception as e:
@@ -2229,124 +3634,80 @@ class MarketWideScreener:
                 print(f"{Colors.RED}[스크리너] 마켓 목록 로드 실패: {e}{Colors.ENDC}")
             return self._all_markets
 
-    def _fetch_tickers_batch(self, markets: List[str]) -> List[dict]:
-        """Ticker API 일괄 조회 (최대 100개씩)"""
-        results = []
-        BATCH_SIZE = 100
-        for i in range(0, len(markets), BATCH_SIZE):
-            batch = markets[i:i + BATCH_SIZE]
-            try:
-                _rate_limit_wait()
-                resp = requests.get(
-                    f"{UPBIT_API_BASE}/v1/ticker",
-                    params={"markets": ",".join(batch)},
-                    timeout=10,
-                )
-                resp.raise_for_status()
-                results.extend(resp.json())
-            except Exception as e:
-                if DEBUG_MODE:
-                    print(f"{Colors.YELLOW}[스크리너] Ticker 조회 실패 (배치 {i}): {e}{Colors.ENDC}")
-        return results
-
-    def _tier1_fast_filter(self, tickers: List[dict]) -> List[CoinCandidate]:
-        """Tier 1: 거래대금/등락률 빠른 필터"""
-        candidates = []
-        for t in tickers:
-            ticker = t.get("market", "")
-            if not ticker.startswith("KRW-"):
-                continue
-            if ticker in self.exclude_coins:
-                continue
-            if ticker in SCREENING_BLACKLIST:
-                continue
-
-            try:
-                price = float(t.get("trade_price", 0))
-                change_rate = float(t.get("signed_change_rate", 0)) * 100
-                trade_value_24h = float(t.get("acc_trade_price_24h", 0))
-                trade_volume_24h = float(t.get("acc_trade_volume_24h", 0))
-            except (TypeError, ValueError):
-                continue
-
-            if trade_value_24h < SCREENING_MIN_TRADING_VALUE_KRW:
-                continue
-            if change_rate > SCREENING_MAX_CHANGE_PCT or change_rate < SCREENING_MIN_CHANGE_PCT:
-                continue
-            if price <= 0:
-                continue
-
-            candidates.append(CoinCandidate(
-                ticker=ticker, price=price, change_rate=change_rate,
-                trade_value_24h=trade_value_24h, trade_volume_24h=trade_volume_24h,
-            ))
-
-        candidates.sort(key=lambda c: c.trade_value_24h, reverse=True)
-        candidates = candidates[:SCREENING_TOP_N_FROM_TIER1]
-        print(f"{Colors.CYAN}[스크리너 Tier1] {len(tickers)}개 → {len(candidates)}개 통과{Colors.ENDC}")
-        return candidates
-
-    def _tier2_ema_qualification(self, candidates: List[CoinCandidate]) -> List[CoinCandidate]:
-        """Tier 2: 4H EMA 자격 평가 (정배열+눌림+EMA10/50 위치)"""
-        qualified = []
-        for cand in candidates:
-            df_4h = get_candles_4h(cand.ticker, count=EMA_4H_HISTORY_COUNT)
-            if df_4h is None or len(df_4h) < 60:
-                cand.ema_qualified = False
-                continue
-
-            success = self.ema_tracker.init_from_df(cand.ticker, df_4h)
-            if not success:
-                cand.ema_qualified = False
-                continue
-
-            status = self.ema_tracker.get_ema_status(cand.ticker)
-            uptrend = status.get("uptrend", False)
-            above_ema50 = status.get("above_ema50", False)
-            above_ema10 = status.get("above_ema10", False)
-            pullback = status.get("pullback", False)
-
-            if uptrend and above_ema50 and above_ema10 and pullback:
-                cand.ema_qualified = True
-                cand.ema_status = status
-                qualified.append(cand)
-                if DEBUG_MODE:
-                    print(f"{Colors.GREEN}  [EMA적격] {cand.ticker} ✅ "
-                          f"등락:{cand.change_rate:+.1f}% "
-                          f"EMA10/20/50={status['ema10']:,.2f}/"
-                          f"{status['ema20']:,.2f}/{status['ema50']:,.2f}{Colors.ENDC}")
-            else:
-                cand.ema_qualified = False
-                cand.ema_status = status
-        return qualified
+    def _refresh_snapshot(self, markets: List[str]) -> int:
+        """WS로 갱신되지 않은(오래된) 마켓만 REST 일괄 조회해 스냅샷 보충"""
+        now = self.provider.time()
+        self.snapshot.set_markets(markets)
+        stale = self.snapshot.stale_markets(SCREENING_SNAPSHOT_MAX_AGE_SEC, markets, now=now)
+        if not stale:
+            return 0
+        return self.snapshot.update_from_rest(self.provider.tickers(stale), now=now)
+
+    def _tier1_fast_filter(self, tickers: np.ndarray, cols: Dict[str, np.ndarray]) -> np.ndarray:
+        """Tier 1: 거래대금/등락률 빠른 필터 → 거래대금 상위 N개 행 번호"""
+        exclude = self.exclude_coins | set(SCREENING_BLACKLIST)
+        change = cols['change_pct']
+        value = cols['trade_value_24h']
+        mask = ((value >= SCREENING_MIN_TRADING_VALUE_KRW)
+                & (change <= SCREENING_MAX_CHANGE_PCT) & (change >= SCREENING_MIN_CHANGE_PCT)
+                & (cols['price'] > 0))
+        if exclude:
+            mask &= ~np.isin(tickers, list(exclude))
+        idx = np.flatnonzero(mask)
+        idx = idx[np.argsort(-value[idx], kind="stable")][:SCREENING_TOP_N_FROM_TIER1]
+        print(f"{Colors.CYAN}[스크리너 Tier1] {len(tickers)}개 → {len(idx)}개 통과{Colors.ENDC}")
+        return idx
+
+    def _tier2_ema_qualification(self, tickers: List[str],
+                                 prices: np.ndarray) -> Tuple[np.ndarray, Dict[str, dict]]:
+        """Tier 2: 4H EMA 자격 평가 (정배열+눌림+EMA10/50 위치) → (통과 마스크, 상태)"""
+        # 4H 마감 스케줄러가 최신 상태로 유지 중인 티커는 조회 생략
+        stale = [t for t in tickers if not self.ema_tracker.is_current(t)]
+        # 나머지만 쿼터 한도 내에서 동시 조회 → 아래 루프는 캐시 적중
+        self.provider.prefetch(stale, "4h", EMA_4H_HISTORY_COUNT)
+        stale_set = set(stale)
+        for ticker, price in zip(tickers, prices):
+            if ticker in stale_set:
+                df_4h = self.provider.candles(ticker, "4h", EMA_4H_HISTORY_COUNT)
+                self.ema_tracker.sync_from_df(ticker, df_4h)
+            elif price > 0:
+                # 스냅샷 가격으로 현재가 갱신 (WS 체결 미구독 코인)
+                self.ema_tracker.update_current_price(ticker, float(price))
+
+        # 전 후보 자격을 한 번의 배열 연산으로 판정 (동기화 실패 티커는 미준비 → False)
+        mask = self.ema_tracker.qualify_mask(tickers)
+        statuses = self.ema_tracker.get_ema_status_many(tickers)
+        if DEBUG_MODE:
+            for ticker in np.asarray(tickers, dtype=object)[mask]:
+                st = statuses[ticker]
+                print(f"{Colors.GREEN}  [EMA적격] {ticker} ✅ "
+                      f"EMA10/20/50={st['ema10']:,.2f}/"
+                      f"{st['ema20']:,.2f}/{st['ema50']:,.2f}{Colors.ENDC}")
+        return mask, statuses
 
-    def _score_candidates(self, candidates: List[CoinCandidate]) -> List[CoinCandidate]:
-        """가중 점수 (거래량 35% + 등락률 25% + 거래대금 40%)"""
-        if not candidates:
-            return []
-        n = len(candidates)
-        vols = sorted([c.trade_volume_24h for c in candidates], reverse=True)
-        changes = sorted([c.change_rate for c in candidates], reverse=True)
-        tvals = sorted([c.trade_value_24h for c in candidates], reverse=True)
-
-        for c in candidates:
-            score = 0.0
-            if c.trade_volume_24h in vols:
-                rank = vols.index(c.trade_volume_24h) + 1
-                score += SCREENING_WEIGHTS["volume_rank"] * (1 - rank / n)
-            if c.change_rate in changes:
-                rank = changes.index(c.change_rate) + 1
-                score += SCREENING_WEIGHTS["change_rate_rank"] * (1 - rank / n)
-            if c.trade_value_24h in tvals:
-                rank = tvals.index(c.trade_value_24h) + 1
-                score += SCREENING_WEIGHTS["trading_value_rank"] * (1 - rank / n)
-            c.score = round(score, 4)
-
-        candidates.sort(key=lambda c: c.score, reverse=True)
-        return candidates
+    @staticmethod
+    def _rank_desc(values: np.ndarray) -> np.ndarray:
+        """내림차순 순위 (1 = 최대, 동률은 입력 순서로 구분)"""
+        order = np.argsort(-values, kind="stable")
+        ranks = np.empty(len(values), dtype=np.int64)
+        ranks[order] = np.arange(1, len(values) + 1)
+        return ranks
+
+    def _score_candidates(self, cols: Dict[str, np.ndarray], idx: np.ndarray) -> np.ndarray:
+        """가중 점수 (거래량 35% + 등락률 25% + 거래대금 40%) — idx 순서의 점수 배열"""
+        n = len(idx)
+        if n == 0:
+            return np.zeros(0)
+        score = np.zeros(n)
+        for col, weight_key in (('trade_volume_24h', 'volume_rank'),
+                                ('change_pct', 'change_rate_rank'),
+                                ('trade_value_24h', 'trading_value_rank')):
+            rank = self._rank_desc(cols[col][idx])
+            score += SCREENING_WEIGHTS[weight_key] * (1 - rank / n)
+        return np.round(score, 4)
 
     def run_full_screening(self, max_select: int = None) -> List[CoinCandidate]:
-        """매시 정각 호출 — 전체 스크리닝 실행"""
+        """정시 호출 — 전체 스크리닝 실행"""
         if max_select is None:
             max_select = SCREENING_FINAL_TOP_N
 
@@ -2357,33 +3718,48 @@ class MarketWideScreener:
             self._screening_in_progress = True
 
         try:
-            start_time_local = time.time()
+            start_time_local = time.time()   # 소요 시간 표시 (실측)
             print(f"{Colors.CYAN}[스크리너] === 전체 스크리닝 시작 ==={Colors.ENDC}")
 
             markets = self._load_all_krw_markets()
             if not markets:
                 return []
 
-            exclude = self.exclude_coins | set(SCREENING_BLACKLIST)
-            target_markets = [m for m in markets if m not in exclude]
-
-            tickers = self._fetch_tickers_batch(target_markets)
-            if not tickers:
+            rest_rows = self._refresh_snapshot(markets)
+            tickers, cols = self.snapshot.view(markets, now=self.provider.time())
+            if not np.isfinite(cols['updated_ts']).any():
                 return []
+            if DEBUG_MODE:
+                print(f"{Colors.CYAN}[스크리너] 스냅샷 {len(tickers)}개 (REST 보충 {rest_rows}개){Colors.ENDC}")
 
-            tier1 = self._tier1_fast_filter(tickers)
-            if not tier1:
+            tier1 = self._tier1_fast_filter(tickers, cols)
+            if len(tier1) == 0:
                 print(f"{Colors.YELLOW}[스크리너] Tier 1 통과 0개{Colors.ENDC}")
                 return []
 
-            qualified = self._tier2_ema_qualification(tier1)
-            if not qualified:
+            mask, statuses = self._tier2_ema_qualification(list(tickers[tier1]),
+                                                           cols['price'][tier1])
+            qualified = tier1[mask]
+            if len(qualified) == 0:
                 print(f"{Colors.YELLOW}[스크리너] Tier 2 (EMA자격) 통과 0개{Colors.ENDC}")
                 self._last_results = []
                 return []
 
-            scored = self._score_candidates(qualified)
-            final = scored[:max_select]
+            scores = self._score_candidates(cols, qualified)
+            order = np.argsort(-scores, kind="stable")[:max_select]
+
+            # 최종 생존 코인만 CoinCandidate 생성
+            final = []
+            for j in order:
+                i = qualified[j]
+                final.append(CoinCandidate(
+                    ticker=tickers[i], price=float(cols['price'][i]),
+                    change_rate=float(cols['change_pct'][i]),
+                    trade_volume_24h=float(cols['trade_volume_24h'][i]),
+                    trade_value_24h=float(cols['trade_value_24h'][i]),
+                    score=float(scores[j]), ema_qualified=True,
+                    ema_status=statuses[tickers[i]],
+                ))
 
             elapsed = time.time() - start_time_local
             print(f"{Colors.GREEN}[스크리너] === 완료: {len(final)}개 선정 (소요 {elapsed:.1f}초) ==={Colors.ENDC}")
@@ -2413,140 +3789,356 @@ class EMA4HTracker:
     """
     4시간봉 EMA(10/20/50) 추적기.
     trading_system_v25 DailyEMATracker의 코인 4H 버전.
+
+    closes/ema는 확정봉만 보관 (진행 중 봉은 current_price로만 반영).
+    조회되는 EMA/정배열/데드크로스/EMA50 이탈 봉 수는 확정봉 EMA에 현재가를 진행 중 봉으로
+    한 번 더 반영한 잠정값 기준 — v38까지 "마지막 행(진행 중 봉) 포함" 의미와 동일.
+    눌림(pullback)은 기존과 같이 직전 확정봉 lookback개만 본다.
+    4H봉 마감마다 sync_from_df()가 새 확정봉을 O(1)로 누적,
+    전체 재초기화는 최초 등록 또는 봉 누락(갭) 시에만 수행.
+
+    [저장 구조]
+    티커마다 행 1개를 갖는 사전 할당 NumPy 링 배열 (closes/ema10/ema20/ema50 × capacity).
+    CandleRingBuffer와 같이 각 값을 pos, pos+capacity 두 곳에 기록 →
+    최근 N봉이 항상 연속 구간이라 여러 티커의 조회를 한 번의 배열 연산으로 처리
+    (get_ema_status_many / uptrend_mask).
+
+    [공급자]
+    진행 중 봉/최신 여부 판정 시각은 provider.time() (생략 시 실거래 공급자)
     """
 
-    def __init__(self):
-        self._data: Dict[str, dict] = {}
+    _C, _E10, _E20, _E50 = range(4)
+    _PERIODS = ((1, EMA_4H_SHORT), (2, EMA_4H_MID), (3, EMA_4H_LONG))
+    _BELOW_EMA50_MAX = 19           # below_ema50_bars 최대 집계 봉 수
+
+    def __init__(self, capacity: int = EMA_4H_STORE_CAPACITY,
+                 initial_rows: int = EMA_4H_STORE_INITIAL_ROWS,
+                 provider: Optional[MarketDataProvider] = None):
+        self.capacity = capacity
+        self.provider = provider or live_provider
+        self._rows: Dict[str, int] = {}
+        self._series = np.full((4, initial_rows, 2 * capacity), np.nan)
+        self._head = np.zeros(initial_rows, dtype=np.int64)      # 다음 쓰기 위치 [0, capacity)
+        self._length = np.zeros(initial_rows, dtype=np.int64)    # 유효 봉 수 (≤ capacity)
+        self._current = np.full(initial_rows, np.nan)            # 현재가 (진행 중 봉)
+        self._last_bar_ts = np.full(initial_rows, np.nan)        # 마지막 확정봉 시작 (UTC epoch 초)
+        self._ready = np.zeros(initial_rows, dtype=bool)
         self._lock = threading.Lock()
 
+    # ─────────────────────────────────────────────
+    # 저장소
+    # ─────────────────────────────────────────────
+
+    def _row_for(self, ticker: str) -> int:
+        """티커 행 번호 (없으면 할당, 행이 모자라면 2배 확장) — 락 보유 상태에서 호출"""
+        row = self._rows.get(ticker)
+        if row is not None:
+            return row
+        row = len(self._rows)
+        n = len(self._head)
+        if row >= n:
+            grow = n
+            self._series = np.concatenate(
+                [self._series, np.full((4, grow, 2 * self.capacity), np.nan)], axis=1)
+            self._head = np.concatenate([self._head, np.zeros(grow, dtype=np.int64)])
+            self._length = np.concatenate([self._length, np.zeros(grow, dtype=np.int64)])
+            self._current = np.concatenate([self._current, np.full(grow, np.nan)])
+            self._last_bar_ts = np.concatenate([self._last_bar_ts, np.full(grow, np.nan)])
+            self._ready = np.concatenate([self._ready, np.zeros(grow, dtype=bool)])
+        self._rows[ticker] = row
+        return row
+
+    def _ready_rows(self, tickers: List[str]) -> Tuple[List[str], np.ndarray]:
+        """준비된 티커와 행 번호 배열 — 락 보유 상태에서 호출"""
+        found = [(t, self._rows[t]) for t in tickers if t in self._rows]
+        found = [(t, r) for t, r in found if self._ready[r]]
+        return [t for t, _ in found], np.array([r for _, r in found], dtype=np.int64)
+
+    def _tail(self, rows: np.ndarray, k: int) -> np.ndarray:
+        """행별 최근 k봉 → (4, len(rows), k), 오래된 봉 → 최신 봉 순 (부족분 NaN)"""
+        end = self._head[rows] + self.capacity
+        cols = end[:, None] - k + np.arange(k)[None, :]
+        out = self._series[:, rows[:, None], cols]
+        short = np.arange(k)[None, :] < (k - self._length[rows])[:, None]
+        out[:, short] = np.nan
+        return out
+
+    def _closed_bars(self, df_4h: pd.DataFrame) -> pd.DataFrame:
+        """진행 중인 4H봉(마지막 행, 현재 슬롯) 제외 — 인덱스는 KST naive"""
+        if _candle_slot(kst_to_epoch(df_4h.index[-1]), "4h") >= _candle_slot(self.provider.time(), "4h"):
+            return df_4h.iloc[:-1]
+        return df_4h
+
+    # ─────────────────────────────────────────────
+    # 적재 / 갱신
+    # ─────────────────────────────────────────────
+
     def init_from_df(self, ticker: str, df_4h: pd.DataFrame) -> bool:
         if df_4h is None or len(df_4h) < 60:
             return False
         try:
-            closes = df_4h["close"].astype(float).tolist()
-            ema10 = self._calc_ema(closes, EMA_4H_SHORT)
-            ema20 = self._calc_ema(closes, EMA_4H_MID)
-            ema50 = self._calc_ema(closes, EMA_4H_LONG)
+            closed = self._closed_bars(df_4h)
+            closes = closed["close"].astype(float).tolist()
+            block = np.array([closes,
+                              self._calc_ema(closes, EMA_4H_SHORT),
+                              self._calc_ema(closes, EMA_4H_MID),
+                              self._calc_ema(closes, EMA_4H_LONG)])[:, -self.capacity:]
+            m = block.shape[1]
             with self._lock:
-                self._data[ticker] = {
-                    "closes": closes,
-                    "ema10": ema10, "ema20": ema20, "ema50": ema50,
-                    "ready": True, "current_price": closes[-1],
-                    "last_finalize_ts": time.time(),
-                }
+                row = self._row_for(ticker)
+                self._series[:, row, :] = np.nan
+                self._series[:, row, :m] = block
+                self._series[:, row, self.capacity:self.capacity + m] = block
+                self._head[row] = m % self.capacity
+                self._length[row] = m
+                self._current[row] = float(df_4h["close"].iat[-1])
+                self._last_bar_ts[row] = kst_to_epoch(closed.index[-1])
+                self._ready[row] = True
             return True
         except Exception as e:
             if DEBUG_MODE:
                 print(f"{Colors.RED}[EMA4H] {ticker} 초기화 실패: {e}{Colors.ENDC}")
             return False
 
+    def sync_from_df(self, ticker: str, df_4h: pd.DataFrame) -> str:
+        """
+        4H봉 프레임으로 상태 동기화.
+        Returns: "stream"(새 확정봉 O(1) 누적) | "current"(변화 없음) | "init"(전체 재초기화) | "fail"
+        """
+        if df_4h is None or len(df_4h) == 0:
+            return "fail"
+        with self._lock:
+            row = self._rows.get(ticker)
+            last_ts = (pd.Timestamp(epoch_to_kst(self._last_bar_ts[row]))
+                       if row is not None and self._ready[row] else None)
+        closed = self._closed_bars(df_4h)
+        if last_ts is None or len(closed) == 0 or last_ts not in closed.index:
+            if last_ts is not None and len(closed) > 0 and last_ts > closed.index[-1]:
+                return "current"  # 프레임이 상태보다 오래됨
+            return "init" if self.init_from_df(ticker, df_4h) else "fail"
+        new_bars = closed[closed.index > last_ts]
+        for ts, close in zip(new_bars.index, new_bars["close"].astype(float)):
+            self.finalize_4h_bar(ticker, close, ts)
+        self.update_current_price(ticker, float(df_4h["close"].iat[-1]))
+        return "stream" if len(new_bars) else "current"
+
     def update_current_price(self, ticker: str, price: float):
         with self._lock:
-            if ticker in self._data and price > 0:
-                self._data[ticker]["current_price"] = price
+            row = self._rows.get(ticker)
+            if row is not None and price > 0:
+                self._current[row] = price
 
-    def finalize_4h_bar(self, ticker: str, close_price: float):
-        """4H봉 확정 시 호출 (스케줄러)"""
+    def finalize_4h_bar(self, ticker: str, close_price: float, bar_ts=None):
+        """4H봉 확정 시 호출 (sync_from_df / 4H 마감 스케줄러)"""
         with self._lock:
-            if ticker not in self._data:
+            row = self._rows.get(ticker)
+            if row is None or not self._ready[row]:
                 return
-            d = self._data[ticker]
-            d["closes"].append(close_price)
-            for period, key in [(EMA_4H_SHORT, "ema10"), (EMA_4H_MID, "ema20"),
-                                (EMA_4H_LONG, "ema50")]:
+            if bar_ts is not None:
+                ts = kst_to_epoch(bar_ts)
+                if ts <= self._last_bar_ts[row]:
+                    return
+                self._last_bar_ts[row] = ts
+            pos = self._head[row]
+            prev = pos - 1 + self.capacity
+            vals = [close_price]
+            for s, period in self._PERIODS:
                 mult = 2.0 / (period + 1)
-                new_ema = (close_price - d[key][-1]) * mult + d[key][-1]
-                d[key].append(new_ema)
-            if len(d["closes"]) > 300:
-                d["closes"] = d["closes"][-300:]
-                for key in ["ema10", "ema20", "ema50"]:
-                    d[key] = d[key][-300:]
-            d["current_price"] = close_price
-            d["last_finalize_ts"] = time.time()
+                last = self._series[s, row, prev]
+                vals.append((close_price - last) * mult + last)
+            self._series[:, row, pos] = vals
+            self._series[:, row, pos + self.capacity] = vals
+            self._head[row] = (pos + 1) % self.capacity
+            self._length[row] = min(self._length[row] + 1, self.capacity)
+            self._current[row] = close_price
+
+    # ─────────────────────────────────────────────
+    # 일괄 조회 (벡터화)
+    # ─────────────────────────────────────────────
+
+    def _provisional(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """진행 중 봉(현재가) 반영 잠정 EMA → (현재가, (3, len(rows)) EMA10/20/50) — 락 보유 상태에서 호출"""
+        last = self._series[:, rows, self._head[rows] + self.capacity - 1]
+        cur = self._current[rows]
+        cur = np.where(np.isnan(cur), last[self._C], cur)
+        mult = np.array([2.0 / (period + 1) for _, period in self._PERIODS])[:, None]
+        return cur, last[1:] + mult * (cur - last[1:])
+
+    def _status_arrays(self, rows: np.ndarray) -> dict:
+        """행 배열 → 상태 배열 묶음 — 락 보유 상태에서 호출"""
+        lookback = EMA_PULLBACK_LOOKBACK
+        k = max(lookback, self._BELOW_EMA50_MAX)
+        closes, _, ema20, ema50 = self._tail(rows, k)
+        cur, (e10, e20, e50) = self._provisional(rows)
+        pullback = ((closes[:, -lookback:] < ema20[:, -lookback:]).any(axis=1)
+                    & (self._length[rows] >= lookback))
+        # 진행 중 봉부터 거꾸로 연속 이탈 봉 수 (최대 _BELOW_EMA50_MAX)
+        m = self._BELOW_EMA50_MAX - 1
+        below = np.concatenate([(cur < e50)[:, None],
+                                (closes[:, -m:] < ema50[:, -m:])[:, ::-1]], axis=1)
+        below_bars = np.cumprod(below, axis=1).sum(axis=1)
+        return {
+            "ema10": e10, "ema20": e20, "ema50": e50, "current_price": cur,
+            "uptrend": (e10 > e20) & (e20 > e50), "pullback": pullback,
+            "above_ema10": cur > e10, "above_ema50": cur > e50,
+            "deadcross": e10 < e20, "below_ema50_bars": below_bars,
+        }
 
-    def is_uptrend(self, ticker: str) -> bool:
+    def get_ema_status_many(self, tickers: List[str]) -> Dict[str, dict]:
+        """여러 티커 상태를 한 번의 배열 연산으로 → {ticker: status} (미준비 티커는 {"ready": False})"""
         with self._lock:
-            if ticker not in self._data or not self._data[ticker]["ready"]:
-                return False
-            d = self._data[ticker]
-            return d["ema10"][-1] > d["ema20"][-1] > d["ema50"][-1]
+            names, rows = self._ready_rows(tickers)
+            arrs = self._status_arrays(rows) if len(rows) else {}
+        out = {t: {"ready": False} for t in tickers}
+        for i, t in enumerate(names):
+            out[t] = {
+                "ready": True,
+                "ema10": float(arrs["ema10"][i]), "ema20": float(arrs["ema20"][i]),
+                "ema50": float(arrs["ema50"][i]),
+                "current_price": float(arrs["current_price"][i]),
+                "uptrend": bool(arrs["uptrend"][i]), "pullback": bool(arrs["pullback"][i]),
+                "above_ema10": bool(arrs["above_ema10"][i]),
+                "above_ema50": bool(arrs["above_ema50"][i]),
+                "deadcross": bool(arrs["deadcross"][i]),
+            }
+        return out
+
+    def uptrend_mask(self, tickers: Optional[List[str]] = None) -> np.ndarray:
+        """tickers 순서의 EMA 정배열 여부 (None이면 get_tracked_tickers() 순서)"""
+        if tickers is None:
+            tickers = self.get_tracked_tickers()
+        mask = np.zeros(len(tickers), dtype=bool)
+        with self._lock:
+            names, rows = self._ready_rows(tickers)
+            if len(rows):
+                _, (e10, e20, e50) = self._provisional(rows)
+                up = (e10 > e20) & (e20 > e50)
+        if len(rows):
+            pos = {t: i for i, t in enumerate(tickers)}
+            mask[[pos[t] for t in names]] = up
+        return mask
+
+    def qualify_mask(self, tickers: List[str]) -> np.ndarray:
+        """매수 자격 (정배열 + 현재가 > EMA10/EMA50 + 눌림) 일괄 판정"""
+        mask = np.zeros(len(tickers), dtype=bool)
+        with self._lock:
+            names, rows = self._ready_rows(tickers)
+            if len(rows):
+                a = self._status_arrays(rows)
+                ok = a["uptrend"] & a["above_ema10"] & a["above_ema50"] & a["pullback"]
+        if len(rows):
+            pos = {t: i for i, t in enumerate(tickers)}
+            mask[[pos[t] for t in names]] = ok
+        return mask
+
+    # ─────────────────────────────────────────────
+    # 단일 티커 조회 (기존 인터페이스)
+    # ─────────────────────────────────────────────
+
+    def _single(self, ticker: str, key: str, default):
+        with self._lock:
+            names, rows = self._ready_rows([ticker])
+            if not names:
+                return default
+            return self._status_arrays(rows)[key][0]
+
+    def is_uptrend(self, ticker: str) -> bool:
+        return bool(self._single(ticker, "uptrend", False))
 
     def had_pullback(self, ticker: str, lookback: int = 5) -> bool:
         with self._lock:
-            if ticker not in self._data or not self._data[ticker]["ready"]:
-                return False
-            d = self._data[ticker]
-            if len(d["closes"]) < lookback + 1:
+            names, rows = self._ready_rows([ticker])
+            if not names or self._length[rows[0]] < lookback:
                 return False
-            for i in range(-lookback - 1, -1):
-                if d["closes"][i] < d["ema20"][i]:
-                    return True
-            return False
+            closes, _, ema20, _ = self._tail(rows, lookback)
+            return bool((closes < ema20).any())
 
     def price_above_ema10(self, ticker: str) -> bool:
-        with self._lock:
-            if ticker not in self._data or not self._data[ticker]["ready"]:
-                return False
-            d = self._data[ticker]
-            return d["current_price"] > d["ema10"][-1]
+        return bool(self._single(ticker, "above_ema10", False))
 
     def price_above_ema50(self, ticker: str) -> bool:
-        with self._lock:
-            if ticker not in self._data or not self._data[ticker]["ready"]:
-                return False
-            d = self._data[ticker]
-            return d["current_price"] > d["ema50"][-1]
+        return bool(self._single(ticker, "above_ema50", False))
 
     def is_deadcross(self, ticker: str) -> bool:
-        with self._lock:
-            if ticker not in self._data or not self._data[ticker]["ready"]:
-                return False
-            d = self._data[ticker]
-            return d["ema10"][-1] < d["ema20"][-1]
+        return bool(self._single(ticker, "deadcross", False))
 
     def below_ema50_bars(self, ticker: str) -> int:
-        with self._lock:
-            if ticker not in self._data or not self._data[ticker]["ready"]:
-                return 0
-            d = self._data[ticker]
-            count = 0
-            for i in range(-1, -min(20, len(d["closes"]) + 1), -1):
-                if d["closes"][i] < d["ema50"][i]:
-                    count += 1
-                else:
-                    break
-            return count
+        return int(self._single(ticker, "below_ema50_bars", 0))
 
     def get_ema_status(self, ticker: str) -> dict:
+        return self.get_ema_status_many([ticker])[ticker]
+
+    def is_current(self, ticker: str) -> bool:
+        """직전 4H 확정봉까지 반영되어 있는지"""
+        expected = (_candle_slot(self.provider.time(), "4h") - 1) * TRADE_CANDLE_TIMEFRAMES["4h"]
         with self._lock:
-            if ticker not in self._data or not self._data[ticker]["ready"]:
-                return {"ready": False}
-            d = self._data[ticker]
-            uptrend = d["ema10"][-1] > d["ema20"][-1] > d["ema50"][-1]
-            pullback = False
-            lookback = EMA_PULLBACK_LOOKBACK
-            if len(d["closes"]) >= lookback + 1:
-                for i in range(-lookback - 1, -1):
-                    if d["closes"][i] < d["ema20"][i]:
-                        pullback = True
-                        break
-            return {
-                "ready": True,
-                "ema10": d["ema10"][-1], "ema20": d["ema20"][-1], "ema50": d["ema50"][-1],
-                "current_price": d["current_price"],
-                "uptrend": uptrend, "pullback": pullback,
-                "above_ema10": d["current_price"] > d["ema10"][-1],
-                "above_ema50": d["current_price"] > d["ema50"][-1],
-                "deadcross": d["ema10"][-1] < d["ema20"][-1],
-            }
+            row = self._rows.get(ticker)
+            return row is not None and bool(self._ready[row]) and self._last_bar_ts[row] >= expected
 
     def is_ready(self, ticker: str) -> bool:
         with self._lock:
-            return ticker in self._data and self._data[ticker]["ready"]
+            row = self._rows.get(ticker)
+            return row is not None and bool(self._ready[row])
 
     def get_tracked_tickers(self) -> List[str]:
         with self._lock:
-            return list(self._data.keys())
+            return list(self._rows.keys())
+
+    # ─────────────────────────────────────────────
+    # 디스크 스냅샷 (재시작 시 전체 재초기화 대신 누락 봉만 누적)
+    # ─────────────────────────────────────────────
+
+    def save_snapshot(self, path: str) -> int:
+        """확정봉/EMA 배열 → .npz (임시 파일 기록 후 교체) → 저장 티커 수"""
+        with self._lock:
+            n = len(self._rows)
+            arrays = {
+                "tickers": np.array(list(self._rows), dtype=str),
+                "capacity": np.int64(self.capacity),
+                "series": self._series[:, :n].copy(),
+                "head": self._head[:n].copy(), "length": self._length[:n].copy(),
+                "last_bar_ts": self._last_bar_ts[:n].copy(), "ready": self._ready[:n].copy(),
+                "ts_format": np.array(EMA_SNAPSHOT_TS_FORMAT),
+            }
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+        return n
+
+    def load_snapshot(self, path: str) -> int:
+        """save_snapshot 파일 복원 → 복원 티커 수 (이후 sync_from_df가 누락 봉만 누적)"""
+        if not os.path.exists(path):
+            return 0
+        try:
+            with np.load(path) as z:
+                if int(z["capacity"]) != self.capacity:
+                    return 0
+                if "ts_format" not in z.files or str(z["ts_format"]) != EMA_SNAPSHOT_TS_FORMAT:
+                    # 이전 형식: last_bar_ts가 KST 시각을 UTC로 읽은 값(+9h) → 버리고 REST 재초기화
+                    return 0
+                tickers, series = z["tickers"], z["series"]
+                head, length = z["head"], z["length"]
+                last_bar_ts, ready = z["last_bar_ts"], z["ready"]
+            restored = 0
+            with self._lock:
+                for i, ticker in enumerate(tickers):
+                    if not ready[i]:
+                        continue
+                    row = self._row_for(str(ticker))
+                    self._series[:, row] = series[:, i]
+                    self._head[row] = head[i]
+                    self._length[row] = length[i]
+                    self._last_bar_ts[row] = last_bar_ts[i]
+                    # 현재가는 첫 sync_from_df / WS 틱 전까지 마지막 확정 종가로 대체
+                    self._current[row] = series[self._C, i, head[i] - 1 + self.capacity]
+                    self._ready[row] = True
+                    restored += 1
+            return restored
+        except Exception as e:
+            print(f"{Colors.YELLOW}[EMA4H] 스냅샷 복원 실패 ({path}): {e}{Colors.ENDC}")
+            return 0
 
     @staticmethod
     def _calc_ema(closes: List[float], period: int) -> List[float]:
@@ -2554,13 +4146,15 @@ class EMA4HTracker:
             return []
         ema = []
         mult = 2.0 / (period + 1)
+        running_sum = 0.0
         for i, price in enumerate(closes):
-            if i == 0:
-                ema.append(float(price))
-            elif i < period:
-                ema.append(float(np.mean(closes[: i + 1])))
+            price = float(price)
+            if i < period:
+                # 초기 period봉은 누적 평균 (SMA 시드)
+                running_sum += price
+                ema.append(running_sum / (i + 1))
             else:
-                ema.append((float(price) - ema[-1]) * mult + ema[-1])
+                ema.append((price - ema[-1]) * mult + ema[-1])
         return ema
 
 
@@ -2580,10 +4174,13 @@ class EMATrendBuyEngine:
       ⑤ RSI: 25 ≤ x ≤ 55
       ⑥ 거래량 ≥ 10봉 평균 × 0.8
       ⑦ 15분봉 3점 체크리스트 (RSI↑+BB↑+양봉) 2/3 이상
+
+    시각/캔들은 provider 경유 (생략 시 실거래 공급자)
     """
 
-    def __init__(self, ema_tracker_ref):
+    def __init__(self, ema_tracker_ref, provider: Optional[MarketDataProvider] = None):
         self.ema_tracker = ema_tracker_ref
+        self.provider = provider or live_provider
         self._watch_list: Dict[str, CoinCandidate] = {}
         self._last_buy_ts: Dict[str, float] = {}
         self._daily_buy_count = 0
@@ -2603,7 +4200,7 @@ class EMATrendBuyEngine:
             print(f"{Colors.YELLOW}[매수엔진] 자격 통과 코인 없음{Colors.ENDC}")
 
     def _reset_daily_count_if_needed(self):
-        today = datetime.now().strftime("%Y-%m-%d")
+        today = self.provider.now().strftime("%Y-%m-%d")
         if self._daily_buy_count_date != today:
             self._daily_buy_count = 0
             self._daily_buy_count_date = today
@@ -2614,7 +4211,7 @@ class EMATrendBuyEngine:
 
     def _check_15m_score(self, ticker: str) -> Tuple[int, str]:
         """15분봉 3점 체크리스트"""
-        df_15m = get_candles_15m(ticker, count=10)
+        df_15m = self.provider.candles(ticker, "15m", 10)
         if df_15m is None or len(df_15m) < 3:
             return 3, "15m없음(통과)"
 
@@ -2635,6 +4232,7 @@ class EMATrendBuyEngine:
 
         return score, f"15m({score}/3:{'+'.join(tags) if tags else '없음'})"
 
+    @_M_CHECK_BUY_SEC.timed()
     def check_buy_signal(self, ticker: str) -> dict:
         """매수 신호 평가"""
         base = {
@@ -2657,7 +4255,7 @@ class EMATrendBuyEngine:
             return base
 
         # 매수 차단 시간대 (기존 v36 정산기)
-        now = datetime.now()
+        now = self.provider.now()
         now_hm = (now.hour, now.minute)
         if BUY_BLOCK_START_HM <= now_hm < BUY_BLOCK_END_HM:
             base["reason"] = f"매수차단시간({BUY_BLOCK_START_HM[0]:02d}:{BUY_BLOCK_START_HM[1]:02d}~)"
@@ -2688,8 +4286,9 @@ class EMATrendBuyEngine:
 
         # 재진입 쿨다운 (recent_sells와 통합)
         last_ts = self._last_buy_ts.get(ticker, 0)
-        if time.time() - last_ts < REENTRY_COOLDOWN_MIN * 60:
-            mins_left = int((REENTRY_COOLDOWN_MIN * 60 - (time.time() - last_ts)) / 60)
+        since_buy = self.provider.time() - last_ts
+        if since_buy < REENTRY_COOLDOWN_MIN * 60:
+            mins_left = int((REENTRY_COOLDOWN_MIN * 60 - since_buy) / 60)
             base["reason"] = f"재진입쿨다운({mins_left}분)"
             return base
 
@@ -2707,7 +4306,7 @@ class EMATrendBuyEngine:
         ema_status = self.ema_tracker.get_ema_status(ticker)
 
         # ── 2. 1H봉 매수 타이밍 ──
-        df_1h = get_candles_1h(ticker, count=50)
+        df_1h = self.provider.candles(ticker, "1h", 50)
         if df_1h is None or len(df_1h) < 25:
             base["reason"] = "1H봉 데이터 부족"
             return base
@@ -2779,7 +4378,7 @@ class EMATrendBuyEngine:
 
     def record_buy(self, ticker: str):
         with self._lock:
-            self._last_buy_ts[ticker] = time.time()
+            self._last_buy_ts[ticker] = self.provider.time()
             self._reset_daily_count_if_needed()
             self._daily_buy_count += 1
             self._watch_list.pop(ticker, None)
@@ -2839,12 +4438,146 @@ class TrendSellEngine:
       - "BB 상단 터치 즉시 매도(조기매도) 회피" → Tier 1 감시만
       - "BB 상단 뚫고 올라가면 민감히 모니터링" → in_above_zone 추적
       - "거리 멀수록 빨리 매도" → 5단계 가속 매트릭스
+
+    [공급자]
+      시각(세션/단계/Spike 유예/DAE zone)과 캔들은 provider 경유 (생략 시 실거래 공급자)
     """
 
-    def __init__(self, ema_tracker_ref):
-        self.ema_tracker = ema_tracker_ref
-        self.targets: Dict[str, dict] = {}
-        self._lock = threading.Lock()
+    def __init__(self, ema_tracker_ref, provider: Optional[MarketDataProvider] = None):
+        self.ema_tracker = ema_tracker_ref
+        self.provider = provider or live_provider
+        self.targets: Dict[str, dict] = {}
+        self._triggers: Dict[str, dict] = {}   # ticker → 틱 가격 트리거 (self._lock 보호)
+        self._lock = threading.Lock()
+
+    # ─────────────────────────────────────────────
+    # 틱 기반 가격 트리거
+    # ─────────────────────────────────────────────
+
+    def _build_triggers(self, info, phase=None, dynamic_trail=None, bb_upper=None):
+        """(self._lock 보유) 매도 조건 → 가격 임계값 집합"""
+        buy = info["buy_price"]
+        peak = info["peak_price"]
+        peak_pnl = (peak - buy) / buy * 100 if buy > 0 else 0
+        partial = info.get("partial_exit_state", {})
+        if not LADDERED_EXIT_ENABLED or partial.get("tier2_done"):
+            partial_price = None
+        elif partial.get("tier1_done"):
+            partial_price = buy * (1 + LADDERED_TIER2_PROFIT / 100)
+        else:
+            partial_price = buy * (1 + LADDERED_TIER1_PROFIT / 100)
+        ratchet_on = phase in ("EARLY", "MID", "MATURE")
+        trail_pct = dynamic_trail if phase in ("MID", "MATURE") else None
+        trig = {
+            "buy": buy, "peak": peak,
+            "stop": buy * (1 + ABSOLUTE_STOP_LOSS_PCT / 100),
+            "loss_watch": buy * (1 + TWO_BAR_CONFIRM_LOSS_PCT / 100),
+            "partial": partial_price,
+            "ratchet_on": ratchet_on, "ratchet": None,
+            "trail_pct": trail_pct, "trail": None,
+            "bb_upper": bb_upper if (DAE_ENABLED and bb_upper and bb_upper > 0) else None,
+            "zone_tier": -1, "zone_peak": 0.0,
+            "armed": True, "last_fire": 0.0,
+        }
+        self._move_peak_levels(trig, peak, peak_pnl)
+        return trig
+
+    @staticmethod
+    def _move_peak_levels(trig, peak, peak_pnl):
+        buy = trig["buy"]
+        if trig["ratchet_on"]:
+            stop_pnl = _calc_ratchet_stop_pnl(peak_pnl)
+            trig["ratchet"] = buy * (1 + stop_pnl / 100) if stop_pnl is not None else None
+        if trig["trail_pct"] and peak_pnl >= 2.0:
+            trig["trail"] = peak * (1 - trig["trail_pct"] / 100)
+
+    @staticmethod
+    def _dae_tier_index(price, bb_upper):
+        """BB 상단 위 거리 → DAE_TIERS 인덱스 (클수록 먼 거리, zone 밖이면 -1)"""
+        above = (price - bb_upper) / bb_upper * 100
+        n = len(DAE_TIERS)
+        for i, (distance_th, _, _) in enumerate(DAE_TIERS):
+            if above >= distance_th:
+                return n - 1 - i
+        return -1
+
+    def refresh_triggers(self, ticker: str, sig: Optional[dict] = None, bb_upper=None):
+        """전체 평가 직후 호출 — 단계/트레일 폭/BB 상단을 반영해 임계값 재계산"""
+        sig = sig or {}
+        with self._lock:
+            info = self.targets.get(ticker)
+            if info is None or info["sold"]:
+                self._triggers.pop(ticker, None)
+                return
+            prev = self._triggers.get(ticker)
+            trig = self._build_triggers(info, sig.get("phase"),
+                                        sig.get("dynamic_trail_pct"), bb_upper)
+            if prev is not None:
+                trig["armed"] = prev["armed"]
+                trig["last_fire"] = prev["last_fire"]
+            self._triggers[ticker] = trig
+
+    def rearm_trigger(self, ticker: str):
+        with self._lock:
+            trig = self._triggers.get(ticker)
+            if trig is not None:
+                trig["armed"] = True
+
+    def on_price_tick(self, ticker: str, price: float) -> Optional[str]:
+        """WS 틱 → 임계 돌파 시 트리거 이름 (틱당 O(1), 발화 후 재무장 전까지 침묵)"""
+        with self._lock:
+            trig = self._triggers.get(ticker)
+            if trig is None or price <= 0:
+                return None
+            # 새 고점 → 래칫/트레일 임계 상향 + 매도 엔진 peak 동기화
+            if price > trig["peak"]:
+                trig["peak"] = price
+                info = self.targets.get(ticker)
+                if info is not None and price > info["peak_price"]:
+                    info["peak_price"] = price
+                buy = trig["buy"]
+                self._move_peak_levels(trig, price, (price - buy) / buy * 100 if buy > 0 else 0)
+
+            # DAE zone: 진입 / 더 먼 tier 도달 / zone 고점 대비 되밀림
+            dae_hit = False
+            if trig["bb_upper"] is not None:
+                tier = self._dae_tier_index(price, trig["bb_upper"])
+                if tier >= 0:
+                    if tier > trig["zone_tier"]:
+                        dae_hit = True
+                        trig["zone_tier"] = tier
+                    if price > trig["zone_peak"]:
+                        trig["zone_peak"] = price
+                    elif price <= trig["zone_peak"] * (1 - DAE_ZONE_RECHECK_DD_PCT / 100):
+                        dae_hit = True
+                        trig["zone_peak"] = price
+                else:
+                    trig["zone_tier"] = -1
+                    trig["zone_peak"] = 0.0
+
+            if not trig["armed"]:
+                return None
+            now = self.provider.time()
+            if now - trig["last_fire"] < SELL_TRIGGER_MIN_INTERVAL_SEC:
+                return None
+
+            if price <= trig["stop"]:
+                name = "ABS_STOP"
+            elif price <= trig["loss_watch"]:
+                name = "LOSS_WATCH"
+            elif trig["ratchet"] is not None and price <= trig["ratchet"]:
+                name = "RATCHET"
+            elif trig["trail"] is not None and price <= trig["trail"]:
+                name = "TRAIL"
+            elif trig["partial"] is not None and price >= trig["partial"]:
+                name = "PARTIAL"
+            elif dae_hit:
+                name = "DAE_ZONE"
+            else:
+                return None
+            trig["armed"] = False
+            trig["last_fire"] = now
+            return name
 
     def register(self, ticker: str, buy_price: float, buy_time: float = None,
                  buy_bb_width: float = None):
@@ -2852,7 +4585,7 @@ class TrendSellEngine:
            ★ v38 유지: buy_bb_width, partial_exit_state, last_spike_time
         """
         if buy_time is None:
-            buy_time = time.time()
+            buy_time = self.provider.time()
         with self._lock:
             self.targets[ticker] = {
                 "buy_price": buy_price,
@@ -2875,6 +4608,8 @@ class TrendSellEngine:
                     "zone_entry_time": 0,             # zone 진입 시각
                 },
             }
+            # 절대 손절/분할 익절 임계는 등록 즉시 활성
+            self._triggers[ticker] = self._build_triggers(self.targets[ticker])
         print(f"{Colors.CYAN}[매도등록] {ticker} 매수가:{buy_price:,.2f}"
               f"{f' BBwidth:{buy_bb_width:.1f}%' if buy_bb_width is not None else ''}{Colors.ENDC}")
 
@@ -2883,12 +4618,14 @@ class TrendSellEngine:
             if ticker in self.targets and not self.targets[ticker]["sold"]:
                 old = self.targets[ticker]["buy_price"]
                 self.targets[ticker]["buy_price"] = actual_price
+                self._triggers[ticker] = self._build_triggers(self.targets[ticker])
                 if old != actual_price:
                     print(f"{Colors.CYAN}[매도] {ticker} 매수가: {old:,.2f}→{actual_price:,.2f}{Colors.ENDC}")
 
     def remove(self, ticker: str):
         with self._lock:
             self.targets.pop(ticker, None)
+            self._triggers.pop(ticker, None)
 
     def _check_accel_stop(self, df_5m) -> bool:
         """5분봉 3연속음봉 + RSI<25 가속 손절"""
@@ -2918,6 +4655,7 @@ class TrendSellEngine:
 
         return True
 
+    @_M_CHECK_SELL_SEC.timed()
     def check_sell_signal(self, ticker: str, current_price: float) -> dict:
         """★ v38 매도 신호 평가 — TOKAMAK 사건 교훈 반영
 
@@ -2960,20 +4698,23 @@ class TrendSellEngine:
         peak_pnl = (info["peak_price"] - buy_price) / buy_price * 100 if buy_price > 0 else 0
         drawdown = (info["peak_price"] - current_price) / info["peak_price"] * 100 if info["peak_price"] > 0 else 0
 
-        elapsed_sec = time.time() - buy_time
+        now_ts = self.provider.time()
+        elapsed_sec = now_ts - buy_time
         elapsed_hours = elapsed_sec / 3600
 
         # ════════════════════════════════════════════════════════════
         # STEP 1: 시간대 분류 (v38: 6 sessions)
         # ════════════════════════════════════════════════════════════
-        session_name, session_policy = _classify_kst_session()
+        now_kst = self.provider.now()
+        session_name, session_policy = _classify_kst_session(now_kst)
 
-        # ATR 계산용 15분봉
-        df_15m_for_atr = get_candles_15m(ticker, count=ATR_PERIOD + 5)
+        # 15분봉(ATR) + 1H봉(BB) — 같은 시점 스냅샷 (실거래: 1분봉 롤업, 미준비 시 REST)
+        frames = self.provider.candle_frames(ticker, {"15m": ATR_PERIOD + 5, "1h": 3})
+        df_15m_for_atr = frames.get("15m")
         atr_pct = _calc_atr_pct(df_15m_for_atr, period=ATR_PERIOD)
 
         # 1H봉 BB 위치
-        df_1h_for_bb = get_candles_1h(ticker, count=3)
+        df_1h_for_bb = frames.get("1h")
         bb_pos_1h = 50.0
         bb_width_1h = 0.0
         if df_1h_for_bb is not None and len(df_1h_for_bb) >= 1:
@@ -3004,15 +4745,15 @@ class TrendSellEngine:
             # Spike Bar 발견 시 시각 기록 (10분 이상 지난 새 spike만)
             if is_spike_bar:
                 last_spike_time_existing = info.get("last_spike_time", 0)
-                if time.time() - last_spike_time_existing > 600:
+                if now_ts - last_spike_time_existing > 600:
                     with self._lock:
                         if ticker in self.targets:
-                            self.targets[ticker]["last_spike_time"] = time.time()
-                            info["last_spike_time"] = time.time()
+                            self.targets[ticker]["last_spike_time"] = now_ts
+                            info["last_spike_time"] = now_ts
 
         # spike grace 활성 여부 (마지막 spike로부터 5분 이내)
         last_spike = info.get("last_spike_time", 0)
-        in_spike_grace = (time.time() - last_spike) < SPIKE_BAR_DELAY_SEC if last_spike > 0 else False
+        in_spike_grace = (now_ts - last_spike) < SPIKE_BAR_DELAY_SEC if last_spike > 0 else False
 
         # 컨텍스트 문자열
         ctx_parts = [session_name, phase]
@@ -3058,7 +4799,7 @@ class TrendSellEngine:
 
         # ── 4-2. BTC 시스템 리스크 (FRESH 제외) ──
         if phase != "FRESH":
-            is_btc_crash, btc_reason = _check_btc_system_risk()
+            is_btc_crash, btc_reason = _check_btc_system_risk(self.provider)
             if is_btc_crash:
                 return {**base, "signal": True, "sell_ratio": 1.0,
                         "reason": f"BTC시스템위기_{btc_reason}({profit_pct:+.2f}%) {ctx_str}",
@@ -3070,7 +4811,7 @@ class TrendSellEngine:
 
         # ── 4-4. 가속 손절 (EARLY) ──
         if phase == "EARLY" and profit_pct < 0:
-            df_5m = get_candles_5m(ticker, count=10)
+            df_5m = self.provider.candles(ticker, "5m", 10)
             if self._check_accel_stop(df_5m):
                 return {**base, "signal": True, "sell_ratio": 1.0,
                         "reason": f"가속손절({profit_pct:+.2f}%) {ctx_str}",
@@ -3078,7 +4819,7 @@ class TrendSellEngine:
 
         # ── 4-5. -3% 2-Bar 확정 손절 ──
         if phase in ("EARLY", "MID") and profit_pct <= TWO_BAR_CONFIRM_LOSS_PCT:
-            df_5m_2bar = get_candles_5m(ticker, count=5)
+            df_5m_2bar = self.provider.candles(ticker, "5m", 5)
             if _check_two_bar_stoploss(df_5m_2bar, buy_price, TWO_BAR_CONFIRM_LOSS_PCT):
                 return {**base, "signal": True, "sell_ratio": 1.0,
                         "reason": f"2Bar확정손절({profit_pct:+.2f}%) {ctx_str}",
@@ -3125,7 +4866,7 @@ class TrendSellEngine:
 
         # ── 7-2. 단기 천장 다중 신호 합의 (Spike grace 중 미발화) ──
         if not in_spike_grace and profit_pct >= TOP_SIGNAL_MIN_PROFIT:
-            is_top, agree_cnt, top_tags = _check_short_term_top_signal(ticker, profit_pct)
+            is_top, agree_cnt, top_tags = _check_short_term_top_signal(ticker, profit_pct, self.provider)
             if is_top:
                 tag_str = "+".join(top_tags) if top_tags else f"{agree_cnt}signals"
                 return {**base, "signal": True, "sell_ratio": 1.0,
@@ -3135,7 +4876,7 @@ class TrendSellEngine:
         # ── 7-3. RSI 과매수 반전 (시간대별 임계값) ──
         rsi_exit_th = session_policy.get("rsi_exit_th", RSI_OVERBOUGHT_EXIT)
         if profit_pct >= RSI_EXIT_MIN_PROFIT:
-            df_1h = get_candles_1h(ticker, count=5)
+            df_1h = self.provider.candles(ticker, "1h", 5)
             if df_1h is not None and len(df_1h) >= 2:
                 rsi_1h = float(df_1h.iloc[-1].get("rsi", 50))
                 if rsi_1h > rsi_exit_th:
@@ -3193,6 +4934,11 @@ class TrendSellEngine:
                     state["tier1_done"] = True
                 elif tier == "TIER2":
                     state["tier2_done"] = True
+                trig = self._triggers.get(ticker)
+                if trig is not None:
+                    # 다음 분할 임계로 이동 (나머지 임계는 다음 평가에서 갱신)
+                    trig["partial"] = (self.targets[ticker]["buy_price"] * (1 + LADDERED_TIER2_PROFIT / 100)
+                                       if tier == "TIER1" else None)
                 print(f"{Colors.CYAN}[분할매도] {ticker} {tier} 완료 표시{Colors.ENDC}")
 
     def _evaluate_dae(self, ticker, current_price, profit_pct,
@@ -3219,7 +4965,7 @@ class TrendSellEngine:
             dict (sell signal) or None
         """
         # 1. DAE 활성 여부
-        active, reason = is_dae_active(session_name)
+        active, reason = is_dae_active(session_name, self.provider.now())
         if not active:
             return None
 
@@ -3232,7 +4978,7 @@ class TrendSellEngine:
             return None
 
         # 4. 듀얼 컨펌 (1H BB + RSI)
-        df_1h = get_candles_1h(ticker, count=3)
+        df_1h = self.provider.candles(ticker, "1h", 3)
         if df_1h is None or len(df_1h) < 1:
             return None
         last_1h = df_1h.iloc[-1]
@@ -3243,7 +4989,7 @@ class TrendSellEngine:
             return None
 
         # 5. 현재 가격의 BB 상단 위 거리 (15분봉 기준)
-        df_15m = get_candles_15m(ticker, count=3)
+        df_15m = self.provider.candles(ticker, "15m", 3)
         if df_15m is None or len(df_15m) < 1:
             return None
         last_15m = df_15m.iloc[-1]
@@ -3278,7 +5024,7 @@ class TrendSellEngine:
                 # zone 안에 있음
                 if not dae_state["in_above_zone"]:
                     dae_state["in_above_zone"] = True
-                    dae_state["zone_entry_time"] = time.time()
+                    dae_state["zone_entry_time"] = self.provider.time()
                     dae_state["peak_above_upper_pct"] = effective_above
                     dae_state["peak_price_in_zone"] = max(current_price, last_high)
                     print(f"{Colors.YELLOW}[DAE감시시작] {ticker} BB상단위 진입 "
@@ -3336,10 +5082,270 @@ class TrendSellEngine:
             if ticker in self.targets:
                 return dict(self.targets[ticker])
             return None
+
+    def export_target(self, ticker: str) -> Optional[dict]:
+        """저널 기록용 target 사본 (중첩 상태 dict까지 복사)"""
+        with self._lock:
+            info = self.targets.get(ticker)
+            if info is None:
+                return None
+            return {k: (dict(v) if isinstance(v, dict) else v) for k, v in info.items()}
+
+    def restore(self, ticker: str, target: dict):
+        """저널 복구 상태로 등록 (peak/분할/DAE/스파이크 상태 유지)"""
+        with self._lock:
+            self.targets[ticker] = {k: (dict(v) if isinstance(v, dict) else v)
+                                    for k, v in target.items()}
+            self._triggers[ticker] = self._build_triggers(self.targets[ticker])
+        print(f"{Colors.CYAN}[매도복구] {ticker} 매수가:{target['buy_price']:,.2f} "
+              f"고점:{target['peak_price']:,.2f}{Colors.ENDC}")
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# SECTION 13-C: 포지션 저널 (held_coins + 매도엔진 targets 선기록 로그 / 체크포인트)
+# ═══════════════════════════════════════════════════════════════════════
+
+def _journal_default(o):
+    if isinstance(o, datetime):
+        return {"__dt__": o.isoformat()}
+    if isinstance(o, np.generic):
+        return o.item()
+    raise TypeError(f"직렬화 불가: {type(o).__name__}")
+
+
+def _journal_object_hook(d):
+    if len(d) == 1 and "__dt__" in d:
+        return datetime.fromisoformat(d["__dt__"])
+    return d
+
+
+class PositionJournal:
+    """
+    보유 포지션 상태 선기록 로그 (Write-Ahead Journal).
+
+    레코드 1줄 = 티커 1개의 전체 상태 {"op": "put", "ticker", "held", "target"} 또는
+    {"op": "del", "ticker"} — 상태가 바뀔 때마다 append + fsync.
+    같은 내용은 다시 쓰지 않음 (평가마다 호출해도 변화가 있을 때만 기록).
+
+    체크포인트: 레코드가 POSITION_JOURNAL_COMPACT_RECORDS개 쌓이면 현재 상태 전체를
+    스냅샷 파일(임시 파일 → fsync → 교체)로 쓰고 저널을 비움.
+    복구: 스냅샷 + 저널 재생 → {ticker: {"held", "target"}}. 잘린 마지막 줄은 무시하고
+    파일에서도 잘라냄 (남겨 두면 다음 레코드가 그 줄에 붙어 다음 복구에서 함께 유실).
+    """
+
+    def __init__(self, path: str = POSITION_JOURNAL_PATH):
+        self.path = path
+        self.snapshot_path = path + ".snapshot"
+        self._state: Dict[str, dict] = {}     # ticker → 마지막 기록 상태
+        self._encoded: Dict[str, str] = {}    # ticker → 마지막 기록 JSON (변화 판정)
+        self._records = 0
+        self._file = None
+        self._lock = threading.Lock()
+        self.writes = 0
+        self.checkpoints = 0
+
+    def _open(self):
+        if self._file is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        return self._file
+
+    @staticmethod
+    def _fsync_write(path: str, text: str):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def recover(self) -> Dict[str, dict]:
+        """스냅샷 + 저널 재생 → {ticker: {"held": dict, "target": dict}} (이후 기록의 기준 상태)"""
+        state: Dict[str, dict] = {}
+        records = 0
+        try:
+            if os.path.exists(self.snapshot_path):
+                with open(self.snapshot_path, encoding="utf-8") as f:
+                    state = json.load(f, object_hook=_journal_object_hook).get("positions", {})
+            if os.path.exists(self.path):
+                good_end = 0
+                with open(self.path, "rb") as f:
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            break      # 기록 중 중단된 마지막 줄
+                        try:
+                            rec = json.loads(line.decode("utf-8"), object_hook=_journal_object_hook)
+                        except ValueError:
+                            break
+                        good_end += len(line)
+                        records += 1
+                        if rec.get("op") == "put":
+                            state[rec["ticker"]] = {"held": rec.get("held"),
+                                                    "target": rec.get("target")}
+                        elif rec.get("op") == "del":
+                            state.pop(rec["ticker"], None)
+                self._truncate_tail(good_end)
+        except Exception as e:
+            print(f"{Colors.YELLOW}[Journal] 복구 실패 — 잔고 기준 동기화: {e}{Colors.ENDC}")
+            state = {}
+        with self._lock:
+            self._state = state
+            self._encoded = {tk: json.dumps(v, default=_journal_default, sort_keys=True)
+                             for tk, v in state.items()}
+            self._records = records
+        return {tk: dict(v) for tk, v in state.items()}
+
+    def _truncate_tail(self, good_end: int):
+        """마지막 정상 줄 이후(잘린 줄) 제거 — 다음 append가 새 줄에서 시작하도록"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if os.path.getsize(self.path) > good_end:
+                with open(self.path, "r+b") as f:
+                    f.truncate(good_end)
+                    f.flush()
+                    os.fsync(f.fileno())
+
+    def _append(self, rec: dict):
+        """(self._lock 보유) 레코드 1줄 기록 + fsync, 필요 시 체크포인트"""
+        f = self._open()
+        f.write(json.dumps(rec, default=_journal_default) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+        self._records += 1
+        self.writes += 1
+        if self._records >= POSITION_JOURNAL_COMPACT_RECORDS:
+            self._checkpoint_locked()
+
+    def put(self, ticker: str, held: Optional[dict], target: Optional[dict]) -> bool:
+        """포지션 상태 기록 (직전 기록과 같으면 생략) → 기록 여부"""
+        value = {"held": held, "target": target}
+        encoded = json.dumps(value, default=_journal_default, sort_keys=True)
+        with self._lock:
+            if self._encoded.get(ticker) == encoded:
+                return False
+            self._append({"op": "put", "ticker": ticker, "ts": time.time(), **value})
+            self._state[ticker] = value
+            self._encoded[ticker] = encoded
+            return True
+
+    def delete(self, ticker: str) -> bool:
+        with self._lock:
+            if ticker not in self._state:
+                return False
+            self._append({"op": "del", "ticker": ticker, "ts": time.time()})
+            self._state.pop(ticker, None)
+            self._encoded.pop(ticker, None)
+            return True
+
+    def _checkpoint_locked(self):
+        self._fsync_write(self.snapshot_path,
+                          json.dumps({"ts": time.time(), "positions": self._state},
+                                     default=_journal_default))
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        open(self.path, "w").close()
+        self._records = 0
+        self.checkpoints += 1
+
+    def checkpoint(self):
+        """현재 상태 스냅샷 기록 + 저널 비움 (동기화 직후 / 종료 시)"""
+        with self._lock:
+            self._checkpoint_locked()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+position_journal = PositionJournal() if POSITION_JOURNAL_ENABLED else None
+
+
+def _journal_position(ticker):
+    """held_coins[ticker] + 매도엔진 target 현재 상태를 저널에 기록 (변화 없으면 생략)"""
+    if position_journal is None:
+        return
+    try:
+        with held_coins_lock:
+            held = dict(held_coins[ticker]) if ticker in held_coins else None
+        target = sell_engine.export_target(ticker) if sell_engine is not None else None
+        if held is None and target is None:
+            position_journal.delete(ticker)
+        else:
+            position_journal.put(ticker, held, target)
+    except Exception as e:
+        print(f"{Colors.RED}[Journal] {ticker} 기록 실패: {e}{Colors.ENDC}")
+
+
+def _journal_remove(ticker):
+    if position_journal is None:
+        return
+    try:
+        position_journal.delete(ticker)
+    except Exception as e:
+        print(f"{Colors.RED}[Journal] {ticker} 삭제 기록 실패: {e}{Colors.ENDC}")
+
+
 # ═══════════════════════════════════════════════════════════════════════
 # SECTION 14: 거래소 동기화 (v35 + v36 매도엔진/EMA트래커 등록)
 # ═══════════════════════════════════════════════════════════════════════
 
+def _run_parallel(fn, items, workers=WARM_START_WORKERS):
+    """items 각각에 fn 동시 실행 → {item: 결과} (예외는 None, 입력 순서대로 착수)"""
+    items = list(dict.fromkeys(items))
+    if not items:
+        return {}
+    out = {}
+    with ThreadPoolExecutor(max_workers=min(workers, len(items)),
+                            thread_name_prefix="warm") as pool:
+        futures = {item: pool.submit(fn, item) for item in items}
+        for item, fut in futures.items():
+            try:
+                out[item] = fut.result()
+            except Exception:
+                out[item] = None
+    return out
+
+
+def _warm_ema_4h(tickers):
+    """EMA 트래커 병렬 적재 → {"stream"/"current"/"init"/"fail": 개수}"""
+    result = {"stream": 0, "current": 0, "init": 0, "fail": 0}
+    if ema_tracker is None:
+        return result
+
+    def load(ticker):
+        return ema_tracker.sync_from_df(ticker, get_candles_4h(ticker, count=EMA_4H_HISTORY_COUNT))
+
+    for status in _run_parallel(load, tickers).values():
+        result[status or "fail"] += 1
+    return result
+
+
+def _restore_journaled_position(ticker, rec, avg_price_raw, total_balance):
+    """저널 레코드 → held_coins + 매도엔진 복원 (거래소 평단과 불일치하면 False)"""
+    if not rec or not rec.get("held") or not rec.get("target"):
+        return False
+    held = dict(rec["held"])
+    buy_price = float(held.get('buy_price') or 0)
+    if buy_price <= 0:
+        return False
+    if avg_price_raw > 0 and abs(buy_price - avg_price_raw) / avg_price_raw * 100 > POSITION_JOURNAL_AVG_MATCH_PCT:
+        print(f"{Colors.YELLOW}[Journal] {ticker} 평단 불일치 (저널 {buy_price:,.2f} / "
+              f"거래소 {avg_price_raw:,.2f}) → 잔고 기준 동기화{Colors.ENDC}")
+        return False
+    held['buy_amount'] = total_balance * buy_price
+    held['synced'] = True
+    with held_coins_lock:
+        held_coins[ticker] = held
+    if sell_engine is not None:
+        sell_engine.restore(ticker, rec["target"])
+    return True
+
+
 def sync_held_coins_with_exchange():
     """★ v36 변경: 등록 후 sell_engine + ema_tracker에 자동 이관"""
     global held_coins
@@ -3361,8 +5367,17 @@ def sync_held_coins_with_exchange():
         send_error_notification("Sync Failed", "get_balances() 3회 실패")
         return False
 
+    # 저널 복구 (스냅샷 + 저널 재생) — 아래에서 거래소 잔고와 대조
+    journaled = position_journal.recover() if position_journal is not None else {}
+    if journaled:
+        print(f"{Colors.CYAN}[Init] 포지션 저널 복구: {len(journaled)}개{Colors.ENDC}")
+
     if len(balances) == 0:
         print(f"{Colors.YELLOW}[Init] 잔고 없음 (빈 계좌){Colors.ENDC}")
+        for tk in journaled:
+            _journal_remove(tk)
+        if position_journal is not None:
+            position_journal.checkpoint()
         return True
 
     synced_coins = []
@@ -3371,6 +5386,10 @@ def sync_held_coins_with_exchange():
     # ★ v36: FIXED_STABLE_COINS 폐기 → 5,000원 이상 모든 코인 관리 대상
     # 사용자가 가진 모든 코인을 v36 매도엔진에 등록하여 추세 매도 적용
 
+    # 현재가는 /v1/ticker 일괄 1회 조회 (코인별 순차 조회 제거)
+    prices = get_current_prices([f"KRW-{b.get('currency', '')}" for b in balances
+                                 if b.get('currency', '') != 'KRW'])
+
     for bal in balances:
         currency = bal.get('currency', '')
         if currency == 'KRW':
@@ -3382,12 +5401,7 @@ def sync_held_coins_with_exchange():
             continue
 
         ticker = f"KRW-{currency}"
-        current_price = get_current_price(ticker)
-        if not current_price:
-            try:
-                current_price = _get_price_rest_single(ticker)
-            except Exception:
-                current_price = None
+        current_price = prices.get(ticker)
 
         coin_value = total_balance * current_price if current_price else 0.0
         avg_price_raw = float(bal.get('avg_buy_price', 0.0))
@@ -3410,6 +5424,25 @@ def sync_held_coins_with_exchange():
         # 모든 5,000원 이상 코인은 v36에서 관리 (managed=True)
         is_managed = True
 
+        # 저널 상태가 거래소 평단과 일치하면 그대로 복원 (buy_time/peak/분할/DAE 유지)
+        rec = journaled.pop(ticker, None)
+        if _restore_journaled_position(ticker, rec, avg_price_raw, total_balance):
+            avg_price = held_coins[ticker]['buy_price']
+            price_source = "저널복구"
+            profit_pct = ((current_price - avg_price) / avg_price * 100) if current_price else 0.0
+            _journal_position(ticker)
+            price_str = f"{current_price:,.0f}원" if current_price else "조회불가"
+            synced_coins.append({
+                'ticker': ticker, 'currency': currency,
+                'balance': total_balance, 'avg_price': avg_price,
+                'cur_price': current_price or 0, 'coin_value': coin_value,
+                'profit_pct': profit_pct, 'managed': is_managed,
+                'price_source': price_source,
+            })
+            print(f"  ✅ {currency}: {total_balance:.6f}개 "
+                  f"@ {avg_price:,.0f}원 [{price_source}] → 현재 {price_str} ({profit_pct:+.2f}%)")
+            continue
+
         profit_pct = ((current_price - avg_price) / avg_price * 100) if (current_price and avg_price > 0) else 0.0
         peak_price = max(avg_price, current_price) if current_price else avg_price
 
@@ -3434,16 +5467,10 @@ def sync_held_coins_with_exchange():
                 'was_overbought': False,
             }
 
-        # ★ v36 핵심: 매도엔진 + EMA 트래커 자동 등록
+        # ★ v36 핵심: 매도엔진 자동 등록 (EMA 트래커는 루프 후 병렬 적재)
         if sell_engine is not None:
             sell_engine.register(ticker, avg_price, buy_time.timestamp())
-
-        if ema_tracker is not None and not ema_tracker.is_ready(ticker):
-            df_4h = get_candles_4h(ticker, count=EMA_4H_HISTORY_COUNT)
-            if df_4h is not None:
-                ema_tracker.init_from_df(ticker, df_4h)
-                if DEBUG_MODE:
-                    print(f"{Colors.CYAN}  [EMA4H 로드] {ticker}{Colors.ENDC}")
+        _journal_position(ticker)
 
         price_str = f"{current_price:,.0f}원" if current_price else "조회불가"
         synced_coins.append({
@@ -3458,12 +5485,22 @@ def sync_held_coins_with_exchange():
               f"@ {avg_price:,.0f}원 [{price_source}]"
               f" → 현재 {price_str} ({profit_sign}{profit_pct:.2f}%)")
 
+    # 저널에는 있으나 잔고에 없는 포지션 (중단 중 매도/소액) → 삭제 기록 후 압축
+    for tk in journaled:
+        _journal_remove(tk)
+    if position_journal is not None:
+        position_journal.checkpoint()
+
+    # EMA 트래커 적재 — 스냅샷 복원 티커는 누락 4H봉만 누적, 나머지는 병렬 초기화
+    ema_result = _warm_ema_4h([c['ticker'] for c in synced_coins])
+
     print(f"\n{Colors.GREEN}[Init] 동기화 완료: {len(synced_coins)}개 등록"
-          f" | {len(skipped_coins)}개 스킵{Colors.ENDC}")
+          f" | {len(skipped_coins)}개 스킵 | EMA4H {ema_result}{Colors.ENDC}")
     if skipped_coins:
         print(f"{Colors.YELLOW}  스킵: {', '.join(skipped_coins)}{Colors.ENDC}")
 
-    _send_sync_discord_report(synced_coins, skipped_coins, unmanaged_coins)
+    threading.Thread(target=_send_sync_discord_report, name="SyncReport", daemon=True,
+                     args=(synced_coins, skipped_coins, unmanaged_coins)).start()
 
     # ★ v36: 스크리너에 보유 코인 알림 (제외 처리용)
     if screener is not None:
@@ -3635,7 +5672,6 @@ def execute_buy(ticker, signal):
                     order_uuid = result.get('uuid', '')
 
                     if order_uuid:
-                        time.sleep(0.5)
                         order_detail = upbit.wait_order_filled(order_uuid, timeout_sec=5)
                         if order_detail and order_detail['avg_price'] > 0:
                             actual_buy_price = order_detail['avg_price']
@@ -3678,6 +5714,7 @@ def execute_buy(ticker, signal):
                 buy_bb_width_val = signal.get('bb_width_pct')  # 매수 시점 1H BB Width
                 sell_engine.register(ticker, actual_buy_price, time.time(),
                                      buy_bb_width=buy_bb_width_val)
+            _journal_position(ticker)
             if buy_engine is not None:
                 buy_engine.record_buy(ticker)
             if screener is not None:
@@ -3686,8 +5723,11 @@ def execute_buy(ticker, signal):
             daily_trade_count += 1
             daily_buy_count += 1
             total_trades += 1
+            _ledger_record(trade_ledger.record_buy if trade_ledger else None,
+                           ticker, actual_buy_price, buy_amount, signal.get('reason', ''),
+                           session=signal.get('session'))
             print(f"{Colors.GREEN}[Buy Success] {coin_name} @ {actual_buy_price:,.0f}원{Colors.ENDC}")
-            send_buy_notification(ticker, signal, buy_amount, total_assets)
+            submit_report(send_buy_notification, ticker, signal, buy_amount, total_assets)
             return True
 
     except Exception as e:
@@ -3696,6 +5736,26 @@ def execute_buy(ticker, signal):
         return False
 
 
+def _ledger_record(fn, *args, **kwargs):
+    """원장 기록 (실패해도 거래 흐름은 계속)"""
+    if fn is None:
+        return
+    try:
+        fn(*args, **kwargs)
+    except Exception as e:
+        print(f"{Colors.RED}[Ledger] 기록 실패: {e}{Colors.ENDC}")
+
+
+def _ledger_sell(ticker, signal, hold_info, profit_pct, profit_amount, sell_ratio):
+    buy_time = hold_info.get('buy_time')
+    hold_sec = (datetime.now() - buy_time).total_seconds() if isinstance(buy_time, datetime) else None
+    _ledger_record(trade_ledger.record_sell if trade_ledger else None,
+                   ticker, signal.get('exit_price', 0.0), profit_pct, profit_amount,
+                   signal.get('sell_category', 'PROFIT_TAKE'), signal.get('reason', ''),
+                   ratio=sell_ratio, session=signal.get('session'), phase=signal.get('phase'),
+                   hold_sec=hold_sec)
+
+
 def execute_sell(ticker, signal):
     """★ v38 변경: 분할 매도(PARTIAL_TAKE) 지원
        - sell_ratio < 1.0이면 보유량의 일부만 매도, held_coins/sell_engine 유지
@@ -3750,6 +5810,7 @@ def execute_sell(ticker, signal):
                                 del held_coins[ticker]
                         if sell_engine is not None:
                             sell_engine.remove(ticker)
+                        _journal_remove(ticker)
                         send_discord_message(f"\n⚠️ **{coin_name} 수동매도 추정** → 자동제거\n")
                         return False
 
@@ -3760,6 +5821,7 @@ def execute_sell(ticker, signal):
                                 del held_coins[ticker]
                         if sell_engine is not None:
                             sell_engine.remove(ticker)
+                        _journal_remove(ticker)
                         return False
 
                     # ★ v38: 분할 매도 시 보유량의 일부만 매도
@@ -3774,7 +5836,6 @@ def execute_sell(ticker, signal):
                     sell_uuid = result.get('uuid', '')
                     actual_sell_price = sell_price
                     if sell_uuid:
-                        time.sleep(0.5)
                         order_detail = upbit.wait_order_filled(sell_uuid, timeout_sec=5)
                         if order_detail and order_detail['avg_price'] > 0:
                             actual_sell_price = order_detail['avg_price']
@@ -3794,6 +5855,7 @@ def execute_sell(ticker, signal):
                                 del held_coins[ticker]
                         if sell_engine is not None:
                             sell_engine.remove(ticker)
+                        _journal_remove(ticker)
                     send_error_notification("Sell Failed", error_str)
                     return False
 
@@ -3811,6 +5873,7 @@ def execute_sell(ticker, signal):
                 # sell_engine의 분할 매도 상태 마킹
                 if sell_engine is not None:
                     sell_engine.mark_partial_done(ticker, partial_tier)
+                _journal_position(ticker)
 
                 # recent_sells에는 기록하지 않음 (재진입 쿨다운 0이므로 무의미)
                 # 단, 통계 업데이트는 진행
@@ -3822,10 +5885,13 @@ def execute_sell(ticker, signal):
 
                 daily_trade_count += 1
                 daily_sell_count += 1
+                _ledger_sell(ticker, signal, hold_info, actual_profit_pct, actual_profit_amount,
+                             sell_ratio)
                 tag = f"PARTIAL_{partial_tier}"
                 print(f"{Colors.GREEN}[{tag}] {coin_name} {sell_ratio*100:.0f}% 분할익절 "
                       f"({actual_profit_pct:+.2f}%, 잔여 {(1-sell_ratio)*100:.0f}% 보유){Colors.ENDC}")
-                send_sell_notification(ticker, hold_info, signal, actual_profit_amount, hold_duration)
+                submit_report(send_sell_notification, ticker, hold_info, signal,
+                              actual_profit_amount, hold_duration)
                 return True
             else:
                 # ── 전량 매도 (기존 v37 동작) ──
@@ -3841,6 +5907,7 @@ def execute_sell(ticker, signal):
 
                 if sell_engine is not None:
                     sell_engine.remove(ticker)
+                _journal_remove(ticker)
                 if screener is not None:
                     screener.update_exclude_coins(set(held_coins.keys()))
 
@@ -3858,8 +5925,10 @@ def execute_sell(ticker, signal):
 
                 daily_trade_count += 1
                 daily_sell_count += 1
+                _ledger_sell(ticker, signal, hold_info, actual_profit_pct, actual_profit_amount, 1.0)
                 print(f"{Colors.GREEN}[Sell Success] {coin_name} {actual_profit_pct:+.2f}%{Colors.ENDC}")
-                send_sell_notification(ticker, hold_info, signal, actual_profit_amount, hold_duration)
+                submit_report(send_sell_notification, ticker, hold_info, signal,
+                              actual_profit_amount, hold_duration)
                 return True
 
     except Exception as e:
@@ -3868,6 +5937,211 @@ def execute_sell(ticker, signal):
         return False
 
 
+# ═══════════════════════════════════════════════════════════════════════
+# SECTION 15-B: 우선순위 작업 스케줄러 (매도 > 매수 > 스크리닝 > 리포트)
+# ═══════════════════════════════════════════════════════════════════════
+
+PRIO_SELL, PRIO_BUY, PRIO_SCREEN, PRIO_REPORT = range(4)
+SCHED_CLASS_NAMES = ("sell", "buy", "screen", "report")
+_SCHED_BACKGROUND = (PRIO_SCREEN, PRIO_REPORT)
+
+
+@dataclass
+class ScheduledTask:
+    priority: int
+    name: str
+    fn: object
+    args: tuple
+    kwargs: dict
+    enqueued_at: float
+    deadline: float
+    future: Future = field(default_factory=Future)
+
+
+class WorkScheduler:
+    """
+    클래스별 FIFO 큐 + 고정 워커 풀.
+
+    - 워커는 항상 가장 높은 우선순위 클래스부터 꺼냄
+    - 스크리닝/리포트는 동시에 SCHED_MAX_BACKGROUND_RUNNING개까지만 실행
+      → 매시 스크리닝 중에도 매도/매수용 워커가 항상 남아 있음
+    - 매도 외 작업은 동시에 (워커 수 - SCHED_SELL_RESERVED_WORKERS)개까지만 실행
+      → 매수 일괄 평가(보유 후보 수십 개)가 몰려도 매도는 큐 대기 없이 시작
+    - 큐 상한 초과 시 submit()은 None (호출자가 판단), 마감 지난 작업은 실행 안 하고 취소
+    - 클래스별 큐 대기 지연(avg/p95/max) 집계
+    - start() 전에는 submit()이 호출 스레드에서 즉시 실행 (초기화/테스트용)
+    """
+
+    def __init__(self, workers=SCHED_WORKERS, sell_reserved=SCHED_SELL_RESERVED_WORKERS):
+        self.workers = workers
+        self.max_non_sell = max(workers - sell_reserved, 1)
+        self._queues = [deque() for _ in SCHED_CLASS_NAMES]
+        self._cond = threading.Condition()
+        self._threads = []
+        self._running = False
+        self._bg_running = 0
+        self._non_sell_running = 0
+        self._latency = [deque(maxlen=SCHED_LATENCY_SAMPLES) for _ in SCHED_CLASS_NAMES]
+        self._counts = [{"submitted": 0, "done": 0, "failed": 0, "rejected": 0, "expired": 0}
+                        for _ in SCHED_CLASS_NAMES]
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, name=f"Sched-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout=5):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join(timeout=timeout)
+        self._threads = []
+
+    def submit(self, priority, fn, *args, name=None, deadline_sec=None, **kwargs):
+        """작업 등록 → Future (큐 가득 차면 None)"""
+        cls = SCHED_CLASS_NAMES[priority]
+        now = time.time()
+        if deadline_sec is None:
+            deadline_sec = SCHED_DEADLINE_SEC[cls]
+        task = ScheduledTask(priority, name or getattr(fn, "__name__", "task"),
+                             fn, args, kwargs, now, now + deadline_sec)
+        with self._cond:
+            if not self._running:
+                inline = True
+            else:
+                inline = False
+                if len(self._queues[priority]) >= SCHED_QUEUE_LIMITS[cls]:
+                    self._counts[priority]["rejected"] += 1
+                    return None
+                self._queues[priority].append(task)
+                self._counts[priority]["submitted"] += 1
+                self._cond.notify()
+        if inline:
+            self._run(task)
+        return task.future
+
+    def _next_task(self):
+        """(cond 보유) 실행 가능한 최우선 작업 꺼내기"""
+        for prio, q in enumerate(self._queues):
+            if not q:
+                continue
+            if prio != PRIO_SELL and self._non_sell_running >= self.max_non_sell:
+                break
+            if prio in _SCHED_BACKGROUND and self._bg_running >= SCHED_MAX_BACKGROUND_RUNNING:
+                continue
+            return q.popleft()
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                task = None
+                while self._running:
+                    task = self._next_task()
+                    if task is not None:
+                        break
+                    self._cond.wait(1.0)
+                if task is None:
+                    return
+                if task.priority != PRIO_SELL:
+                    self._non_sell_running += 1
+                if task.priority in _SCHED_BACKGROUND:
+                    self._bg_running += 1
+            try:
+                self._run(task)
+            finally:
+                if task.priority != PRIO_SELL:
+                    with self._cond:
+                        self._non_sell_running -= 1
+                        if task.priority in _SCHED_BACKGROUND:
+                            self._bg_running -= 1
+                        self._cond.notify()
+
+    def _count(self, priority, key):
+        with self._cond:
+            self._counts[priority][key] += 1
+
+    def _run(self, task):
+        """작업 실행 (통계 갱신은 cond 아래 — 여러 워커가 동시에 갱신)"""
+        now = time.time()
+        expired = now > task.deadline
+        with self._cond:
+            self._latency[task.priority].append(now - task.enqueued_at)
+            if expired:
+                self._counts[task.priority]["expired"] += 1
+        if expired:
+            task.future.cancel()
+            if DEBUG_MODE:
+                print(f"{Colors.YELLOW}[Sched] {task.name} 마감 초과 "
+                      f"({now - task.enqueued_at:.1f}s 대기) — 건너뜀{Colors.ENDC}")
+            return
+        if not task.future.set_running_or_notify_cancel():
+            return
+        try:
+            result = task.fn(*task.args, **task.kwargs)
+        except Exception as e:
+            self._count(task.priority, "failed")
+            task.future.set_exception(e)
+            if DEBUG_MODE:
+                print(f"{Colors.RED}[Sched] {task.name} 예외: {e}{Colors.ENDC}")
+            return
+        self._count(task.priority, "done")
+        task.future.set_result(result)
+
+    def get_stats(self):
+        """클래스별 큐 길이/건수/대기 지연(ms)"""
+        stats = {}
+        with self._cond:
+            for prio, cls in enumerate(SCHED_CLASS_NAMES):
+                lat = sorted(self._latency[prio])
+                n = len(lat)
+                stats[cls] = {
+                    "queued": len(self._queues[prio]),
+                    **self._counts[prio],
+                    "wait_avg_ms": round(sum(lat) / n * 1000, 1) if n else 0.0,
+                    "wait_p95_ms": round(lat[min(n - 1, int(n * 0.95))] * 1000, 1) if n else 0.0,
+                    "wait_max_ms": round(lat[-1] * 1000, 1) if n else 0.0,
+                }
+        return stats
+
+    def format_stats(self):
+        parts = []
+        for cls, st in self.get_stats().items():
+            parts.append(f"{cls} q{st['queued']} p95 {st['wait_p95_ms']:.0f}ms"
+                         + (f" 만료{st['expired']}" if st['expired'] else "")
+                         + (f" 거부{st['rejected']}" if st['rejected'] else ""))
+        return " | ".join(parts)
+
+
+work_scheduler = WorkScheduler()
+
+
+def submit_report(fn, *args, **kwargs):
+    """리포트/알림 작업 비동기 실행 (매매 스레드가 Discord/잔고 조회에 막히지 않도록)"""
+    return work_scheduler.submit(PRIO_REPORT, fn, *args, **kwargs)
+
+
+def _wait_futures(futures, timeout):
+    """Future 목록 대기 → 결과 리스트 (실패/취소/시간초과는 None)"""
+    results = []
+    end = time.time() + timeout
+    for fut in futures:
+        if fut is None:
+            results.append(None)
+            continue
+        try:
+            results.append(fut.result(timeout=max(0.0, end - time.time())))
+        except Exception:
+            results.append(None)
+    return results
+
+
 # ═══════════════════════════════════════════════════════════════════════
 # SECTION 16: 매수 스레드 (★ v36 — 후보 코인 순회, 예측기 호출 0)
 # ═══════════════════════════════════════════════════════════════════════
@@ -3968,17 +6242,24 @@ def buy_thread_worker():
                       f"후보:{len(watch_list)}종 | "
                       f"오늘매수:{daily_count}/{DAILY_BUY_COUNT_LIMIT}건{Colors.ENDC}")
 
-            for ticker in watch_list:
+            with held_coins_lock:
+                eval_list = [t for t in watch_list if t not in held_coins]
+            # 매수 신호 평가 (★ v36 — 예측기 호출 없음) — BUY 클래스로 병렬 평가
+            futures = [work_scheduler.submit(PRIO_BUY, buy_engine.check_buy_signal, t,
+                                             name=f"buy:{t}")
+                       for t in eval_list]
+            signals = _wait_futures(futures, SCHED_DEADLINE_SEC["buy"])
+
+            for ticker, sig in zip(eval_list, signals):
                 if stop_event.is_set():
                     return
+                if sig is None:
+                    continue
 
                 with held_coins_lock:
                     if ticker in held_coins:
                         continue
 
-                # 매수 신호 평가 (★ v36 — 예측기 호출 없음)
-                sig = buy_engine.check_buy_signal(ticker)
-
                 if sig['signal']:
                     coin_name = ticker.replace('KRW-', '')
 
@@ -4000,8 +6281,6 @@ def buy_thread_worker():
                         if mc >= MAX_HOLDINGS:
                             break
 
-                time.sleep(0.3)
-
             time.sleep(BUY_THREAD_INTERVAL)
 
         except Exception as e:
@@ -4033,6 +6312,145 @@ def _send_no_cash_discord_alert(krw_balance, num_held, managed_count):
 # SECTION 17: 매도 스레드 (★ v36 — TrendSellEngine 단일 진입점)
 # ═══════════════════════════════════════════════════════════════════════
 
+def _evaluate_sell_ticker(ticker):
+    """단일 보유 코인 매도 신호 평가 → (sig, buy_time) 또는 None (스케줄러 SELL 작업)"""
+    # 현재가 조회
+    current_price = get_current_price(ticker)
+    if not current_price or current_price <= 0:
+        return None
+
+    # held_info 가져오기
+    with held_coins_lock:
+        if ticker not in held_coins:
+            return None
+        held_info = held_coins[ticker].copy()
+        buy_price = held_info['buy_price']
+        buy_time = held_info.get('buy_time')
+
+    # ★ v36: TrendSellEngine 단일 진입점
+    if sell_engine is None:
+        return None
+
+    # 매도 엔진에 등록되어 있지 않으면 자동 등록 (안전장치)
+    target_info = sell_engine.get_target_info(ticker)
+    if target_info is None:
+        buy_time_ts = buy_time.timestamp() if isinstance(buy_time, datetime) else time.time() - 3600
+        sell_engine.register(ticker, buy_price, buy_time_ts)
+
+    sig = sell_engine.check_sell_signal(ticker, current_price)
+    # 평가 중 바뀐 peak/DAE/과매수/스파이크 상태 기록 (틱 단위 peak 갱신도 여기서 합쳐짐)
+    _journal_position(ticker)
+    if SELL_EVENT_DRIVEN and not sig['signal']:
+        sell_engine.refresh_triggers(ticker, sig, _get_bb_upper_15m(ticker))
+    return sig, buy_time
+
+
+def _get_bb_upper_15m(ticker):
+    """DAE zone 트리거용 15분봉 BB 상단 (평가 직후라 메모리/캐시 적중)"""
+    try:
+        df = get_candles_15m(ticker, count=ATR_PERIOD + 5)
+        if df is None or len(df) < 1:
+            return None
+        val = df.iloc[-1].get('BB_UPPER')
+        return None if val is None or pd.isna(val) else float(val)
+    except Exception:
+        return None
+
+
+# 매도 실행 직렬화 (매도 스레드 순회 + 틱 트리거 작업이 동시에 같은 코인을 팔지 않도록)
+sell_execution_lock = threading.Lock()
+sell_trigger_stats = {"fired": 0, "sold": 0, "last_latency_ms": 0.0}
+
+
+def _act_on_sell_signal(ticker, sig, buy_time, source="SWEEP"):
+    """매도 신호 → 로그 + execute_sell (sell_execution_lock 직렬화)"""
+    with sell_execution_lock:
+        with held_coins_lock:
+            if ticker not in held_coins:
+                return False
+        if sig.get('sell_ratio', 1.0) < 1.0 and sell_engine is not None:
+            # 분할 매도: 평가 ~ 락 획득 사이 다른 경로(틱 트리거/순회)가 같은 단계를 이미 팔았을 수 있음
+            # → 락 안에서 재평가, 신호가 사라졌으면 매도하지 않음
+            price = get_current_price(ticker) or sig['exit_price']
+            sig = sell_engine.check_sell_signal(ticker, price)
+            if not sig['signal']:
+                return False
+        profit_pct = sig['profit_pct']
+        coin_name = ticker.replace('KRW-', '')
+        color = Colors.GREEN if profit_pct >= 0 else Colors.RED
+        emoji = "📈" if profit_pct >= 0 else "📉"
+
+        print(f"\n{color}{'='*55}")
+        print(f"[SELL SIGNAL] {coin_name} 매도! ({source})")
+        print(f"{'='*55}{Colors.ENDC}")
+        print(f"  {emoji} 수익률: {profit_pct:+.2f}%")
+        print(f"  💰 매도가: {sig['exit_price']:,.0f}원")
+        print(f"  🔍 사유: {sig['reason']}")
+        if buy_time:
+            if isinstance(buy_time, datetime):
+                print(f"  ⏱️ 보유: {format_duration(datetime.now() - buy_time)}")
+        print(f"{color}{'='*55}{Colors.ENDC}\n")
+
+        success = execute_sell(ticker, sig)
+        if success:
+            print(f"{color}[SELL] {coin_name} 매도 완료! ({profit_pct:+.2f}%){Colors.ENDC}")
+        return success
+
+
+def _handle_sell_trigger(ticker, trigger_name, tick_price, fired_at):
+    """틱 트리거 → 전체 매도 평가 → 신호 시 즉시 매도 (스케줄러 SELL 작업)"""
+    try:
+        res = _evaluate_sell_ticker(ticker)
+        if res is None:
+            return None
+        sig, buy_time = res
+        if sig['signal']:
+            if _act_on_sell_signal(ticker, sig, buy_time, source=f"TICK:{trigger_name}"):
+                sell_trigger_stats["sold"] += 1
+                sell_trigger_stats["last_latency_ms"] = round((time.time() - fired_at) * 1000, 1)
+        elif DEBUG_MODE:
+            print(f"{Colors.CYAN}[SELL트리거] {ticker} {trigger_name}@{tick_price:,.2f} → "
+                  f"{sig['reason']}{Colors.ENDC}")
+        return sig
+    finally:
+        if sell_engine is not None:
+            sell_engine.rearm_trigger(ticker)
+
+
+def _dispatch_sell_trigger(ticker, trigger_name, tick_price):
+    """WS 스레드에서 호출 — 평가는 스케줄러 SELL 클래스로 넘기고 즉시 반환"""
+    sell_trigger_stats["fired"] += 1
+    fut = work_scheduler.submit(PRIO_SELL, _handle_sell_trigger, ticker, trigger_name,
+                                tick_price, time.time(), name=f"trigger:{ticker}:{trigger_name}")
+    if fut is None and sell_engine is not None:
+        sell_engine.rearm_trigger(ticker)
+
+
+def _sell_sweep_interval():
+    """WS 정상 + 틱 트리거 사용 시 전체 점검은 안전망 주기로만"""
+    if SELL_EVENT_DRIVEN:
+        with ws_status_lock:
+            if ws_status['connected']:
+                return SELL_SWEEP_INTERVAL_WS
+    return SELL_THREAD_INTERVAL
+
+
+def _record_first_sell_check(evaluated):
+    """기동 후 첫 매도 점검 완료 시각 기록 (웜 스타트 계측)"""
+    boot_ts = warm_start_stats['boot_ts']
+    if boot_ts is None or warm_start_stats['first_sell_check_sec'] is not None:
+        return
+    elapsed = time.time() - boot_ts
+    warm_start_stats['first_sell_check_sec'] = elapsed
+    print(f"{Colors.GREEN}[Init] 첫 매도 점검 완료: 기동 후 {elapsed:.1f}초 "
+          f"({evaluated}코인 평가){Colors.ENDC}")
+
+
+def _format_first_sell_check():
+    sec = warm_start_stats['first_sell_check_sec']
+    return f"{sec:.1f}초" if sec is not None else "진행 중"
+
+
 def sell_thread_worker():
     """★ v36 핵심: TrendSellEngine.check_sell_signal → execute_sell
     
@@ -4043,6 +6461,9 @@ def sell_thread_worker():
       - peak_price 갱신 → sell_engine 내부에서 처리
     """
     print(f"{Colors.YELLOW}[Thread 2] v39 매도 스레드 시작 ({SELL_THREAD_INTERVAL}초 주기){Colors.ENDC}")
+    if SELL_EVENT_DRIVEN:
+        print(f"{Colors.YELLOW}  ├ WS 틱 트리거 (절대손절/래칫/트레일/분할/DAE zone) — "
+              f"WS 정상 시 전체 점검 {SELL_SWEEP_INTERVAL_WS}초{Colors.ENDC}")
     print(f"{Colors.YELLOW}  ├ Sell-Side (분할+DAE+Ratchet+Spike){Colors.ENDC}")
     print(f"{Colors.YELLOW}  ├ D+0 안전장치: 가속손절 + 당일-3% + 절대-5%{Colors.ENDC}")
     print(f"{Colors.YELLOW}  └ 시간 청산 0건 (사용자 핵심 지시 #2,3){Colors.ENDC}")
@@ -4057,70 +6478,36 @@ def sell_thread_worker():
                 tickers = list(held_coins.keys())
 
             if not tickers:
+                _record_first_sell_check(0)
                 if DEBUG_MODE and iteration % 60 == 0:
                     print(f"{Colors.YELLOW}[SELL] 보유 종목 없음{Colors.ENDC}")
                 time.sleep(SELL_THREAD_INTERVAL)
                 continue
 
-            for ticker in tickers:
-                if stop_event.is_set():
-                    return
-
-                # 현재가 조회
-                current_price = get_current_price(ticker)
-                if not current_price or current_price <= 0:
-                    continue
+            # 매도 신호 평가 — SELL 클래스(최우선)로 병렬 평가, 실행은 이 스레드에서 순차
+            futures = [work_scheduler.submit(PRIO_SELL, _evaluate_sell_ticker, t,
+                                             name=f"sell:{t}")
+                       for t in tickers]
+            results = _wait_futures(futures, SCHED_DEADLINE_SEC["sell"])
 
-                # held_info 가져오기
-                with held_coins_lock:
-                    if ticker not in held_coins:
-                        continue
-                    held_info = held_coins[ticker].copy()
-                    buy_price = held_info['buy_price']
-                    buy_time = held_info.get('buy_time')
+            _record_first_sell_check(sum(1 for r in results if r is not None))
 
-                # ★ v36: TrendSellEngine 단일 진입점
-                if sell_engine is None:
+            for ticker, res in zip(tickers, results):
+                if stop_event.is_set():
+                    return
+                if res is None:
                     continue
-
-                # 매도 엔진에 등록되어 있지 않으면 자동 등록 (안전장치)
-                target_info = sell_engine.get_target_info(ticker)
-                if target_info is None:
-                    buy_time_ts = buy_time.timestamp() if isinstance(buy_time, datetime) else time.time() - 3600
-                    sell_engine.register(ticker, buy_price, buy_time_ts)
-
-                sig = sell_engine.check_sell_signal(ticker, current_price)
+                sig, buy_time = res
 
                 if sig['signal']:
-                    profit_pct = sig['profit_pct']
-                    coin_name = ticker.replace('KRW-', '')
-                    color = Colors.GREEN if profit_pct >= 0 else Colors.RED
-                    emoji = "📈" if profit_pct >= 0 else "📉"
-
-                    print(f"\n{color}{'='*55}")
-                    print(f"[SELL SIGNAL] {coin_name} 매도!")
-                    print(f"{'='*55}{Colors.ENDC}")
-                    print(f"  {emoji} 수익률: {profit_pct:+.2f}%")
-                    print(f"  💰 매도가: {sig['exit_price']:,.0f}원")
-                    print(f"  🔍 사유: {sig['reason']}")
-                    if buy_time:
-                        if isinstance(buy_time, datetime):
-                            print(f"  ⏱️ 보유: {format_duration(datetime.now() - buy_time)}")
-                    print(f"{color}{'='*55}{Colors.ENDC}\n")
-
-                    success = execute_sell(ticker, sig)
-                    if success:
-                        print(f"{color}[SELL] {coin_name} 매도 완료! ({profit_pct:+.2f}%){Colors.ENDC}")
-                    time.sleep(2)
+                    _act_on_sell_signal(ticker, sig, buy_time)
 
                 else:
                     if DEBUG_MODE and iteration % 60 == 0:
                         coin_name = ticker.replace('KRW-', '')
                         print(f"{Colors.CYAN}[SELL] {coin_name}: {sig['profit_pct']:+.2f}%, {sig['reason']}{Colors.ENDC}")
 
-                time.sleep(0.3)
-
-            time.sleep(SELL_THREAD_INTERVAL)
+            time.sleep(_sell_sweep_interval())
 
         except Exception as e:
             print(f"{Colors.RED}[Sell Thread Error] {e}{Colors.ENDC}")
@@ -4133,6 +6520,28 @@ def sell_thread_worker():
 # SECTION 18: 정시 통계 리포트 (★ v36 — 등급/예측기 표시 제거, EMA 추가)
 # ═══════════════════════════════════════════════════════════════════════
 
+def _ledger_report_section():
+    """원장 누적 집계 요약 (집계 사본 조회만, 거래 스캔 없음)"""
+    if trade_ledger is None:
+        return ""
+    total = trade_ledger.aggregate("all")
+    if total['trades'] == 0:
+        return ""
+    today = trade_ledger.aggregate("day", datetime.now().strftime('%Y-%m-%d'))
+    rolling = trade_ledger.rolling_win_rate()
+    section = (
+        f"\n\n📒 **누적** `{total['trades']}건 승률{total['win_rate']:.0f}% "
+        f"평균{total['avg_pct']:+.2f}% {format_profit_amount(total['sum_krw'])}` "
+        f"오늘`{today['trades']}건 {today['win_rate']:.0f}%` "
+        f"최근{ROLLING_WINDOW}건`{rolling:.0f}%`"
+    )
+    cats = sorted(trade_ledger.aggregates("category").items(),
+                  key=lambda kv: kv[1]['trades'], reverse=True)[:4]
+    for cat, a in cats:
+        section += f"\n  `{cat:<13s} {a['trades']:>3}건 {a['win_rate']:>3.0f}% {a['avg_pct']:+.2f}%`"
+    return section
+
+
 def send_enhanced_statistics_report():
     """★ v36 변경: 시장 등급, 예측기, watchlist 모든 코드 제거. EMA 상태 추가"""
     try:
@@ -4264,7 +6673,8 @@ def send_enhanced_statistics_report():
                         f"{chg:+.1f}% {bb_str} {rsi_str}`"
                     )
 
-        msg = f"\n{'─'*25}\n{header}{mkt_section}{hold_section}{candidate_section}\n{'─'*25}"
+        msg = (f"\n{'─'*25}\n{header}{mkt_section}{_ledger_report_section()}"
+               f"{hold_section}{candidate_section}\n{'─'*25}")
         send_discord_message(msg)
 
     except Exception as e:
@@ -4277,42 +6687,101 @@ def send_enhanced_statistics_report():
 # SECTION 19: 모니터 스레드 (★ v36 — 매시 정각 스크리닝 통합)
 # ═══════════════════════════════════════════════════════════════════════
 
+def _run_scheduled_screening():
+    """정시 스크리닝 → 매수엔진 후보 등록 → WS 재구독 (스케줄러 SCREEN 작업)"""
+    # 보유 코인 제외 갱신
+    with held_coins_lock:
+        held_set = set(held_coins.keys())
+    screener.update_exclude_coins(held_set)
+    # 스크리닝 실행
+    results = screener.run_full_screening()
+    # 매수엔진에 후보 등록
+    buy_engine.register_candidates(results)
+    # WS 핫 재구독 (후보 변경 반영, 연결 유지)
+    if results:
+        ws_subscription_manager.update()
+    return results
+
+
+def screening_thread_worker():
+    """스크리닝 스케줄러 — SCREENING_INTERVAL_MIN 경계(KST 정각 기준)마다 SCREEN 작업 제출"""
+    period = SCREENING_INTERVAL_MIN * 60
+    print(f"{Colors.MAGENTA}[Screen] 마켓 와이드 스크리닝 {SCREENING_INTERVAL_MIN}분 주기{Colors.ENDC}")
+    while not stop_event.is_set():
+        now = time.time()
+        next_run = (int(now // period) + 1) * period
+        if stop_event.wait(next_run - now):
+            break
+        if screener is None or buy_engine is None:
+            continue
+        print(f"{Colors.MAGENTA}[Screen] 스크리닝 실행 ({datetime.now().strftime('%H:%M')}){Colors.ENDC}")
+        if work_scheduler.submit(PRIO_SCREEN, _run_scheduled_screening,
+                                 name="screening") is None:
+            print(f"{Colors.YELLOW}[Screen] 이전 스크리닝 진행 중 — 이번 회차 생략{Colors.ENDC}")
+
+
+def _finalize_ema_4h_bars():
+    """4H봉 마감 → 추적 중인 전 티커에 확정봉 반영 (스케줄러 SCREEN 작업)
+
+    체결 집계 버퍼(WS)가 있으면 그 4H봉을, 없으면 캔들 캐시(마감 후 꼬리 조회)를 사용.
+    """
+    if ema_tracker is None:
+        return {}
+    result = {"stream": 0, "current": 0, "init": 0, "fail": 0}
+    for tk in ema_tracker.get_tracked_tickers():
+        try:
+            df_4h = get_trade_candles(tk, "4h", EMA_4H_HISTORY_COUNT)
+            if df_4h is None:
+                df_4h = get_candles_4h(tk, count=EMA_4H_HISTORY_COUNT)
+            result[ema_tracker.sync_from_df(tk, df_4h)] += 1
+        except Exception:
+            result["fail"] += 1
+    print(f"{Colors.CYAN}[EMA4H] 4H봉 마감 반영: 누적 {result['stream']} | "
+          f"재초기화 {result['init']} | 변화없음 {result['current']} | "
+          f"실패 {result['fail']}{Colors.ENDC}")
+    _save_warm_snapshot()
+    return result
+
+
+def _save_warm_snapshot():
+    """EMA4H 상태 디스크 저장 (4H봉 마감 반영 후 + 종료 시)"""
+    if ema_tracker is None:
+        return
+    try:
+        ema_tracker.save_snapshot(WARM_SNAPSHOT_PATH)
+    except Exception as e:
+        if DEBUG_MODE:
+            print(f"{Colors.YELLOW}[EMA4H] 스냅샷 저장 실패: {e}{Colors.ENDC}")
+
+
+def ema_4h_close_thread_worker():
+    """4H봉 마감 스케줄러 (KST 01/05/09/13/17/21시 + EMA_4H_FINALIZE_DELAY_SEC)"""
+    bar_sec = TRADE_CANDLE_TIMEFRAMES["4h"]
+    while not stop_event.is_set():
+        now = time.time()
+        next_run = (int(now // bar_sec) + 1) * bar_sec + EMA_4H_FINALIZE_DELAY_SEC
+        if stop_event.wait(next_run - now):
+            break
+        work_scheduler.submit(PRIO_SCREEN, _finalize_ema_4h_bars, name="ema4h_finalize")
+
+
 def monitor_thread_worker():
-    """★ v36 핵심: 매시 정각에 마켓 와이드 스크리닝 자동 수행
+    """★ v36: 상태 출력 + 정시 디스코드 보고 (스크리닝은 screening_thread_worker)
     
     v35 대비 변경:
       - get_grade_display_str(), get_predictor_status_str() 호출 제거
       - calculate_dynamic_stop_loss 호출 제거
-      - 매시 정각에 screener.run_full_screening() 자동 실행 신규 추가
     """
     print(f"{Colors.MAGENTA}[Thread 3] v36 모니터 스레드 시작 ({MONITOR_THREAD_INTERVAL}초 주기){Colors.ENDC}")
-    print(f"{Colors.MAGENTA}  └ 매시 정각: 마켓 와이드 스크리닝 자동 실행{Colors.ENDC}")
 
     iteration = 0
     last_report_time = datetime.now() - timedelta(hours=1)
-    last_screening_hour = -1   # 마지막 스크리닝 시간 (정각 1회 보장)
 
     while not stop_event.is_set():
         try:
             iteration += 1
             current_time = datetime.now()
 
-            # ──── 매시 정각 스크리닝 ────
-            if (current_time.minute < 5 and current_time.hour != last_screening_hour
-                    and screener is not None and buy_engine is not None):
-                last_screening_hour = current_time.hour
-                print(f"{Colors.MAGENTA}[Monitor] 매시 정각 스크리닝 실행 ({current_time.strftime('%H:%M')}){Colors.ENDC}")
-
-                # 보유 코인 제외 갱신
-                screener.update_exclude_coins(set(held_coins.keys()))
-                # 스크리닝 실행
-                results = screener.run_full_screening()
-                # 매수엔진에 후보 등록
-                buy_engine.register_candidates(results)
-                # WS 재구독 (후보 변경 반영)
-                if results:
-                    reconnect_websocket()
-
             with held_coins_lock:
                 current_holdings = len(held_coins)
             with statistics_lock:
@@ -4326,12 +6795,36 @@ def monitor_thread_worker():
 
             # ★ v36: 5분봉 빌더 + 4H EMA 트래커 상태
             with ws_candles_5m_lock:
-                _5m_ready = sum(1 for v in ws_candles_5m.values() if v.get('indicators_ready'))
+                _5m_ready = sum(1 for v in ws_candles_5m.values() if v.indicators_ready)
                 _5m_total = len(ws_candles_5m)
             ema_count = len(ema_tracker.get_tracked_tickers()) if ema_tracker else 0
             print(f"  5m빌더: {_5m_ready}/{_5m_total}코인 | "
                   f"EMA4H 추적: {ema_count}코인 | "
                   f"매수후보: {buy_engine.get_watch_list() if buy_engine else []}")
+            print(f"  스케줄러: {work_scheduler.format_stats()}")
+            print(f"  매도트리거: 발화 {sell_trigger_stats['fired']}회 | "
+                  f"매도 {sell_trigger_stats['sold']}회 | "
+                  f"최근 반응 {sell_trigger_stats['last_latency_ms']:.0f}ms")
+            cs = candle_cache.get_stats()
+            print(f"  캔들캐시: {cs['entries']}건 | 적중 {cs['hits']} | 전체조회 {cs['misses']} | "
+                  f"꼬리조회 {cs['tail_fetches']} | WS패치 {cs['ws_patches']} | "
+                  f"병합 {cs['coalesced']} | 제거 {cs['evictions']}")
+            if candle_store is not None:
+                ds = candle_store.stats()
+                print(f"  캔들DB: 조회 {ds['reads']} | REST {ds['rest_pages']}회 "
+                      f"{ds['rest_bars']:,}봉")
+            if account_cache is not None:
+                ac = account_cache.get_stats()
+                print(f"  계정캐시: {'유효' if ac['valid'] else '무효'} | 적중 {ac['hits']} | "
+                      f"REST {ac['rest_seeds']}회 (폐기 {ac['stale_seeds']}) | 자산 {ac['asset_events']} | "
+                      f"주문 {ac['order_events']} | 끊김 {ac['gaps']}")
+            if order_tracker is not None:
+                ot = order_tracker.get_stats()
+                print(f"  체결추적: WS {ot['ws_fills']}건 | REST폴백 {ot['rest_fallbacks']}건 | "
+                      f"대기 {ot['pending']} | 지연 p50 {ot['latency_p50_ms']:.0f}ms "
+                      f"max {ot['latency_max_ms']:.0f}ms")
+            print(f"  시세스냅샷: {len(market_snapshot.markets())}마켓 | "
+                  f"WS갱신 {market_snapshot.ws_updates} | REST보충 {market_snapshot.rest_updates}")
 
             with held_coins_lock:
                 for ticker, info in held_coins.items():
@@ -4355,7 +6848,7 @@ def monitor_thread_worker():
             elapsed = (current_time - last_report_time).total_seconds()
             if elapsed >= 3540 and 0 <= current_time.minute <= 3:
                 print(f"{Colors.GREEN}[Monitor] 정시 디스코드 보고{Colors.ENDC}")
-                send_enhanced_statistics_report()
+                submit_report(send_enhanced_statistics_report)
                 last_report_time = current_time
 
             time.sleep(MONITOR_THREAD_INTERVAL)
@@ -4367,15 +6860,54 @@ def monitor_thread_worker():
     print(f"{Colors.MAGENTA}[Thread 3] v36 모니터 종료{Colors.ENDC}")
 
 
+def _collect_runtime_metrics():
+    """/metrics 수집 직전 게이지 갱신 (WS 시세 캐시 지연, 연결 상태, 캐시/보유 수)"""
+    now = time.time()
+    with ws_price_lock:
+        ages = {tk: now - e['ts'] for tk, e in ws_price_cache.items()}
+    with held_coins_lock:
+        held = list(held_coins)
+    with ws_status_lock:
+        connected = ws_status['connected']
+        last_received = ws_status['last_received']
+    _M_WS_PRICE_ENTRIES.set(len(ages))
+    _M_WS_PRICE_MAX_AGE.set(max(ages.values()) if ages else 0.0)
+    _M_WS_LAST_MSG_AGE.set(now - last_received if last_received else 0.0)
+    _M_WS_CONNECTED.set(1 if connected else 0)
+    _M_CANDLE_CACHE_ENTRIES.set(candle_cache.get_stats()['entries'])
+    _M_HELD.set(len(held))
+    _M_WS_PRICE_AGE.clear()
+    for tk in held:
+        if tk in ages:
+            _M_WS_PRICE_AGE.labels(tk).set(ages[tk])
+
+
+def start_metrics_server():
+    """로컬 /metrics 노출 (METRICS_HTTP_PORT=0이면 생략, 포트 사용 중이면 경고만)"""
+    if not METRICS_HTTP_PORT:
+        return False
+    metrics.add_collector(_collect_runtime_metrics)
+    try:
+        metrics.serve(METRICS_HTTP_PORT, METRICS_HTTP_HOST)
+    except OSError as e:
+        print(f"{Colors.YELLOW}[Metrics] HTTP 기동 실패 ({METRICS_HTTP_HOST}:{METRICS_HTTP_PORT}): {e}{Colors.ENDC}")
+        return False
+    print(f"{Colors.GREEN}[Metrics] http://{METRICS_HTTP_HOST}:{METRICS_HTTP_PORT}/metrics{Colors.ENDC}")
+    return True
+
+
 # ═══════════════════════════════════════════════════════════════════════
 # SECTION 20: 메인 함수 (★ v36 — 인스턴스 생성 + 초기 스크리닝)
 # ═══════════════════════════════════════════════════════════════════════
 
 def main():
-    """★ v36 핵심: 4개 신규 인스턴스 생성 → 동기화 → 초기 스크리닝 → 스레드 시작"""
-    global upbit, ema_tracker, screener, buy_engine, sell_engine
+    """★ v36 핵심: 인스턴스 생성 → 스냅샷 복원 → WS 기동 → 보유 동기화 → 매도 스레드 → 병렬 초기화"""
+    global upbit, ema_tracker, screener, buy_engine, sell_engine, private_stream
+    global candle_store, trade_ledger
 
     print(_STARTUP_BANNER)
+    boot_t0 = time.time()
+    warm_start_stats['boot_ts'] = boot_t0
 
     # ── 1. API 초기화 ──
     try:
@@ -4384,6 +6916,10 @@ def main():
     except Exception as e:
         print(f"{Colors.RED}[Error] API 연결 실패: {e}{Colors.ENDC}")
         return
+    if CANDLE_STORE_ENABLED:
+        candle_store = get_candle_store()
+    if TRADE_LEDGER_ENABLED:
+        trade_ledger = get_trade_ledger("test" if TEST_MODE else "live")
 
     # ── 2. ★ v36 핵심: 신규 인스턴스 4개 생성 ──
     print(f"{Colors.CYAN}[Init] v36 핵심 인스턴스 생성...{Colors.ENDC}")
@@ -4394,33 +6930,59 @@ def main():
     print(f"{Colors.GREEN}[Init] EMA4HTracker / MarketWideScreener / "
           f"EMATrendBuyEngine / TrendSellEngine ✅{Colors.ENDC}\n")
 
-    # ── 3. 보유 코인 동기화 (sell_engine + ema_tracker 자동 등록) ──
+    # ── 3. 디스크 스냅샷 복원 (4H EMA — 캔들은 로컬 캔들 DB가 누락 봉만 조회) ──
+    restored = ema_tracker.load_snapshot(WARM_SNAPSHOT_PATH)
+    if restored:
+        print(f"{Colors.GREEN}[Init] EMA4H 스냅샷 복원: {restored}코인{Colors.ENDC}")
+
+    # ── 4. WebSocket 먼저 기동 (연결/구독은 아래 REST 초기화와 병행) ──
+    start_metrics_server()
+    work_scheduler.start()
+    ws_thread = threading.Thread(target=websocket_thread_worker, name="WS", daemon=True)
+    ws_thread.start()
+    if account_cache is not None and not TEST_MODE:
+        # 비공개 스트림 (myAsset/myOrder) — 연결 후 첫 잔고 조회가 REST 시드
+        private_stream = PrivateStreamClient(token_fn=upbit._make_jwt_token)
+        private_stream.add_listener(account_cache)
+        if order_tracker is not None:
+            private_stream.add_listener(order_tracker)
+        private_stream.start()
+
+    # ── 5. 보유 코인 동기화 (sell_engine 등록 + ema_tracker 병렬 적재) ──
     print(f"{Colors.CYAN}[Init] 기존 보유 코인 동기화 중...{Colors.ENDC}")
     sync_success = sync_held_coins_with_exchange()
     if not sync_success:
         print(f"{Colors.YELLOW}[Warning] 동기화 실패 - 계속 진행{Colors.ENDC}\n")
+    ws_subscription_manager.update()   # 보유 코인 구독 (연결 전이면 on_open이 반영)
+    restored_sells = restore_recent_sells_from_ledger()
+    if restored_sells:
+        print(f"{Colors.CYAN}[Init] 원장에서 재진입 쿨다운 복원: {restored_sells}개{Colors.ENDC}")
+
+    # ── 6. 보유 보호 즉시 시작: 매도 스레드 ──
+    sell_t = threading.Thread(target=sell_thread_worker, name="Sell", daemon=True)
+    sell_t.start()
+    print(f"{Colors.GREEN}[Init] 매도 스레드 시작 (기동 후 {time.time() - boot_t0:.1f}초){Colors.ENDC}")
 
-    # ── 4. 5분봉 빌더 REST 초기화 (보유 코인 우선) ──
+    # ── 7. 5분봉 빌더 REST 초기화 (보유 코인 먼저 착수, 공용 토큰 버킷 안에서 병렬) ──
     print(f"{Colors.CYAN}[Init] 5분봉 빌더 REST 초기화 중...{Colors.ENDC}")
-    init_count = 0
-    init_targets = list(held_coins.keys()) + ALWAYS_MONITOR
-    init_targets = list(set(init_targets))
+    with held_coins_lock:
+        held_list = list(held_coins.keys())
+    init_targets = list(dict.fromkeys(held_list + ALWAYS_MONITOR))
     if not init_targets:
         # 보유 없으면 BTC 하나만 초기화 (시장 안정성 측정용)
         init_targets = ['KRW-BTC']
 
-    for ticker in init_targets:
-        if _init_ws_candle_from_rest(ticker):
-            init_count += 1
-            if DEBUG_MODE:
-                print(f"  ✅ {ticker.replace('KRW-', '')} 5분봉 {WS_CANDLE_HISTORY_SIZE}개 로드")
-        else:
+    init_results = _run_parallel(_init_ws_candle_from_rest, init_targets)
+    init_count = sum(1 for ok in init_results.values() if ok)
+    for ticker, ok in init_results.items():
+        if not ok:
             print(f"  ❌ {ticker.replace('KRW-', '')} 5분봉 초기화 실패 (REST 폴백 사용)")
-        time.sleep(0.2)
+        elif DEBUG_MODE:
+            print(f"  ✅ {ticker.replace('KRW-', '')} 5분봉 {WS_CANDLE_HISTORY_SIZE}개 로드")
     print(f"{Colors.GREEN}[Init] 5분봉 빌더 초기화 완료 ({init_count}/{len(init_targets)}){Colors.ENDC}\n")
 
-    # ── 5. 초기 자산 보고 ──
-    send_startup_asset_report()
+    # ── 8. 초기 자산 보고 (백그라운드) ──
+    threading.Thread(target=send_startup_asset_report, name="AssetReport", daemon=True).start()
 
     with held_coins_lock:
         synced_coins = len(held_coins)
@@ -4431,29 +6993,9 @@ def main():
         init_krw = 0.0
     can_buy_now = init_krw >= MIN_BUY_AMOUNT_KRW
 
-    # ── 6. ★ v36 핵심: 초기 스크리닝 (매시 정각 대기 안 함) ──
-    print(f"{Colors.CYAN}[Init] 마켓 와이드 초기 스크리닝...{Colors.ENDC}")
-    try:
-        initial_candidates = screener.run_full_screening()
-        if initial_candidates:
-            buy_engine.register_candidates(initial_candidates)
-        else:
-            print(f"{Colors.YELLOW}[Init] 초기 스크리닝 통과 코인 0개 (다음 정각 재시도){Colors.ENDC}")
-    except Exception as e:
-        print(f"{Colors.RED}[Init] 초기 스크리닝 실패: {e}{Colors.ENDC}")
-        if DEBUG_MODE:
-            traceback.print_exc()
-
-    # ── 7. WebSocket 시작 ──
-    ws_thread = threading.Thread(target=websocket_thread_worker, name="WS", daemon=True)
-    ws_thread.start()
-    print(f"{Colors.CYAN}[Init] WebSocket 연결 대기...{Colors.ENDC}")
-    ws_wait = time.time()
-    while time.time() - ws_wait < 5.0:
-        with ws_status_lock:
-            if ws_status['connected']:
-                break
-        time.sleep(0.2)
+    # ── 9. ★ v36 핵심: 초기 스크리닝 (스케줄러 SCREEN 작업 — 결과는 매수엔진/WS 구독에 반영) ──
+    print(f"{Colors.CYAN}[Init] 마켓 와이드 초기 스크리닝 제출 (백그라운드){Colors.ENDC}")
+    work_scheduler.submit(PRIO_SCREEN, _run_scheduled_screening, name="screening")
 
     with ws_status_lock:
         ws_ok = ws_status['connected']
@@ -4464,7 +7006,7 @@ def main():
     else:
         print(f"{Colors.YELLOW}[Init] WebSocket ⏳ 연결 중 (REST fallback){Colors.ENDC}\n")
 
-    # ── 8. Discord 시작 알림 ──
+    # ── 10. Discord 시작 알림 ──
     buy_mode_str = (
         f"✅ 매수 활성 (`{init_krw:,.0f}원`)"
         if can_buy_now
@@ -4476,10 +7018,11 @@ def main():
         f"**모드:** `{'TEST MODE' if TEST_MODE else 'LIVE MODE'}`\n"
         f"**최대 보유:** `{MAX_HOLDINGS}개`\n"
         f"**동기화 코인:** `{synced_coins}개`\n"
-        f"**매수 후보:** `{candidate_count}개` (마켓 와이드 스크리닝)\n"
+        f"**매수 후보:** `{candidate_count}개` (초기 스크리닝 진행 중)\n"
         f"**5분봉 빌더:** `{init_count}/{len(init_targets)}개 준비`\n"
         f"**현금 상태:** {buy_mode_str}\n"
-        f"**WebSocket:** `{'✅ 연결됨' if ws_ok else '⏳ 연결 중'}`\n\n"
+        f"**WebSocket:** `{'✅ 연결됨' if ws_ok else '⏳ 연결 중'}`\n"
+        f"**웜 스타트:** `첫 매도 점검 {_format_first_sell_check()}`\n\n"
         f"**v36 핵심 변경:**\n"
         f"├ ✅ 시간 청산 완전 제거\n"
         f"├ ✅ price_predictor 폐기\n"
@@ -4490,20 +7033,21 @@ def main():
     )
     send_discord_message(start_msg)
 
-    # ── 9. 스레드 시작 ──
+    # ── 11. 나머지 스레드 시작 (매도 스레드는 6단계에서 시작) ──
     buy_t = threading.Thread(target=buy_thread_worker, name="Buy", daemon=True)
-    sell_t = threading.Thread(target=sell_thread_worker, name="Sell", daemon=True)
     monitor_t = threading.Thread(target=monitor_thread_worker, name="Monitor", daemon=True)
+    ema4h_t = threading.Thread(target=ema_4h_close_thread_worker, name="EMA4H", daemon=True)
+    screen_t = threading.Thread(target=screening_thread_worker, name="Screen", daemon=True)
 
     buy_t.start()
-    time.sleep(1)
-    sell_t.start()
-    time.sleep(1)
     monitor_t.start()
+    ema4h_t.start()
+    screen_t.start()
 
-    print(f"{Colors.GREEN}[Main] 모든 v36 스레드 시작 완료 (Thread 1~4){Colors.ENDC}\n")
+    print(f"{Colors.GREEN}[Main] 모든 v36 스레드 시작 완료 (Thread 1~4) — "
+          f"기동 {time.time() - boot_t0:.1f}초{Colors.ENDC}\n")
 
-    # ── 10. 메인 루프 ──
+    # ── 12. 메인 루프 ──
     try:
         while True:
             time.sleep(1)
@@ -4515,6 +7059,7 @@ def main():
 
         stop_event.set()
 
+        ws_subscription_manager.close_all()
         with _ws_app_lock:
             if _ws_app:
                 try:
@@ -4527,6 +7072,15 @@ def main():
         buy_t.join(timeout=10)
         sell_t.join(timeout=10)
         monitor_t.join(timeout=10)
+        ema4h_t.join(timeout=2)
+        screen_t.join(timeout=2)
+        work_scheduler.stop()
+        if private_stream is not None:
+            private_stream.stop()
+        _save_warm_snapshot()
+        if position_journal is not None:
+            position_journal.checkpoint()
+            position_journal.close()
 
         runtime = format_duration(datetime.now() - start_time)
         with statistics_lock:
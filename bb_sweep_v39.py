@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ═══════════════════════════════════════════════════════════════════════
+# BB Sweep v39 — 매도 엔진 상수 파라미터 스윕 (멀티프로세스 백테스트)
+# ═══════════════════════════════════════════════════════════════════════
+"""
+DAE_TIERS / RATCHET_STOP_TIERS / ATR_TRAIL_K_MULT / SPIKE_BAR_* / TIME_ZONE_POLICY 등
+봇 모듈 상수 조합을 그리드 또는 랜덤 탐색으로 백테스트해 결과 표로 정리.
+
+[해결 문제]
+DAE 거리 임계는 TOKAMAK 30일 1회 분석, 래칫/ATR 트레일/Spike/시간대 정책은 수작업 튜닝.
+bb_backtest_v39로 1개 설정은 검증 가능하지만 수천 개 조합을 돌릴 방법이 없었음.
+
+[설계]
+  1. 탐색 공간
+     - 키: 봇 모듈 상수 이름, 중첩 값은 점 경로 (dict 키 / list·tuple 인덱스)
+         "ATR_TRAIL_K_MULT"                      → 값 전체 교체
+         "DAE_TIERS.0.0"                         → T6 거리 임계
+         "TIME_ZONE_POLICY.GLOBAL_PEAK.trail_mult"
+     - 값: 후보 리스트 (그리드 = 데카르트 곱, 랜덤 = 독립 추출)
+           또는 {"uniform": [lo, hi]} (랜덤 전용 연속 구간)
+     - 상수는 호출 시점에 모듈 전역에서 읽히므로 setattr 교체로 반영
+       (기본 인자로 묶인 상수, 지표 기간 상수는 대상 아님)
+
+  2. 데이터 공유
+     - 원본 OHLCV를 (티커, 시간봉)별 .npy 메모리 맵으로 한 번 기록 → 워커는 mmap으로 열기만 함
+       (프로세스 풀로 DataFrame 피클 전송 없음)
+     - 워커 초기화 시 재생 배열(_TickerSeries) 1회 생성, 이후 모든 설정에서 재사용
+
+  3. 실행
+     - ProcessPoolExecutor(기본 CPU 수), 설정 1개 = 작업 1개
+     - 워커는 설정 적용 → Backtester.run() → 원래 상수 복원
+
+  4. 결과
+     - 설정별 1행: 파라미터 + 기대값/승률/MDD/수익률/거래 수 + 매도 사유별 건수(n_<카테고리>)
+     - sort_by 지정 컬럼 기준 정렬, CSV 저장
+
+[사용 예시]
+
+    data = load_csv_dir("./market_data", ["KRW-ETH", "KRW-XRP", "KRW-BTC"])
+    table = run_sweep(data, {"ATR_TRAIL_K_MULT": [2.0, 3.0], "DAE_TIERS.0.0": [3.0, 4.0]})
+    print(table.head(20))
+
+    # CLI (space.json = 위와 같은 dict)
+    python bb_sweep_v39.py --csv-dir ./market_data --space space.json --workers 16 --out sweep.csv
+    python bb_sweep_v39.py --csv-dir ./market_data --random 2000 --seed 7 --sort expectancy_pct
+"""
+
+import argparse
+import copy
+import itertools
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import bb_backtest_v39 as bt
+import bb_bounce_hunter_v39 as bot
+
+
+# ============================================================================
+# SECTION 1: 기본 설정
+# ============================================================================
+
+# --space 생략 시 탐색 공간 (4×3×3×3×3×3 = 972개)
+DEFAULT_SWEEP_SPACE = {
+    "ATR_TRAIL_K_MULT": [2.0, 2.5, 3.0, 3.5],
+    "SPIKE_BAR_ATR_MULTIPLE": [1.5, 2.0, 2.5],
+    "SPIKE_BAR_DELAY_SEC": [180, 300, 600],
+    "DAE_TIERS.0.0": [3.0, 4.0, 5.0],
+    "RATCHET_STOP_TIERS.3.1": [0.0, 0.5, 1.0],
+    "TIME_ZONE_POLICY.GLOBAL_PEAK.trail_mult": [1.0, 1.3, 1.6],
+}
+
+DEFAULT_SORT = "expectancy_pct"
+MMAP_COLUMNS = ("epoch", "open", "high", "low", "close", "volume", "value")
+MMAP_MANIFEST = "manifest.json"
+METRIC_COLUMNS = ("expectancy_pct", "expectancy_krw", "win_rate", "max_drawdown_pct",
+                  "return_pct", "closed_trades", "sells", "buys", "avg_profit_pct", "pnl_krw")
+
+
+# ============================================================================
+# SECTION 2: 상수 교체 (점 경로)
+# ============================================================================
+
+def _replace_path(value, keys: List[str], new):
+    """value의 keys 경로만 new로 바꾼 사본 (원본 객체는 수정하지 않음)"""
+    if not keys:
+        return new
+    k, rest = keys[0], keys[1:]
+    if isinstance(value, dict):
+        if k not in value:
+            raise KeyError(k)
+        out = dict(value)
+        out[k] = _replace_path(value[k], rest, new)
+        return out
+    if isinstance(value, (list, tuple)):
+        items = list(value)
+        i = int(k)
+        items[i] = _replace_path(items[i], rest, new)
+        return type(value)(items)
+    raise KeyError(k)
+
+
+def apply_overrides(overrides: Dict[str, object]) -> Dict[str, object]:
+    """봇 모듈 상수 교체 → 복원용 원래 값 {이름: 값}"""
+    saved: Dict[str, object] = {}
+    try:
+        for path, new in overrides.items():
+            name, *keys = path.split(".")
+            if not name.isupper() or not hasattr(bot, name):
+                raise KeyError(f"봇 모듈 상수 아님: {name}")
+            saved.setdefault(name, getattr(bot, name))
+            setattr(bot, name, _replace_path(getattr(bot, name), keys, new))
+    except Exception:
+        restore_overrides(saved)
+        raise
+    return saved
+
+
+def restore_overrides(saved: Dict[str, object]):
+    for name, value in saved.items():
+        setattr(bot, name, value)
+
+
+# ============================================================================
+# SECTION 3: 탐색 공간
+# ============================================================================
+
+def grid_configs(space: Dict[str, object]) -> List[dict]:
+    """후보 리스트의 데카르트 곱"""
+    for path, values in space.items():
+        if not isinstance(values, list):
+            raise ValueError(f"그리드 탐색은 후보 리스트만 지원: {path}")
+    names = list(space)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(space[n] for n in names))]
+
+
+def random_configs(space: Dict[str, object], n: int, seed: Optional[int] = None) -> List[dict]:
+    """파라미터별 독립 추출 n개 (중복 설정 제거)"""
+    rng = random.Random(seed)
+    seen, out = set(), []
+    for _ in range(n * 20):
+        if len(out) >= n:
+            break
+        cfg = {}
+        for path, spec in space.items():
+            if isinstance(spec, dict) and "uniform" in spec:
+                lo, hi = spec["uniform"]
+                cfg[path] = round(rng.uniform(lo, hi), 4)
+            else:
+                cfg[path] = copy.deepcopy(rng.choice(spec))
+        key = json.dumps(cfg, sort_keys=True, default=str)
+        if key not in seen:
+            seen.add(key)
+            out.append(cfg)
+    return out
+
+
+# ============================================================================
+# SECTION 4: 메모리 맵 데이터 공유
+# ============================================================================
+
+def export_memmap(data: Dict[str, Dict[str, pd.DataFrame]], path: str) -> str:
+    """{ticker: {tf: DataFrame}} → (티커, 시간봉)별 .npy (epoch + OHLCV) + manifest"""
+    os.makedirs(path, exist_ok=True)
+    manifest = []
+    for ticker, frames in data.items():
+        for tf, df in frames.items():
+            if df is None or df.empty:
+                continue
+            fname = f"{ticker}_{tf}.npy"
+            arr = np.lib.format.open_memmap(os.path.join(path, fname), mode="w+",
+                                            dtype=np.float64, shape=(len(df), len(MMAP_COLUMNS)))
+            arr[:, 0] = bt._kst_index_to_epoch(df.index)
+            for j, col in enumerate(MMAP_COLUMNS[1:], start=1):
+                arr[:, j] = df[col].to_numpy(dtype=float)
+            arr.flush()
+            del arr
+            manifest.append([ticker, tf, fname])
+    with open(os.path.join(path, MMAP_MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    return path
+
+
+def load_memmap(path: str) -> Dict[str, Dict[str, pd.DataFrame]]:
+    """export_memmap 디렉터리 → {ticker: {tf: DataFrame}} (열 데이터는 읽기 전용 mmap)"""
+    with open(os.path.join(path, MMAP_MANIFEST), encoding="utf-8") as f:
+        manifest = json.load(f)
+    data: Dict[str, Dict[str, pd.DataFrame]] = {}
+    for ticker, tf, fname in manifest:
+        arr = np.load(os.path.join(path, fname), mmap_mode="r")
+        index = bt._epoch_to_kst_index(arr[:, 0].astype(np.int64))
+        data.setdefault(ticker, {})[tf] = pd.DataFrame(
+            {col: arr[:, j] for j, col in enumerate(MMAP_COLUMNS) if j > 0}, index=index)
+    return data
+
+
+# ============================================================================
+# SECTION 5: 워커
+# ============================================================================
+
+_worker_series: Optional[dict] = None
+_worker_kwargs: dict = {}
+
+
+def _worker_init(mmap_dir: str, bt_kwargs: dict):
+    """워커 프로세스 1회: mmap 열기 + 재생 배열 생성"""
+    global _worker_series, _worker_kwargs
+    data = load_memmap(mmap_dir)
+    _worker_series = {tk: bt._TickerSeries(tk, fr) for tk, fr in data.items()
+                      if fr.get(bt.BASE_TF) is not None and len(fr[bt.BASE_TF]) > 0}
+    _worker_kwargs = dict(bt_kwargs)
+
+
+def _result_row(config_id: int, cfg: dict, result: "bt.BacktestResult") -> dict:
+    m = result.metrics()
+    row = {"config_id": config_id, **cfg}
+    row.update({k: m[k] for k in METRIC_COLUMNS})
+    cat = result.by_category()
+    for name, r in cat.iterrows():
+        row[f"n_{name}"] = int(r["trades"])
+    row["elapsed_sec"] = m["elapsed_sec"]
+    return row
+
+
+def _worker_run(config_id: int, cfg: dict) -> dict:
+    saved = {}
+    try:
+        saved = apply_overrides(cfg)
+        result = bt.Backtester(None, series=_worker_series, quiet=True, **_worker_kwargs).run()
+        return _result_row(config_id, cfg, result)
+    except Exception as e:
+        return {"config_id": config_id, **cfg, "error": f"{type(e).__name__}: {e}"}
+    finally:
+        restore_overrides(saved)
+
+
+# ============================================================================
+# SECTION 6: 스윕
+# ============================================================================
+
+def _table(rows: List[dict], sort_by: str) -> pd.DataFrame:
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+    n_cols = sorted(c for c in df.columns if c.startswith("n_"))
+    if n_cols:
+        df[n_cols] = df[n_cols].fillna(0).astype(int)
+    tail = [c for c in ("elapsed_sec", "error") if c in df.columns]
+    df = df[[c for c in df.columns if c not in n_cols and c not in tail] + n_cols + tail]
+    # 리스트/튜플 값(티어 전체 교체 등)은 정렬/CSV용 문자열로
+    for c in df.columns:
+        if df[c].map(lambda v: isinstance(v, (list, tuple, dict))).any():
+            df[c] = df[c].map(json.dumps)
+    if sort_by in df.columns:
+        df = df.sort_values(sort_by, ascending=(sort_by == "max_drawdown_pct"), kind="stable")
+    return df.reset_index(drop=True)
+
+
+def run_sweep(data: Dict[str, Dict[str, pd.DataFrame]], space: Optional[Dict[str, object]] = None,
+              configs: Optional[List[dict]] = None, workers: Optional[int] = None,
+              sort_by: str = DEFAULT_SORT, mmap_dir: Optional[str] = None,
+              progress: bool = True, **bt_kwargs) -> pd.DataFrame:
+    """
+    설정 목록(없으면 space 그리드) 병렬 백테스트 → 결과 표.
+    bt_kwargs는 Backtester 인자 (initial_cash, fee_rate, slippage_bps, start, end).
+    """
+    if configs is None:
+        configs = grid_configs(space or DEFAULT_SWEEP_SPACE)
+    for cfg in configs[:1]:
+        restore_overrides(apply_overrides(cfg))      # 잘못된 경로는 풀 기동 전에 실패
+    workers = workers or os.cpu_count() or 1
+    own_dir = mmap_dir is None
+    mmap_dir = mmap_dir or tempfile.mkdtemp(prefix="bb_sweep_")
+    t0 = time.perf_counter()
+    rows = []
+    try:
+        export_memmap(data, mmap_dir)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_worker_init,
+                                 initargs=(mmap_dir, bt_kwargs)) as pool:
+            futures = [pool.submit(_worker_run, i, cfg) for i, cfg in enumerate(configs)]
+            for done, fut in enumerate(as_completed(futures), 1):
+                rows.append(fut.result())
+                if progress and (done % max(1, len(configs) // 20) == 0 or done == len(configs)):
+                    el = time.perf_counter() - t0
+                    print(f"{bot.Colors.CYAN}[스윕] {done}/{len(configs)} "
+                          f"({el:.0f}초, 잔여 약 {el / done * (len(configs) - done):.0f}초){bot.Colors.ENDC}")
+    finally:
+        if own_dir:
+            shutil.rmtree(mmap_dir, ignore_errors=True)
+    return _table(rows, sort_by)
+
+
+# ============================================================================
+# SECTION 7: CLI
+# ============================================================================
+
+def _load_space(arg: Optional[str]) -> Dict[str, object]:
+    if not arg:
+        return DEFAULT_SWEEP_SPACE
+    if os.path.exists(arg):
+        with open(arg, encoding="utf-8") as f:
+            return json.load(f)
+    return json.loads(arg)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="v39 매도 엔진 상수 파라미터 스윕")
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--csv-dir", help="crypto_data_downloader_v3 CSV 폴더")
+    src.add_argument("--store", action="store_true", help="로컬 캔들 DB 사용")
+    ap.add_argument("--tickers", help="쉼표 구분 (예: KRW-ETH,KRW-BTC)")
+    ap.add_argument("--space", help="탐색 공간 JSON 파일 또는 문자열 (생략 시 기본 공간)")
+    ap.add_argument("--random", type=int, help="랜덤 탐색 설정 수 (생략 시 그리드)")
+    ap.add_argument("--seed", type=int)
+    ap.add_argument("--workers", type=int, help="프로세스 수 (기본 CPU 수)")
+    ap.add_argument("--start", help="KST YYYY-MM-DD")
+    ap.add_argument("--end", help="KST YYYY-MM-DD (미포함)")
+    ap.add_argument("--days", type=int, help="--store: 종료일(기본 현재) 이전 N일 재생")
+    ap.add_argument("--cash", type=float, default=bt.DEFAULT_INITIAL_CASH)
+    ap.add_argument("--fee", type=float, default=bt.DEFAULT_FEE_RATE)
+    ap.add_argument("--slippage-bps", type=float, default=bt.DEFAULT_SLIPPAGE_BPS)
+    ap.add_argument("--sort", default=DEFAULT_SORT, help="정렬 컬럼 (max_drawdown_pct는 오름차순)")
+    ap.add_argument("--top", type=int, default=20, help="출력 행 수")
+    ap.add_argument("--out", help="결과 표 CSV 저장 경로")
+    args = ap.parse_args(argv)
+
+    tickers = [t.strip() for t in args.tickers.split(",")] if args.tickers else None
+    start, end = bt._parse_date(args.start), bt._parse_date(args.end)
+    if args.days and start is None:
+        start = (end or datetime.now()) - timedelta(days=args.days)
+    if args.csv_dir:
+        data = bt.load_csv_dir(args.csv_dir, tickers)
+    else:
+        if not tickers:
+            ap.error("--store는 --tickers 필요")
+        data = bt.load_from_store(tickers, end=end)
+
+    space = _load_space(args.space)
+    configs = random_configs(space, args.random, args.seed) if args.random else grid_configs(space)
+    print(f"{bot.Colors.CYAN}[스윕] {len(data)}개 티커, 설정 {len(configs)}개, "
+          f"프로세스 {args.workers or os.cpu_count()}개{bot.Colors.ENDC}")
+
+    table = run_sweep(data, configs=configs, workers=args.workers, sort_by=args.sort,
+                      initial_cash=args.cash, fee_rate=args.fee,
+                      slippage_bps=args.slippage_bps, start=start, end=end)
+    with pd.option_context("display.width", 200, "display.max_columns", 40):
+        print(table.head(args.top).to_string())
+    if args.out:
+        table.to_csv(args.out, encoding="utf-8-sig", index=False)
+        print(f"{bot.Colors.GREEN}[스윕] 결과 표 저장: {args.out}{bot.Colors.ENDC}")
+
+
+if __name__ == "__main__":
+    main()
@@ -28,6 +28,9 @@ import os
 import sys
 from datetime import datetime, timedelta
 
+from upbit_rate_limiter import PRIORITY_BULK, get_rate_limiter
+from upbit_candle_store import get_candle_store
+
 
 # ============================================================================
 # SECTION 1: 기본 설정
@@ -42,8 +45,8 @@ ALL_TICKERS = [
     "KRW-ADA", "KRW-LINK", "KRW-BCH", "KRW-SUI"
 ]
 
-# Rate Limit 설정 (Upbit 공식: 초당 10 req, 여유 포함 8 req)
-API_CALL_MIN_INTERVAL = 0.13   # 초 (≈ 7.7 req/sec)
+# Rate Limit 설정 (Upbit 공식: 초당 10 req — 실제 제한은 upbit_rate_limiter 공용 버킷)
+API_CALL_MIN_INTERVAL = 0.13   # 초 (≈ 7.7 req/sec, 소요 시간 추정용)
 MAX_PER_CALL          = 200    # Upbit 1회 최대 캔들 수
 MAX_RETRIES           = 5
 RETRY_DELAY           = 2.0    # 초
@@ -125,15 +128,11 @@ def create_output_directory():
 # SECTION 3: Upbit 공식 REST API 클라이언트 (인증 불필요 - Public API)
 # ============================================================================
 
-_last_api_call_time = 0.0
+_rate_limiter = get_rate_limiter()
 
 def _rate_limit():
-    """Rate Limit 자동 조절"""
-    global _last_api_call_time
-    elapsed = time.time() - _last_api_call_time
-    if elapsed < API_CALL_MIN_INTERVAL:
-        time.sleep(API_CALL_MIN_INTERVAL - elapsed)
-    _last_api_call_time = time.time()
+    """Rate Limit 자동 조절 — 공용 토큰 버킷 (candles 그룹, 대량 조회 우선순위)"""
+    _rate_limiter.acquire("candles", PRIORITY_BULK)
 
 
 def fetch_candles(ticker: str, interval_key: str, count: int = 200, to: str = None) -> list:
@@ -153,20 +152,18 @@ def fetch_candles(ticker: str, interval_key: str, count: int = 200, to: str = No
     if to:
         params['to'] = to
 
-    _rate_limit()
-
     for attempt in range(1, MAX_RETRIES + 1):
         try:
+            _rate_limit()
             resp = requests.get(url, params=params, timeout=15)
+            _rate_limiter.on_response(resp, "candles")
 
             if resp.status_code == 200:
                 return resp.json()
 
             elif resp.status_code == 429:
-                # Rate Limit 초과
-                wait = min(30, 5 * attempt)
-                print(f"\n  {Colors.YELLOW}[Rate Limit] {wait}초 대기...{Colors.ENDC}", end="")
-                time.sleep(wait)
+                # Rate Limit 초과 — 제한기가 그룹 버킷을 백오프 동안 정지
+                print(f"\n  {Colors.YELLOW}[Rate Limit] 백오프 대기...{Colors.ENDC}", end="")
                 continue
 
             else:
@@ -222,81 +219,40 @@ def fetch_ohlcv_paginated(ticker: str, interval_key: str, target_count: int,
     """
     coin_name    = ticker.replace('KRW-', '')
     interval_name = AVAILABLE_INTERVALS[interval_key]['name']
-    total_calls  = calculate_api_calls(target_count)
-
-    if verbose:
-        print(f"\n  📥 {coin_name} {interval_name} 수집 (목표: {target_count:,}개 / {total_calls}회 호출)")
-
-    all_candles  = []
-    collected    = 0
-    remaining    = target_count
-    current_to   = None
-    call_count   = 0
+    interval_code = AVAILABLE_INTERVALS[interval_key]['code']
+    store        = get_candle_store()
+    pages_before = store.rest_pages
     start_ts     = time.time()
 
-    while remaining > 0:
-        batch = min(remaining, MAX_PER_CALL)
-        candles = fetch_candles(ticker, interval_key, batch, current_to)
-
-        if not candles:
-            if collected == 0:
-                print(f"\n  {Colors.RED}데이터 수집 실패 ({ticker}){Colors.ENDC}")
-                return None
-            break  # 더 이상 데이터 없음 (상장일 도달)
+    if verbose:
+        _, _, have = store.bounds(ticker, interval_code)
+        need_calls = calculate_api_calls(max(target_count - have, 0)) + 1
+        print(f"\n  📥 {coin_name} {interval_name} 수집 (목표: {target_count:,}개 / "
+              f"로컬 DB {have:,}개 / 약 {need_calls}회 호출)")
 
-        all_candles.extend(candles)
-        collected  += len(candles)
-        remaining  -= len(candles)
-        call_count += 1
+    def fetch_page(market, _interval, count, to):
+        return fetch_candles(market, interval_key, count, to)
 
+    def progress(done, total):
         if verbose:
+            calls = store.rest_pages - pages_before
             elapsed = time.time() - start_ts
-            eta = (elapsed / call_count * (total_calls - call_count)) if call_count > 0 else 0
-            print_progress(min(collected, target_count), target_count,
-                           f"{collected:,}개", eta_sec=eta)
-
-        # 다음 페이지 기준 시각 (마지막 캔들의 시각 - 1초)
-        last_candle = candles[-1]
-        last_dt_str = last_candle.get('candle_date_time_utc', '')
-        if not last_dt_str:
-            break
+            eta = elapsed / calls * max(calculate_api_calls(total) - calls, 0) if calls else 0
+            print_progress(min(done, total), total, f"{done:,}개", eta_sec=eta)
 
-        # UTC ISO 형식으로 to 파라미터 설정
-        try:
-            last_dt = datetime.strptime(last_dt_str, '%Y-%m-%dT%H:%M:%S')
-            current_to = (last_dt - timedelta(seconds=1)).strftime('%Y-%m-%dT%H:%M:%S')
-        except Exception:
-            break
-
-        # 배치가 최대치 미만이면 더 이상 데이터 없음 (상장일 도달)
-        if len(candles) < batch:
-            if verbose:
-                print(f"\n  {Colors.CYAN}ℹ️  상장일 도달 (실제 수집: {collected:,}개){Colors.ENDC}", end="")
-            break
-
-    if verbose:
-        print()  # 줄바꿈
+    # 로컬 캔들 DB에서 최신 구간만 증분 조회, 부족한 과거 구간은 이어 받음 (상장일 도달 시 기록)
+    df = store.get_candles(ticker, interval_code, target_count,
+                           fetch_page=fetch_page, progress=progress)
 
-    if not all_candles:
+    if df is None or df.empty:
+        print(f"\n  {Colors.RED}데이터 수집 실패 ({ticker}){Colors.ENDC}")
         return None
 
-    # ── DataFrame 변환 ──
-    rows = [{
-        'datetime': c.get('candle_date_time_kst', c.get('candle_date_time_utc', '')),
-        'open':   c.get('opening_price', 0.0),
-        'high':   c.get('high_price', 0.0),
-        'low':    c.get('low_price', 0.0),
-        'close':  c.get('trade_price', 0.0),
-        'volume': c.get('candle_acc_trade_volume', 0.0),
-        'value':  c.get('candle_acc_trade_price', 0.0),
-    } for c in all_candles]
-
-    df = pd.DataFrame(rows)
-    df['datetime'] = pd.to_datetime(df['datetime'])
-    df = df.set_index('datetime').sort_index(ascending=True)
+    if verbose:
+        print(f"\n  {Colors.CYAN}ℹ️  {len(df):,}개 (REST {store.rest_pages - pages_before}회"
+              f"{', 상장일 도달' if len(df) < target_count else ''}){Colors.ENDC}")
 
     # 데이터 품질 처리
-    df = df[~df.index.duplicated(keep='last')]  # 중복 제거
     df = df[df['close'] > 0]                    # 이상치 제거
 
     return df
@@ -27,6 +27,9 @@ import requests, numpy as np, pandas as pd
 from datetime import datetime, timedelta
 from threading import Lock
 
+from upbit_rate_limiter import PRIORITY_BULK, get_rate_limiter
+from upbit_candle_store import get_candle_store
+
 warnings.filterwarnings('ignore')
 
 try:
@@ -54,7 +57,6 @@ TARGET_COINS = ["KRW-ETH", "KRW-XRP", "KRW-SOL"]
 MULTI_S2_TOP_N = 2   # Stage 2는 상위 N개 코인만 실행 (시간 절약)
 
 UPBIT_API_BASE  = "https://api.upbit.com"
-API_INTERVAL    = 0.13
 MAX_RETRIES     = 3
 
 BB_PERIOD       = 20
@@ -143,7 +145,6 @@ FEATURE_PRUNE_ENABLED = True
 FEATURE_PRUNE_MIN_IMPORTANCE = 0.02
 
 _predict_lock = Lock()
-_last_api_t   = 0.0
 
 
 # ============================================================================
@@ -166,70 +167,43 @@ def pi(t):  print(f"{C.BLUE}  ℹ️  {t}{C.END}")
 # SECTION 3: Upbit REST API (15분봉)
 # ============================================================================
 
+_rate_limiter = get_rate_limiter()
+
+
 def _rate_limit():
-    global _last_api_t
-    elapsed = time.time() - _last_api_t
-    if elapsed < API_INTERVAL:
-        time.sleep(API_INTERVAL - elapsed)
-    _last_api_t = time.time()
+    _rate_limiter.acquire("candles", PRIORITY_BULK)
 
 
-def fetch_candles_15m(ticker: str, count: int, to: str = None):
-    """Upbit 15분봉 수집 (페이지네이션)"""
+def _fetch_page_15m(ticker: str, interval: str, count: int, to: str = None):
+    """Upbit 15분봉 1페이지 (≤200개, 최신순) — 재시도 포함, 실패 시 None"""
     url = f"{UPBIT_API_BASE}/v1/candles/minutes/15"
-    all_c, remaining, cur_to = [], count, to
-
-    while remaining > 0:
-        batch = min(remaining, 200)
-        params = {'market': ticker, 'count': batch}
-        if cur_to:
-            params['to'] = cur_to
-        _rate_limit()
-        fetched = None
-        for attempt in range(1, MAX_RETRIES + 1):
-            try:
-                r = requests.get(url, params=params, timeout=10)
-                if r.status_code == 200:
-                    fetched = r.json(); break
-                elif r.status_code == 429:
-                    time.sleep(5 * attempt)
-                else:
-                    time.sleep(1 * attempt)
-            except Exception:
-                time.sleep(2 * attempt)
-        if not fetched:
-            break
-        all_c.extend(fetched)
-        remaining -= len(fetched)
-        if len(fetched) < batch:
-            break
-        last_dt = fetched[-1].get('candle_date_time_utc', '')
-        if not last_dt:
-            break
+    params = {'market': ticker, 'count': count}
+    if to:
+        params['to'] = to
+    for attempt in range(1, MAX_RETRIES + 1):
         try:
-            dt_obj = datetime.strptime(last_dt, '%Y-%m-%dT%H:%M:%S')
-            cur_to = (dt_obj - timedelta(seconds=1)).strftime('%Y-%m-%dT%H:%M:%S')
+            _rate_limit()
+            r = requests.get(url, params=params, timeout=10)
+            _rate_limiter.on_response(r, "candles")
+            if r.status_code == 200:
+                return r.json()
+            elif r.status_code == 429:
+                continue
+            else:
+                time.sleep(1 * attempt)
         except Exception:
-            break
+            time.sleep(2 * attempt)
+    return None
 
-    if not all_c:
-        return None
 
-    rows = [{
-        'datetime': c.get('candle_date_time_kst', ''),
-        'open':     c.get('opening_price', 0.0),
-        'high':     c.get('high_price', 0.0),
-        'low':      c.get('low_price', 0.0),
-        'close':    c.get('trade_price', 0.0),
-        'volume':   c.get('candle_acc_trade_volume', 0.0),
-    } for c in all_c]
-
-    df = pd.DataFrame(rows)
-    df['datetime'] = pd.to_datetime(df['datetime'])
-    df = df.set_index('datetime').sort_index()
-    df = df[~df.index.duplicated(keep='last')]
-    df = df[df['close'] > 0]
-    return df
+def fetch_candles_15m(ticker: str, count: int, to: str = None):
+    """Upbit 15분봉 수집 — 로컬 캔들 DB에 없는 구간만 REST 조회 (to: UTC, 미포함)"""
+    df = get_candle_store().get_candles(ticker, "minute15", count, to=to,
+                                        fetch_page=_fetch_page_15m)
+    if df is None or df.empty:
+        return None
+    df = df[['open', 'high', 'low', 'close', 'volume']]
+    return df[df['close'] > 0]
 
 
 def get_anchor_to_str(offset_bars: int) -> str:
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+테스트 공용 설정.
+
+- 저장소 루트를 import 경로에 추가 (봇/upbit_* 모듈을 패키지 없이 사용)
+- 봇 모듈이 읽는 데이터 경로(캔들 DB, 원장, 저널, 스냅샷)를 임시 디렉터리로 지정
+- host_tz: 호스트 시간대(TZ)를 바꿔 같은 테스트를 반복 — 시각 변환이 TZ에 의존하지 않는지 확인
+- rest_frame / wait_slot_margin: 실시간 슬롯 기준 REST 캔들 프레임 생성
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+_DATA_DIR = tempfile.mkdtemp(prefix="bb_tests_")
+for _key, _name in (("UPBIT_CANDLE_DB", "candles.db"), ("UPBIT_TRADE_LEDGER", "ledger.db"),
+                    ("BOT_POSITION_JOURNAL", "positions.journal"),
+                    ("BOT_WARM_SNAPSHOT", "ema4h_snapshot.npz")):
+    os.environ.setdefault(_key, os.path.join(_DATA_DIR, _name))
+
+HOST_TIMEZONES = ("UTC", "Asia/Seoul")
+
+
+def rest_frame(bar_sec, n, now):
+    """now가 속한 슬롯까지 n봉 — pyupbit와 같은 KST naive 인덱스"""
+    from upbit_market_provider import epoch_to_kst
+    last = epoch_to_kst(now // bar_sec * bar_sec)
+    idx = pd.date_range(end=last, periods=n, freq=f"{bar_sec}s")
+    close = 100 + np.arange(n, dtype=float)
+    return pd.DataFrame({"open": close, "high": close + 1, "low": close - 1,
+                         "close": close, "volume": 10.0}, index=idx)
+
+
+def wait_slot_margin(bar_sec, margin=10.0):
+    """봉 경계 margin초 이내면 경계를 넘길 때까지 대기 (테스트 도중 슬롯이 바뀌지 않도록)"""
+    left = bar_sec - time.time() % bar_sec
+    if left < margin:
+        time.sleep(left + 0.5)
+
+
+@pytest.fixture(params=HOST_TIMEZONES)
+def host_tz(request, monkeypatch):
+    monkeypatch.setenv("TZ", request.param)
+    time.tzset()
+    yield request.param
+    monkeypatch.undo()
+    time.tzset()
+
+
+@pytest.fixture(scope="session")
+def bot():
+    import bb_bounce_hunter_v39
+    return bb_bounce_hunter_v39
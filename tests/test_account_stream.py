@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""AccountStateCache / OrderFillTracker — 가짜 스트림으로 myAsset/myOrder 주입"""
+
+import json
+
+import pytest
+
+from upbit_account_stream import AccountStateCache, OrderFillTracker, PrivateStreamClient
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, data):
+        self.sent.append(json.loads(data))
+
+
+@pytest.fixture
+def stream():
+    """연결된 가짜 비공개 스트림 + 계정 캐시 + 체결 추적기"""
+    client = PrivateStreamClient(token_fn=lambda: "token")
+    cache, tracker = AccountStateCache(reconcile_sec=300), OrderFillTracker()
+    client.add_listener(cache)
+    client.add_listener(tracker)
+    ws = FakeSocket()
+    client._on_open(ws)
+    assert [s.get("type") for s in ws.sent[0][1:]] == ["myAsset", "myOrder"]
+    return client, ws, cache, tracker
+
+
+def _push(client, ws, msg):
+    client._on_message(ws, json.dumps(msg).encode("utf-8"))
+
+
+def _rest(krw, btc, avg=100.0):
+    return [{"currency": "KRW", "balance": str(krw), "locked": "0", "avg_buy_price": "0"},
+            {"currency": "BTC", "balance": str(btc), "locked": "0", "avg_buy_price": str(avg)}]
+
+
+def _by_currency(balances):
+    return {b["currency"]: b for b in balances}
+
+
+def test_rest_seed_does_not_roll_back_newer_ws_balance(stream):
+    client, ws, cache, _ = stream
+    version = cache.version()           # REST 요청 시작
+    _push(client, ws, {"type": "myAsset", "assets": [
+        {"currency": "KRW", "balance": 400.0, "locked": 0.0}]})
+    seeded = cache.seed_from_rest(_rest(krw=1000, btc=2), since_version=version)
+
+    assert _by_currency(seeded)["KRW"]["balance"] == 400.0
+    assert float(_by_currency(seeded)["BTC"]["balance"]) == 2.0
+    assert cache.balance("KRW") == 400.0
+
+    # 요청 이후 변화가 없으면 REST 값 그대로
+    cache.seed_from_rest(_rest(krw=900, btc=2), since_version=cache.version())
+    assert cache.balance("KRW") == 900.0
+
+
+def test_seed_started_before_reconnect_is_dropped(stream):
+    client, ws, cache, _ = stream
+    cache.seed_from_rest(_rest(krw=1000, btc=1), since_version=cache.version())
+    version = cache.version()
+    client._on_close(ws)
+    client._on_open(ws)
+
+    assert cache.seed_from_rest(_rest(krw=1000, btc=1), since_version=version) is None
+    assert cache.balances() is None
+    assert cache.get_stats()["stale_seeds"] == 1
+
+
+def test_order_stream_updates_avg_price_and_resolves_fill(stream):
+    client, ws, cache, tracker = stream
+    cache.seed_from_rest(_rest(krw=1000, btc=1, avg=100.0), since_version=cache.version())
+    fut = tracker.track("order-1")
+
+    _push(client, ws, {"type": "myOrder", "uuid": "order-1", "code": "KRW-BTC",
+                       "ask_bid": "BID", "state": "trade", "price": 200.0, "volume": 1.0})
+    assert not fut.done()
+    _push(client, ws, {"type": "myOrder", "uuid": "order-1", "code": "KRW-BTC",
+                       "ask_bid": "BID", "state": "done", "executed_volume": 1.0,
+                       "avg_price": 200.0, "paid_fee": 0.1})
+    _push(client, ws, {"type": "myAsset", "assets": [
+        {"currency": "BTC", "balance": 2.0, "locked": 0.0}]})
+
+    fill = tracker.wait(fut, timeout=1)
+    assert (fill["state"], fill["avg_price"], fill["executed_volume"]) == ("done", 200.0, 1.0)
+    btc = _by_currency(cache.balances())["BTC"]
+    assert (btc["balance"], btc["avg_buy_price"]) == (2.0, 150.0)
+
+
+def test_fill_arriving_before_order_response_is_buffered(stream):
+    client, ws, _, tracker = stream
+    _push(client, ws, {"type": "myOrder", "uuid": "order-2", "code": "KRW-BTC",
+                       "ask_bid": "ASK", "state": "done", "executed_volume": 0.5,
+                       "executed_funds": 50.0, "paid_fee": 0.0})
+    fill = tracker.wait(tracker.track("order-2"), timeout=0)
+    assert fill["avg_price"] == 100.0
+    assert tracker.get_stats()["pending"] == 0
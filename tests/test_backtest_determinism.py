@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""백테스터 결정성 — 같은 데이터는 호스트 시간대(TZ)와 무관하게 같은 결과"""
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from conftest import HOST_TIMEZONES
+
+# 매수 조건을 완화해 짧은 합성 데이터에서도 매수/매도 경로까지 재생
+LOOSE_BUY = {"BUY_BB_MAX_POSITION": 100, "BUY_RSI_MAX": 100, "BUY_VOL_RATIO_MIN": 0.3}
+
+
+def _write_csvs(path, coins=("BTC", "ETH", "XRP"), days=30):
+    rng = np.random.default_rng(1)
+    idx = pd.date_range("2026-01-01 09:00", periods=288 * days, freq="5min")
+    for i, coin in enumerate(coins):
+        ret = (rng.normal(0.00004 * (1 if i % 2 == 0 else -0.3), 0.003, len(idx))
+               + 0.002 * np.sin(np.arange(len(idx)) / 150))
+        close = 10000 * (i + 1) * np.exp(np.cumsum(ret))
+        op = np.r_[close[0], close[:-1]]
+        hi = np.maximum(op, close) * (1 + np.abs(rng.normal(0, 0.001, len(idx))))
+        lo = np.minimum(op, close) * (1 - np.abs(rng.normal(0, 0.001, len(idx))))
+        vol = rng.uniform(500, 1500, len(idx)) * 1e4 / (i + 1)
+        df = pd.DataFrame({"open": op, "high": hi, "low": lo, "close": close,
+                           "volume": vol, "value": vol * close}, index=idx)
+        df.index.name = "datetime"
+        df.to_csv(os.path.join(path, f"{coin}_minute5_{days}d_20260201_0000.csv"), encoding="utf-8-sig")
+
+
+def test_replay_is_independent_of_host_timezone(tmp_path, monkeypatch):
+    import bb_backtest_v39 as bt
+    import bb_sweep_v39 as sw
+
+    _write_csvs(str(tmp_path))
+    results = {}
+    saved = sw.apply_overrides(LOOSE_BUY)
+    try:
+        for tz in HOST_TIMEZONES:
+            monkeypatch.setenv("TZ", tz)
+            time.tzset()
+            results[tz] = bt.Backtester(bt.load_csv_dir(str(tmp_path))).run()
+    finally:
+        sw.restore_overrides(saved)
+        monkeypatch.undo()
+        time.tzset()
+
+    a, b = (results[tz] for tz in HOST_TIMEZONES)
+    assert a.ema_sync == b.ema_sync
+    assert a.ema_sync.get("stream", 0) > 0 and a.ema_sync.get("current", 0) == 0
+    pd.testing.assert_frame_equal(a.trades_df(), b.trades_df())
+    pd.testing.assert_series_equal(a.equity, b.equity)
+    assert a.metrics()["buys"] > 0
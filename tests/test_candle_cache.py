@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""CandleSeriesCache — 캐시 적중 시 WS 최신가로 진행 중 봉 패치"""
+
+import time
+
+from conftest import rest_frame, wait_slot_margin
+
+TICKER = "KRW-CACHETEST"
+
+
+def test_hit_patches_live_bar_with_ws_price(bot, host_tz, monkeypatch):
+    wait_slot_margin(900)
+    cache = bot.CandleSeriesCache()
+    raw = rest_frame(900, 60, time.time())
+    finish = lambda ticker, df: df.assign(finished=True)
+    cache.put(TICKER, "15m", raw, finish(TICKER, raw.copy()), 60)
+
+    monkeypatch.setattr(bot, "CANDLE_WS_PATCH", True)
+    monkeypatch.setattr(bot, "_ws_live_price", lambda ticker: 250.0)
+    monkeypatch.setattr(bot, "get_ohlcv", lambda *a, **k: None)    # 적중 경로 → REST 조회 없음
+
+    df = cache.get_or_fetch(TICKER, "15m", 30, finish, seed=False)
+    assert len(df) == 30 and df["finished"].all()
+    assert df["close"].iat[-1] == 250.0
+    assert df["high"].iat[-1] == 250.0
+    assert df["low"].iat[-1] == raw["low"].iat[-1]
+    assert df["close"].iat[-2] == raw["close"].iat[-2]
+    assert raw["close"].iat[-1] != 250.0                 # 원본 프레임은 그대로
+    assert cache.get_stats()["ws_patches"] == 1 and cache.get_stats()["hits"] == 1
+
+    # 같은 가격이면 다시 계산하지 않음
+    cache.get_or_fetch(TICKER, "15m", 30, finish, seed=False)
+    assert cache.get_stats()["ws_patches"] == 1
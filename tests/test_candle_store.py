@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""CandleStore — 여러 페이지 sync의 원자성과 조회 우선순위 전달"""
+
+import time
+
+import upbit_candle_store as ucs
+from upbit_rate_limiter import PRIORITY_BULK, PRIORITY_NORMAL
+
+MARKET, INTERVAL, SEC = "KRW-BTC", "minute1", 60
+
+
+def _candle(ts):
+    return {"candle_date_time_utc": ucs.ts_to_utc_str(ts), "opening_price": 1.0,
+            "high_price": 1.0, "low_price": 1.0, "trade_price": float(ts),
+            "candle_acc_trade_volume": 1.0, "candle_acc_trade_price": 1.0}
+
+
+class FakePages:
+    """업비트처럼 to 이전 count개를 최신순으로 — fail_on번째 호출은 빈 응답"""
+
+    def __init__(self, fail_on=None):
+        self.calls = 0
+        self.fail_on = fail_on
+
+    def __call__(self, market, interval, count, to):
+        self.calls += 1
+        if self.calls == self.fail_on:
+            return []
+        end = ucs.utc_str_to_ts(to) - SEC if to else int(time.time()) // SEC * SEC
+        return [_candle(end - i * SEC) for i in range(count)]
+
+
+def _store(tmp_path, bars_ago):
+    store = ucs.CandleStore(str(tmp_path / "candles.db"))
+    last = int(time.time()) // SEC * SEC - bars_ago * SEC
+    store.upsert_raw(MARKET, INTERVAL, [_candle(last - i * SEC) for i in range(50)])
+    return store, last
+
+
+def _is_contiguous(store):
+    df = store.read(MARKET, INTERVAL)
+    return bool((df.index.to_series().diff().dropna() == "60s").all())
+
+
+def test_partial_multi_page_sync_writes_nothing(tmp_path):
+    store, last = _store(tmp_path, bars_ago=450)       # 3페이지 필요
+    before = store.bounds(MARKET, INTERVAL)
+
+    assert store.sync(MARKET, INTERVAL, FakePages(fail_on=2)) is None
+    assert store.bounds(MARKET, INTERVAL) == before    # 최신 페이지만 쓰면 구멍이 생김
+
+    stored = store.sync(MARKET, INTERVAL, FakePages())
+    assert stored is not None and stored > 450
+    first, newest, n = store.bounds(MARKET, INTERVAL)
+    assert first == before[0] and newest > last
+    assert _is_contiguous(store)
+
+
+def test_large_gap_replaces_only_after_full_fetch(tmp_path, monkeypatch):
+    monkeypatch.setattr(ucs, "STORE_MAX_GAP_BARS", 300)
+    store, _ = _store(tmp_path, bars_ago=1000)
+    before = store.bounds(MARKET, INTERVAL)
+
+    assert store.sync(MARKET, INTERVAL, FakePages(fail_on=2), initial_count=400) is None
+    assert store.bounds(MARKET, INTERVAL) == before    # 실패 시 기존 구간 유지
+
+    assert store.sync(MARKET, INTERVAL, FakePages(), initial_count=400) == 400
+    assert store.bounds(MARKET, INTERVAL)[2] == 400 and _is_contiguous(store)
+
+
+def test_get_candles_passes_priority(tmp_path, monkeypatch):
+    seen = []
+
+    class FakeClient:
+        def fetch_candles_raw(self, market, interval, count, to, priority):
+            seen.append(priority)
+            return FakePages()(market, interval, count, to)
+
+    monkeypatch.setattr(ucs, "get_market_client", lambda: FakeClient())
+    store = ucs.CandleStore(str(tmp_path / "candles.db"))
+    assert len(store.get_candles(MARKET, INTERVAL, 10, priority=PRIORITY_NORMAL)) == 10
+    assert seen and set(seen) == {PRIORITY_NORMAL}
+    store.get_candles("KRW-ETH", INTERVAL, 10)
+    assert seen[-1] == PRIORITY_BULK
+
+
+def test_trading_path_sync_is_one_page_and_gap_fills_later(tmp_path):
+    store, last = _store(tmp_path, bars_ago=5000)
+    pages = FakePages()
+
+    df = store.get_candles(MARKET, INTERVAL, 40, fetch_page=pages, max_sync_bars=200)
+    assert pages.calls == 1
+    assert len(df) == 40
+    head = store.gap_head(MARKET, INTERVAL)
+    assert head is not None and head > last
+    assert df.index[0] >= ucs.pd.Timestamp(head + ucs.KST_OFFSET_SEC, unit="s")
+    assert store.count_before(MARKET, INTERVAL) == 200  # 공백 아래 봉은 읽기에서 제외
+    assert _is_contiguous(store)
+
+    # 다음 매매 경로 조회는 최신 구간에서 이어받음 (공백은 그대로)
+    store.get_candles(MARKET, INTERVAL, 40, fetch_page=pages, max_sync_bars=200)
+    assert pages.calls == 2 and store.gap_head(MARKET, INTERVAL) == head
+
+    stored = store.fill_gap(MARKET, INTERVAL, pages)
+    assert stored is not None and stored >= 5000 - 200
+    assert store.gap_head(MARKET, INTERVAL) is None
+    first, _, _ = store.bounds(MARKET, INTERVAL)
+    assert store.read(MARKET, INTERVAL).index[0] == ucs.pd.Timestamp(
+        first + ucs.KST_OFFSET_SEC, unit="s")
+    assert _is_contiguous(store)
+
+
+def test_failed_or_oversized_gap_fill(tmp_path, monkeypatch):
+    store, _ = _store(tmp_path, bars_ago=1000)
+    assert store.sync(MARKET, INTERVAL, FakePages(), max_bars=200) == 200
+    head = store.gap_head(MARKET, INTERVAL)
+
+    assert store.fill_gap(MARKET, INTERVAL, FakePages(fail_on=2)) is None
+    assert store.gap_head(MARKET, INTERVAL) == head     # 실패 시 경계 유지
+
+    monkeypatch.setattr(ucs, "STORE_MAX_GAP_BARS", 300)
+    assert store.fill_gap(MARKET, INTERVAL, FakePages()) == 0
+    assert store.gap_head(MARKET, INTERVAL) is None
+    assert store.bounds(MARKET, INTERVAL) == (head, head + 199 * SEC, 200)
+
+
+def test_unlimited_get_candles_fills_recorded_gap(tmp_path):
+    store, _ = _store(tmp_path, bars_ago=1000)
+    store.sync(MARKET, INTERVAL, FakePages(), max_bars=200)
+    df = store.get_candles(MARKET, INTERVAL, 500, fetch_page=FakePages())
+    assert len(df) == 500 and store.gap_head(MARKET, INTERVAL) is None
+    assert _is_contiguous(store)
+
+
+def test_ts_to_utc_str_is_host_tz_independent(host_tz):
+    assert ucs.ts_to_utc_str(0) == "1970-01-01T00:00:00"
+    assert ucs.utc_str_to_ts(ucs.ts_to_utc_str(1_700_000_000)) == 1_700_000_000
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""EMA4HTracker — 봉 시각(KST 인덱스 ↔ UTC epoch) 처리와 4H 경계 스트리밍"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from upbit_market_provider import InMemoryMarketProvider, kst_to_epoch
+
+BAR = 4 * 3600
+LAST_BAR_KST = datetime(2026, 3, 2, 13, 0)      # 4H 슬롯 시작 (KST 13:00 = UTC 04:00)
+
+
+def _frame_4h(n=140, extra=3):
+    """LAST_BAR_KST까지 n봉 + 이후 extra봉 (시계를 넘기면 순서대로 보임)"""
+    idx = pd.date_range(end=LAST_BAR_KST + pd.Timedelta(hours=4 * extra), periods=n + extra, freq="4h")
+    rng = np.random.default_rng(12)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.002, 0.01, len(idx))))
+    return pd.DataFrame({"open": close, "high": close * 1.01, "low": close * 0.99,
+                         "close": close, "volume": 1.0}, index=idx)
+
+
+def _tracker(bot, df):
+    provider = InMemoryMarketProvider(ts=kst_to_epoch(LAST_BAR_KST) + 600)
+    provider.set_candles("KRW-ETH", "4h", df)
+    return bot.EMA4HTracker(provider=provider), provider
+
+
+def test_sync_streams_across_two_4h_boundaries(bot, host_tz):
+    df = _frame_4h()
+    tracker, provider = _tracker(bot, df)
+    tk = "KRW-ETH"
+
+    assert tracker.sync_from_df(tk, provider.candles(tk, "4h", 100)) == "init"
+    assert tracker.is_current(tk)
+    assert tracker._last_bar_ts[0] == kst_to_epoch(LAST_BAR_KST - pd.Timedelta(hours=4))
+    length0 = int(tracker._length[0])
+
+    # 같은 봉 안에서는 변화 없음
+    provider.advance(3600)
+    assert tracker.sync_from_df(tk, provider.candles(tk, "4h", 100)) == "current"
+
+    # 4H 경계 2개 통과 → 최신 아님 → 확정봉 2개 스트리밍
+    provider.set_time(kst_to_epoch(LAST_BAR_KST) + 2 * BAR + 60)
+    assert not tracker.is_current(tk)
+    assert tracker.sync_from_df(tk, provider.candles(tk, "4h", 100)) == "stream"
+    assert tracker.is_current(tk)
+    assert int(tracker._length[0]) == length0 + 2
+
+    # 스트리밍 결과 = 초기화 때의 확정봉 99개 + 새 확정봉 2개로 다시 계산한 EMA
+    closes = df[df.index <= LAST_BAR_KST + pd.Timedelta(hours=4)]["close"].tolist()[-101:]
+    last = tracker._head[0] + tracker.capacity - 1
+    for s, period in tracker._PERIODS:
+        assert np.isclose(tracker._series[s, 0, last], bot.EMA4HTracker._calc_ema(closes, period)[-1])
+
+
+def test_is_current_rejects_stale_state(bot, host_tz):
+    tracker, provider = _tracker(bot, _frame_4h())
+    tracker.init_from_df("KRW-ETH", provider.candles("KRW-ETH", "4h", 100))
+    provider.advance(2 * BAR)
+    assert not tracker.is_current("KRW-ETH")
+
+
+def test_snapshot_round_trip_and_legacy_format(bot, host_tz, tmp_path):
+    tracker, provider = _tracker(bot, _frame_4h())
+    tracker.init_from_df("KRW-ETH", provider.candles("KRW-ETH", "4h", 100))
+    path = str(tmp_path / "snap.npz")
+    assert tracker.save_snapshot(path) == 1
+
+    restored = bot.EMA4HTracker(provider=provider)
+    assert restored.load_snapshot(path) == 1
+    assert restored._last_bar_ts[0] == tracker._last_bar_ts[0]
+    assert restored.is_current("KRW-ETH")
+
+    # ts_format 없는 이전 스냅샷(+9h 시각)은 무시
+    with np.load(path) as z:
+        legacy = {k: z[k] for k in z.files if k != "ts_format"}
+    legacy_path = str(tmp_path / "legacy.npz")
+    np.savez(legacy_path, **legacy)
+    assert bot.EMA4HTracker(provider=provider).load_snapshot(legacy_path) == 0
+
+
+@pytest.mark.parametrize("dip", [1.0, 0.85])
+def test_status_matches_last_row_semantics(bot, host_tz, dip):
+    """조회값 = 진행 중 봉까지 포함한 전체 행 EMA (v38 의미), 눌림은 직전 확정봉 lookback개"""
+    df = _frame_4h()
+    df.loc[df.index > LAST_BAR_KST - pd.Timedelta(hours=24), "close"] *= dip   # 0.85: 최근 봉 EMA50 이탈
+    tracker, provider = _tracker(bot, df)
+    tk = "KRW-ETH"
+    frame = provider.candles(tk, "4h", 100)
+    tracker.init_from_df(tk, frame)
+
+    closes = frame["close"].tolist()
+    ema = {p: bot.EMA4HTracker._calc_ema(closes, p) for p in (bot.EMA_4H_SHORT, bot.EMA_4H_MID, bot.EMA_4H_LONG)}
+    e10, e20, e50 = ema[bot.EMA_4H_SHORT], ema[bot.EMA_4H_MID], ema[bot.EMA_4H_LONG]
+    status = tracker.get_ema_status(tk)
+    assert np.isclose(status["ema10"], e10[-1])
+    assert np.isclose(status["ema20"], e20[-1])
+    assert np.isclose(status["ema50"], e50[-1])
+    assert status["uptrend"] == (e10[-1] > e20[-1] > e50[-1])
+    assert status["deadcross"] == (e10[-1] < e20[-1])
+    assert tracker.uptrend_mask([tk])[0] == status["uptrend"]
+
+    lookback = bot.EMA_PULLBACK_LOOKBACK
+    assert tracker.had_pullback(tk, lookback) == any(
+        closes[i] < e20[i] for i in range(-lookback - 1, -1))
+    below = 0
+    for i in range(-1, -20, -1):
+        if closes[i] >= e50[i]:
+            break
+        below += 1
+    assert tracker.below_ema50_bars(tk) == below
+    assert (below > 0) == (dip < 1)
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""증분 지표 엔진 ↔ add_indicators 패리티 (슬라이딩 창, 진행 중 봉 갱신, 갭 재시드)"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+TOL = 1e-6
+
+
+def _frame(n=360, seed=5):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    close[80:105] = np.round(close[80:105])             # 호가 단위로 멈춘 구간
+    close[160:185] = close[160]                          # 가격 정지 (BB/RSI 평탄)
+    close[240:260] = close[240] * np.linspace(1, 1.15, 20)   # 하락 없는 연속 상승
+    op = np.r_[close[0], close[:-1]]
+    idx = pd.date_range("2026-03-01 09:00", periods=n, freq="15min")
+    return pd.DataFrame({"open": op, "high": np.maximum(op, close) * 1.001,
+                         "low": np.minimum(op, close) * 0.999, "close": close,
+                         "volume": rng.uniform(1, 5, n)}, index=idx)
+
+
+@pytest.mark.parametrize("window", [None, 20, 60])
+def test_sliding_window_parity(bot, window):
+    ok, max_diff = bot.check_incremental_parity(_frame(), window=window)
+    assert ok, max_diff
+
+
+def _compare(bot, got, frame):
+    ref = bot.add_indicators(frame.copy())
+    assert list(got.columns) == list(ref.columns)
+    skip = bot._parity_noise_rows(ref)
+    for col in bot._INDICATOR_COLUMNS:
+        g, e = got[col].to_numpy(float), ref[col].to_numpy(float)
+        np.testing.assert_array_equal(np.isnan(g), np.isnan(e), err_msg=col)
+        m = ~np.isnan(e) & ~skip.get(col, False)
+        np.testing.assert_allclose(g[m], e[m], rtol=TOL, atol=TOL, err_msg=col)
+    decided = ~skip["srsi_d"] & ((ref["srsi_k"] - ref["srsi_d"]).abs().to_numpy() > 1e-9)   # K≈D는 방향 미정
+    assert (got["srsi_direction"].to_numpy() == ref["srsi_direction"].to_numpy())[decided].all()
+
+
+def test_live_path_windows_ticks_and_gaps(bot):
+    df = _frame(seed=9)
+    key = ("KRW-PARITY", "15m")
+    bot.indicator_states.pop(key, None)
+    rng = np.random.default_rng(1)
+    size = 40
+    for end in range(size, len(df) + 1):
+        frame = df.iloc[end - size:end].copy()
+        for _ in range(2):
+            # 진행 중 봉 틱 갱신 — 상태는 그대로, 마지막 행만 바뀜
+            frame.iloc[-1, frame.columns.get_loc("close")] *= 1 + rng.normal(0, 0.002)
+            got = bot.add_indicators_incremental(frame.copy(), *key)
+            _compare(bot, got, frame)
+        # 창 앞 19행은 rolling 미충족 → BB NaN / bb_position 50 (상태의 과거 값을 쓰지 않음)
+        assert got["bb_mid"].iloc[:19].isna().all()
+        assert (got["bb_position"].iloc[:19] == 50).all()
+
+    state = bot.get_indicator_state(*key)
+    assert state.count == len(df) - 1      # 확정봉은 한 번씩만 반영
+
+    # 갭 (상태보다 한참 뒤 프레임) → 재시드 후에도 동일
+    frame = _frame(n=600, seed=9).iloc[-60:]
+    _compare(bot, bot.add_indicators_incremental(frame.copy(), *key), frame)
+    assert bot.get_indicator_state(*key) is not state
+    bot.indicator_states.pop(key, None)
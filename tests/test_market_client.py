@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""UpbitMarketClient.request — 429 재시도는 매 시도 새 서명으로만"""
+
+import itertools
+
+from upbit_market_client import HTTP_429_MAX_RETRY, UpbitMarketClient
+
+
+class NoWaitLimiter:
+    def acquire(self, group, priority=None):
+        pass
+
+    def on_response(self, resp, group):
+        pass
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class FakeSession:
+    def __init__(self, statuses):
+        self.statuses = iter(statuses)
+        self.sent_headers = []
+
+    def request(self, method, url, headers=None, **kwargs):
+        self.sent_headers.append(headers)
+        return FakeResponse(next(self.statuses))
+
+
+def _client(statuses):
+    client = UpbitMarketClient(limiter=NoWaitLimiter())
+    session = FakeSession(statuses)
+    client._session = lambda: session
+    return client, session
+
+
+def test_header_factory_is_signed_again_on_each_retry():
+    client, session = _client([429, 429, 200])
+    nonce = itertools.count()
+    resp = client.post("/v1/orders", json={},
+                       headers=lambda: {"Authorization": f"Bearer {next(nonce)}"})
+    assert resp.status_code == 200
+    assert [h["Authorization"] for h in session.sent_headers] == ["Bearer 0", "Bearer 1", "Bearer 2"]
+
+
+def test_static_auth_header_is_not_replayed():
+    client, session = _client([429, 200])
+    resp = client.get("/v1/accounts", headers={"Authorization": "Bearer once"})
+    assert resp.status_code == 429
+    assert len(session.sent_headers) == 1
+
+
+def test_public_request_still_retries():
+    client, session = _client([429] * HTTP_429_MAX_RETRY)
+    assert client.get("/v1/ticker", params={"markets": "KRW-BTC"}).status_code == 429
+    assert len(session.sent_headers) == HTTP_429_MAX_RETRY
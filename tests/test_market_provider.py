@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""MarketDataProvider — 추상 메서드 강제, 실거래 시계는 호스트 시간대와 무관한 KST"""
+
+import time
+
+import pytest
+
+from upbit_market_provider import InMemoryMarketProvider, MarketDataProvider, epoch_to_kst
+
+
+def test_incomplete_provider_cannot_be_created():
+    class ClockOnly(MarketDataProvider):
+        def time(self):
+            return 0.0
+
+    with pytest.raises(TypeError):
+        MarketDataProvider()
+    with pytest.raises(TypeError):
+        ClockOnly()
+    assert InMemoryMarketProvider(ts=0).now() == epoch_to_kst(0)
+
+
+def test_live_now_is_kst_on_any_host(bot, host_tz):
+    provider = bot.LiveMarketProvider()
+    before = epoch_to_kst(time.time())
+    now = provider.now()
+    assert before <= now <= epoch_to_kst(time.time())
+    assert abs((now - epoch_to_kst(provider.time())).total_seconds()) < 1
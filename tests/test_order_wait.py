@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""UpbitAPI.wait_order_filled — WS 대기 + REST 폴백이 전체 timeout 안에, 전송 기록 정리"""
+
+import time
+
+from upbit_account_stream import OrderFillTracker
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+class FakeClient:
+    def __init__(self):
+        self.n = 0
+
+    def post(self, path, json=None, headers=None):
+        self.n += 1
+        return FakeResponse({"uuid": f"order-{self.n}"})
+
+
+def test_rest_fallback_gets_only_the_remaining_budget(bot, monkeypatch):
+    tracker = OrderFillTracker()
+    tracker.on_connected()                       # 연결돼 있지만 myOrder가 오지 않음
+    monkeypatch.setattr(bot, "order_tracker", tracker)
+    monkeypatch.setattr(bot, "ORDER_FILL_WS_TIMEOUT_SEC", 0.6)
+    api = bot.UpbitAPI("access", "s" * 32)
+    polls = []
+    monkeypatch.setattr(api, "get_order", lambda u: polls.append(u) or {"state": "wait"})
+
+    t0 = time.time()
+    fill = api.wait_order_filled("order-x", timeout_sec=1.0)
+    elapsed = time.time() - t0
+
+    assert fill["state"] == "wait"
+    assert polls
+    assert elapsed < 1.4                         # 이전: WS 0.6 + REST 1.0
+
+
+def test_unwaited_orders_are_pruned_by_age(bot, monkeypatch):
+    monkeypatch.setattr(bot, "order_tracker", None)
+    monkeypatch.setattr(bot, "market_client", FakeClient())
+    api = bot.UpbitAPI("access", "s" * 32)
+    api._order_sent["stale"] = ("bid", time.time() - bot.ORDER_SENT_MAX_AGE_SEC - 1)
+
+    for _ in range(3):
+        api.buy_market_order("KRW-BTC", 10000)
+
+    assert set(api._order_sent) == {"order-1", "order-2", "order-3"}
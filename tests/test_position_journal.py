@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""PositionJournal — 잘린 마지막 줄 뒤에 이어 쓴 레코드도 다음 복구에서 유지"""
+
+import pytest
+
+
+def _tear(path):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"op": "put", "ticker": "KRW-TORN", "he')
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / "positions.journal")
+
+
+def test_append_after_torn_line_survives_restart(bot, journal_path):
+    journal = bot.PositionJournal(journal_path)
+    journal.recover()
+    journal.put("KRW-AAA", {"buy_price": 100.0}, None)
+    journal.close()
+    _tear(journal_path)
+
+    journal = bot.PositionJournal(journal_path)
+    assert set(journal.recover()) == {"KRW-AAA"}
+    journal.put("KRW-BBB", {"buy_price": 200.0}, None)
+    journal.close()
+
+    recovered = bot.PositionJournal(journal_path).recover()
+    assert set(recovered) == {"KRW-AAA", "KRW-BBB"}
+    assert recovered["KRW-BBB"]["held"] == {"buy_price": 200.0}
+
+
+def test_empty_account_sync_checkpoints_journal(bot, journal_path, monkeypatch):
+    journal = bot.PositionJournal(journal_path)
+    journal.recover()
+    journal.put("KRW-AAA", {"buy_price": 100.0}, None)
+    journal.close()
+    _tear(journal_path)
+
+    class EmptyAccount:
+        def get_balances(self):
+            return []
+
+    journal = bot.PositionJournal(journal_path)
+    monkeypatch.setattr(bot, "position_journal", journal)
+    monkeypatch.setattr(bot, "upbit", EmptyAccount())
+    assert bot.sync_held_coins_with_exchange()
+    journal.put("KRW-BBB", {"buy_price": 200.0}, None)
+    journal.close()
+
+    assert set(bot.PositionJournal(journal_path).recover()) == {"KRW-BBB"}
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""TradeLedger — mode별 분리, 분할 매도 집계, 이전 스키마 집계 재계산"""
+
+import sqlite3
+import time
+
+import upbit_trade_ledger as utl
+
+
+def _ledger(tmp_path, mode):
+    return utl.TradeLedger(str(tmp_path / "ledger.db"), mode)
+
+
+def test_modes_do_not_share_aggregates_or_cooldowns(tmp_path):
+    live, test = _ledger(tmp_path, "live"), _ledger(tmp_path, "test")
+    test.record_sell("KRW-AAA", 100.0, 3.0, 300.0, "PROFIT_TAKE")
+    live.record_sell("KRW-BBB", 100.0, -1.0, -100.0, "STOP_LOSS")
+
+    assert live.aggregate("all")["trades"] == 1
+    assert live.aggregate("all")["wins"] == 0
+    assert set(live.recent_sells(0)) == {"KRW-BBB"}
+    assert [t["ticker"] for t in live.trades()] == ["KRW-BBB"]
+
+    reopened = _ledger(tmp_path, "live")
+    assert reopened.aggregate("all")["trades"] == 1
+    assert reopened.aggregate("category", "PROFIT_TAKE")["trades"] == 0
+    assert reopened.rolling_win_rate() == 0.0
+    assert set(_ledger(tmp_path, "test").recent_sells(0)) == {"KRW-AAA"}
+
+
+def test_partial_sells_count_once_per_position(tmp_path):
+    ledger = _ledger(tmp_path, "live")
+    ledger.record_sell("KRW-AAA", 100.0, 4.0, 200.0, "PROFIT_TAKE", ratio=0.5)
+    ledger.record_sell("KRW-AAA", 100.0, 2.0, 100.0, "PROFIT_TAKE", ratio=0.5)
+    ledger.record_sell("KRW-AAA", 100.0, -1.0, -50.0, "STOP_LOSS", ratio=1.0)
+
+    total = ledger.aggregate("all")
+    assert (total["trades"], total["wins"], total["losses"]) == (1, 0, 1)
+    assert total["avg_pct"] == -1.0
+    assert total["sum_krw"] == 250.0
+    assert ledger.aggregate("category", "PROFIT_TAKE")["trades"] == 0
+    assert ledger.rolling_win_rate() == 0.0
+
+    reopened = _ledger(tmp_path, "live")
+    assert reopened.aggregate("all") == total
+    assert reopened.rolling_win_rate() == 0.0
+
+
+def test_old_schema_aggregates_are_rebuilt_per_mode(tmp_path):
+    path = str(tmp_path / "ledger.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(utl._SCHEMA)
+    conn.execute("CREATE TABLE agg (dim TEXT NOT NULL, key TEXT NOT NULL, trades INTEGER, "
+                 "wins INTEGER, losses INTEGER, sum_pct REAL, sum_krw REAL, "
+                 "PRIMARY KEY (dim, key)) WITHOUT ROWID")
+    conn.execute("INSERT INTO agg VALUES ('all', 'all', 9, 9, 0, 90.0, 900.0)")
+    now = time.time()
+    for mode, pct, ratio in (("live", 5.0, 0.5), ("live", 1.0, 1.0), ("test", 3.0, 1.0)):
+        conn.execute("INSERT INTO trades (ts, mode, side, ticker, price, ratio, profit_pct, "
+                     "profit_krw, category) VALUES (?,?,?,?,?,?,?,?,?)",
+                     (now, mode, "sell", "KRW-AAA", 100.0, ratio, pct, pct * 10, "PROFIT_TAKE"))
+    conn.commit()
+    conn.close()
+
+    total = utl.TradeLedger(path, "live").aggregate("all")
+    assert (total["trades"], total["wins"], total["sum_krw"]) == (1, 1, 60.0)
+    assert utl.TradeLedger(path, "test").aggregate("all")["trades"] == 1
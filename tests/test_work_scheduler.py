@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""WorkScheduler — 매수 작업이 워커를 모두 점유해도 매도는 예약 워커에서 실행"""
+
+import threading
+import time
+
+
+def test_sell_runs_while_buys_occupy_workers(bot):
+    sched = bot.WorkScheduler(workers=3, sell_reserved=1)
+    sched.start()
+    release = threading.Event()
+    started = []
+    try:
+        buys = [sched.submit(bot.PRIO_BUY, lambda i=i: started.append(i) or release.wait(10),
+                             name=f"buy{i}") for i in range(6)]
+        sell = sched.submit(bot.PRIO_SELL, lambda: "sold", name="sell")
+
+        assert sell.result(timeout=2) == "sold"
+        time.sleep(0.2)
+        assert len(started) == 2                   # 매도 외 동시 실행은 워커 - 1
+        release.set()
+        assert all(f.result(timeout=5) for f in buys)
+        assert sched.get_stats()["buy"]["done"] == 6
+    finally:
+        release.set()
+        sched.stop()
+
+
+def test_stats_are_exact_under_concurrent_workers(bot):
+    sched = bot.WorkScheduler(workers=4, sell_reserved=1)
+    sched.start()
+    n = 400
+    try:
+        for start in range(0, n // 2, 50):             # 큐 상한 안에서 나눠 제출
+            futures = [sched.submit(prio, (lambda: 1) if i % 5 else (lambda: 1 / 0),
+                                    deadline_sec=60, name=f"t{i}")
+                       for i in range(start, start + 50) for prio in (bot.PRIO_SELL, bot.PRIO_BUY)]
+            for f in futures:
+                f.exception(timeout=10)
+        stats = sched.get_stats()
+        for cls in ("sell", "buy"):
+            assert stats[cls]["submitted"] == n // 2
+            assert stats[cls]["done"] + stats[cls]["failed"] == n // 2
+            assert stats[cls]["failed"] == n // 10
+    finally:
+        sched.stop()
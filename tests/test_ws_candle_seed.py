@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""REST 시드(KST naive 인덱스) → WS 체결로 이어지는 진행 중 봉"""
+
+import time
+
+import pytest
+
+from conftest import rest_frame, wait_slot_margin
+
+TICKER = "KRW-SEEDTEST"
+
+
+@pytest.fixture
+def ws_state(bot, monkeypatch):
+    wait_slot_margin(900)     # 시드와 체결이 같은 슬롯에 들도록
+    monkeypatch.setattr(bot, "WS_CANDLE_SOURCE", "trade")
+    monkeypatch.setitem(bot.ws_status, "connected", True)
+    yield bot
+    with bot.ws_candles_5m_lock:
+        bot.ws_candles_5m.pop(TICKER, None)
+        bot.trade_aggregators.pop(TICKER, None)
+    bot._ws_candle_initialized.pop(TICKER, None)
+
+
+def test_rest_seed_then_trade_updates_live_bar(ws_state, host_tz, monkeypatch):
+    bot = ws_state
+    now = time.time()
+    rest_5m = rest_frame(300, bot.WS_CANDLE_HISTORY_SIZE, now)
+    monkeypatch.setattr(bot, "get_ohlcv", lambda *a, **k: rest_5m)
+    assert bot._init_ws_candle_from_rest(TICKER)
+    rest_15m = rest_frame(900, 60, now)
+    assert bot.seed_trade_candles(TICKER, "15m", rest_15m)
+
+    # REST 마지막 봉이 현재 슬롯 → 진행 중 봉으로 이어 받음
+    with bot.ws_candles_5m_lock:
+        buf_5m = bot.ws_candles_5m[TICKER]
+        assert buf_5m.has_current
+        assert buf_5m.current_slot == bot._get_5m_slot(now)
+        assert bot.trade_aggregators[TICKER].buffers["15m"].has_current
+
+    price = 500.0
+    bot._on_trade_message(TICKER, {"trade_price": price, "trade_volume": 1.0,
+                                   "trade_timestamp": int(time.time() * 1000),
+                                   "sequential_id": 1})
+
+    # 진행 중 봉 시각 = 마지막 체결 시각 (슬롯은 REST 현재 봉과 같음)
+    df_5m = bot.get_ws_candles_5m(TICKER)
+    assert df_5m.index[-1].floor("5min") == rest_5m.index[-1]
+    assert df_5m.index[-2] == rest_5m.index[-2]
+    assert df_5m["close"].iat[-1] == price
+    assert df_5m["high"].iat[-1] == price
+
+    df_15m = bot.get_trade_candles(TICKER, "15m", 30)
+    assert df_15m.index[-1].floor("15min") == rest_15m.index[-1]
+    assert df_15m.index[-2] == rest_15m.index[-2]
+    assert df_15m["close"].iat[-1] == price
+    assert df_15m["open"].iat[-1] == rest_15m["open"].iat[-1]
+    assert len(df_15m) == 30
+
+
+def test_returned_frames_do_not_alias_cache(ws_state, monkeypatch):
+    bot = ws_state
+    now = time.time()
+    monkeypatch.setattr(bot, "get_ohlcv", lambda *a, **k: rest_frame(300, bot.WS_CANDLE_HISTORY_SIZE, now))
+    assert bot._init_ws_candle_from_rest(TICKER)
+    assert bot.seed_trade_candles(TICKER, "15m", rest_frame(900, 60, now))
+
+    for get in (lambda: bot.get_ws_candles_5m(TICKER),
+                lambda: bot.get_trade_candles(TICKER, "15m", 30)):
+        first = get()
+        expected = first["close"].copy()
+        first["close"] = -1.0
+        first.drop(columns=["rsi"], inplace=True)
+        again = get()                         # 같은 틱 → 버퍼 캐시 적중
+        assert (again["close"] == expected).all()
+        assert "rsi" in again.columns
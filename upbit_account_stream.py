@@ -0,0 +1,483 @@
+# ═══════════════════════════════════════════════════════════════════════
+# UpbitAccountStream — 계정 상태 캐시 (myAsset/myOrder 비공개 WebSocket + 느린 REST 대조)
+# ═══════════════════════════════════════════════════════════════════════
+"""
+업비트 비공개 WebSocket(myAsset, myOrder)으로 잔고를 메모리에 유지하는 캐시.
+
+[해결 문제]
+upbit.get_balance("KRW")는 숫자 하나를 위해 /v1/accounts 전체를 조회.
+buy_thread_worker가 매 주기 호출하고, execute_buy가 2~3회 + get_total_balance,
+execute_sell이 매도마다 get_balances()를 다시 호출 → 인증 요청 왕복이 매매 경로에 누적.
+
+[설계]
+  1. AccountStateCache
+     - REST /v1/accounts 결과로 시드 (seed_from_rest)
+     - WS 반영마다 버전 증가 — 호출자는 REST 요청 전 version()을 받아 시드에 전달,
+       요청 이후 WS로 바뀐 통화는 REST 값으로 덮지 않음 (느린 응답이 새 잔고를 되돌리는 문제)
+       요청 이후 재연결/끊김이 있었으면 시드 전체 폐기 (그 사이 변화를 REST도 WS도 모름)
+     - myAsset: 변경된 통화의 balance/locked 절대값 반영 (순서 무관, 멱등)
+     - myOrder(state=trade): 체결가/수량으로 avg_buy_price 가중 평균 갱신
+       (myAsset에는 평단이 없음, 기준 수량은 체결로만 누적 → 도착 순서 무관)
+     - 유효 조건: 시드 완료 + 비공개 스트림 연결 유지 + 마지막 REST 대조 후
+       reconcile_sec 이내 → 유효하지 않으면 None (호출자가 REST 조회 후 재시드)
+     - 끊김(gap) 시 즉시 무효화 → 다음 조회가 REST 대조
+     - 조회는 락 안에서 dict 복사만 (네트워크 없음)
+
+  2. PrivateStreamClient
+     - wss://api.upbit.com/websocket/v1/private (Authorization: Bearer JWT)
+     - 구독: [{"ticket"}, {"type": "myAsset"}, {"type": "myOrder"}]
+     - 메시지를 등록된 리스너(add_listener)에 전달 — 캐시 외 주문 추적기 등도 구독 가능
+     - 끊기면 지수 백오프 재연결, 리스너에 on_gap 통지
+
+  3. OrderFillTracker (주문 체결 추적)
+     - myOrder의 누적 필드(executed_volume, avg_price, paid_fee)로 주문별 상태 유지
+     - done/cancel 수신 시 주문 UUID별 Future 완료 (add_done_callback으로 콜백 가능)
+     - 주문 응답(uuid)보다 먼저 온 메시지는 버퍼에 보관 후 track() 시 즉시 반영
+     - 스트림 미연결/타임아웃이면 None → 호출자가 REST 폴링으로 폴백
+     - 주문 전송 시각 ~ 최종 상태 수신 지연(ms) 통계
+
+  4. 테스트
+     - 스트림 없이 cache.on_message(dict) / tracker.on_message(dict)로 가짜 메시지 주입
+
+[사용 예시]
+
+    cache = AccountStateCache(reconcile_sec=300)
+    stream = PrivateStreamClient(token_fn=lambda: api._make_jwt_token())
+    stream.add_listener(cache)
+    stream.start()
+
+    bals = cache.balances()          # None이면 REST 조회 후 재시드:
+    ver = cache.version()            #   REST 요청 전에 버전 확보
+    bals = cache.seed_from_rest(rest_balances, since_version=ver)
+    krw = cache.balance("KRW")
+
+    tracker = OrderFillTracker()
+    stream.add_listener(tracker)
+    t0 = time.time(); uid = api.buy_market_order(...)['uuid']
+    fill = tracker.wait(tracker.track(uid, sent_ts=t0), timeout=5)   # None이면 REST 폴링
+"""
+
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Callable, Dict, List, Optional
+
+import websocket
+
+
+UPBIT_PRIVATE_WS_URL = "wss://api.upbit.com/websocket/v1/private"
+
+DEFAULT_RECONCILE_SEC = 300.0       # WS 정상이어도 이 주기로 REST 대조
+RECONNECT_BASE_SEC = 1.0
+RECONNECT_MAX_SEC = 30.0
+PING_INTERVAL_SEC = 60
+
+ORDER_FINAL_STATES = ("done", "cancel")
+ORDER_EARLY_BUFFER = 256            # 주문 응답보다 먼저 도착한 myOrder 보관 개수
+ORDER_LATENCY_WINDOW = 100          # 체결 지연 통계 표본 수
+
+
+def _f(v, default=0.0) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return default
+
+
+class AccountStateCache:
+    """
+    /v1/accounts 형식 잔고 캐시.
+
+    [Thread Safety]
+    상태는 self._lock으로 보호. WS 스레드가 갱신, 매매 스레드가 조회.
+    """
+
+    def __init__(self, reconcile_sec: float = DEFAULT_RECONCILE_SEC):
+        self.reconcile_sec = reconcile_sec
+        self._accounts: Dict[str, dict] = {}
+        self._seeded_at = 0.0
+        self._stream_live = False
+        self._version = 0           # WS 반영/연결 변화마다 증가
+        self._stream_version = 0    # 마지막 연결/끊김 시점 버전
+        self._lock = threading.Lock()
+        # 통계
+        self.hits = 0
+        self.misses = 0
+        self.rest_seeds = 0
+        self.stale_seeds = 0
+        self.asset_events = 0
+        self.order_events = 0
+        self.gaps = 0
+
+    # ─────────────────────────────────────────────
+    # 유효성
+    # ─────────────────────────────────────────────
+
+    def _valid(self) -> bool:
+        """(self._lock 보유)"""
+        return (self._stream_live and self._seeded_at > 0
+                and time.time() - self._seeded_at < self.reconcile_sec)
+
+    def is_valid(self) -> bool:
+        with self._lock:
+            return self._valid()
+
+    def version(self) -> int:
+        """현재 버전 — REST 요청 전에 받아 seed_from_rest(since_version=)로 전달"""
+        with self._lock:
+            return self._version
+
+    def _bump(self) -> int:
+        """(self._lock 보유)"""
+        self._version += 1
+        return self._version
+
+    def on_connected(self):
+        """스트림 연결/재연결 — 연결 전 변화는 모르므로 다음 조회에서 REST 재시드"""
+        with self._lock:
+            self._stream_live = True
+            self._seeded_at = 0.0
+            self._stream_version = self._bump()
+
+    def on_gap(self):
+        """스트림 끊김 → 캐시 무효화"""
+        with self._lock:
+            self._stream_live = False
+            self._seeded_at = 0.0
+            self._stream_version = self._bump()
+            self.gaps += 1
+
+    # ─────────────────────────────────────────────
+    # 갱신
+    # ─────────────────────────────────────────────
+
+    def seed_from_rest(self, balances: Optional[list],
+                       since_version: Optional[int] = None) -> Optional[List[dict]]:
+        """
+        REST /v1/accounts 결과로 교체 → 반영된 잔고 사본 (폐기 시 None).
+
+        since_version: REST 요청 직전 version(). 그 이후 WS로 갱신된 통화는 캐시 값 유지,
+        그 이후 재연결/끊김이 있었으면 시드 폐기 (캐시는 무효 상태 유지).
+        None이면 무조건 전체 교체.
+        """
+        if balances is None:
+            return None
+        with self._lock:
+            if since_version is not None and since_version < self._stream_version:
+                self.stale_seeds += 1
+                return None
+            accounts = {b.get('currency'): dict(b) for b in balances if b.get('currency')}
+            for acc in accounts.values():
+                acc['_avg_basis_volume'] = _f(acc.get('balance')) + _f(acc.get('locked'))
+            if since_version is not None:
+                for cur, acc in self._accounts.items():
+                    if acc.get('_ver', 0) > since_version:
+                        accounts[cur] = acc
+            self._accounts = accounts
+            self._seeded_at = time.time()
+            self.rest_seeds += 1
+            return self._view()
+
+    def on_message(self, msg: dict):
+        """비공개 스트림 메시지 1건 (myAsset / myOrder)"""
+        kind = msg.get('type') or msg.get('ty')
+        if kind == 'myAsset':
+            self._apply_asset(msg)
+        elif kind == 'myOrder':
+            self._apply_order(msg)
+
+    def _account(self, cur: str) -> dict:
+        """(self._lock 보유) 처음 보는 통화는 빈 계정 생성"""
+        acc = self._accounts.get(cur)
+        if acc is None:
+            acc = self._accounts[cur] = {
+                'currency': cur, 'balance': 0.0, 'locked': 0.0,
+                'avg_buy_price': 0.0, 'avg_buy_price_modified': False,
+                'unit_currency': 'KRW', '_avg_basis_volume': 0.0,
+            }
+        return acc
+
+    def _apply_asset(self, msg: dict):
+        with self._lock:
+            ver = self._bump()
+            for a in msg.get('assets', []):
+                cur = a.get('currency')
+                if not cur:
+                    continue
+                acc = self._account(cur)
+                acc['balance'] = _f(a.get('balance'))
+                acc['locked'] = _f(a.get('locked'))
+                acc['_ver'] = ver
+            self.asset_events += 1
+
+    def _apply_order(self, msg: dict):
+        """
+        체결(state=trade) → 평단 가중 평균.
+        평단 기준 수량은 잔고와 별도로 체결 수량만으로 누적 → myAsset과 도착 순서 무관.
+        """
+        with self._lock:
+            self.order_events += 1
+            if msg.get('state') != 'trade':
+                return
+            code = msg.get('code', '')
+            if '-' not in code:
+                return
+            price, volume = _f(msg.get('price')), _f(msg.get('volume'))
+            if price <= 0 or volume <= 0:
+                return
+            acc = self._account(code.split('-', 1)[1])
+            acc['_ver'] = self._bump()
+            basis = acc.get('_avg_basis_volume', 0.0)
+            if msg.get('ask_bid') == 'BID':
+                total = basis + volume
+                acc['avg_buy_price'] = (_f(acc.get('avg_buy_price')) * basis + price * volume) / total
+                acc['_avg_basis_volume'] = total
+            else:
+                acc['_avg_basis_volume'] = max(basis - volume, 0.0)
+
+    # ─────────────────────────────────────────────
+    # 조회 (네트워크 없음)
+    # ─────────────────────────────────────────────
+
+    def _view(self) -> List[dict]:
+        """(self._lock 보유) 내부 필드 제외 사본"""
+        return [{k: v for k, v in a.items() if not k.startswith('_')}
+                for a in self._accounts.values()]
+
+    def balances(self) -> Optional[List[dict]]:
+        """/v1/accounts 형식 리스트 사본 (캐시 무효면 None → 호출자가 REST 조회)"""
+        with self._lock:
+            if not self._valid():
+                self.misses += 1
+                return None
+            self.hits += 1
+            return self._view()
+
+    def balance(self, currency: str) -> Optional[float]:
+        """통화 사용 가능 잔고 (캐시 무효면 None)"""
+        with self._lock:
+            if not self._valid():
+                self.misses += 1
+                return None
+            self.hits += 1
+            acc = self._accounts.get(currency)
+            return _f(acc.get('balance')) if acc else 0.0
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {"valid": self._valid(), "currencies": len(self._accounts),
+                    "hits": self.hits, "misses": self.misses, "rest_seeds": self.rest_seeds,
+                    "stale_seeds": self.stale_seeds,
+                    "asset_events": self.asset_events, "order_events": self.order_events,
+                    "gaps": self.gaps}
+
+
+def _fill_from_order(msg: dict, state: str) -> dict:
+    """myOrder 누적 필드 → wait_order_filled 반환 형식"""
+    exec_vol = _f(msg.get('executed_volume'))
+    avg_price = _f(msg.get('avg_price'))
+    if avg_price <= 0 and exec_vol > 0:
+        avg_price = _f(msg.get('executed_funds')) / exec_vol
+    return {'avg_price': avg_price, 'paid_fee': _f(msg.get('paid_fee')),
+            'executed_volume': exec_vol, 'state': state}
+
+
+class OrderFillTracker:
+    """
+    myOrder 스트림 기반 주문 체결 추적.
+
+    [Thread Safety]
+    주문 상태/Future 맵은 self._lock으로 보호. Future 완료(콜백 실행)는 락 밖에서.
+    """
+
+    def __init__(self, early_buffer: int = ORDER_EARLY_BUFFER):
+        self._lock = threading.Lock()
+        self._futures: Dict[str, Future] = {}
+        self._sent_ts: Dict[str, float] = {}
+        self._early: "OrderedDict[str, dict]" = OrderedDict()
+        self._early_max = early_buffer
+        self._latency_ms = deque(maxlen=ORDER_LATENCY_WINDOW)
+        self.live = False
+        # 통계
+        self.ws_fills = 0
+        self.rest_fallbacks = 0
+        self.partial_events = 0
+
+    def on_connected(self):
+        self.live = True
+
+    def on_gap(self):
+        self.live = False
+
+    def track(self, order_uuid: str, sent_ts: Optional[float] = None) -> Future:
+        """주문 UUID 등록 → Future (결과: avg_price/paid_fee/executed_volume/state/latency_ms)"""
+        resolved = None
+        with self._lock:
+            fut = self._futures.get(order_uuid)
+            if fut is None:
+                fut = self._futures[order_uuid] = Future()
+                self._sent_ts[order_uuid] = sent_ts or time.time()
+                early = self._early.pop(order_uuid, None)
+                if early is not None and early.get('state') in ORDER_FINAL_STATES:
+                    resolved = self._finish(order_uuid, early)
+        if resolved is not None:
+            fut.set_result(resolved)
+        return fut
+
+    def _finish(self, order_uuid: str, msg: dict) -> dict:
+        """(self._lock 보유) 최종 상태 → 결과 dict + 지연 기록"""
+        fill = _fill_from_order(msg, msg.get('state'))
+        latency = (time.time() - self._sent_ts.pop(order_uuid, time.time())) * 1000
+        fill['latency_ms'] = latency
+        self._latency_ms.append(latency)
+        self._futures.pop(order_uuid, None)
+        self.ws_fills += 1
+        return fill
+
+    def on_message(self, msg: dict):
+        if (msg.get('type') or msg.get('ty')) != 'myOrder':
+            return
+        order_uuid = msg.get('uuid')
+        if not order_uuid:
+            return
+        state = msg.get('state')
+        fut = resolved = None
+        with self._lock:
+            fut = self._futures.get(order_uuid)
+            if fut is None:
+                # 주문 응답 전 도착 → track() 때 반영
+                self._early[order_uuid] = msg
+                self._early.move_to_end(order_uuid)
+                while len(self._early) > self._early_max:
+                    self._early.popitem(last=False)
+                return
+            if state in ORDER_FINAL_STATES:
+                resolved = self._finish(order_uuid, msg)
+            elif state == 'trade':
+                self.partial_events += 1
+        if resolved is not None and not fut.done():
+            fut.set_result(resolved)
+
+    def wait(self, fut: Future, timeout: float) -> Optional[dict]:
+        """체결 결과 대기 (스트림 미연결/타임아웃이면 None → 호출자 REST 폴백)"""
+        if fut.done():
+            return fut.result()
+        if not self.live:
+            self.rest_fallbacks += 1
+            return None
+        try:
+            return fut.result(timeout=timeout)
+        except FutureTimeout:
+            self.rest_fallbacks += 1
+            return None
+
+    def forget(self, order_uuid: str):
+        """REST로 확정된 주문 정리"""
+        with self._lock:
+            self._futures.pop(order_uuid, None)
+            self._sent_ts.pop(order_uuid, None)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            lat = sorted(self._latency_ms)
+            return {"pending": len(self._futures), "ws_fills": self.ws_fills,
+                    "rest_fallbacks": self.rest_fallbacks, "partials": self.partial_events,
+                    "latency_p50_ms": lat[len(lat) // 2] if lat else 0.0,
+                    "latency_max_ms": lat[-1] if lat else 0.0}
+
+
+class PrivateStreamClient:
+    """업비트 비공개 WebSocket (myAsset/myOrder) 수신 스레드 + 리스너 분배"""
+
+    def __init__(self, token_fn: Callable[[], str], url: str = UPBIT_PRIVATE_WS_URL):
+        self.url = url
+        self._token_fn = token_fn
+        self._listeners: List = []
+        self._app: Optional[websocket.WebSocketApp] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.connected = False
+        self.messages = 0
+        self.reconnects = 0
+
+    def add_listener(self, listener):
+        """listener: on_message(dict) 필수, on_connected()/on_gap() 선택"""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def _notify(self, method: str, *args):
+        with self._lock:
+            listeners = list(self._listeners)
+        for lst in listeners:
+            fn = getattr(lst, method, None)
+            if fn is None:
+                continue
+            try:
+                fn(*args)
+            except Exception:
+                pass
+
+    def _on_open(self, ws):
+        ws.send(json.dumps([{"ticket": str(uuid.uuid4())},
+                            {"type": "myAsset"}, {"type": "myOrder"}]))
+        self.connected = True
+        self._notify("on_connected")
+
+    def _on_message(self, ws, message):
+        try:
+            if isinstance(message, bytes):
+                message = message.decode('utf-8')
+            msg = json.loads(message)
+        except Exception:
+            return
+        if not isinstance(msg, dict) or msg.get('status') == 'UP':
+            return
+        self.messages += 1
+        self._notify("on_message", msg)
+
+    def _on_close(self, ws, *args):
+        if self.connected:
+            self.connected = False
+            self._notify("on_gap")
+
+    def _run(self):
+        delay = RECONNECT_BASE_SEC
+        while not self._stop.is_set():
+            started = time.time()
+            try:
+                app = websocket.WebSocketApp(
+                    self.url, header=[f"Authorization: Bearer {self._token_fn()}"],
+                    on_open=self._on_open, on_message=self._on_message,
+                    on_close=self._on_close, on_error=lambda ws, e: None)
+                self._app = app
+                app.run_forever(ping_interval=PING_INTERVAL_SEC, ping_timeout=10)
+            except Exception:
+                pass
+            self._on_close(None)
+            if self._stop.is_set():
+                break
+            if time.time() - started > 60:
+                delay = RECONNECT_BASE_SEC
+            self.reconnects += 1
+            self._stop.wait(delay)
+            delay = min(delay * 2, RECONNECT_MAX_SEC)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="WS-private", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        app = self._app
+        if app is not None:
+            try:
+                app.close()
+            except Exception:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout)
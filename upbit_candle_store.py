@@ -0,0 +1,470 @@
+# ═══════════════════════════════════════════════════════════════════════
+# UpbitCandleStore — 로컬 캔들 DB (SQLite, 증분 동기화, 봇/예측기/다운로더 공용)
+# ═══════════════════════════════════════════════════════════════════════
+"""
+봇/예측기/다운로더가 공유하는 디스크 캔들 저장소.
+
+[해결 문제]
+봇(get_ohlcv), price_predictor_v5_1(fetch_candles_15m), crypto_data_downloader_v3
+(fetch_ohlcv_paginated)가 같은 업비트 캔들 엔드포인트를 각자 페이지네이션하고
+실행 간에 아무것도 남기지 않음 (다운로더 CSV는 다시 읽는 곳이 없음).
+→ 봇 재시작/예측기 그리드 실행마다 수백 회의 rate-limit 대상 요청.
+
+[설계]
+  1. SQLite 단일 파일, 기본키 (market, interval, ts)
+     - ts = 봉 시작 UTC epoch 초 (candle_date_time_utc)
+     - WAL 모드 → 봇이 쓰는 동안 다운로더/예측기가 동시에 읽기 가능
+     - 스레드별 커넥션 (threading.local)
+
+  2. 증분 동기화
+     - sync(): 마지막 저장 봉 이후(마지막 봉 포함, 미완성 봉 갱신)만 조회
+       전 구간을 받은 뒤 한 트랜잭션으로 저장 — 중간 페이지 실패 시 아무것도 쓰지 않음
+       (일부만 쓰면 최신 봉과 기존 봉 사이에 영구 구멍이 생김)
+     - backfill(): 가장 오래된 저장 봉 이전 구간만 조회, 상장일 도달 시 기록 후 재조회 안 함
+     - 공백이 STORE_MAX_GAP_BARS를 넘으면 오래된 구간을 버리고 새로 받음
+       → 저장 구간은 항상 연속 (업비트가 생략하는 무체결 봉 제외)
+     - max_bars 지정(매매 경로) 시 공백이 커도 최신 max_bars개(1페이지)만 받고
+       경계를 gaps 테이블에 기록 → 읽기는 경계 이후(최신 연속 구간)만,
+       사이 공백은 fill_gap()이 나중에 채움 (백그라운드/PRIORITY_BULK)
+
+  3. 공용 읽기 API
+     - get_candles(market, interval, count, to=None): 필요한 부분만 REST로 채운 뒤
+       로컬에서 읽어 KST 인덱스 OHLCV DataFrame 반환 (candles_to_df와 같은 형식)
+     - fetch_page 인자로 도구별 1페이지 조회 함수(재시도/진행률) 주입 가능,
+       기본은 공용 UpbitMarketClient (priority 인자 — 봇 매매 경로는 PRIORITY_NORMAL)
+
+[사용 예시]
+
+    store = get_candle_store()
+    df = store.get_candles("KRW-BTC", "minute15", 2000)            # 최초: REST 10회, 이후: 로컬
+    df = store.get_candles("KRW-BTC", "minute15", 500, to="2024-06-01T00:00:00")
+    store.sync("KRW-ETH", "minute240")                              # 새 봉만 조회
+    store.sync("KRW-ETH", "minute5", max_bars=200)                 # 공백이 커도 1페이지만
+    store.fill_gap("KRW-ETH", "minute5")                            # 남은 공백 (백그라운드)
+"""
+
+import calendar
+import functools
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from upbit_market_client import CANDLE_MAX_PER_CALL, get_market_client
+from upbit_rate_limiter import PRIORITY_BULK
+
+
+CANDLE_DB_PATH = os.getenv("UPBIT_CANDLE_DB", "./market_data/upbit_candles.db")
+
+# 인터벌별 봉 길이 (초) — 주/월봉은 증분 조회 수 추정용 하한
+INTERVAL_SECONDS = {
+    'minute1': 60, 'minute3': 180, 'minute5': 300, 'minute10': 600,
+    'minute15': 900, 'minute30': 1800, 'minute60': 3600, 'minute240': 14400,
+    'day': 86400, 'week': 7 * 86400, 'month': 28 * 86400,
+}
+
+STORE_MAX_GAP_BARS = 20000      # 마지막 저장 봉 이후 공백이 이보다 크면 오래된 구간 폐기 (100페이지)
+KST_OFFSET_SEC = 9 * 3600
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'value']
+
+# fetch_page(market, interval, count, to) → 업비트 캔들 JSON 리스트 (최신순, count ≤ 200)
+FetchPage = Callable[[str, str, int, Optional[str]], Optional[list]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS candles (
+    market   TEXT    NOT NULL,
+    interval TEXT    NOT NULL,
+    ts       INTEGER NOT NULL,
+    open     REAL, high REAL, low REAL, close REAL, volume REAL, value REAL,
+    PRIMARY KEY (market, interval, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sync_state (
+    market   TEXT    NOT NULL,
+    interval TEXT    NOT NULL,
+    listing_ts INTEGER,              -- 상장 첫 봉 (backfill 종료 지점)
+    PRIMARY KEY (market, interval)
+);
+CREATE TABLE IF NOT EXISTS gaps (
+    market   TEXT    NOT NULL,
+    interval TEXT    NOT NULL,
+    head_ts  INTEGER NOT NULL,       -- 최신 연속 구간의 첫 봉 (이전 봉과 사이에 공백)
+    PRIMARY KEY (market, interval)
+);
+"""
+
+
+def utc_str_to_ts(s: str) -> int:
+    """'2024-01-01T00:00:00' (UTC) → epoch 초"""
+    return calendar.timegm(datetime.strptime(s[:19], '%Y-%m-%dT%H:%M:%S').timetuple())
+
+
+def ts_to_utc_str(ts: int) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+
+
+def _default_fetch_page(market: str, interval: str, count: int, to: Optional[str],
+                        priority: int = PRIORITY_BULK) -> list:
+    return get_market_client().fetch_candles_raw(market, interval, count, to, priority)
+
+
+def _page_fetcher(fetch_page: Optional[FetchPage], priority: int) -> FetchPage:
+    """주입된 fetch_page 또는 priority로 조회하는 공용 클라이언트"""
+    if fetch_page is not None:
+        return fetch_page
+    return functools.partial(_default_fetch_page, priority=priority)
+
+
+class CandleStore:
+    """
+    SQLite 캔들 저장소.
+
+    [Thread Safety]
+    스레드별 커넥션 + (market, interval)별 동기화 락. 여러 스레드/프로세스에서 동시 사용 가능.
+    """
+
+    def __init__(self, path: str = CANDLE_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._sync_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._sync_locks_guard = threading.Lock()
+        self.reads = 0
+        self.rest_pages = 0
+        self.rest_bars = 0
+        d = os.path.dirname(os.path.abspath(path))
+        os.makedirs(d, exist_ok=True)
+        self._conn()
+
+    # ─────────────────────────────────────────────
+    # 저수준
+    # ─────────────────────────────────────────────
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _sync_lock(self, market: str, interval: str) -> threading.Lock:
+        key = (market, interval)
+        with self._sync_locks_guard:
+            lock = self._sync_locks.get(key)
+            if lock is None:
+                lock = self._sync_locks[key] = threading.Lock()
+            return lock
+
+    def upsert_raw(self, market: str, interval: str, candles: list, replace: bool = False,
+                   new_head: bool = False) -> int:
+        """업비트 캔들 JSON 리스트 저장 (같은 봉은 덮어씀 — 미완성 봉 갱신)
+        replace=True면 같은 트랜잭션에서 기존 봉/상장일 기록을 먼저 삭제
+        new_head=True면 이 봉들을 공백 뒤 최신 연속 구간으로 기록 (이전 경계 아래 봉은 삭제
+        — 공백은 항상 1개, 경계 아래 구간도 연속)"""
+        rows = []
+        for c in candles or []:
+            dt = c.get('candle_date_time_utc')
+            if not dt:
+                continue
+            rows.append((market, interval, utc_str_to_ts(dt),
+                         c.get('opening_price', 0.0), c.get('high_price', 0.0),
+                         c.get('low_price', 0.0), c.get('trade_price', 0.0),
+                         c.get('candle_acc_trade_volume', 0.0),
+                         c.get('candle_acc_trade_price', 0.0)))
+        if rows:
+            conn = self._conn()
+            with conn:
+                if replace:
+                    conn.execute("DELETE FROM candles WHERE market=? AND interval=?",
+                                 (market, interval))
+                    conn.execute("DELETE FROM sync_state WHERE market=? AND interval=?",
+                                 (market, interval))
+                    conn.execute("DELETE FROM gaps WHERE market=? AND interval=?",
+                                 (market, interval))
+                if new_head:
+                    old = conn.execute("SELECT head_ts FROM gaps WHERE market=? AND interval=?",
+                                       (market, interval)).fetchone()
+                    if old is not None:
+                        conn.execute("DELETE FROM candles WHERE market=? AND interval=? AND ts<?",
+                                     (market, interval, old[0]))
+                    conn.execute("INSERT OR REPLACE INTO gaps VALUES (?,?,?)",
+                                 (market, interval, min(r[2] for r in rows)))
+                conn.executemany(
+                    "INSERT OR REPLACE INTO candles VALUES (?,?,?,?,?,?,?,?,?)", rows)
+        return len(rows)
+
+    def bounds(self, market: str, interval: str) -> Tuple[Optional[int], Optional[int], int]:
+        """(가장 오래된 ts, 가장 최근 ts, 봉 수)"""
+        row = self._conn().execute(
+            "SELECT MIN(ts), MAX(ts), COUNT(*) FROM candles WHERE market=? AND interval=?",
+            (market, interval)).fetchone()
+        return row[0], row[1], row[2]
+
+    def gap_head(self, market: str, interval: str) -> Optional[int]:
+        """공백 뒤 최신 연속 구간의 첫 봉 ts (공백 없으면 None)"""
+        row = self._conn().execute(
+            "SELECT head_ts FROM gaps WHERE market=? AND interval=?",
+            (market, interval)).fetchone()
+        return row[0] if row else None
+
+    def _head_floor(self, market: str, interval: str, to: Optional[str]) -> Optional[int]:
+        """to 이전 읽기가 공백을 건너지 않도록 하는 하한 (없으면 None)"""
+        head = self.gap_head(market, interval)
+        if head is None or (to and utc_str_to_ts(to) <= head):
+            return None
+        return head
+
+    def _listing_ts(self, market: str, interval: str) -> Optional[int]:
+        row = self._conn().execute(
+            "SELECT listing_ts FROM sync_state WHERE market=? AND interval=?",
+            (market, interval)).fetchone()
+        return row[0] if row else None
+
+    def _set_listing_ts(self, market: str, interval: str, ts: int):
+        conn = self._conn()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO sync_state VALUES (?,?,?)",
+                         (market, interval, ts))
+
+    def _fetch_range(self, market: str, interval: str, count: int, to: Optional[str],
+                     fetch_page: FetchPage, progress=None, atomic: bool = False,
+                     replace: bool = False, new_head: bool = False) -> Tuple[int, str]:
+        """
+        to 이전 count개를 페이지 단위로 조회+저장 → (저장 봉 수, 상태)
+        상태: "ok" | "listing" (요청보다 짧은 페이지 = 상장 첫 봉 도달) | "fail" (빈 응답/실패)
+
+        atomic=False: 페이지마다 저장 (backfill — 과거 방향으로 이어지므로 중간 실패해도 연속)
+        atomic=True: 전 구간을 모은 뒤 한 번에 저장, "fail"이면 저장하지 않음 (0, "fail")
+        replace=True: (atomic) 저장 트랜잭션에서 기존 봉을 지우고 새 구간으로 교체
+        new_head=True: (atomic) 받은 구간을 공백 뒤 최신 연속 구간으로 기록
+        """
+        stored, remaining, cur_to, status = 0, count, to, "ok"
+        pending = []
+        while remaining > 0:
+            batch = min(remaining, CANDLE_MAX_PER_CALL)
+            page = fetch_page(market, interval, batch, cur_to)
+            self.rest_pages += 1
+            if not page:
+                # 실패와 "더 이전 봉 없음"을 구분할 수 없으므로 상장일로 기록하지 않음
+                status = "fail"
+                break
+            if atomic:
+                pending.extend(page)
+            else:
+                n = self.upsert_raw(market, interval, page)
+                stored += n
+                self.rest_bars += n
+            remaining -= len(page)
+            if progress is not None:
+                progress(stored + len(pending), count)
+            if len(page) < batch:
+                status = "listing"
+                break
+            cur_to = page[-1].get('candle_date_time_utc')
+            if not cur_to:
+                break
+        if atomic:
+            if status == "fail":
+                return 0, status
+            stored = self.upsert_raw(market, interval, pending, replace=replace,
+                                     new_head=new_head)
+            self.rest_bars += stored
+        return stored, status
+
+    # ─────────────────────────────────────────────
+    # 동기화
+    # ─────────────────────────────────────────────
+
+    def sync(self, market: str, interval: str, fetch_page: Optional[FetchPage] = None,
+             initial_count: int = CANDLE_MAX_PER_CALL,
+             priority: int = PRIORITY_BULK, max_bars: Optional[int] = None) -> Optional[int]:
+        """마지막 저장 봉 이후만 조회 (저장 없으면 initial_count개) → 저장 봉 수 (실패 시 None)
+
+        구간 전체를 받았을 때만 저장 — 여러 페이지 중 하나라도 실패하면 아무것도 쓰지 않고
+        None (다음 sync가 같은 구간을 다시 받음, 저장 구간은 계속 연속)
+
+        max_bars: 조회 상한 (매매 경로). 공백이 더 크면 최신 max_bars개만 받아
+        공백 경계를 기록 — 사이 구간은 fill_gap()으로 채움
+        """
+        fetch_page = _page_fetcher(fetch_page, priority)
+        sec = INTERVAL_SECONDS.get(interval, 60)
+        with self._sync_lock(market, interval):
+            _, last_ts, _ = self.bounds(market, interval)
+            count, replace, new_head = initial_count, False, False
+            if last_ts is not None:
+                gap = int((time.time() - last_ts) // sec) + 1
+                if max_bars is not None and gap + 1 > max_bars:
+                    # 매매 경로: 최신 구간만 받고 공백은 기록 (fill_gap이 채움)
+                    count, new_head = max_bars, True
+                elif gap > STORE_MAX_GAP_BARS:
+                    # 연속 구간 유지: 새 구간을 다 받으면 오래된 봉 폐기 후 교체
+                    replace = True
+                else:
+                    count = gap + 1     # 마지막 저장 봉(당시 미완성)부터 다시 받음
+            stored, status = self._fetch_range(market, interval, count, None, fetch_page,
+                                               atomic=True, replace=replace, new_head=new_head)
+            if status == "fail":
+                return None
+            if status == "listing" and (last_ts is None or replace):
+                first_ts, _, _ = self.bounds(market, interval)
+                self._set_listing_ts(market, interval, first_ts)
+            return stored
+
+    def fill_gap(self, market: str, interval: str, fetch_page: Optional[FetchPage] = None,
+                 priority: int = PRIORITY_BULK) -> Optional[int]:
+        """기록된 공백(경계 아래 마지막 봉 ~ 경계)을 채움 → 저장 봉 수 (공백 없으면 0, 실패 시 None)
+
+        공백이 STORE_MAX_GAP_BARS를 넘으면 받지 않고 경계 아래 봉을 버림 (과거는 backfill이 다시 받음)
+        """
+        fetch_page = _page_fetcher(fetch_page, priority)
+        sec = INTERVAL_SECONDS.get(interval, 60)
+        with self._sync_lock(market, interval):
+            head = self.gap_head(market, interval)
+            if head is None:
+                return 0
+            conn = self._conn()
+            lower = conn.execute(
+                "SELECT MAX(ts) FROM candles WHERE market=? AND interval=? AND ts<?",
+                (market, interval, head)).fetchone()[0]
+            stored = 0
+            if lower is not None:
+                bars = (head - lower) // sec
+                if bars > STORE_MAX_GAP_BARS:
+                    with conn:
+                        conn.execute("DELETE FROM candles WHERE market=? AND interval=? AND ts<?",
+                                     (market, interval, head))
+                else:
+                    # 경계 아래 마지막 봉(당시 미완성)부터 경계 직전까지
+                    stored, status = self._fetch_range(market, interval, bars + 1,
+                                                       ts_to_utc_str(head), fetch_page,
+                                                       atomic=True)
+                    if status == "fail":
+                        return None
+            with conn:
+                conn.execute("DELETE FROM gaps WHERE market=? AND interval=? AND head_ts=?",
+                             (market, interval, head))
+            return stored
+
+    def backfill(self, market: str, interval: str, bars: int,
+                 fetch_page: Optional[FetchPage] = None, progress=None,
+                 priority: int = PRIORITY_BULK) -> int:
+        """가장 오래된 저장 봉 이전 bars개 조회 (상장일 도달 기록 시 생략) → 저장 봉 수"""
+        fetch_page = _page_fetcher(fetch_page, priority)
+        with self._sync_lock(market, interval):
+            first_ts, _, _ = self.bounds(market, interval)
+            if first_ts is not None and self._listing_ts(market, interval) == first_ts:
+                return 0
+            to = ts_to_utc_str(first_ts) if first_ts is not None else None
+            stored, status = self._fetch_range(market, interval, bars, to, fetch_page, progress)
+            if status == "listing":
+                first_ts, _, _ = self.bounds(market, interval)
+                self._set_listing_ts(market, interval, first_ts)
+            return stored
+
+    # ─────────────────────────────────────────────
+    # 읽기
+    # ─────────────────────────────────────────────
+
+    def read(self, market: str, interval: str, count: Optional[int] = None,
+             to: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """로컬 봉 → OHLCV DataFrame (KST naive 인덱스, 오름차순). to는 UTC, 미포함."""
+        sql = "SELECT ts, open, high, low, close, volume, value FROM candles " \
+              "WHERE market=? AND interval=?"
+        args = [market, interval]
+        floor = self._head_floor(market, interval, to)
+        if floor is not None:
+            sql += " AND ts >= ?"
+            args.append(floor)
+        if to:
+            sql += " AND ts < ?"
+            args.append(utc_str_to_ts(to))
+        sql += " ORDER BY ts DESC"
+        if count:
+            sql += " LIMIT ?"
+            args.append(int(count))
+        rows = self._conn().execute(sql, args).fetchall()
+        if not rows:
+            return None
+        df = pd.DataFrame(rows[::-1], columns=['ts'] + OHLCV_COLUMNS)
+        df.index = pd.to_datetime(df.pop('ts') + KST_OFFSET_SEC, unit='s').rename('datetime')
+        return df
+
+    def count_before(self, market: str, interval: str, to: Optional[str] = None) -> int:
+        sql = "SELECT COUNT(*) FROM candles WHERE market=? AND interval=?"
+        args = [market, interval]
+        floor = self._head_floor(market, interval, to)
+        if floor is not None:
+            sql += " AND ts >= ?"
+            args.append(floor)
+        if to:
+            sql += " AND ts < ?"
+            args.append(utc_str_to_ts(to))
+        return self._conn().execute(sql, args).fetchone()[0]
+
+    def get_candles(self, market: str, interval: str, count: int, to: Optional[str] = None,
+                    fetch_page: Optional[FetchPage] = None, refresh: bool = True,
+                    progress=None, priority: int = PRIORITY_BULK,
+                    max_sync_bars: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """
+        to 이전(미지정 시 현재까지) count개 봉.
+        refresh=True면 최근 구간 증분 동기화, 부족한 과거 구간은 backfill 후 로컬에서 읽음.
+        priority는 REST 조회의 rate-limit 우선순위 (fetch_page 주입 시 무시).
+
+        max_sync_bars: 증분 동기화 상한 (매매 경로 — 긴 공백에도 1페이지만 조회).
+        지정하면 공백을 여기서 채우지 않고 최신 연속 구간만 반환 (gap_head() → fill_gap()),
+        미지정이면 기록된 공백을 먼저 채움.
+        """
+        self.reads += 1
+        try:
+            _, last_ts, _ = self.bounds(market, interval)
+            if refresh and (to is None or last_ts is None or utc_str_to_ts(to) > last_ts):
+                synced = self.sync(market, interval, fetch_page,
+                                   initial_count=max(1, min(count, CANDLE_MAX_PER_CALL)),
+                                   priority=priority, max_bars=max_sync_bars)
+                if synced is None and to is None:
+                    return None     # 최신 구간 조회 실패 — 오래된 로컬 봉을 최신으로 내주지 않음
+            if self._head_floor(market, interval, to) is not None:
+                if max_sync_bars is not None:
+                    return self.read(market, interval, count, to)
+                if self.fill_gap(market, interval, fetch_page, priority) is None:
+                    return None
+            have = self.count_before(market, interval, to)
+            if have < count:
+                first_ts, _, _ = self.bounds(market, interval)
+                extra = 0
+                if to and first_ts is not None:
+                    # to가 저장 구간보다 과거면 그 사이 봉까지 받아야 함
+                    sec = INTERVAL_SECONDS.get(interval, 60)
+                    extra = max(0, (first_ts - utc_str_to_ts(to)) // sec)
+                self.backfill(market, interval, count - have + extra, fetch_page, progress,
+                              priority)
+            return self.read(market, interval, count, to)
+        except Exception:
+            return None
+
+    def stats(self) -> dict:
+        """호출 통계 (전체 봉 수 집계는 대용량 DB에서 느리므로 카운터만)"""
+        return {"reads": self.reads, "rest_pages": self.rest_pages, "rest_bars": self.rest_bars}
+
+
+# ─────────────────────────────────────────────
+# 프로세스 공용 인스턴스
+# ─────────────────────────────────────────────
+
+_shared_store: Optional[CandleStore] = None
+_shared_store_lock = threading.Lock()
+
+
+def get_candle_store() -> CandleStore:
+    """프로세스 공용 저장소 (최초 호출 시 생성)"""
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = CandleStore()
+        return _shared_store
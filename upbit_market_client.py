@@ -0,0 +1,277 @@
+# ═══════════════════════════════════════════════════════════════════════
+# UpbitMarketClient — 업비트 REST 공용 클라이언트 (커넥션 풀 + 일괄/비동기 캔들 조회)
+# ═══════════════════════════════════════════════════════════════════════
+"""
+봇/예측기/다운로더가 공유하는 업비트 REST 클라이언트.
+
+[해결 문제]
+v39까지 get_ohlcv, _get_price_rest_single, UpbitAPI, 스크리너가 매 호출마다
+requests.get/post를 직접 호출 → 요청마다 새 TCP 연결 + TLS 핸드셰이크.
+또한 프로세스 전역 _rate_limit_wait 락 하나로 모든 요청이 직렬화되어
+스크리너 Tier 2 (4H봉 30개 순차 조회)가 매시 약 60초 정체.
+
+[설계]
+  1. Keep-Alive 커넥션 풀
+     - 스레드별 requests.Session + HTTPAdapter(pool_maxsize) 재사용
+     - 출처: requests 공식 문서 "Session Objects" (커넥션 재사용)
+
+  2. 요청 그룹별 초당 쿼터
+     - upbit_rate_limiter의 그룹별 토큰 버킷 (Remaining-Req 헤더 동기화, 429 백오프)
+     - 그룹이 다르면 서로 기다리지 않음 (캔들 조회가 주문을 막지 않음)
+     - priority 인자로 같은 그룹 내 우선순위 지정 (대량 조회는 PRIORITY_BULK)
+     - 429 재시도는 새 서명으로만: 인증 요청은 headers에 헤더 생성 함수를 넘겨 매 시도 JWT 재발급
+       (고정 Authorization 헤더는 nonce 재사용으로 거부되므로 재시도하지 않음)
+
+  3. 일괄/비동기 조회
+     - fetch_candles_many(tickers, interval, count): 스레드풀 동시 조회
+     - fetch_candles_many_async(...): asyncio 코루틴 (run_in_executor)
+     - 동시 요청 수는 쿼터 게이트가 초당 한도 이내로 자동 조절
+
+[사용 예시]
+
+    client = get_market_client()
+    df = client.fetch_candles("KRW-BTC", "minute15", 200)
+    dfs = client.fetch_candles_many(["KRW-BTC", "KRW-ETH"], "minute240", 100)
+
+    # asyncio 환경
+    dfs = await client.fetch_candles_many_async(tickers, "minute240", 100)
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Union
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from upbit_metrics import get_metrics_registry
+from upbit_rate_limiter import (PRIORITY_BULK, PRIORITY_NORMAL, RateLimiter,
+                                get_rate_limiter, group_for)
+
+
+UPBIT_API_BASE = "https://api.upbit.com"
+
+CANDLE_PATHS = {
+    'minute1':   '/v1/candles/minutes/1',
+    'minute3':   '/v1/candles/minutes/3',
+    'minute5':   '/v1/candles/minutes/5',
+    'minute10':  '/v1/candles/minutes/10',
+    'minute15':  '/v1/candles/minutes/15',
+    'minute30':  '/v1/candles/minutes/30',
+    'minute60':  '/v1/candles/minutes/60',
+    'minute240': '/v1/candles/minutes/240',
+    'day':       '/v1/candles/days',
+    'week':      '/v1/candles/weeks',
+    'month':     '/v1/candles/months',
+}
+CANDLE_MAX_PER_CALL = 200
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_MAX_WORKERS = 8
+HTTP_429_MAX_RETRY = 3
+
+_metrics = get_metrics_registry()
+_M_REQUESTS = _metrics.counter("upbit_rest_requests_total",
+                               "REST 요청 수 (엔드포인트/HTTP 상태별, 예외는 status=error)",
+                               ("endpoint", "status"))
+_M_LATENCY = _metrics.histogram("upbit_rest_request_seconds",
+                                "REST 요청 응답 시간 (토큰 대기 제외)", ("endpoint",))
+
+
+def candles_to_df(candles: list, count: Optional[int] = None) -> Optional[pd.DataFrame]:
+    """업비트 캔들 JSON → OHLCV DataFrame (KST naive 인덱스, 오름차순)"""
+    if not candles:
+        return None
+    rows = [{
+        'datetime': c.get('candle_date_time_kst', ''),
+        'open': c.get('opening_price', 0.0),
+        'high': c.get('high_price', 0.0),
+        'low': c.get('low_price', 0.0),
+        'close': c.get('trade_price', 0.0),
+        'volume': c.get('candle_acc_trade_volume', 0.0),
+        'value': c.get('candle_acc_trade_price', 0.0),
+    } for c in candles]
+
+    df = pd.DataFrame(rows)
+    df['datetime'] = pd.to_datetime(df['datetime'])
+    df = df.set_index('datetime').sort_index(ascending=True)
+    df = df[~df.index.duplicated(keep='last')]
+    if count is not None and len(df) > count:
+        df = df.iloc[-count:]
+    return df
+
+
+class UpbitMarketClient:
+    """
+    업비트 REST 공용 클라이언트.
+
+    [Thread Safety]
+    세션은 스레드별로 생성(threading.local), 요청 수 제한은 공용 RateLimiter가 담당.
+    여러 스레드에서 동시에 호출해도 안전.
+    """
+
+    def __init__(self, base_url: str = UPBIT_API_BASE,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 max_workers: int = DEFAULT_MAX_WORKERS,
+                 timeout: float = 10,
+                 limiter: Optional[RateLimiter] = None):
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.limiter = limiter or get_rate_limiter()
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="upbit-rest")
+
+    # ─────────────────────────────────────────────
+    # 저수준 요청
+    # ─────────────────────────────────────────────
+
+    def _session(self) -> requests.Session:
+        sess = getattr(self._local, "session", None)
+        if sess is None:
+            sess = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.pool_size,
+                                  pool_maxsize=self.pool_size)
+            sess.mount("https://", adapter)
+            sess.mount("http://", adapter)
+            self._local.session = sess
+        return sess
+
+    def request(self, method: str, path: str, params=None, json=None,
+                headers: Union[dict, Callable[[], dict], None] = None,
+                timeout: Optional[float] = None,
+                priority: Optional[int] = None) -> requests.Response:
+        """
+        토큰 획득 후 요청 (429는 제한기 백오프 후 재시도, 예외는 호출자에게 전달).
+
+        headers가 함수면 시도마다 호출 (JWT nonce 재발급).
+        고정 헤더에 Authorization이 있으면 nonce가 1회용이라 재시도 없이 429 그대로 반환.
+        """
+        group = group_for(method, path)
+        attempts = HTTP_429_MAX_RETRY
+        if headers is not None and not callable(headers) and "Authorization" in headers:
+            attempts = 1
+        resp = None
+        for _ in range(attempts):
+            self.limiter.acquire(group, priority)
+            t0 = time.perf_counter()
+            try:
+                resp = self._session().request(
+                    method, f"{self.base_url}{path}", params=params, json=json,
+                    headers=headers() if callable(headers) else headers,
+                    timeout=timeout or self.timeout,
+                )
+            except Exception:
+                _M_REQUESTS.labels(path, "error").inc()
+                raise
+            _M_LATENCY.labels(path).observe(time.perf_counter() - t0)
+            _M_REQUESTS.labels(path, resp.status_code).inc()
+            self.limiter.on_response(resp, group)
+            if resp.status_code != 429:
+                return resp
+        return resp
+
+    def get(self, path: str, params=None, headers=None,
+            timeout: Optional[float] = None,
+            priority: Optional[int] = None) -> requests.Response:
+        return self.request("GET", path, params=params, headers=headers,
+                            timeout=timeout, priority=priority)
+
+    def post(self, path: str, json=None, headers=None,
+             timeout: Optional[float] = None,
+             priority: Optional[int] = None) -> requests.Response:
+        return self.request("POST", path, json=json, headers=headers,
+                            timeout=timeout, priority=priority)
+
+    # ─────────────────────────────────────────────
+    # 캔들
+    # ─────────────────────────────────────────────
+
+    def fetch_candles_raw(self, ticker: str, interval: str = "minute15",
+                          count: int = 200, to: Optional[str] = None,
+                          priority: int = PRIORITY_NORMAL) -> list:
+        """캔들 JSON 리스트 (최신순, 200개 초과 시 to 기준 페이지네이션)"""
+        path = CANDLE_PATHS.get(interval, CANDLE_PATHS['minute15'])
+        all_candles = []
+        remaining = count
+        current_to = to
+        while remaining > 0:
+            batch_count = min(remaining, CANDLE_MAX_PER_CALL)
+            params = {'market': ticker, 'count': batch_count}
+            if current_to:
+                params['to'] = current_to
+            resp = self.get(path, params=params, priority=priority)
+            if resp.status_code != 200:
+                break
+            candles = resp.json()
+            if not candles:
+                break
+            all_candles.extend(candles)
+            remaining -= len(candles)
+            if len(candles) < batch_count:
+                break
+            current_to = candles[-1].get('candle_date_time_utc', '')
+            if not current_to:
+                break
+        return all_candles
+
+    def fetch_candles(self, ticker: str, interval: str = "minute15",
+                      count: int = 200, to: Optional[str] = None,
+                      priority: int = PRIORITY_NORMAL) -> Optional[pd.DataFrame]:
+        """캔들 DataFrame (실패 시 None)"""
+        try:
+            return candles_to_df(
+                self.fetch_candles_raw(ticker, interval, count, to, priority), count)
+        except Exception:
+            return None
+
+    def fetch_candles_many(self, tickers: List[str], interval: str = "minute15",
+                           count: int = 200, to: Optional[str] = None,
+                           priority: int = PRIORITY_BULK
+                           ) -> Dict[str, Optional[pd.DataFrame]]:
+        """여러 티커 캔들 동시 조회 → {ticker: DataFrame or None} (기본 BULK 우선순위)"""
+        futures = {tk: self._executor.submit(self.fetch_candles, tk, interval, count, to,
+                                             priority)
+                   for tk in dict.fromkeys(tickers)}
+        return {tk: fut.result() for tk, fut in futures.items()}
+
+    async def fetch_candles_async(self, ticker: str, interval: str = "minute15",
+                                  count: int = 200, to: Optional[str] = None,
+                                  priority: int = PRIORITY_NORMAL
+                                  ) -> Optional[pd.DataFrame]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self.fetch_candles, ticker, interval, count, to, priority)
+
+    async def fetch_candles_many_async(self, tickers: List[str], interval: str = "minute15",
+                                       count: int = 200, to: Optional[str] = None,
+                                       priority: int = PRIORITY_BULK
+                                       ) -> Dict[str, Optional[pd.DataFrame]]:
+        unique = list(dict.fromkeys(tickers))
+        results = await asyncio.gather(
+            *(self.fetch_candles_async(tk, interval, count, to, priority) for tk in unique))
+        return dict(zip(unique, results))
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+# ─────────────────────────────────────────────
+# 프로세스 공용 인스턴스
+# ─────────────────────────────────────────────
+
+_shared_client: Optional[UpbitMarketClient] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_market_client() -> UpbitMarketClient:
+    """프로세스 공용 클라이언트 (최초 호출 시 생성)"""
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = UpbitMarketClient()
+        return _shared_client
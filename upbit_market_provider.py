@@ -0,0 +1,225 @@
+# ═══════════════════════════════════════════════════════════════════════
+# MarketDataProvider — 시계/시세 공급자 인터페이스 (실거래 · 재생 · 메모리)
+# ═══════════════════════════════════════════════════════════════════════
+"""
+스크리너/EMA 트래커/매수·매도 엔진이 생성 시 주입받는 시계 + 시세 공급자.
+
+[해결 문제]
+세션 분류(_classify_kst_session), 보유 단계, Spike 유예, 재진입 쿨다운, 캐시 TTL이
+모두 time.time() / datetime.now()와 모듈 전역 get_candles_* / get_current_price를 직접 호출.
+→ 과거 데이터 재생은 봇 모듈 전역을 통째로 바꿔치기해야 했고(프로세스당 1개),
+  "09:05 KST, 1H BB 97%" 같은 상황을 엔진 단위로 재현할 방법이 없었음.
+
+[설계]
+  1. 인터페이스 (엔진이 쓰는 것만)
+     - time() → epoch 초, now() → KST naive datetime (캔들 인덱스와 같은 기준)
+     - candles(ticker, tf, count) → 지표 포함 DataFrame (tf: "5m" | "15m" | "1h" | "4h")
+     - price(ticker), balances() (/v1/accounts 형식)
+     - 스크리너용: markets(), tickers(markets) (/v1/ticker 형식), prefetch()
+     - candle_frames(ticker, {tf: count}): 같은 시점 스냅샷 (기본 = candles 반복)
+
+  2. 구현
+     - LiveMarketProvider (bb_bounce_hunter_v39): 벽시계 + WS/캐시/REST 조회 함수 위임
+     - ReplayMarketProvider (bb_backtest_v39): 저장 캔들을 시뮬레이션 시계로 재생
+     - InMemoryMarketProvider (이 모듈): 고정 프레임 + 수동 시계 (엔진 단위 재현/벤치마크)
+
+  3. 엔진은 공급자를 생성자 인자로 받음 (생략 시 실거래 공급자)
+     → 같은 프로세스에서 실거래 엔진과 재생 엔진을 동시에 생성 가능
+
+[사용 예시]
+
+    provider = InMemoryMarketProvider(ts=kst_to_epoch(datetime(2026, 3, 2, 9, 5)))
+    provider.set_candles("KRW-ETH", "1h", df_1h_with_indicators)
+    provider.set_price("KRW-ETH", 4_120_000)
+
+    sell_engine = TrendSellEngine(ema_tracker, provider=provider)
+    sell_engine.register("KRW-ETH", 4_000_000, buy_time=provider.time() - 3 * 3600)
+    sell_engine.check_sell_signal("KRW-ETH", provider.price("KRW-ETH"))
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+KST_OFFSET_SEC = 9 * 3600
+TIMEFRAMES = ("5m", "15m", "1h", "4h")
+
+
+def epoch_to_kst(ts: float) -> datetime:
+    """UTC epoch 초 → KST naive datetime"""
+    return datetime(1970, 1, 1) + timedelta(seconds=ts + KST_OFFSET_SEC)
+
+
+def kst_to_epoch(dt: datetime) -> float:
+    """KST naive datetime (pd.Timestamp 포함) → UTC epoch 초 — 호스트 시간대와 무관"""
+    return (dt - datetime(1970, 1, 1)).total_seconds() - KST_OFFSET_SEC
+
+
+def kst_index_to_epoch(index: pd.DatetimeIndex) -> np.ndarray:
+    """KST naive 인덱스 → UTC epoch 초 배열 (업비트 REST 캔들 인덱스용, .timestamp() 대신 사용)"""
+    return (pd.DatetimeIndex(index).values.astype("datetime64[s]").astype(np.int64)
+            - KST_OFFSET_SEC).astype(float)
+
+
+class MarketDataProvider(ABC):
+    """
+    시계 + 시세 공급자 추상 클래스.
+
+    time/now/candles/price/balances/markets/tickers는 구현 필수 (빠뜨리면 생성 시 TypeError),
+    candle_frames/prefetch는 기본 구현 제공.
+    """
+
+    # ─────────────────────────────────────────────
+    # 시계
+    # ─────────────────────────────────────────────
+
+    @abstractmethod
+    def time(self) -> float:
+        """epoch 초 (UTC 기준)"""
+
+    @abstractmethod
+    def now(self) -> datetime:
+        """KST naive datetime (호스트 시간대와 무관, 캔들 인덱스와 같은 기준)"""
+
+    # ─────────────────────────────────────────────
+    # 시세 / 계정
+    # ─────────────────────────────────────────────
+
+    @abstractmethod
+    def candles(self, ticker: str, tf: str, count: int) -> Optional[pd.DataFrame]:
+        """지표 포함 캔들 (tf: "5m" | "15m" | "1h" | "4h", 없으면 None)"""
+
+    def candle_frames(self, ticker: str, tf_counts: Dict[str, int]) -> Dict[str, Optional[pd.DataFrame]]:
+        return {tf: self.candles(ticker, tf, n) for tf, n in tf_counts.items()}
+
+    @abstractmethod
+    def price(self, ticker: str) -> Optional[float]:
+        """현재가 (없으면 None)"""
+
+    @abstractmethod
+    def balances(self) -> Optional[List[dict]]:
+        """/v1/accounts 형식 잔고 (조회 실패 시 None)"""
+
+    # ─────────────────────────────────────────────
+    # 스크리너
+    # ─────────────────────────────────────────────
+
+    @abstractmethod
+    def markets(self) -> List[str]:
+        """KRW 마켓 목록"""
+
+    @abstractmethod
+    def tickers(self, markets: List[str]) -> List[dict]:
+        """/v1/ticker 형식 시세 목록"""
+
+    def prefetch(self, tickers: Iterable[str], tf: str, count: int) -> int:
+        """일괄 선조회 (지원하지 않으면 0)"""
+        return 0
+
+
+class InMemoryMarketProvider(MarketDataProvider):
+    """
+    고정 프레임 + 수동 시계 공급자.
+
+    - candles(): 등록된 프레임에서 now() 이후 시작하는 봉을 제외한 최근 count행
+      (프레임은 지표 컬럼까지 포함된 상태로 등록)
+    - price(): set_price 값, 없으면 가장 짧은 봉의 마지막 종가
+    - tickers(): set_ticker_row 값, 없으면 현재가만 채운 행
+    """
+
+    def __init__(self, ts: Optional[float] = None,
+                 frames: Optional[Dict[Tuple[str, str], pd.DataFrame]] = None,
+                 prices: Optional[Dict[str, float]] = None,
+                 balances: Optional[List[dict]] = None):
+        self.ts = time.time() if ts is None else float(ts)
+        self._frames: Dict[Tuple[str, str], pd.DataFrame] = dict(frames or {})
+        self._prices: Dict[str, float] = dict(prices or {})
+        self._balances: List[dict] = list(balances or [])
+        self._ticker_rows: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    # ─────────────────────────────────────────────
+    # 설정
+    # ─────────────────────────────────────────────
+
+    def set_time(self, ts: float):
+        self.ts = float(ts)
+
+    def advance(self, sec: float):
+        self.ts += sec
+
+    def set_candles(self, ticker: str, tf: str, df: pd.DataFrame):
+        with self._lock:
+            self._frames[(ticker, tf)] = df.sort_index()
+
+    def set_price(self, ticker: str, price: float):
+        with self._lock:
+            self._prices[ticker] = float(price)
+
+    def set_balances(self, balances: List[dict]):
+        with self._lock:
+            self._balances = list(balances)
+
+    def set_ticker_row(self, ticker: str, row: dict):
+        with self._lock:
+            self._ticker_rows[ticker] = {**row, "market": ticker}
+
+    # ─────────────────────────────────────────────
+    # MarketDataProvider
+    # ─────────────────────────────────────────────
+
+    def time(self) -> float:
+        return self.ts
+
+    def now(self) -> datetime:
+        return epoch_to_kst(self.ts)
+
+    def candles(self, ticker: str, tf: str, count: int) -> Optional[pd.DataFrame]:
+        with self._lock:
+            df = self._frames.get((ticker, tf))
+        if df is None:
+            return None
+        end = df.index.searchsorted(self.now(), side="right")
+        if end == 0:
+            return None
+        return df.iloc[max(0, end - count):end]
+
+    def price(self, ticker: str) -> Optional[float]:
+        with self._lock:
+            price = self._prices.get(ticker)
+        if price is not None:
+            return price
+        for tf in TIMEFRAMES:
+            df = self.candles(ticker, tf, 1)
+            if df is not None:
+                return float(df["close"].iat[-1])
+        return None
+
+    def balances(self) -> Optional[List[dict]]:
+        with self._lock:
+            return [dict(b) for b in self._balances]
+
+    def markets(self) -> List[str]:
+        with self._lock:
+            names = {tk for tk, _ in self._frames} | set(self._prices) | set(self._ticker_rows)
+        return sorted(m for m in names if m.startswith("KRW-"))
+
+    def tickers(self, markets: List[str]) -> List[dict]:
+        rows = []
+        for m in markets:
+            with self._lock:
+                row = self._ticker_rows.get(m)
+            if row is not None:
+                rows.append(dict(row))
+                continue
+            price = self.price(m)
+            if price is not None:
+                rows.append({"market": m, "trade_price": price, "signed_change_rate": 0.0,
+                             "acc_trade_price_24h": 0.0, "acc_trade_volume_24h": 0.0})
+        return rows
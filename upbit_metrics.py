@@ -0,0 +1,468 @@
+# ═══════════════════════════════════════════════════════════════════════
+# UpbitMetrics — 프로세스 내 메트릭 레지스트리 (카운터/게이지/HDR 히스토그램 + Prometheus 노출)
+# ═══════════════════════════════════════════════════════════════════════
+"""
+봇/시세 클라이언트/요청 제한기가 공유하는 런타임 메트릭.
+
+[해결 문제]
+운영 상태 확인 수단이 print 로그와 매시 디스코드 보고뿐.
+엔드포인트별 분당 REST 호출 수, 캔들 캐시 적중률, 매도 판정 소요 시간,
+WS 시세 캐시 지연을 실시간으로 볼 방법이 없었음.
+
+[설계]
+  1. 메트릭 3종 (라벨별 자식 객체, 자식은 최초 조회 시 생성 후 재사용)
+     - Counter: 누적 증가 (요청 수, 캐시 적중/미스, WS 메시지 수)
+     - Gauge: 현재 값 (WS 캐시 지연, 보유 수) — set_function()으로 수집 시점 계산 가능
+     - Histogram: HDR 방식 로그-선형 버킷 (2의 거듭제곱 구간마다 선형 하위 버킷 8개)
+       → 인덱스 계산 O(1) (math.frexp), 상대 오차 ≤ 12.5%, 1µs ~ 약 36분 범위
+
+  2. 오버헤드
+     - 기록 1회 = 라벨 조회 없이 미리 바인딩한 자식 + 락 1회 + 정수 증가
+     - 핫패스에서는 labels()를 모듈 로드 시 한 번만 호출해 자식을 보관
+
+  3. 노출
+     - render(): Prometheus text format 0.0.4
+       (히스토그램 le 경계는 2의 거듭제곱만 출력 — 하위 버킷은 quantile() 계산용)
+     - serve(port): 로컬 HTTP /metrics (데몬 스레드, 기본 127.0.0.1)
+     - add_collector(fn): 수집 직전에 호출 (WS 캐시 지연처럼 매번 계산하는 게이지)
+
+[Thread Safety]
+메트릭 자식마다 threading.Lock, 레지스트리/자식 맵은 별도 락으로 보호.
+
+[사용 예시]
+
+    metrics = get_metrics_registry()
+    rest_calls = metrics.counter("upbit_rest_requests_total", "REST 요청 수", ("endpoint", "status"))
+    rest_calls.labels("/v1/ticker", "200").inc()
+
+    check_sell_sec = metrics.histogram("bot_check_sell_seconds", "매도 판정 소요 시간")
+    with check_sell_sec.time():
+        engine.check_sell_signal(ticker, price)
+
+    metrics.serve(9108)        # curl http://127.0.0.1:9108/metrics
+"""
+
+import math
+import threading
+import time
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+HISTOGRAM_UNIT = 1e-6           # 최소 단위 (초) — 이보다 작은 값은 첫 버킷
+HISTOGRAM_SUB_BUCKETS = 8       # 2의 거듭제곱 구간당 선형 하위 버킷 수
+HISTOGRAM_MAX_POWER = 30        # 마지막 구간 [2^30, 2^31) × 단위 (≈ 2147초까지), 초과분은 +Inf 버킷
+
+DEFAULT_HTTP_HOST = "127.0.0.1"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _label_str(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+# ─────────────────────────────────────────────
+# 메트릭 자식 (라벨 값 1조합)
+# ─────────────────────────────────────────────
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeChild:
+    __slots__ = ("value", "_fn", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._fn: Optional[Callable[[], float]] = None
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        with self._lock:
+            self.value = float(value)
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set_function(self, fn: Callable[[], float]):
+        """수집 시점에 fn() 값으로 보고"""
+        self._fn = fn
+
+    def get(self) -> float:
+        fn = self._fn
+        if fn is not None:
+            try:
+                return float(fn())
+            except Exception:
+                return math.nan
+        return self.value
+
+
+class _Timer:
+    __slots__ = ("_child", "_t0")
+
+    def __init__(self, child):
+        self._child = child
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._child.observe(time.perf_counter() - self._t0)
+        return False
+
+
+class _HistogramChild:
+    """HDR 방식 로그-선형 버킷 히스토그램"""
+
+    __slots__ = ("counts", "count", "sum", "max", "_lock")
+
+    N_BUCKETS = 2 + (HISTOGRAM_MAX_POWER + 1) * HISTOGRAM_SUB_BUCKETS   # 0: 단위 미만, 마지막: 초과
+
+    def __init__(self):
+        self.counts = [0] * self.N_BUCKETS
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def bucket_index(value: float) -> int:
+        x = value / HISTOGRAM_UNIT
+        if x < 1.0:
+            return 0
+        m, e = math.frexp(x)                      # x = m × 2^e, m ∈ [0.5, 1)
+        power = e - 1
+        if power > HISTOGRAM_MAX_POWER:
+            return _HistogramChild.N_BUCKETS - 1
+        return 1 + power * HISTOGRAM_SUB_BUCKETS + int((2.0 * m - 1.0) * HISTOGRAM_SUB_BUCKETS)
+
+    @staticmethod
+    def bucket_upper(idx: int) -> float:
+        if idx == 0:
+            return HISTOGRAM_UNIT
+        if idx >= _HistogramChild.N_BUCKETS - 1:
+            return math.inf
+        power, sub = divmod(idx - 1, HISTOGRAM_SUB_BUCKETS)
+        return (2.0 ** power) * (1.0 + (sub + 1) / HISTOGRAM_SUB_BUCKETS) * HISTOGRAM_UNIT
+
+    def observe(self, value: float):
+        idx = self.bucket_index(value)
+        with self._lock:
+            self.counts[idx] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+    def quantile(self, q: float) -> float:
+        """q 분위수 (하위 버킷 상한 기준, 상대 오차 ≤ 1/HISTOGRAM_SUB_BUCKETS)"""
+        with self._lock:
+            counts = list(self.counts)
+            total, vmax = self.count, self.max
+        if total == 0:
+            return 0.0
+        rank = q * total
+        acc = 0
+        for idx, c in enumerate(counts):
+            acc += c
+            if c and acc >= rank:
+                return min(self.bucket_upper(idx), vmax)
+        return vmax
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            count, total, vmax = self.count, self.sum, self.max
+        return {"count": count, "mean": total / count if count else 0.0, "max": vmax,
+                "p50": self.quantile(0.5), "p90": self.quantile(0.9), "p99": self.quantile(0.99)}
+
+    def export_buckets(self) -> Tuple[List[Tuple[float, int]], int, float]:
+        """(2의 거듭제곱 le 경계별 누적 수, 총 수, 합)"""
+        with self._lock:
+            counts = list(self.counts)
+            count, total = self.count, self.sum
+        out = []
+        acc = counts[0]
+        out.append((HISTOGRAM_UNIT, acc))
+        for power in range(HISTOGRAM_MAX_POWER + 1):
+            start = 1 + power * HISTOGRAM_SUB_BUCKETS
+            acc += sum(counts[start:start + HISTOGRAM_SUB_BUCKETS])
+            out.append(((2.0 ** (power + 1)) * HISTOGRAM_UNIT, acc))
+        return out, count, total
+
+
+# ─────────────────────────────────────────────
+# 메트릭 (이름 + 라벨 이름 → 자식 맵)
+# ─────────────────────────────────────────────
+
+class _Metric:
+    TYPE = ""
+    _child_cls = None
+
+    def __init__(self, name: str, help_text: str = "", labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        self._default = None if self.labelnames else self.labels()
+
+    def labels(self, *values, **kwargs):
+        """라벨 값 → 자식 (핫패스에서는 결과를 보관해 재사용)"""
+        if kwargs:
+            values = tuple(str(kwargs[n]) for n in self.labelnames)
+        else:
+            values = tuple(str(v) for v in values)
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name}: 라벨 {self.labelnames} 필요, 받은 값 {values}")
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self._child_cls()
+        return child
+
+    def remove(self, *values):
+        with self._lock:
+            self._children.pop(tuple(str(v) for v in values), None)
+
+    def clear(self):
+        with self._lock:
+            self._children.clear()
+
+    def children(self) -> List[Tuple[Tuple[str, ...], object]]:
+        with self._lock:
+            return list(self._children.items())
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {_escape(self.help)}", f"# TYPE {self.name} {self.TYPE}"]
+
+
+class Counter(_Metric):
+    TYPE = "counter"
+    _child_cls = _CounterChild
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for values, child in self.children():
+            lines.append(f"{self.name}{_label_str(self.labelnames, values)} {_fmt(child.value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    TYPE = "gauge"
+    _child_cls = _GaugeChild
+
+    def set(self, value: float):
+        self._default.set(value)
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default.dec(amount)
+
+    def set_function(self, fn: Callable[[], float]):
+        self._default.set_function(fn)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for values, child in self.children():
+            value = child.get()
+            if not math.isnan(value):
+                lines.append(f"{self.name}{_label_str(self.labelnames, values)} {_fmt(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    TYPE = "histogram"
+    _child_cls = _HistogramChild
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+    def time(self) -> _Timer:
+        return self._default.time()
+
+    def timed(self, *values):
+        """함수 데코레이터 — 호출 소요 시간 기록 (예외로 끝나도 기록)"""
+        child = self.labels(*values)
+
+        def deco(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                t0 = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    child.observe(time.perf_counter() - t0)
+            return wrapper
+        return deco
+
+    def quantile(self, q: float) -> float:
+        return self._default.quantile(q)
+
+    def snapshot(self) -> dict:
+        return self._default.snapshot()
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for values, child in self.children():
+            buckets, count, total = child.export_buckets()
+            for le, acc in buckets:
+                le_label = f'le="{le!r}"'
+                lines.append(f"{self.name}_bucket{_label_str(self.labelnames, values, le_label)} {acc}")
+            inf_label = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_label_str(self.labelnames, values, inf_label)} {count}")
+            lines.append(f"{self.name}_sum{_label_str(self.labelnames, values)} {_fmt(total)}")
+            lines.append(f"{self.name}_count{_label_str(self.labelnames, values)} {count}")
+        return lines
+
+
+# ─────────────────────────────────────────────
+# 레지스트리 + HTTP 노출
+# ─────────────────────────────────────────────
+
+class MetricsRegistry:
+    """이름별 메트릭 보관 + 수집기 + Prometheus 텍스트 출력"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self.scrapes = 0
+
+    def _get_or_create(self, cls, name: str, help_text: str, labelnames: Sequence[str]):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labelnames)
+            elif type(metric) is not cls or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"메트릭 {name} 이미 {metric.TYPE}{metric.labelnames}로 등록됨")
+            return metric
+
+    def counter(self, name: str, help_text: str = "", labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str = "", labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text, labelnames)
+
+    def histogram(self, name: str, help_text: str = "", labelnames: Sequence[str] = ()) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, labelnames)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        with self._lock:
+            return self._metrics.get(name)
+
+    def add_collector(self, fn: Callable[[], None]):
+        """render() 직전에 호출될 함수 등록 (수집 시점 게이지 갱신용)"""
+        with self._lock:
+            self._collectors.append(fn)
+
+    def render(self) -> str:
+        with self._lock:
+            collectors = list(self._collectors)
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        for fn in collectors:
+            try:
+                fn()
+            except Exception:
+                pass
+        self.scrapes += 1
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = DEFAULT_HTTP_HOST) -> ThreadingHTTPServer:
+        """/metrics HTTP 서버 기동 (이미 기동했으면 기존 서버 반환, 포트 사용 중이면 OSError)"""
+        with self._lock:
+            if self._server is not None:
+                return self._server
+        registry = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), _Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        with self._lock:
+            self._server = server
+        return server
+
+    def shutdown(self):
+        with self._lock:
+            server, self._server = self._server, None
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+
+# ─────────────────────────────────────────────
+# 프로세스 공용 인스턴스
+# ─────────────────────────────────────────────
+
+_shared_registry: Optional[MetricsRegistry] = None
+_shared_registry_lock = threading.Lock()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """프로세스 공용 레지스트리 (최초 호출 시 생성)"""
+    global _shared_registry
+    with _shared_registry_lock:
+        if _shared_registry is None:
+            _shared_registry = MetricsRegistry()
+        return _shared_registry
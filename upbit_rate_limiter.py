@@ -0,0 +1,272 @@
+# ═══════════════════════════════════════════════════════════════════════
+# UpbitRateLimiter — Remaining-Req 헤더 기반 그룹별 토큰 버킷 (우선순위 + 429 백오프)
+# ═══════════════════════════════════════════════════════════════════════
+"""
+봇/예측기/다운로더가 공유하는 업비트 요청 수 제한기.
+
+[해결 문제]
+v39까지 봇은 전 스레드 공통 0.12초 간격 락, 다운로더/예측기는 각자 0.13초
+간격 _rate_limit 복사본을 사용. 요청 그룹 구분이 없어 스크리너의 캔들 대량
+조회 뒤에 execute_sell의 주문/잔고 조회가 수 초씩 대기 (손절 슬리피지).
+
+[설계 원칙 - 출처 표기]
+
+  1. 그룹별 토큰 버킷
+     출처: 업비트 개발자 센터 "요청 수 제한" (https://docs.upbit.com/kr/reference/rate-limits)
+     - 시세 그룹(market/candles/ticker/trades/orderbook) 초당 10회
+     - 거래 default 초당 30회, order 초당 8회
+     - 버킷 용량(버스트) + 충전 속도 = 그룹 한도 → 임의의 1초 구간에서 한도 초과 없음
+
+  2. Remaining-Req 헤더 동기화
+     - 응답 헤더 예: "group=candles; min=1799; sec=9"
+     - sec(이번 초 잔여 요청 수)가 로컬 토큰보다 적으면 로컬을 낮춤
+       → 같은 IP를 쓰는 다른 프로세스(다운로더 등)의 소비까지 반영
+
+  3. 우선순위
+     - CRITICAL(주문/계정) > NORMAL > BULK(스크리너/다운로더 대량 캔들)
+     - 상위 우선순위 대기자가 있으면 하위는 양보
+     - BULK는 버킷의 마지막 토큰(reserve)을 쓰지 않음
+
+  4. 429/418 백오프
+     - 429: 그룹 버킷을 지수 백오프(0.5 → 1 → 2 … 최대 10초) 동안 정지, 성공 시 리셋
+     - 418(IP 차단): Retry-After 또는 60초 정지
+
+[Thread Safety]
+버킷마다 threading.Condition으로 보호. 여러 스레드에서 동시에 호출해도 안전.
+
+[사용 예시]
+
+    limiter = get_rate_limiter()
+    limiter.acquire("candles", PRIORITY_BULK)
+    resp = session.get(url, params=params)
+    limiter.on_response(resp, "candles")
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+from upbit_metrics import get_metrics_registry
+
+
+PRIORITY_CRITICAL = 0       # 주문/계정 (매도 체결 경로)
+PRIORITY_NORMAL = 1
+PRIORITY_BULK = 2           # 스크리너/다운로더 대량 조회
+PRIORITY_NAMES = ("critical", "normal", "bulk")
+
+# 업비트 요청 그룹별 초당 한도
+GROUP_LIMITS = {
+    "market": 10, "candles": 10, "ticker": 10, "trades": 10, "orderbook": 10,
+    "default": 30, "order": 8,
+}
+UNKNOWN_GROUP_LIMIT = 10
+
+BURST_FRACTION = 0.3        # 한도 중 버스트(버킷 용량) 비율, 나머지는 충전 속도
+BULK_RESERVE_TOKENS = 1.0   # BULK 요청이 남겨둬야 하는 토큰 수
+
+BACKOFF_429_BASE_SEC = 0.5
+BACKOFF_429_MAX_SEC = 10.0
+BACKOFF_418_DEFAULT_SEC = 60.0
+
+_metrics = get_metrics_registry()
+_M_WAIT = _metrics.histogram("upbit_ratelimit_wait_seconds",
+                             "토큰 획득 대기 시간 (그룹/우선순위별)", ("group", "priority"))
+_M_PENALTY = _metrics.counter("upbit_ratelimit_penalties_total",
+                              "429/418 응답으로 인한 버킷 정지 횟수", ("group", "status"))
+
+
+def group_for(method: str, path: str) -> str:
+    """요청 → 업비트 쿼터 그룹 이름"""
+    if path.startswith("/v1/candles"):
+        return "candles"
+    if path.startswith("/v1/ticker"):
+        return "ticker"
+    if path.startswith("/v1/market"):
+        return "market"
+    if path.startswith("/v1/trades"):
+        return "trades"
+    if path.startswith("/v1/orderbook"):
+        return "orderbook"
+    if path.startswith("/v1/orders") and method.upper() in ("POST", "DELETE"):
+        return "order"
+    return "default"
+
+
+def default_priority(group: str) -> int:
+    """그룹 기본 우선순위 — 주문/계정 그룹은 CRITICAL"""
+    return PRIORITY_CRITICAL if group in ("order", "default") else PRIORITY_NORMAL
+
+
+def parse_remaining_req(header: Optional[str]) -> Optional[Dict[str, str]]:
+    """'group=candles; min=1799; sec=9' → {'group': 'candles', 'min': '1799', 'sec': '9'}"""
+    if not header:
+        return None
+    out = {}
+    for part in header.split(";"):
+        if "=" in part:
+            k, v = part.split("=", 1)
+            out[k.strip()] = v.strip()
+    return out or None
+
+
+class TokenBucket:
+    """단일 그룹 토큰 버킷 (우선순위 대기 + 일시 정지)"""
+
+    def __init__(self, limit_per_sec: float):
+        self.limit = float(limit_per_sec)
+        self.capacity = max(1.0, self.limit * BURST_FRACTION)
+        self.rate = self.limit - self.capacity
+        self.tokens = self.capacity
+        self._last = time.monotonic()
+        self._blocked_until = 0.0
+        self._backoff_sec = 0.0
+        self._waiting = [0, 0, 0]
+        self._cond = threading.Condition()
+        # 통계
+        self.acquired = 0
+        self.total_wait_sec = 0.0
+        self.throttled_429 = 0
+
+    def _refill(self, now: float):
+        if now > self._last:
+            self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+            self._last = now
+
+    def acquire(self, priority: int = PRIORITY_NORMAL, timeout: Optional[float] = None) -> bool:
+        """토큰 1개 획득 (timeout 초과 시 False)"""
+        priority = min(max(priority, PRIORITY_CRITICAL), PRIORITY_BULK)
+        start = time.monotonic()
+        floor = BULK_RESERVE_TOKENS if priority == PRIORITY_BULK else 0.0
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    higher_waiting = any(self._waiting[q] for q in range(priority))
+                    if (now >= self._blocked_until and not higher_waiting
+                            and self.tokens - floor >= 1.0):
+                        self.tokens -= 1.0
+                        self.acquired += 1
+                        self.total_wait_sec += now - start
+                        return True
+                    if now < self._blocked_until:
+                        wait = self._blocked_until - now
+                    elif self.rate > 0:
+                        wait = max(1.0 + floor - self.tokens, 0.0) / self.rate
+                    else:
+                        wait = 0.05
+                    if timeout is not None:
+                        remaining = timeout - (now - start)
+                        if remaining <= 0:
+                            return False
+                        wait = min(wait, remaining)
+                    self._cond.wait(max(wait, 0.002))
+            finally:
+                self._waiting[priority] -= 1
+                self._cond.notify_all()
+
+    def sync_remaining(self, sec_remaining: int):
+        """서버가 알려준 이번 초 잔여 요청 수로 로컬 토큰 하향 보정"""
+        with self._cond:
+            self._refill(time.monotonic())
+            if sec_remaining < self.tokens:
+                self.tokens = float(max(sec_remaining, 0))
+
+    def on_success(self):
+        with self._cond:
+            self._backoff_sec = 0.0
+
+    def penalize(self, seconds: Optional[float] = None):
+        """429/418 → 버킷 정지 (seconds 미지정 시 지수 백오프)"""
+        with self._cond:
+            if seconds is None:
+                self._backoff_sec = min(BACKOFF_429_MAX_SEC,
+                                        max(BACKOFF_429_BASE_SEC, self._backoff_sec * 2))
+                seconds = self._backoff_sec
+                self.throttled_429 += 1
+            now = time.monotonic()
+            self._blocked_until = max(self._blocked_until, now + seconds)
+            self.tokens = 0.0
+            self._last = max(self._last, self._blocked_until)
+            self._cond.notify_all()
+
+
+class RateLimiter:
+    """그룹별 TokenBucket 묶음 + 응답 헤더 피드백"""
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None):
+        self._limits = dict(GROUP_LIMITS if limits is None else limits)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, group: str) -> TokenBucket:
+        with self._lock:
+            b = self._buckets.get(group)
+            if b is None:
+                b = TokenBucket(self._limits.get(group, UNKNOWN_GROUP_LIMIT))
+                self._buckets[group] = b
+            return b
+
+    def acquire(self, group: str, priority: Optional[int] = None,
+                timeout: Optional[float] = None) -> bool:
+        if priority is None:
+            priority = default_priority(group)
+        t0 = time.perf_counter()
+        ok = self.bucket(group).acquire(priority, timeout)
+        _M_WAIT.labels(group, PRIORITY_NAMES[min(max(priority, PRIORITY_CRITICAL), PRIORITY_BULK)]
+                       ).observe(time.perf_counter() - t0)
+        return ok
+
+    def on_response(self, resp, group: Optional[str] = None):
+        """응답 → 헤더 동기화 + 429/418 백오프. 헤더의 group이 우선."""
+        try:
+            info = parse_remaining_req(resp.headers.get("Remaining-Req"))
+            if info and info.get("group"):
+                group = info["group"]
+            if group is None:
+                return
+            b = self.bucket(group)
+            if resp.status_code == 429:
+                _M_PENALTY.labels(group, "429").inc()
+                b.penalize()
+                return
+            if resp.status_code == 418:
+                _M_PENALTY.labels(group, "418").inc()
+                retry_after = resp.headers.get("Retry-After")
+                try:
+                    seconds = float(retry_after) if retry_after else BACKOFF_418_DEFAULT_SEC
+                except ValueError:
+                    seconds = BACKOFF_418_DEFAULT_SEC
+                b.penalize(seconds)
+                return
+            b.on_success()
+            if info and "sec" in info:
+                b.sync_remaining(int(info["sec"]))
+        except Exception:
+            pass
+
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {g: {"acquired": b.acquired, "avg_wait_ms": round(
+                    b.total_wait_sec / b.acquired * 1000, 2) if b.acquired else 0.0,
+                    "throttled_429": b.throttled_429}
+                for g, b in buckets.items()}
+
+
+# ─────────────────────────────────────────────
+# 프로세스 공용 인스턴스
+# ─────────────────────────────────────────────
+
+_shared_limiter: Optional[RateLimiter] = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """프로세스 공용 제한기 (최초 호출 시 생성)"""
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter()
+        return _shared_limiter
@@ -0,0 +1,295 @@
+# ═══════════════════════════════════════════════════════════════════════
+# UpbitTradeLedger — 영속 거래 원장 (SQLite, 인덱스 + 증분 집계)
+# ═══════════════════════════════════════════════════════════════════════
+"""
+봇의 매수/매도 체결을 기록하는 디스크 원장.
+
+[해결 문제]
+v39까지 거래 통계는 모듈 전역(total_trades, winning_trades, daily_* …)과
+trade_history = deque(maxlen=100)에만 존재 → 재시작 시 소실,
+매도 사유별(STOPLOSS vs BB_DAE_T4 vs RATCHET_STOP …) 분석은 최근 100건이 한계.
+재진입 쿨다운(recent_sells)도 메모리에만 있어 재시작 직후 무력화.
+
+[설계]
+  1. SQLite 단일 파일 (WAL), 체결 1건 = trades 1행
+     - 인덱스: ts / (ticker, ts) / (category, ts)
+  2. 증분 집계
+     - 매도 기록과 같은 트랜잭션에서 agg(mode, dim, key) 행 갱신
+       dim: all / category / session / phase / day
+     - mode(live/test)별로 분리 — TEST_MODE 거래가 실거래 통계/쿨다운에 섞이지 않음
+     - 건수/승패/평균%는 포지션 종료(전량 매도) 1건 기준, 분할 매도는 손익(원)만 합산
+       (분할 익절마다 1승으로 세면 거래 수/승률이 부풀려짐)
+     - 메모리 사본을 함께 갱신 → 조회는 dict 조회 O(1) (스캔 없음)
+     - 최근 ROLLING_WINDOW건 승패는 deque로 유지 (롤링 승률)
+  3. 재진입 쿨다운 복원
+     - recent_sells(since_ts): 티커별 마지막 전량 매도 (재시작 시 recent_sells 재구성)
+
+[사용 예시]
+
+    ledger = get_trade_ledger()
+    ledger.record_buy("KRW-BTC", 95_000_000, 100_000, "EMA추세")
+    ledger.record_sell("KRW-BTC", 96_000_000, profit_pct=1.05, profit_krw=1050,
+                       category="RATCHET_STOP", reason="...", session="EU_RAMP", phase="MID")
+    ledger.aggregate("category", "RATCHET_STOP")   # {'trades': 1, 'wins': 1, 'win_rate': 100.0, ...}
+    ledger.rolling_win_rate()
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+TRADE_LEDGER_PATH = os.getenv("UPBIT_TRADE_LEDGER", "./market_data/trade_ledger.db")
+ROLLING_WINDOW = 50             # 롤링 승률 집계 매도 건수
+
+AGG_DIMENSIONS = ("all", "category", "session", "phase", "day")
+
+# PRAGMA user_version — 2: agg 기본키에 mode 추가 + 분할 매도 건수 제외 (이전 집계는 trades로 재계산)
+LEDGER_SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id         INTEGER PRIMARY KEY,
+    ts         REAL    NOT NULL,
+    ticker     TEXT    NOT NULL,
+    side       TEXT    NOT NULL,          -- 'buy' | 'sell'
+    price      REAL,
+    amount_krw REAL,
+    ratio      REAL,                      -- 매도 비율 (분할 매도 < 1.0)
+    profit_pct REAL,
+    profit_krw REAL,
+    category   TEXT,
+    reason     TEXT,
+    session    TEXT,
+    phase      TEXT,
+    hold_sec   REAL,
+    mode       TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_trades_ts       ON trades (ts);
+CREATE INDEX IF NOT EXISTS ix_trades_ticker   ON trades (ticker, ts);
+CREATE INDEX IF NOT EXISTS ix_trades_category ON trades (category, ts);
+"""
+
+_AGG_TABLE = """
+CREATE TABLE IF NOT EXISTS agg (
+    mode    TEXT    NOT NULL,
+    dim     TEXT    NOT NULL,
+    key     TEXT    NOT NULL,
+    trades  INTEGER NOT NULL DEFAULT 0,
+    wins    INTEGER NOT NULL DEFAULT 0,
+    losses  INTEGER NOT NULL DEFAULT 0,
+    sum_pct REAL    NOT NULL DEFAULT 0,
+    sum_krw REAL    NOT NULL DEFAULT 0,
+    PRIMARY KEY (mode, dim, key)
+) WITHOUT ROWID
+"""
+
+_AGG_UPSERT = (
+    "INSERT INTO agg (mode, dim, key, trades, wins, losses, sum_pct, sum_krw) "
+    "VALUES (?,?,?,?,?,?,?,?) ON CONFLICT(mode, dim, key) DO UPDATE SET "
+    "trades=trades+excluded.trades, wins=wins+excluded.wins, "
+    "losses=losses+excluded.losses, sum_pct=sum_pct+excluded.sum_pct, "
+    "sum_krw=sum_krw+excluded.sum_krw")
+
+
+def _sell_delta(ts: float, ratio: float, profit_pct: float, profit_krw: float,
+                category: Optional[str], session: Optional[str],
+                phase: Optional[str]) -> Tuple[List[tuple], List[float], Optional[bool]]:
+    """매도 1건 → (집계 키 목록, [trades, wins, losses, sum_pct, sum_krw] 증분, 승패)
+
+    분할 매도(ratio < 1)는 손익(원)만 — 건수/승패/평균%는 전량 매도(포지션 종료) 기준.
+    """
+    day = datetime.fromtimestamp(ts).strftime('%Y-%m-%d')
+    keys = [("all", "all"), ("category", category or "NONE"), ("day", day)]
+    if session:
+        keys.append(("session", session))
+    if phase:
+        keys.append(("phase", phase))
+    if ratio is not None and ratio < 1.0:
+        return keys, [0, 0, 0, 0.0, profit_krw], None
+    win = 1 if profit_pct > 0 else 0
+    return keys, [1, win, 1 - win, profit_pct, profit_krw], bool(win)
+
+
+def _agg_view(row: List[float]) -> dict:
+    trades, wins, losses, sum_pct, sum_krw = row
+    return {
+        "trades": int(trades), "wins": int(wins), "losses": int(losses),
+        "win_rate": wins / trades * 100 if trades else 0.0,
+        "avg_pct": sum_pct / trades if trades else 0.0,
+        "sum_pct": sum_pct, "sum_krw": sum_krw,
+    }
+
+
+class TradeLedger:
+    """
+    SQLite 거래 원장 + 메모리 집계 사본.
+
+    [Thread Safety]
+    커넥션 1개를 락으로 보호 (체결 기록은 드묾). 집계 조회는 같은 락 아래 dict 조회.
+
+    기록/집계/조회는 모두 생성 시 mode 기준 (같은 파일에 live/test가 함께 있어도 분리).
+    """
+
+    def __init__(self, path: str = TRADE_LEDGER_PATH, mode: str = "live"):
+        self.path = path
+        self.mode = mode
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._agg: Dict[tuple, List[float]] = {}
+        self._rolling = deque(maxlen=ROLLING_WINDOW)
+        self._migrate()
+        self._load()
+
+    def _migrate(self):
+        """이전 버전 집계(agg) → 현재 규칙으로 trades에서 재계산 (trades는 원본 그대로)"""
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= LEDGER_SCHEMA_VERSION:
+            self._conn.execute(_AGG_TABLE)
+            return
+        with self._conn:
+            self._conn.execute("DROP TABLE IF EXISTS agg")
+            self._conn.execute(_AGG_TABLE)
+            rows = self._conn.execute(
+                "SELECT COALESCE(mode, 'live'), ts, ratio, profit_pct, profit_krw, category, "
+                "session, phase FROM trades WHERE side='sell' ORDER BY ts").fetchall()
+            for mode, ts, ratio, pct, krw, category, session, phase in rows:
+                keys, delta, _ = _sell_delta(ts, ratio, pct or 0.0, krw or 0.0,
+                                             category, session, phase)
+                self._conn.executemany(_AGG_UPSERT, [(mode, dim, key, *delta) for dim, key in keys])
+            self._conn.execute(f"PRAGMA user_version = {LEDGER_SCHEMA_VERSION}")
+
+    def _load(self):
+        """이 mode의 집계 테이블 + 최근 전량 매도 승패 → 메모리"""
+        with self._lock:
+            for dim, key, *vals in self._conn.execute(
+                    "SELECT dim, key, trades, wins, losses, sum_pct, sum_krw FROM agg "
+                    "WHERE mode=?", (self.mode,)):
+                self._agg[(dim, key)] = list(vals)
+            rows = self._conn.execute(
+                "SELECT profit_pct FROM trades WHERE side='sell' AND mode=? "
+                "AND (ratio IS NULL OR ratio >= 1.0) ORDER BY ts DESC LIMIT ?",
+                (self.mode, ROLLING_WINDOW)).fetchall()
+            self._rolling.extend(r[0] > 0 for r in reversed(rows))
+
+    # ─────────────────────────────────────────────
+    # 기록
+    # ─────────────────────────────────────────────
+
+    def record_buy(self, ticker: str, price: float, amount_krw: float, reason: str = "",
+                   ts: Optional[float] = None, session: Optional[str] = None) -> int:
+        ts = time.time() if ts is None else ts
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "INSERT INTO trades (ts, ticker, side, price, amount_krw, reason, session, mode) "
+                "VALUES (?,?,?,?,?,?,?,?)",
+                (ts, ticker, "buy", price, amount_krw, reason, session, self.mode))
+            return cur.lastrowid
+
+    def record_sell(self, ticker: str, price: float, profit_pct: float, profit_krw: float,
+                    category: str, reason: str = "", ratio: float = 1.0,
+                    session: Optional[str] = None, phase: Optional[str] = None,
+                    hold_sec: Optional[float] = None, ts: Optional[float] = None) -> int:
+        """매도 1건 기록 + 집계 증분 갱신 (같은 트랜잭션, 분할 매도는 손익(원)만 집계)"""
+        ts = time.time() if ts is None else ts
+        keys, delta, win = _sell_delta(ts, ratio, profit_pct, profit_krw, category, session, phase)
+        with self._lock:
+            with self._conn:
+                cur = self._conn.execute(
+                    "INSERT INTO trades (ts, ticker, side, price, ratio, profit_pct, profit_krw, "
+                    "category, reason, session, phase, hold_sec, mode) "
+                    "VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)",
+                    (ts, ticker, "sell", price, ratio, profit_pct, profit_krw,
+                     category, reason, session, phase, hold_sec, self.mode))
+                self._conn.executemany(
+                    _AGG_UPSERT, [(self.mode, dim, key, *delta) for dim, key in keys])
+            for k in keys:
+                row = self._agg.setdefault(k, [0, 0, 0, 0.0, 0.0])
+                for i, v in enumerate(delta):
+                    row[i] += v
+            if win is not None:
+                self._rolling.append(win)
+            return cur.lastrowid
+
+    # ─────────────────────────────────────────────
+    # 집계 조회 (O(1))
+    # ─────────────────────────────────────────────
+
+    def aggregate(self, dim: str, key: str = "all") -> dict:
+        with self._lock:
+            return _agg_view(self._agg.get((dim, key), [0, 0, 0, 0.0, 0.0]))
+
+    def aggregates(self, dim: str) -> Dict[str, dict]:
+        """dim의 전체 키별 집계 (키 수만큼, 거래 수와 무관)"""
+        with self._lock:
+            return {k: _agg_view(v) for (d, k), v in self._agg.items() if d == dim}
+
+    def rolling_win_rate(self) -> Optional[float]:
+        with self._lock:
+            if not self._rolling:
+                return None
+            return sum(self._rolling) / len(self._rolling) * 100
+
+    # ─────────────────────────────────────────────
+    # 인덱스 조회
+    # ─────────────────────────────────────────────
+
+    def recent_sells(self, since_ts: float) -> Dict[str, dict]:
+        """since_ts 이후 티커별 마지막 전량 매도 (이 mode) → {ticker: {'ts', 'category', 'reason'}}"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT ticker, ts, category, reason FROM trades "
+                "WHERE side='sell' AND mode=? AND ratio >= 1.0 AND ts >= ? ORDER BY ts",
+                (self.mode, since_ts)).fetchall()
+        return {tk: {"ts": ts, "category": cat, "reason": reason}
+                for tk, ts, cat, reason in rows}
+
+    def trades(self, ticker: Optional[str] = None, category: Optional[str] = None,
+               since_ts: Optional[float] = None, limit: int = 1000) -> List[dict]:
+        sql = "SELECT * FROM trades WHERE mode=?"
+        args: list = [self.mode]
+        if ticker:
+            sql += " AND ticker=?"
+            args.append(ticker)
+        if category:
+            sql += " AND category=?"
+            args.append(category)
+        if since_ts is not None:
+            sql += " AND ts>=?"
+            args.append(since_ts)
+        sql += " ORDER BY ts DESC LIMIT ?"
+        args.append(limit)
+        with self._lock:
+            cur = self._conn.execute(sql, args)
+            cols = [c[0] for c in cur.description]
+            return [dict(zip(cols, r)) for r in cur.fetchall()]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ─────────────────────────────────────────────
+# 프로세스 공용 인스턴스
+# ─────────────────────────────────────────────
+
+_shared_ledger: Optional[TradeLedger] = None
+_shared_ledger_lock = threading.Lock()
+
+
+def get_trade_ledger(mode: str = "live") -> TradeLedger:
+    """프로세스 공용 원장 (최초 호출 시 생성)"""
+    global _shared_ledger
+    with _shared_ledger_lock:
+        if _shared_ledger is None:
+            _shared_ledger = TradeLedger(mode=mode)
+        return _shared_ledger